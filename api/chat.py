@@ -4,12 +4,15 @@ Main chat functionality and session management
 OPTIMIZED: Cache-based configuration loading and parallel AI response generation
 """
 from fastapi import APIRouter, HTTPException, Depends, status, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, AsyncIterator
 import logging
 import asyncio
+import json
 import time
-from functools import lru_cache
+import uuid
+from functools import lru_cache, partial
 from database.utils import get_database_helper
 
 from auth_service import verify_token
@@ -31,6 +34,11 @@ except ImportError:
     get_response_cache = None
     get_distributed_cache = None
 
+from single_flight import get_chat_single_flight
+from semantic_cache import get_semantic_cache
+from cache_keys import make_cache_key
+from cache_warmer import get_cache_warmer
+
 # OPTIMIZATION: Cache AI configuration to avoid repeated loading
 @lru_cache(maxsize=1)
 def get_cached_ai_config() -> Dict[str, Any]:
@@ -67,9 +75,15 @@ class PerformanceMetrics:
             'huggingface_hits': 0,
             'fallback_hits': 0,
             'parallel_optimization_saves': 0,
-            'config_cache_saves': 0
+            'config_cache_saves': 0,
+            'streaming_requests': 0,
+            'coalesced_requests': 0,
+            'distributed_coalesced_requests': 0,
+            'semantic_cache_hits': 0
         }
         self.response_times = []
+        # Time to the first streamed chunk (ms): a whole post-processed sentence, not a raw token
+        self.first_chunk_times = []
     
     def record_request(self, response_time_ms: int, source: str, used_parallel: bool = False):
         """Record performance metrics for a request"""
@@ -92,9 +106,32 @@ class PerformanceMetrics:
         
         self.metrics['config_cache_saves'] += 1  # Config is always cached
     
+    def record_stream(self, first_chunk_ms: int, total_ms: int, source: str):
+        """Record a streamed response: time to the first chunk plus total duration"""
+        self.record_request(total_ms, source)
+        self.metrics['streaming_requests'] += 1
+        self.first_chunk_times.append(first_chunk_ms)
+        if len(self.first_chunk_times) > 100:
+            self.first_chunk_times.pop(0)
+    
+    def record_coalesced(self, coalesced: str):
+        """Record a request answered by another identical in-flight request"""
+        self.metrics['coalesced_requests'] += 1
+        if coalesced == "distributed":
+            self.metrics['distributed_coalesced_requests'] += 1
+    
     def get_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics"""
+        sorted_first_chunk = sorted(self.first_chunk_times)
         return {
+            # Headline latency metric: what the user waits before seeing anything
+            'time_to_first_chunk_ms': {
+                'average': sum(sorted_first_chunk) / len(sorted_first_chunk) if sorted_first_chunk else 0,
+                'median': sorted_first_chunk[len(sorted_first_chunk)//2] if sorted_first_chunk else 0,
+                'p95': sorted_first_chunk[min(len(sorted_first_chunk) - 1, int(len(sorted_first_chunk) * 0.95))]
+                       if sorted_first_chunk else 0,
+                'samples': len(sorted_first_chunk)
+            },
             **self.metrics,
             'current_response_times': self.response_times[-10:],  # Last 10 response times
             'median_response_time': sorted(self.response_times)[len(self.response_times)//2] if self.response_times else 0
@@ -146,6 +183,164 @@ class ChatResponse(BaseModel):
     session_id: str
     response_time_ms: Optional[int] = None
 
+def _validate_chat_input(raw_message: str) -> str:
+    """Validate and sanitize a chat message (raises HTTPException on invalid input)"""
+    message = raw_message.strip()
+    if not message:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Message cannot be empty"
+        )
+    
+    if len(message) > 1000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Message too long (max 1000 characters)"
+        )
+    
+    # Security validation
+    is_xss, xss_pattern = input_validator.detect_xss_attempt(message)
+    if is_xss:
+        logger.warning(f"XSS attempt blocked: {xss_pattern}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid content detected"
+        )
+    
+    is_sql_injection, sql_pattern = input_validator.detect_sql_injection(message)
+    if is_sql_injection:
+        logger.warning(f"SQL injection attempt blocked: {sql_pattern}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid content detected"
+        )
+    
+    # Sanitize input
+    return input_validator.sanitize_input(message)
+
+def _get_cache_instance():
+    """Get appropriate cache instance (distributed cache preferred, fallback to response cache)"""
+    cache_instance = None
+    if get_distributed_cache:
+        cache_instance = get_distributed_cache()
+    
+    # Fallback to response cache if distributed cache not available
+    if not cache_instance and get_response_cache:
+        cache_instance = get_response_cache()
+    
+    # Stale-while-revalidate: stale hits are recomputed in the background
+    if cache_instance is not None and getattr(cache_instance, 'refresher', False) is None:
+        cache_instance.set_refresher(_revalidate_cached_response)
+    return cache_instance
+
+async def _revalidate_cached_response(message: str, context: str = "") -> Tuple[str, str]:
+    """Recompute a stale cached answer off the request path"""
+    return await generate_ai_response(message)
+
+def _get_semantic_cache():
+    """Semantic near-duplicate cache (None when disabled)"""
+    # One model for every query, so Turkish and English phrasings share a vector space
+    return get_semantic_cache(embed=partial(model_manager.generate_embedding, force_turkish=True),
+                              verifier=generate_ai_response)
+
+async def _semantic_lookup(message: str):
+    """Look up a near-duplicate question; returns the lookup (hit or miss) or None"""
+    semantic_cache = _get_semantic_cache()
+    if not semantic_cache:
+        return None
+    semantic = await semantic_cache.lookup(message)
+    if semantic.hit:
+        performance_metrics.metrics['semantic_cache_hits'] += 1
+        logger.info(f"Returning semantic cache answer ({semantic.source}, similarity {semantic.similarity:.3f})")
+    return semantic
+
+async def _semantic_store(message: str, response: str, source: str, semantic=None):
+    """Remember a generated answer for near-duplicate questions"""
+    semantic_cache = _get_semantic_cache()
+    if semantic_cache:
+        await semantic_cache.store(message, response, source,
+                                   embedding=semantic.embedding if semantic else None)
+
+async def _generate_with_semantic_cache(message: str) -> Tuple[str, str]:
+    """generate_ai_response behind the semantic near-duplicate cache"""
+    semantic = await _semantic_lookup(message)
+    if semantic and semantic.hit:
+        return semantic.response, "semantic_cache"
+    generated = await generate_ai_response(message)
+    await _semantic_store(message, *generated, semantic=semantic)
+    return generated
+
+def _get_cache_warmer():
+    """Warming job recomputing frequent historical questions (None when disabled)"""
+    return get_cache_warmer(compute=generate_ai_response,
+                            store=_warm_store,
+                            fetch_history=db_manager.get_frequent_messages,
+                            lookup=_warm_lookup,
+                            claim=_warm_claim,
+                            release=_warm_release)
+
+async def _warm_claim(lock_key: str, token: str, ttl: float):
+    """One worker warms per trigger: the shared cache's in-flight lock (None without Redis)"""
+    cache_instance = _get_cache_instance()
+    if cache_instance is None or not hasattr(cache_instance, 'acquire_inflight'):
+        return None
+    return await cache_instance.acquire_inflight(lock_key, token, ttl)
+
+async def _warm_release(lock_key: str, token: str):
+    """Free the warming lock when a run fails or a non-startup run ends"""
+    cache_instance = _get_cache_instance()
+    if cache_instance is not None and hasattr(cache_instance, 'release_inflight'):
+        await cache_instance.release_inflight(lock_key, token)
+
+async def _warm_lookup(message: str):
+    """Cached answer of a question to warm, if another worker already stored it"""
+    return await _cache_get(_get_cache_instance(), message)
+
+async def _warm_store(message: str, response: str, source: str):
+    """Store a warmed answer in the response caches and the semantic cache"""
+    await _cache_set(_get_cache_instance(), message, response, source)
+    await _semantic_store(message, response, source)
+
+def start_cache_warming(reason: str = "startup"):
+    """Warm the response caches from chat history in the background"""
+    warmer = _get_cache_warmer()
+    if warmer:
+        warmer.schedule(reason)
+
+async def _cache_get(cache_instance, message: str):
+    """Get a cached (response, source) tuple from a sync or async cache"""
+    if not cache_instance:
+        return None
+    try:
+        if hasattr(cache_instance, 'get') and asyncio.iscoroutinefunction(cache_instance.get):
+            # Async cache (distributed)
+            return await cache_instance.get(message)
+        # Sync cache (local)
+        return cache_instance.get(message)
+    except Exception as e:
+        logger.warning(f"Cache get error: {e}")
+        return None
+
+def _single_flight_key(cache_instance, message: str) -> str:
+    """Coalescing key: the cache's own normalized key so duplicates match cache hits"""
+    if cache_instance is not None and hasattr(cache_instance, '_get_cache_key'):
+        return cache_instance._get_cache_key(message)
+    return make_cache_key(message)
+
+async def _cache_set(cache_instance, message: str, response: str, source: str):
+    """Store a response in a sync or async cache"""
+    if not cache_instance:
+        return
+    try:
+        if hasattr(cache_instance, 'set') and asyncio.iscoroutinefunction(cache_instance.set):
+            # Async cache (distributed)
+            await cache_instance.set(message, response, source=source)
+        else:
+            # Sync cache (local)
+            cache_instance.set(message, response, source=source)
+    except Exception as e:
+        logger.warning(f"Cache set error: {e}")
+
 @router.post("/message", response_model=ChatResponse)
 async def chat_message(
     chat_msg: ChatMessage,
@@ -168,84 +363,40 @@ async def chat_message(
                 detail="Too many chat requests. Please slow down."
             )
         
-        # Input validation
-        message = chat_msg.message.strip()
-        if not message:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Message cannot be empty"
-            )
-        
-        if len(message) > 1000:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Message too long (max 1000 characters)"
-            )
-        
-        # Security validation
-        is_xss, xss_pattern = input_validator.detect_xss_attempt(message)
-        if is_xss:
-            logger.warning(f"XSS attempt blocked: {xss_pattern}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid content detected"
-            )
-        
-        is_sql_injection, sql_pattern = input_validator.detect_sql_injection(message)
-        if is_sql_injection:
-            logger.warning(f"SQL injection attempt blocked: {sql_pattern}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid content detected"
-            )
-        
-        # Sanitize input
-        sanitized_message = input_validator.sanitize_input(message)
+        # Input validation and sanitization
+        sanitized_message = _validate_chat_input(chat_msg.message)
         
         # Get or create session
         session_id = db_manager.get_or_create_session(user_id)
         
-        # Get appropriate cache instance (distributed cache preferred, fallback to response cache)
-        cache_instance = None
-        if get_distributed_cache:
-            cache_instance = get_distributed_cache()
-        
-        # Fallback to response cache if distributed cache not available
-        if not cache_instance and get_response_cache:
-            cache_instance = get_response_cache()
-        
         # Try to get cached response
-        cached = None
-        if cache_instance:
-            try:
-                if hasattr(cache_instance, 'get') and asyncio.iscoroutinefunction(cache_instance.get):
-                    # Async cache (distributed)
-                    cached = await cache_instance.get(sanitized_message)
-                else:
-                    # Sync cache (local)
-                    cached = cache_instance.get(sanitized_message)
-            except Exception as e:
-                logger.warning(f"Cache get error: {e}")
+        cache_instance = _get_cache_instance()
+        cached = await _cache_get(cache_instance, sanitized_message)
         
         if cached:
             ai_response, response_source = cached
             logger.info(f"Returning cached response from {response_source}")
             response_source = f"cache_{response_source}"
         else:
-            # Generate AI response
-            ai_response, response_source = await generate_ai_response(sanitized_message)
+            async def compute():
+                # Generate AI response and cache it before waiters are released
+                generated = await _generate_with_semantic_cache(sanitized_message)
+                await _cache_set(cache_instance, sanitized_message, *generated)
+                return generated
             
-            # Cache the response
-            if cache_instance:
-                try:
-                    if hasattr(cache_instance, 'set') and asyncio.iscoroutinefunction(cache_instance.set):
-                        # Async cache (distributed)
-                        await cache_instance.set(sanitized_message, ai_response, source=response_source)
-                    else:
-                        # Sync cache (local)
-                        cache_instance.set(sanitized_message, ai_response, source=response_source)
-                except Exception as e:
-                    logger.warning(f"Cache set error: {e}")
+            async def lookup():
+                return await _cache_get(cache_instance, sanitized_message)
+            
+            # Identical concurrent messages share one generation (single-flight)
+            (ai_response, response_source), coalesced = await get_chat_single_flight().do(
+                _single_flight_key(cache_instance, sanitized_message),
+                compute,
+                cache=cache_instance,
+                lookup=lookup
+            )
+            if coalesced:
+                performance_metrics.record_coalesced(coalesced)
+                logger.info(f"Coalesced with identical in-flight request ({coalesced})")
         
         # Calculate response time
         response_time_ms = int((time.time() - start_time) * 1000)
@@ -281,6 +432,90 @@ async def chat_message(
             detail="Failed to process chat message"
         )
 
+FALLBACK_RESPONSE = "Üzgünüm, şu anda sorunuza uygun bir yanıt üretemiyorum. Lütfen daha sonra tekrar deneyin."
+
+# Answer sources shared by generate_ai_response and stream_ai_response; each
+# returns (response or None, source, confidence)
+
+async def _check_knowledge_base(message: str):
+    """Check knowledge base for answers"""
+    try:
+        from qdrant_client.models import Filter, FieldCondition, MatchValue
+        
+        # Search in knowledge base
+        search_results = qdrant_client.search(
+            collection_name="mefapex_faq",
+            query_text=message,
+            limit=3
+        )
+        
+        if search_results and search_results[0].score > 0.8:
+            return search_results[0].payload.get("answer", ""), "knowledge_base", search_results[0].score
+        return None, "knowledge_base", 0.0
+        
+    except Exception as e:
+        logger.warning(f"Knowledge base search failed: {e}")
+        return None, "knowledge_base", 0.0
+
+async def _check_static_content(message: str):
+    """Check static content for answers"""
+    try:
+        if content_manager:
+            static_response, response_type = content_manager.find_response(message)
+            if static_response:
+                # Assume high confidence for exact matches
+                confidence = 0.9 if response_type == "exact_match" else 0.7
+                return static_response, "static_content", confidence
+        return None, "static_content", 0.0
+    except Exception as e:
+        logger.warning(f"Static content search failed: {e}")
+        return None, "static_content", 0.0
+
+async def _check_openai(message: str, ai_config: Dict[str, Any]):
+    """Check OpenAI for answers"""
+    try:
+        if not ai_config['use_openai']:
+            return None, "openai", 0.0
+            
+        # Check if model_manager has OpenAI support
+        if hasattr(model_manager, 'generate_openai_response'):
+            openai_response = await model_manager.generate_openai_response(
+                context="You are MEFAPEX AI Assistant, a helpful and knowledgeable assistant.",
+                query=message
+            )
+            if openai_response:
+                return openai_response, "openai", 0.8  # Assume good confidence for OpenAI
+        else:
+            logger.debug("OpenAI not implemented in model manager")
+        return None, "openai", 0.0
+    except Exception as e:
+        logger.warning(f"OpenAI generation failed: {e}")
+        return None, "openai", 0.0
+
+def _best_answer(results) -> Optional[Tuple[str, str]]:
+    """Pick the highest-confidence (response, source) of the source checks"""
+    best_response = None
+    best_source = "fallback"
+    best_confidence = 0.0
+    
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Task failed: {result}")
+            continue
+            
+        response, source, confidence = result
+        if response and confidence > best_confidence:
+            best_response = response
+            best_source = source
+            best_confidence = confidence
+            
+            # OPTIMIZATION: Early return for high-confidence answers
+            if confidence > 0.85:
+                logger.info(f"🎯 Early return with high-confidence answer from {source} (confidence: {confidence:.2f})")
+                break
+    
+    return (best_response, best_source) if best_response else None
+
 async def generate_ai_response(message: str) -> tuple[str, str]:
     """
     OPTIMIZED: Generate AI response from various sources with parallel processing
@@ -296,61 +531,8 @@ async def generate_ai_response(message: str) -> tuple[str, str]:
     # OPTIMIZATION: Use cached configuration instead of re-fetching
     ai_config = get_cached_ai_config()
     
-    # OPTIMIZATION: Run multiple sources in parallel with early return
-    async def check_knowledge_base():
-        """Check knowledge base for answers"""
-        try:
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
-            
-            # Search in knowledge base
-            search_results = qdrant_client.search(
-                collection_name="mefapex_faq",
-                query_text=message,
-                limit=3
-            )
-            
-            if search_results and search_results[0].score > 0.8:
-                return search_results[0].payload.get("answer", ""), "knowledge_base", search_results[0].score
-            return None, "knowledge_base", 0.0
-            
-        except Exception as e:
-            logger.warning(f"Knowledge base search failed: {e}")
-            return None, "knowledge_base", 0.0
-    
-    async def check_static_content():
-        """Check static content for answers"""
-        try:
-            if content_manager:
-                static_response, response_type = content_manager.find_response(message)
-                if static_response:
-                    # Assume high confidence for exact matches
-                    confidence = 0.9 if response_type == "exact_match" else 0.7
-                    return static_response, "static_content", confidence
-            return None, "static_content", 0.0
-        except Exception as e:
-            logger.warning(f"Static content search failed: {e}")
-            return None, "static_content", 0.0
-    
-    async def check_openai():
-        """Check OpenAI for answers"""
-        try:
-            if not ai_config['use_openai']:
-                return None, "openai", 0.0
-                
-            # Check if model_manager has OpenAI support
-            if hasattr(model_manager, 'generate_openai_response'):
-                openai_response = await model_manager.generate_openai_response(
-                    context="You are MEFAPEX AI Assistant, a helpful and knowledgeable assistant.",
-                    query=message
-                )
-                if openai_response:
-                    return openai_response, "openai", 0.8  # Assume good confidence for OpenAI
-            else:
-                logger.debug("OpenAI not implemented in model manager")
-            return None, "openai", 0.0
-        except Exception as e:
-            logger.warning(f"OpenAI generation failed: {e}")
-            return None, "openai", 0.0
+    # Request deadline: local generation stops at a sentence boundary when it is reached
+    deadline = time.monotonic() + ai_config.get('generation_time_budget', 4.0)
     
     async def check_huggingface():
         """Check HuggingFace for answers"""
@@ -359,7 +541,8 @@ async def generate_ai_response(message: str) -> tuple[str, str]:
                 return None, "huggingface", 0.0
                 
             hf_response = await model_manager.generate_huggingface_response(
-                message=message
+                message=message,
+                deadline=deadline
             )
             if hf_response:
                 return hf_response, "huggingface", 0.6  # Lower confidence for local models
@@ -371,9 +554,9 @@ async def generate_ai_response(message: str) -> tuple[str, str]:
     # OPTIMIZATION: Execute all sources in parallel
     try:
         tasks = [
-            check_knowledge_base(),
-            check_static_content(),
-            check_openai(),
+            _check_knowledge_base(message),
+            _check_static_content(message),
+            _check_openai(message, ai_config),
             check_huggingface()
         ]
         
@@ -382,28 +565,9 @@ async def generate_ai_response(message: str) -> tuple[str, str]:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         used_parallel = True
         
-        # Find the best result based on confidence score
-        best_response = None
-        best_source = "fallback"
-        best_confidence = 0.0
-        
-        for result in results:
-            if isinstance(result, Exception):
-                logger.warning(f"Task failed: {result}")
-                continue
-                
-            response, source, confidence = result
-            if response and confidence > best_confidence:
-                best_response = response
-                best_source = source
-                best_confidence = confidence
-                
-                # OPTIMIZATION: Early return for high-confidence answers
-                if confidence > 0.85:
-                    logger.info(f"🎯 Early return with high-confidence answer from {source} (confidence: {confidence:.2f})")
-                    break
-        
-        if best_response:
+        best = _best_answer(results)
+        if best:
+            best_response, best_source = best
             response_time_ms = int((time.time() - start_time) * 1000)
             performance_metrics.record_request(response_time_ms, best_source, used_parallel)
             logger.info(f"✅ Parallel AI response generated: {response_time_ms}ms from {best_source}")
@@ -413,11 +577,170 @@ async def generate_ai_response(message: str) -> tuple[str, str]:
         logger.error(f"Parallel AI response generation failed: {e}")
     
     # Final fallback
-    fallback_response = "Üzgünüm, şu anda sorunuza uygun bir yanıt üretemiyorum. Lütfen daha sonra tekrar deneyin."
     response_time_ms = int((time.time() - start_time) * 1000)
     performance_metrics.record_request(response_time_ms, "fallback", used_parallel)
     
-    return fallback_response, "fallback"
+    return FALLBACK_RESPONSE, "fallback"
+
+async def stream_ai_response(message: str) -> AsyncIterator[Tuple[str, str]]:
+    """
+    🌊 Streaming counterpart of generate_ai_response
+    Yields (text_delta, source). The same knowledge base / static content /
+    OpenAI checks run first and their answer is returned as a single chunk,
+    so a question gets the same answer and source as POST /chat; only the
+    Hugging Face fallback is streamed sentence by sentence.
+    """
+    ai_config = get_cached_ai_config()
+    
+    # Hugging Face has the lowest confidence: it only answers when these find nothing
+    results = await asyncio.gather(
+        _check_knowledge_base(message),
+        _check_static_content(message),
+        _check_openai(message, ai_config),
+        return_exceptions=True
+    )
+    best = _best_answer(results)
+    if best:
+        yield best
+        return
+    
+    streamed = False
+    if ai_config['use_huggingface']:
+        deadline = time.monotonic() + ai_config.get('generation_time_budget', 4.0)
+        try:
+            if hasattr(model_manager, 'stream_huggingface_response'):
+                async for delta in model_manager.stream_huggingface_response(message=message, deadline=deadline):
+                    streamed = True
+                    yield delta, "huggingface"
+            else:
+                hf_response = await model_manager.generate_huggingface_response(message=message, deadline=deadline)
+                if hf_response:
+                    streamed = True
+                    yield hf_response, "huggingface"
+        except Exception as e:
+            # Sentences already sent stay; with none, answer like generate_ai_response
+            logger.warning(f"HuggingFace streaming failed: {e}")
+    
+    if not streamed:
+        yield FALLBACK_RESPONSE, "fallback"
+
+async def _single_chunk(text: str, source: str) -> AsyncIterator[Tuple[str, str]]:
+    """Wrap a complete response as a one-chunk stream"""
+    yield text, source
+
+async def stream_chat_events(message: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Produce chat stream events shared by the WebSocket and SSE transports:
+    ``chat_chunk`` frames followed by a final ``chat_response`` frame that
+    carries the full text and the time to the first chunk (the first
+    post-processed sentence when generating, not the first raw token).
+    """
+    start_time = time.time()
+    stream_id = uuid.uuid4().hex
+    first_chunk_ms = None
+    parts = []
+    response_source = "fallback"
+    
+    cache_instance = _get_cache_instance()
+    cached = await _cache_get(cache_instance, message)
+    semantic = None
+    
+    if cached:
+        ai_response, source = cached
+        chunks = _single_chunk(ai_response, f"cache_{source}")
+    else:
+        semantic = await _semantic_lookup(message)
+        if semantic and semantic.hit:
+            chunks = _single_chunk(semantic.response, "semantic_cache")
+        else:
+            chunks = stream_ai_response(message)
+    
+    async for delta, response_source in chunks:
+        if first_chunk_ms is None:
+            first_chunk_ms = int((time.time() - start_time) * 1000)
+        parts.append(delta)
+        yield {
+            "type": "chat_chunk",
+            "stream_id": stream_id,
+            "index": len(parts) - 1,
+            "delta": delta,
+            "source": response_source
+        }
+    
+    full_response = "".join(parts)
+    total_ms = int((time.time() - start_time) * 1000)
+    performance_metrics.record_stream(first_chunk_ms or total_ms, total_ms, response_source)
+    
+    if not cached and full_response:
+        await _cache_set(cache_instance, message, full_response, response_source)
+        if not (semantic and semantic.hit):
+            await _semantic_store(message, full_response, response_source, semantic=semantic)
+    
+    yield {
+        "type": "chat_response",
+        "stream_id": stream_id,
+        "response": full_response,
+        "source": response_source,
+        "cached": bool(cached),
+        "first_chunk_ms": first_chunk_ms or total_ms,
+        "response_time_ms": total_ms
+    }
+
+@router.post("/stream")
+async def chat_stream(
+    chat_msg: ChatMessage,
+    request: Request,
+    current_user: dict = Depends(verify_token)
+):
+    """
+    🌊 Stream a chat response as Server-Sent Events
+    Events: ``chunk`` (text delta) ... ``done`` (full response + timings)
+    """
+    from core.utils import get_client_ip
+    client_ip = get_client_ip(request)
+    user_id = current_user["user_id"]
+    
+    if rate_limiter and not rate_limiter.is_allowed(client_ip, "chat"):
+        logger.warning(f"Chat rate limit exceeded for user {user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many chat requests. Please slow down."
+        )
+    
+    sanitized_message = _validate_chat_input(chat_msg.message)
+    session_id = db_manager.get_or_create_session(user_id)
+    
+    async def event_source():
+        try:
+            async for event in stream_chat_events(sanitized_message):
+                if event["type"] == "chat_chunk":
+                    yield f"event: chunk\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                    continue
+                
+                event["session_id"] = session_id
+                yield f"event: done\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                
+                db_helper = get_database_helper(db_manager)
+                save_result = db_helper.save_chat_interaction(
+                    user_id=user_id,
+                    message=sanitized_message,
+                    response=event["response"],
+                    source=event["source"],
+                    session_id=session_id
+                )
+                if not save_result["success"]:
+                    logger.warning(f"Failed to save message: {save_result.get('error')}")
+                logger.info(f"Streamed chat response for user {user_id}: first chunk {event['first_chunk_ms']}ms, "
+                            f"total {event['response_time_ms']}ms from {event['source']}")
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'message': 'Failed to process chat message'})}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/history")
 async def get_chat_history(current_user: dict = Depends(verify_token)):
@@ -467,14 +790,33 @@ async def get_performance_metrics(current_user: dict = Depends(verify_token)):
         config_info = {
             "use_openai": ai_config.get('use_openai', False),
             "use_huggingface": ai_config.get('use_huggingface', True),
+            "generation_time_budget_seconds": ai_config.get('generation_time_budget', 4.0),
             "config_cached": True  # Always true since we use cached config
         }
         
+        # Deadline-aware generation: how often the time budget cut a response short
+        generation_stats = {}
+        if hasattr(model_manager, 'get_generation_stats'):
+            generation_stats = model_manager.get_generation_stats()
+        
+        semantic_cache = _get_semantic_cache()
+        cache_warmer = _get_cache_warmer()
+        
         return {
             "performance_metrics": metrics,
+            "generation_metrics": generation_stats,
+            "single_flight": get_chat_single_flight().get_stats(),
+            "semantic_cache": semantic_cache.get_stats() if semantic_cache else {"enabled": False},
+            "cache_warming": cache_warmer.get_stats() if cache_warmer else {"enabled": False},
             "configuration": config_info,
+            "headline_latency_metric": "time_to_first_chunk_ms",
             "optimization_status": {
                 "config_caching": "enabled",
+                "streaming": "enabled",
+                "deadline_aware_generation": "enabled",
+                "request_coalescing": "enabled",
+                "semantic_cache": "enabled" if semantic_cache else "disabled",
+                "cache_warming": "enabled" if cache_warmer else "disabled",
                 "parallel_processing": "enabled", 
                 "early_return": "enabled",
                 "metrics_tracking": "enabled"
@@ -228,6 +228,27 @@ async def models_status():
             "timestamp": datetime.utcnow().isoformat()
         }
 
+@router.get("/memory")
+async def worker_memory():
+    """
+    🧊 Per-worker memory report (RSS / USS / PSS) and preload status
+    USS shows the memory a worker adds on top of preloaded, shared model pages
+    """
+    try:
+        from core.preload import get_process_memory_report
+        return {
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            **get_process_memory_report()
+        }
+    except Exception as e:
+        logger.error(f"Worker memory report failed: {e}")
+        return {
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
 @router.get("/cache")
 async def cache_health():
     """
@@ -0,0 +1,154 @@
+"""
+📊 Embedding Backend Benchmark for MEFAPEX AI Assistant
+======================================================
+Compare PyTorch SentenceTransformer and ONNX Runtime (int8) embedding backends:
+- Single-query latency (mean / p50 / p95)
+- Batch throughput (sentences per second)
+- Cosine agreement between torch and ONNX embeddings
+
+Usage:
+    python benchmark_embedding_backends.py [--model NAME] [--iterations N] [--batch-size N] [--fp32]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from onnx_embedding_backend import ONNXEmbeddingBackend, cosine_agreement
+
+logger = logging.getLogger(__name__)
+
+TEST_SENTENCES = [
+    "Mefapex hakkında bilgi verir misiniz?",
+    "Çalışma saatleriniz neler?",
+    "İzin başvurusu nasıl yapılır?",
+    "Teknik destek ekibine nasıl ulaşabilirim?",
+    "İş güvenliği kuralları nelerdir?",
+    "Yemek saatleri ne zaman?",
+    "Şirketinizin iletişim bilgileri neler?",
+    "Hangi sektörlerde hizmet veriyorsunuz?",
+    "Maaş ödemeleri hangi gün yapılıyor?",
+    "Fazla mesai ücreti nasıl hesaplanır?",
+    "What are your working hours?",
+    "How can I contact technical support?",
+    "Üretim hattında arıza olduğunda kime haber vermeliyim?",
+    "Eğitim programlarınız hakkında bilgi alabilir miyim?",
+    "Kişisel koruyucu ekipmanlar nereden temin edilir?",
+    "Vardiya değişikliği talebi nasıl yapılır?",
+]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _measure(encode: Callable[[List[str]], np.ndarray], sentences: List[str],
+             iterations: int, batch_size: int) -> Dict[str, Any]:
+    """Measure single-query latency and batch throughput for an encode function"""
+    # Warmup
+    encode(sentences[:2])
+
+    latencies_ms = []
+    for _ in range(iterations):
+        for sentence in sentences:
+            start = time.perf_counter()
+            encode([sentence])
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    batches = [sentences[i:i + batch_size] for i in range(0, len(sentences), batch_size)]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for batch in batches:
+            encode(batch)
+    batch_duration = time.perf_counter() - start
+
+    return {
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies_ms), 3),
+            "p50": round(_percentile(latencies_ms, 50), 3),
+            "p95": round(_percentile(latencies_ms, 95), 3),
+        },
+        "throughput_sentences_per_second": round(len(sentences) * iterations / batch_duration, 2),
+    }
+
+
+def run_benchmark(model_name: str, iterations: int = 5, batch_size: int = 8,
+                  quantize: bool = True) -> Dict[str, Any]:
+    """Run the torch vs ONNX embedding benchmark"""
+    from sentence_transformers import SentenceTransformer
+    import torch
+
+    cache_dir = os.path.join(os.getcwd(), "models_cache")
+    sentences = [s.strip().lower() for s in TEST_SENTENCES]
+
+    logger.info(f"📚 Loading torch model: {model_name}")
+    torch_model = SentenceTransformer(model_name, device="cpu", cache_folder=cache_dir)
+    torch_model.eval()
+
+    def torch_encode(batch: List[str]) -> np.ndarray:
+        with torch.inference_mode():
+            return torch_model.encode(batch, convert_to_tensor=False, show_progress_bar=False,
+                                      batch_size=len(batch), normalize_embeddings=True)
+
+    backend = ONNXEmbeddingBackend(model_name, cache_dir=cache_dir, quantize=quantize)
+    export_start = time.perf_counter()
+    backend.load(torch_model)
+    export_seconds = time.perf_counter() - export_start
+
+    torch_results = _measure(torch_encode, sentences, iterations, batch_size)
+    onnx_results = _measure(backend.encode, sentences, iterations, batch_size)
+
+    agreement = cosine_agreement(torch_encode(sentences), backend.encode(sentences))
+
+    return {
+        "model": model_name,
+        "onnx_quantized": backend.quantize,
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {"iterations": iterations, "batch_size": batch_size, "sentences": len(sentences)},
+        "onnx_load_or_export_seconds": round(export_seconds, 2),
+        "torch": torch_results,
+        "onnx": onnx_results,
+        "speedup": {
+            "latency_p50": round(torch_results["latency_ms"]["p50"] / onnx_results["latency_ms"]["p50"], 2),
+            "throughput": round(onnx_results["throughput_sentences_per_second"] /
+                                torch_results["throughput_sentences_per_second"], 2),
+        },
+        "cosine_agreement": {
+            "mean": round(float(agreement.mean()), 5),
+            "min": round(float(agreement.min()), 5),
+        },
+    }
+
+
+def main():
+    from core.configuration import get_config
+
+    parser = argparse.ArgumentParser(description="Benchmark torch vs ONNX embedding backends")
+    parser.add_argument("--model", default=get_config().ai.turkish_sentence_model)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--fp32", action="store_true", help="Benchmark the fp32 ONNX export instead of int8")
+    parser.add_argument("--output", help="Optional JSON output file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = run_benchmark(args.model, args.iterations, args.batch_size, quantize=not args.fp32)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        logger.info(f"💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+🚪 Cache Admission Policies for MEFAPEX AI Assistant
+TinyLFU: a new key only replaces the eviction victim when it has been
+seen more often, so one-off questions cannot push out popular answers.
+
+- Count-min sketch (4 rows, counters capped at 15) estimates access frequency
+- Doorkeeper Bloom filter absorbs the first access of each key, keeping
+  one-hit wonders out of the sketch
+- Aging: after ``sample_size`` recorded accesses all counters are halved and
+  the doorkeeper is cleared, so the policy follows shifting popularity
+"""
+import hashlib
+from typing import Optional, Tuple
+
+_MASK64 = (1 << 64) - 1
+_MAX_COUNT = 15
+# bytes.translate table that halves every counter in C speed
+_HALVE = bytes(value >> 1 for value in range(256))
+
+def _hash_pair(key: str) -> Tuple[int, int]:
+    """Two independent 64-bit hashes for double hashing"""
+    digest = key.rpartition(':')[2]
+    try:
+        # Cache keys are already (versioned) MD5 hex digests
+        value = int(digest, 16) if len(digest) == 32 else None
+    except ValueError:
+        value = None
+    if value is None:
+        value = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest(), 'little')
+    return value & _MASK64, ((value >> 64) & _MASK64) | 1
+
+def _next_power_of_two(value: int) -> int:
+    return 1 << max(4, (max(1, value) - 1).bit_length())
+
+class CountMinSketch:
+    """Count-min sketch with saturating 4-bit counters"""
+
+    def __init__(self, width: int, depth: int = 4):
+        self.width = _next_power_of_two(width)
+        self.depth = depth
+        self._table = bytearray(self.width * depth)
+
+    def _indexes(self, hashes: Tuple[int, int]):
+        h1, h2 = hashes
+        mask = self.width - 1
+        return [row * self.width + ((h1 + row * h2) & mask) for row in range(self.depth)]
+
+    def increment(self, hashes: Tuple[int, int]):
+        """Conservative update: only raise the counters that hold the minimum"""
+        indexes = self._indexes(hashes)
+        current = min(self._table[i] for i in indexes)
+        if current >= _MAX_COUNT:
+            return
+        for i in indexes:
+            if self._table[i] == current:
+                self._table[i] = current + 1
+
+    def estimate(self, hashes: Tuple[int, int]) -> int:
+        return min(self._table[i] for i in self._indexes(hashes))
+
+    def halve(self):
+        self._table = bytearray(self._table.translate(_HALVE))
+
+class BloomFilter:
+    """Bloom filter used as the TinyLFU doorkeeper"""
+
+    def __init__(self, capacity: int, hashes: int = 3):
+        self.bits = _next_power_of_two(capacity * 8)
+        self.hashes = hashes
+        self._array = bytearray(self.bits // 8)
+
+    def _positions(self, hashes: Tuple[int, int]):
+        h1, h2 = hashes
+        mask = self.bits - 1
+        return [(h2 + i * h1) & mask for i in range(self.hashes)]
+
+    def add(self, hashes: Tuple[int, int]) -> bool:
+        """Add the key; returns True if it was (probably) already present"""
+        present = True
+        for position in self._positions(hashes):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not self._array[byte] & bit:
+                present = False
+                self._array[byte] |= bit
+        return present
+
+    def contains(self, hashes: Tuple[int, int]) -> bool:
+        return all(self._array[p >> 3] & (1 << (p & 7)) for p in self._positions(hashes))
+
+    def clear(self):
+        self._array = bytearray(len(self._array))
+
+class TinyLFUAdmission:
+    """
+    TinyLFU admission filter
+
+    Not thread-safe on its own: callers use it under their cache lock
+    (or from a single event loop).
+    """
+
+    def __init__(self, capacity: int, sample_factor: int = 10):
+        """
+        Args:
+            capacity: Number of entries the protected cache holds
+            sample_factor: Accesses (x capacity) between aging steps
+        """
+        capacity = max(16, capacity)
+        self.sample_size = capacity * sample_factor
+        # 4 counters per entry and row keeps collisions from inflating one-off keys
+        # (at least 256, so tiny caches do not admit by collision)
+        self._sketch = CountMinSketch(max(64, capacity) * 4)
+        # The doorkeeper sees every distinct key of an aging period
+        self._doorkeeper = BloomFilter(self.sample_size)
+        self._additions = 0
+        self.resets = 0
+
+    def record(self, key: str):
+        """Record one access of a key"""
+        hashes = _hash_pair(key)
+        if self._doorkeeper.add(hashes):
+            self._sketch.increment(hashes)
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        """Estimated recent access frequency of a key"""
+        hashes = _hash_pair(key)
+        return self._sketch.estimate(hashes) + (1 if self._doorkeeper.contains(hashes) else 0)
+
+    def admit(self, candidate: str, victim: str) -> bool:
+        """Should ``candidate`` replace ``victim``?"""
+        return self.estimate(candidate) > self.estimate(victim)
+
+    def _age(self):
+        """Halve all counters and reset the doorkeeper"""
+        self._sketch.halve()
+        self._doorkeeper.clear()
+        self._additions //= 2
+        self.resets += 1
+
+def create_admission_policy(policy: Optional[str], capacity: int) -> Optional[TinyLFUAdmission]:
+    """Create an admission filter by name ("tinylfu"); None/"none" disables admission"""
+    if not policy or policy.lower() == "none":
+        return None
+    if policy.lower() == "tinylfu":
+        return TinyLFUAdmission(capacity)
+    raise ValueError(f"Unknown cache admission policy: {policy}")
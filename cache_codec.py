@@ -0,0 +1,94 @@
+"""
+📦 Binary Codec for Distributed Cache Entries
+Compact, versioned layout replacing the JSON serialization of
+DistributedCacheEntry in Redis.
+
+Layout (big-endian):
+    header  2s magic b"MC" | B codec version | B flags | Q entry version
+    body    d timestamp | d last_accessed | I access_count |
+            B len(source) | B len(node_id) | source | node_id | response (UTF-8)
+
+The body is zlib-compressed (flag bit 0) when it is at least
+``compress_threshold`` bytes and compression actually shrinks it. The entry
+version sits at a fixed offset so Redis scripts can stamp it without
+decoding. Values that do not start with the magic are read as legacy JSON.
+"""
+import json
+import struct
+import zlib
+from typing import Any, Dict, Union
+
+MAGIC = b"MC"
+CODEC_VERSION = 1
+FLAG_COMPRESSED = 0x01
+
+_HEADER = struct.Struct(">2sBBQ")
+_BODY = struct.Struct(">ddIBB")
+HEADER_SIZE = _HEADER.size
+# Byte offset of the 8-byte entry version (stamped by the Redis set script)
+VERSION_OFFSET = 4
+
+DEFAULT_COMPRESS_THRESHOLD = 512
+_COMPRESS_LEVEL = 3
+
+class CodecError(ValueError):
+    """Raised for values written by an unknown codec version or truncated values"""
+
+def _short_utf8(value: str) -> bytes:
+    encoded = (value or "").encode("utf-8")
+    if len(encoded) > 255:
+        raise CodecError(f"Field too long for binary cache codec: {value[:20]}...")
+    return encoded
+
+def encode_entry(entry: Any, compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD) -> bytes:
+    """Encode an entry (any object with DistributedCacheEntry's fields)"""
+    source = _short_utf8(entry.source)
+    node_id = _short_utf8(entry.node_id)
+    body = b"".join((
+        _BODY.pack(entry.timestamp, entry.last_accessed, entry.access_count, len(source), len(node_id)),
+        source,
+        node_id,
+        entry.response.encode("utf-8")
+    ))
+
+    flags = 0
+    if compress_threshold and len(body) >= compress_threshold:
+        compressed = zlib.compress(body, _COMPRESS_LEVEL)
+        if len(compressed) < len(body):
+            body, flags = compressed, FLAG_COMPRESSED
+
+    return _HEADER.pack(MAGIC, CODEC_VERSION, flags, getattr(entry, "version", 0)) + body
+
+def decode_entry(data: Union[bytes, str]) -> Dict[str, Any]:
+    """Decode a binary or legacy JSON value into DistributedCacheEntry fields"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if not data.startswith(MAGIC):
+        # Entries written before the binary codec
+        return json.loads(data)
+    if len(data) < HEADER_SIZE + _BODY.size:
+        raise CodecError("Truncated cache entry")
+
+    _, codec_version, flags, version = _HEADER.unpack_from(data)
+    if codec_version != CODEC_VERSION:
+        raise CodecError(f"Unsupported cache codec version: {codec_version}")
+
+    body = memoryview(data)[HEADER_SIZE:]
+    if flags & FLAG_COMPRESSED:
+        body = memoryview(zlib.decompress(body))
+
+    timestamp, last_accessed, access_count, source_len, node_len = _BODY.unpack_from(body)
+    offset = _BODY.size
+    source = bytes(body[offset:offset + source_len]).decode("utf-8")
+    offset += source_len
+    node_id = bytes(body[offset:offset + node_len]).decode("utf-8")
+    offset += node_len
+    return {
+        'response': bytes(body[offset:]).decode("utf-8"),
+        'timestamp': timestamp,
+        'access_count': access_count,
+        'last_accessed': last_accessed,
+        'source': source,
+        'node_id': node_id,
+        'version': version
+    }
@@ -0,0 +1,125 @@
+"""
+🔑 Canonical Cache Keys for MEFAPEX AI Assistant
+Effectively identical Turkish phrasings share one cache entry:
+
+- Turkish-correct casefolding (I → ı, İ → i; Python's ``lower()`` turns
+  "İ" into "i̇" with a combining dot)
+- Punctuation and whitespace folding ("MEFAPEX'in" → "mefapexin")
+- Optional diacritic folding (ç→c, ğ→g, ı→i, ö→o, ş→s, ü→u) for users
+  typing without a Turkish keyboard
+- Stopword-insensitive ordering: filler words are dropped and the remaining
+  tokens are sorted, so "acaba çalışma saatleri nedir" and
+  "saatleri çalışma nedir" match (Turkish case suffixes keep the roles)
+- Keys carry a version prefix (``v2:<md5>``), so changing the rules never
+  serves entries built under the old ones
+"""
+import hashlib
+import re
+import unicodedata
+from typing import FrozenSet, Iterable, Optional
+
+# Bump when canonicalization rules change
+CACHE_KEY_VERSION = "v2"
+
+# Filler words that never change the answer. Negations (değil, yok) and
+# question words (ne, nasıl, nerede) and demonstratives (bu, şu) are kept.
+DEFAULT_STOPWORDS: FrozenSet[str] = frozenset({
+    'acaba', 'lütfen', 'bir', 've', 'ile', 'da', 'de', 'ki', 'ya',
+    'mi', 'mı', 'mu', 'mü', 'misin', 'mısın', 'musun', 'müsün',
+    'miyim', 'mıyım', 'muyum', 'müyüm', 'midir', 'mıdır', 'mudur', 'müdür',
+    'merhaba', 'selam', 'teşekkürler', 'teşekkür', 'ederim', 'rica'
+})
+
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_DIACRITICS = str.maketrans({'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
+                             'â': 'a', 'î': 'i', 'û': 'u'})
+# Apostrophes join suffixes ("MEFAPEX'in"); other punctuation separates words,
+# except inside numbers ("08:00-18:00", "12.05.2024" keep their order)
+_APOSTROPHES = re.compile(r"['’‘`´]")
+_TOKEN = re.compile(r"\d+(?:[.,:/-]\d+)+|[^\W_]+")
+
+def turkish_casefold(text: str) -> str:
+    """Lowercase with Turkish dotted/dotless I rules"""
+    text = unicodedata.normalize('NFC', text).translate(_TURKISH_UPPER).lower()
+    # Decomposed input ("I" + combining dot above) still yields a stray dot
+    return text.replace('i̇', 'i')
+
+def fold_turkish_diacritics(text: str) -> str:
+    """Map Turkish (and circumflexed) letters to their ASCII base letters"""
+    text = text.translate(_DIACRITICS)
+    return ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+
+class QueryCanonicalizer:
+    """Turns a chat message into its canonical cache form"""
+
+    def __init__(self,
+                 fold_diacritics: bool = False,
+                 ignore_stopwords: bool = True,
+                 sort_tokens: bool = True,
+                 stopwords: Optional[Iterable[str]] = None,
+                 version: str = CACHE_KEY_VERSION):
+        """
+        Args:
+            fold_diacritics: Treat "çalışma" and "calisma" as the same word
+            ignore_stopwords: Drop filler words such as "acaba", "lütfen", "mi"
+            sort_tokens: Ignore word order
+            stopwords: Replaces DEFAULT_STOPWORDS
+            version: Key prefix; change it whenever the rules change
+        """
+        self.fold_diacritics = fold_diacritics
+        self.ignore_stopwords = ignore_stopwords
+        self.sort_tokens = sort_tokens
+        self.version = version
+        stopwords = DEFAULT_STOPWORDS if stopwords is None else stopwords
+        self.stopwords = frozenset(self._fold(turkish_casefold(word)) for word in stopwords)
+
+    def _fold(self, text: str) -> str:
+        return fold_turkish_diacritics(text) if self.fold_diacritics else text
+
+    def canonicalize(self, text: str) -> str:
+        """Canonical form of a message"""
+        if not text:
+            return ""
+        text = turkish_casefold(text)
+        text = self._fold(_APOSTROPHES.sub('', text))
+        tokens = _TOKEN.findall(text)
+
+        if self.ignore_stopwords:
+            # A message made only of filler words keeps them
+            tokens = [token for token in tokens if token not in self.stopwords] or tokens
+        if self.sort_tokens:
+            tokens.sort()
+        return ' '.join(tokens)
+
+    def make_key(self, message: str, context: str = "") -> str:
+        """Versioned cache key for a message and its context"""
+        combined = f"{self.canonicalize(message)}:{self.canonicalize(context) if context else ''}"
+        return f"{self.version}:{hashlib.md5(combined.encode('utf-8')).hexdigest()}"
+
+def legacy_cache_key(message: str, context: str = "") -> str:
+    """Key scheme used before canonical keys (kept for hit-rate comparisons)"""
+    combined = f"{message.strip().lower()}:{context.strip().lower() if context else ''}"
+    return hashlib.md5(combined.encode('utf-8')).hexdigest()
+
+# Global canonicalizer instance
+_canonicalizer: Optional[QueryCanonicalizer] = None
+
+def get_query_canonicalizer() -> QueryCanonicalizer:
+    """Get the global canonicalizer configured from cache settings"""
+    global _canonicalizer
+    if _canonicalizer is None:
+        try:
+            from core.config_utils import load_cache_config
+            cache_config = load_cache_config()
+        except Exception:
+            cache_config = None
+        _canonicalizer = QueryCanonicalizer(
+            fold_diacritics=getattr(cache_config, 'cache_key_fold_diacritics', False),
+            ignore_stopwords=getattr(cache_config, 'cache_key_ignore_stopwords', True),
+            sort_tokens=getattr(cache_config, 'cache_key_sort_tokens', True)
+        )
+    return _canonicalizer
+
+def make_cache_key(message: str, context: str = "") -> str:
+    """Canonical, versioned cache key shared by local and distributed caches"""
+    return get_query_canonicalizer().make_key(message, context)
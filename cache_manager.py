@@ -63,12 +63,15 @@ class CacheManager:
     async def shutdown(self):
         """Gracefully shutdown all cache instances"""
         try:
+            from cache_warmer import shutdown_cache_warmer
+            await shutdown_cache_warmer()
+            
             if self.distributed_cache and hasattr(self.distributed_cache, 'shutdown'):
                 await self.distributed_cache.shutdown()
                 logger.info("🔌 Distributed cache shutdown")
             
             if self.response_cache:
-                # Response cache shutdown is handled by background threads
+                # Response cache jobs stop with the housekeeping scheduler
                 logger.info("🔌 Response cache shutdown")
             
             self.initialized = False
@@ -152,6 +155,15 @@ class CacheManager:
             if self.distributed_cache and hasattr(self.distributed_cache, 'get_stats'):
                 distributed_stats = await self.distributed_cache.get_stats()
                 metrics['distributed_cache'] = distributed_stats
+            
+            # Warm coverage of frequent questions
+            from cache_warmer import get_cache_warmer
+            cache_warmer = get_cache_warmer()
+            metrics['cache_warming'] = cache_warmer.get_stats() if cache_warmer else {'enabled': False}
+            
+            # Expiry sweeps and auto-scaling run as housekeeping jobs
+            from housekeeping import get_housekeeping_scheduler
+            metrics['housekeeping'] = get_housekeeping_scheduler().get_stats()
         
         except Exception as e:
             logger.error(f"Error getting performance metrics: {e}")
@@ -186,7 +198,14 @@ class CacheManager:
                 await self.distributed_cache.clear()
                 logger.info("🗑️ Distributed cache cleared")
             
+            from semantic_cache import clear_semantic_cache
+            clear_semantic_cache()
+            
             logger.info("🧹 All caches cleared")
+            
+            # Refill the frequent questions in the background
+            from cache_warmer import schedule_cache_warming
+            schedule_cache_warming("cache_clear")
         
         except Exception as e:
             logger.error(f"Error clearing caches: {e}")
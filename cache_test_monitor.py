@@ -7,6 +7,7 @@ import time
 import random
 import logging
 import json
+import sys
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
@@ -446,6 +447,134 @@ class CacheMonitor:
         
         return "\n".join(report_lines)
 
+def run_eviction_benchmark(sizes: List[int] = (1_000, 10_000, 100_000, 1_000_000),
+                           policies: List[str] = ("lru", "fifo", "lfu", "random", "ttl_aware"),
+                           operations: int = 20_000) -> List[CacheTestResult]:
+    """
+    Measure set latency of a full AdvancedResponseCache for each eviction policy
+    
+    Every measured set inserts a new key and therefore evicts one entry; with
+    O(1)/O(log n) eviction structures the latency should stay flat as size grows.
+    """
+    from response_cache import AdvancedResponseCache
+    
+    results = []
+    for policy in policies:
+        for size in sizes:
+            cache = AdvancedResponseCache(max_size=size, ttl=3600, eviction_policy=policy,
+                                          max_memory_mb=64 * 1024, auto_scale=False)
+            logger.info(f"🔄 Filling {policy} cache with {size:,} entries...")
+            for i in range(size):
+                cache.set(f"benchmark message {i}", "benchmark response", source="test")
+            # Give LFU buckets some spread
+            for i in range(0, size, 10):
+                cache.get(f"benchmark message {i}")
+            
+            start_time = time.perf_counter()
+            for i in range(size, size + operations):
+                cache.set(f"benchmark message {i}", "benchmark response", source="test")
+            duration = time.perf_counter() - start_time
+            
+            stats = cache.get_stats()
+            results.append(CacheTestResult(
+                test_name=f"Eviction {policy} @ {size:,}",
+                operations=operations,
+                duration_seconds=duration,
+                ops_per_second=operations / duration if duration > 0 else 0,
+                hit_rate=stats['hit_rate'],
+                memory_usage_mb=stats['memory_usage_mb'],
+                success=stats['size'] == size and stats['evictions'] >= operations
+            ))
+            cache.clear()
+    
+    return results
+
+def generate_eviction_report(results: List[CacheTestResult]) -> str:
+    """Set latency per policy and cache size"""
+    report_lines = [
+        "🔍 MEFAPEX Cache Eviction Benchmark",
+        "=" * 50,
+        f"{'Test':<32}{'us/set':>10}{'ops/sec':>14}",
+        "-" * 56
+    ]
+    for result in results:
+        latency_us = result.duration_seconds / result.operations * 1_000_000 if result.operations else 0
+        status = "" if result.success else "  ❌"
+        report_lines.append(f"{result.test_name:<32}{latency_us:>10.2f}{result.ops_per_second:>14,.0f}{status}")
+    return "\n".join(report_lines)
+
+def compare_key_hit_rates(queries: List[str]) -> Dict[str, Any]:
+    """
+    Replay a query log against the legacy and canonical cache key schemes
+    
+    Every query whose key was seen before counts as a hit (unbounded cache),
+    so the difference is the gain from canonicalization alone.
+    """
+    from cache_keys import QueryCanonicalizer, legacy_cache_key
+    
+    schemes = {
+        'legacy': legacy_cache_key,
+        'canonical': QueryCanonicalizer(fold_diacritics=False).make_key,
+        'canonical_folded': QueryCanonicalizer(fold_diacritics=True).make_key
+    }
+    results = {'queries': len(queries)}
+    for name, make_key in schemes.items():
+        seen = set()
+        hits = 0
+        for query in queries:
+            key = make_key(query)
+            hits += key in seen
+            seen.add(key)
+        results[name] = {
+            'hits': hits,
+            'distinct_keys': len(seen),
+            'hit_rate': round(hits / len(queries) * 100, 2) if queries else 0
+        }
+    return results
+
+def run_codec_benchmark(responses: Optional[List[str]] = None, iterations: int = 2000) -> List[Dict[str, Any]]:
+    """
+    Compare today's JSON entry format with the binary codec
+    
+    Reports bytes per entry and encode/decode time per entry for short,
+    medium and long Turkish answers.
+    """
+    from distributed_cache import DistributedCacheEntry
+    from cache_codec import encode_entry, decode_entry
+    
+    if responses is None:
+        # Real answers from the static content, shortest to longest
+        with open("content/static_responses.json", encoding="utf-8") as f:
+            static = json.load(f)['responses']
+        responses = sorted((item['message'] for item in static.values()), key=len)
+    
+    formats = {
+        'json': (lambda entry: json.dumps(entry.to_dict()), json.loads),
+        'binary': (encode_entry, decode_entry)
+    }
+    results = []
+    for response in responses:
+        now = time.time()
+        entry = DistributedCacheEntry(response, now, 3, now, "knowledge_base", "node1", version=42)
+        for name, (encode, decode) in formats.items():
+            data = encode(entry)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                encode(entry)
+            encode_us = (time.perf_counter() - start) / iterations * 1_000_000
+            start = time.perf_counter()
+            for _ in range(iterations):
+                decode(data)
+            decode_us = (time.perf_counter() - start) / iterations * 1_000_000
+            results.append({
+                'response_chars': len(response),
+                'format': name,
+                'bytes': len(data.encode('utf-8') if isinstance(data, str) else data),
+                'encode_us': round(encode_us, 2),
+                'decode_us': round(decode_us, 2)
+            })
+    return results
+
 async def run_cache_tests():
     """Main function to run cache tests"""
     from cache_manager import get_cache_manager, initialize_cache_manager
@@ -472,5 +601,22 @@ if __name__ == "__main__":
     # Configure logging
     logging.basicConfig(level=logging.INFO)
     
-    # Run tests
-    asyncio.run(run_cache_tests())
+    if len(sys.argv) > 1 and sys.argv[1] == "eviction-benchmark":
+        # python cache_test_monitor.py eviction-benchmark [max_size]
+        max_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+        sizes = [size for size in (1_000, 10_000, 100_000, 1_000_000) if size <= max_size]
+        print(generate_eviction_report(run_eviction_benchmark(sizes)))
+    elif len(sys.argv) > 1 and sys.argv[1] == "codec-benchmark":
+        # python cache_test_monitor.py codec-benchmark
+        print(f"{'chars':>7}{'format':>8}{'bytes':>8}{'encode us':>11}{'decode us':>11}")
+        for row in run_codec_benchmark():
+            print(f"{row['response_chars']:>7}{row['format']:>8}{row['bytes']:>8}"
+                  f"{row['encode_us']:>11.2f}{row['decode_us']:>11.2f}")
+    elif len(sys.argv) > 2 and sys.argv[1] == "key-hit-rate":
+        # python cache_test_monitor.py key-hit-rate queries.txt (one query per line)
+        with open(sys.argv[2], encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+        print(json.dumps(compare_key_hit_rates(queries), indent=2, ensure_ascii=False))
+    else:
+        # Run tests
+        asyncio.run(run_cache_tests())
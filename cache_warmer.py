@@ -0,0 +1,372 @@
+"""
+🔥 Response Cache Warming for MEFAPEX AI Assistant
+After a deploy, a ``clear_all_caches`` or a content reload the response caches
+start empty, and the first wave of common questions would all go through the
+full generation cascade. The warming job instead:
+
+- Reads the most frequent user messages of a recent window from
+  ``chat_messages`` and groups them by canonical cache key
+- Recomputes their answers off the request path, in small batches with a
+  rate limit so live traffic keeps the models
+- Reports warm coverage (share of frequent questions and of their historical
+  traffic that is cached) in cache stats
+- With a shared (Redis) cache only one worker warms per trigger: the first to
+  claim the run's lock does the work, the others skip it. The startup lock is
+  held after a successful run (every worker starts together); other triggers
+  release it when done so a later edit is warmed again
+"""
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from cache_keys import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Answers that are never used to warm a cache (e.g. models not ready yet)
+UNWARMABLE_SOURCES = frozenset({"fallback"})
+
+# Triggers whose lock outlives a successful run (claim_ttl) to dedupe workers starting together
+HELD_CLAIM_REASONS = frozenset({"startup"})
+
+@dataclass
+class WarmCandidate:
+    """A frequent question: one phrasing per canonical key and its summed hits"""
+    message: str
+    hits: int
+    cache_key: str
+
+@dataclass
+class WarmRun:
+    """Result of one warming run"""
+    reason: str
+    started_at: float
+    refresh: bool
+    candidates: int = 0
+    warmed: int = 0
+    already_cached: int = 0
+    skipped: int = 0
+    failed: int = 0
+    covered_hits: int = 0
+    total_hits: int = 0
+    duration: float = 0.0
+    completed: bool = False
+    claimed_elsewhere: bool = False  # Another worker holds this trigger's warming lock
+
+    @property
+    def coverage(self) -> float:
+        """Percentage of candidate questions that are cached after the run"""
+        if not self.candidates:
+            return 0.0
+        return round((self.warmed + self.already_cached) / self.candidates * 100, 2)
+
+    @property
+    def traffic_coverage(self) -> float:
+        """Percentage of the window's message volume answered by warm entries"""
+        if not self.total_hits:
+            return 0.0
+        return round(self.covered_hits / self.total_hits * 100, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'reason': self.reason,
+            'refresh': self.refresh,
+            'started_at': self.started_at,
+            'duration_seconds': round(self.duration, 3),
+            'completed': self.completed,
+            'claimed_elsewhere': self.claimed_elsewhere,
+            'candidates': self.candidates,
+            'warmed': self.warmed,
+            'already_cached': self.already_cached,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'coverage': self.coverage,
+            'traffic_coverage': self.traffic_coverage
+        }
+
+class CacheWarmer:
+    """Recomputes the answers of frequent historical questions into the caches"""
+
+    def __init__(self,
+                 compute: Callable[[str], Awaitable[Optional[Tuple[str, str]]]],
+                 store: Callable[[str, str, str], Awaitable[None]],
+                 fetch_history: Callable[[int, int], List[Dict[str, Any]]],
+                 lookup: Optional[Callable[[str], Awaitable[Optional[Tuple[str, str]]]]] = None,
+                 claim: Optional[Callable[[str, str, float], Awaitable[Optional[bool]]]] = None,
+                 release: Optional[Callable[[str, str], Awaitable[None]]] = None,
+                 claim_ttl: float = 300.0,
+                 top_n: int = 200,
+                 window_days: int = 7,
+                 batch_size: int = 4,
+                 rate_per_second: float = 2.0,
+                 history_factor: int = 5):
+        """
+        Args:
+            compute: ``message -> (response, source)``, the normal answer cascade
+            store: ``(message, response, source)`` writes the answer to the caches
+            fetch_history: ``(since_days, limit) -> [{'message', 'hits'}]``, called
+                on a worker thread (blocking database access)
+            lookup: ``message -> (response, source) | None``; questions it finds are
+                not recomputed unless the run is a refresh
+            claim: ``(lock_key, token, ttl) -> True | False | None``, cross-worker lock
+                for a trigger; False skips the run (another worker warms), None means
+                no shared lock is available and the run goes ahead locally
+            release: ``(lock_key, token)`` frees the lock after a failed run
+            claim_ttl: Lock lifetime in seconds; kept after a successful run so
+                workers starting later in the same rollout do not warm again
+            top_n: Number of distinct (canonical) questions to warm
+            window_days: History window in days
+            batch_size: Questions computed concurrently
+            rate_per_second: Upper bound on computed questions per second (0 = no limit)
+            history_factor: Raw messages fetched per warmed question; several
+                phrasings collapse into one canonical key
+        """
+        self.compute = compute
+        self.store = store
+        self.fetch_history = fetch_history
+        self.lookup = lookup
+        self.claim = claim
+        self.release = release
+        self.claim_ttl = max(1.0, claim_ttl)
+        self.top_n = max(0, top_n)
+        self.window_days = max(1, window_days)
+        self.batch_size = max(1, batch_size)
+        self.rate_per_second = max(0.0, rate_per_second)
+        self.history_factor = max(1, history_factor)
+
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[Tuple[str, bool]] = None
+        self._current: Optional[WarmRun] = None
+        self._last_run: Optional[WarmRun] = None
+        self._stats = {
+            'runs': 0,
+            'runs_by_reason': {},
+            'questions_warmed': 0,
+            'failures': 0,
+            'coalesced_requests': 0,
+            'claimed_elsewhere': 0
+        }
+
+    def select_candidates(self, rows: List[Dict[str, Any]]) -> Tuple[List[WarmCandidate], int]:
+        """Group history rows by canonical key; returns (top candidates, total hits)"""
+        grouped: Dict[str, WarmCandidate] = {}
+        best_phrasing: Dict[str, int] = {}
+        total_hits = 0
+
+        for row in rows:
+            message = (row.get('message') or '').strip()
+            hits = int(row.get('hits') or 0)
+            if not message or hits <= 0:
+                continue
+            total_hits += hits
+            cache_key = make_cache_key(message)
+            candidate = grouped.get(cache_key)
+            if candidate is None:
+                grouped[cache_key] = WarmCandidate(message, hits, cache_key)
+                best_phrasing[cache_key] = hits
+                continue
+            candidate.hits += hits
+            # Warm with the most common phrasing of the question
+            if hits > best_phrasing[cache_key]:
+                best_phrasing[cache_key] = hits
+                candidate.message = message
+
+        candidates = sorted(grouped.values(), key=lambda c: c.hits, reverse=True)
+        return candidates[:self.top_n], total_hits
+
+    async def _warm_one(self, candidate: WarmCandidate, run: WarmRun):
+        """Warm a single question and record the outcome"""
+        try:
+            if self.lookup is not None and not run.refresh:
+                if await self.lookup(candidate.message):
+                    run.already_cached += 1
+                    run.covered_hits += candidate.hits
+                    return
+
+            result = self.compute(candidate.message)
+            if inspect.isawaitable(result):
+                result = await result
+            if not result or not result[0] or result[1] in UNWARMABLE_SOURCES:
+                run.skipped += 1
+                return
+
+            response, source = result
+            await self.store(candidate.message, response, source)
+            run.warmed += 1
+            run.covered_hits += candidate.hits
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            run.failed += 1
+            logger.warning(f"Cache warming failed for '{candidate.message[:40]}': {e}")
+
+    async def warm(self, reason: str = "manual", refresh: bool = False) -> WarmRun:
+        """
+        Run one warming pass
+
+        Args:
+            reason: Trigger, reported in stats (startup, cache_clear, content_reload)
+            refresh: Recompute questions even if they are cached (content changed)
+        """
+        run = WarmRun(reason=reason, started_at=time.time(), refresh=refresh)
+        lock_key = f"cache_warming:{reason}"
+        token = uuid.uuid4().hex
+        owned = await self.claim(lock_key, token, self.claim_ttl) if self.claim is not None else None
+        if owned is False:
+            run.claimed_elsewhere = True
+            self._stats['claimed_elsewhere'] += 1
+            logger.info(f"🔥 Cache warming ({reason}) skipped: another worker is warming")
+            return run
+
+        self._current = run
+        try:
+            if not self.top_n:
+                run.completed = True
+                return run
+            rows = await asyncio.to_thread(self.fetch_history, self.window_days,
+                                           self.top_n * self.history_factor)
+            candidates, run.total_hits = self.select_candidates(rows)
+            run.candidates = len(candidates)
+            logger.info(f"🔥 Cache warming ({reason}): {run.candidates} frequent questions")
+
+            min_batch_seconds = self.batch_size / self.rate_per_second if self.rate_per_second else 0.0
+            for start in range(0, len(candidates), self.batch_size):
+                batch_started = time.monotonic()
+                await asyncio.gather(*(self._warm_one(candidate, run)
+                                       for candidate in candidates[start:start + self.batch_size]))
+                # Rate limit: live requests get the models between batches
+                remaining = min_batch_seconds - (time.monotonic() - batch_started)
+                await asyncio.sleep(max(0.0, remaining))
+
+            run.completed = True
+            logger.info(f"✅ Cache warming ({reason}) done: {run.warmed} warmed, "
+                        f"{run.already_cached} already cached, coverage {run.coverage}% "
+                        f"of questions / {run.traffic_coverage}% of traffic")
+            return run
+        finally:
+            if owned and self.release is not None and (not run.completed or reason not in HELD_CLAIM_REASONS):
+                # Failed runs are retried; a later content_reload / cache_clear must warm again
+                await asyncio.shield(self.release(lock_key, token))
+            run.duration = time.time() - run.started_at
+            self._stats['runs'] += 1
+            self._stats['runs_by_reason'][reason] = self._stats['runs_by_reason'].get(reason, 0) + 1
+            self._stats['questions_warmed'] += run.warmed
+            self._stats['failures'] += run.failed
+            self._current = None
+            self._last_run = run
+
+    def schedule(self, reason: str, refresh: bool = False) -> Optional[asyncio.Task]:
+        """
+        Start a background warming run. While one is running, the request is
+        coalesced into a single follow-up run (a refresh wins over a plain run).
+        """
+        if self._task is not None and not self._task.done():
+            pending_refresh = refresh or bool(self._pending and self._pending[1])
+            self._pending = (reason, pending_refresh)
+            self._stats['coalesced_requests'] += 1
+            return self._task
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug(f"Cache warming ({reason}) not scheduled: no running event loop")
+            return None
+        self._task = loop.create_task(self._run(reason, refresh))
+        return self._task
+
+    async def _run(self, reason: str, refresh: bool):
+        """Warming task: runs the requested pass and any coalesced follow-up"""
+        while True:
+            try:
+                await self.warm(reason, refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Cache warming ({reason}) failed: {e}")
+            if self._pending is None:
+                return
+            (reason, refresh), self._pending = self._pending, None
+
+    async def shutdown(self):
+        """Cancel a running warming pass"""
+        self._pending = None
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Warming runs and the warm coverage of the last completed run"""
+        last = self._last_run
+        return {
+            'enabled': True,
+            'running': self._current is not None,
+            'current_run': self._current.to_dict() if self._current else None,
+            'last_run': last.to_dict() if last else None,
+            'coverage': last.coverage if last else 0.0,
+            'traffic_coverage': last.traffic_coverage if last else 0.0,
+            'top_n': self.top_n,
+            'window_days': self.window_days,
+            'rate_per_second': self.rate_per_second,
+            **self._stats,
+            'runs_by_reason': dict(self._stats['runs_by_reason'])
+        }
+
+# Global cache warmer instance (None when disabled)
+_cache_warmer: Optional[CacheWarmer] = None
+_cache_warmer_initialized = False
+
+def get_cache_warmer(compute: Optional[Callable] = None,
+                     store: Optional[Callable] = None,
+                     fetch_history: Optional[Callable] = None,
+                     lookup: Optional[Callable] = None,
+                     claim: Optional[Callable] = None,
+                     release: Optional[Callable] = None) -> Optional[CacheWarmer]:
+    """
+    Get the global cache warmer; created on first call with callbacks from
+    cache configuration (the callbacks are only used for that first creation)
+    """
+    global _cache_warmer, _cache_warmer_initialized
+    if _cache_warmer_initialized or compute is None or store is None or fetch_history is None:
+        return _cache_warmer
+    _cache_warmer_initialized = True
+
+    try:
+        from core.config_utils import load_cache_config
+        cache_config = load_cache_config()
+    except Exception:
+        cache_config = None
+    if not getattr(cache_config, 'cache_warming_enabled', True):
+        return None
+
+    _cache_warmer = CacheWarmer(
+        compute=compute,
+        store=store,
+        fetch_history=fetch_history,
+        lookup=lookup,
+        claim=claim,
+        release=release,
+        claim_ttl=getattr(cache_config, 'cache_warming_claim_ttl', 300.0),
+        top_n=getattr(cache_config, 'cache_warming_top_n', 200),
+        window_days=getattr(cache_config, 'cache_warming_window_days', 7),
+        batch_size=getattr(cache_config, 'cache_warming_batch_size', 4),
+        rate_per_second=getattr(cache_config, 'cache_warming_rate', 2.0)
+    )
+    return _cache_warmer
+
+def schedule_cache_warming(reason: str, refresh: bool = False) -> Optional[asyncio.Task]:
+    """Rerun warming in the background if the warmer has been set up"""
+    if _cache_warmer is None:
+        return None
+    return _cache_warmer.schedule(reason, refresh)
+
+async def shutdown_cache_warmer():
+    """Stop the global cache warmer"""
+    if _cache_warmer is not None:
+        await _cache_warmer.shutdown()
@@ -10,6 +10,9 @@ import logging
 import asyncio
 from typing import Dict, List, Optional, Tuple
 
+from cache_keys import make_cache_key
+from negative_cache import create_negative_cache
+
 logger = logging.getLogger(__name__)
 
 class ContentManager:
@@ -35,6 +38,10 @@ class ContentManager:
         self.settings = {}
         self._cache = {}
         self._cache_enabled = True
+        self._content_version = 0
+        
+        # Queries that only produced a default/fallback answer skip the cascade for a TTL
+        self._negative_cache = create_negative_cache()
         self._ai_enabled = True  # AI sadece anlama için kullanılır
         
         # NEW: Inverted index for optimized keyword lookup
@@ -63,11 +70,14 @@ class ContentManager:
         
         # Enhanced Question Matcher'ı initialize et
         try:
-            from enhanced_question_matcher import EnhancedQuestionMatcher
+            from enhanced_question_matcher import EnhancedQuestionMatcher, TurkishTextNormalizer
             self.enhanced_matcher = EnhancedQuestionMatcher(self.model_manager)
+            # Synonyms are loaded (and versioned) by the normalizer, not the matcher
+            self._synonym_source = TurkishTextNormalizer
             logger.info("🧠 Enhanced Question Matcher initialized with semantic search")
         except ImportError as e:
             self.enhanced_matcher = None
+            self._synonym_source = None
             logger.warning(f"⚠️ Enhanced Question Matcher not available: {e}")
         
         # NEW: Intent Classifier'ı initialize et
@@ -91,7 +101,8 @@ class ContentManager:
             'enhanced_matches': 0,
             'intent_matches': 0,  # NEW: Intent classifier matches
             'no_matches': 0,
-            'cache_hits': 0
+            'cache_hits': 0,
+            'negative_cache_hits': 0
         }
         
         # Load static content on initialization
@@ -122,6 +133,7 @@ class ContentManager:
             self.static_responses = data.get("responses", {})
             self.categories = data.get("categories", {})
             self.settings = data.get("settings", {})
+            self._content_version += 1
             
             # Build inverted index for optimized lookup
             self._build_inverted_index()
@@ -190,6 +202,21 @@ class ContentManager:
             logger.debug(f"🎯 Cache hit for: {user_message[:30]}...")
             return cached_response, f"cache_{source}"
         
+        # Known-unanswerable query: skip the matching cascade
+        negative_key = None
+        if self._negative_cache:
+            self._negative_cache.sync_version(self._knowledge_version())
+            negative_key = make_cache_key(user_message)
+            negative = self._negative_cache.get(negative_key)
+            if negative:
+                response, source = negative
+                self.stats['negative_cache_hits'] += 1
+                logger.debug(f"🚫 Negative cache hit for: {user_message[:30]}...")
+                if source == "default":
+                    # Default answers quote the user's own wording
+                    response = self._get_enhanced_default_response(user_message)
+                return response, source
+        
         # ======= NEW: Intent Classification (PRIORITY) =======
         if self.intent_classifier and self.intent_classifier.is_trained:
             try:
@@ -296,8 +323,7 @@ class ContentManager:
                 if turkish_fallback:
                     self.stats['turkish_fallback'] = self.stats.get('turkish_fallback', 0) + 1
                     logger.info(f"🇹🇷 Using Turkish fallback response")
-                    if self._cache_enabled:
-                        self._cache[user_message_lower] = (turkish_fallback, "turkish_fallback")
+                    self._remember_unanswerable(negative_key, turkish_fallback, "turkish_fallback")
                     return turkish_fallback, "turkish_fallback"
             except Exception as e:
                 logger.warning(f"Turkish fallback failed: {e}")
@@ -305,12 +331,22 @@ class ContentManager:
         # Final fallback - enhanced default
         self.stats['no_matches'] += 1
         default_response = self._get_enhanced_default_response(user_message)
-        if self._cache_enabled:
-            self._cache[user_message_lower] = (default_response, "default")
+        self._remember_unanswerable(negative_key, default_response, "default")
         
         logger.info(f"📝 No match found for: {user_message[:50]}... - returning enhanced default")
         return default_response, "default"
     
+    def _knowledge_version(self) -> Tuple:
+        """Versions of everything that decides whether a query is answerable"""
+        synonyms_version = self._synonym_source._synonyms_version if self._synonym_source else 0
+        intent_version = getattr(self.intent_classifier, 'model_version', 0) if self.intent_classifier else 0
+        return (self._content_version, synonyms_version, intent_version)
+    
+    def _remember_unanswerable(self, negative_key: Optional[str], response: str, source: str):
+        """Record a default/fallback answer in the negative cache (not the response cache)"""
+        if self._negative_cache and negative_key:
+            self._negative_cache.add(negative_key, response, source)
+    
     def _get_response_by_category(self, category: str) -> Optional[str]:
         """Kategori adına göre static response'u al"""
         if category in self.static_responses:
@@ -729,6 +765,7 @@ class ContentManager:
             "static_responses": len(self.static_responses),
             "categories": len(self.categories),
             "cache_entries": len(self._cache),
+            "negative_cache": self._negative_cache.get_stats() if self._negative_cache else {"enabled": False},
             "cache_enabled": self._cache_enabled,
             "ai_enabled": self._ai_enabled,
             "enhanced_matcher_enabled": self.enhanced_matcher is not None,
@@ -813,6 +850,11 @@ class ContentManager:
     def clear_cache(self):
         """Clear response cache"""
         self._cache.clear()
+        if self._negative_cache:
+            self._negative_cache.clear()
+        # Near-duplicate answers were built from the old content as well
+        from semantic_cache import clear_semantic_cache
+        clear_semantic_cache()
         logger.info("🗑️ Response cache cleared")
 
     def reload_content(self):
@@ -820,6 +862,10 @@ class ContentManager:
         self.clear_cache()
         self.load_static_content()  # This will also rebuild the inverted index
         logger.info("🔄 Content reloaded and inverted index rebuilt")
+        
+        # Cached answers of frequent questions may be outdated: recompute them
+        from cache_warmer import schedule_cache_warming
+        schedule_cache_warming("content_reload", refresh=True)
     
     def warmup_ai_models(self):
         """
@@ -171,14 +171,16 @@ def get_ai_config() -> dict:
             'use_openai': getattr(config.ai, 'use_openai', False),
             'openai_api_key': getattr(config.ai, 'openai_api_key', None),
             'model': getattr(config.ai, 'model', 'gpt-3.5-turbo'),
-            'use_huggingface': getattr(config.ai, 'use_huggingface', True)
+            'use_huggingface': getattr(config.ai, 'use_huggingface', True),
+            'generation_time_budget': getattr(config.ai, 'generation_time_budget', 4.0)
         }
     else:
         return {
             'use_openai': getattr(config, 'USE_OPENAI', False),
             'openai_api_key': getattr(config, 'OPENAI_API_KEY', None),
             'model': getattr(config, 'OPENAI_MODEL', 'gpt-3.5-turbo'),
-            'use_huggingface': getattr(config, 'USE_HUGGINGFACE', True)
+            'use_huggingface': getattr(config, 'USE_HUGGINGFACE', True),
+            'generation_time_budget': float(getattr(config, 'AI_GENERATION_TIME_BUDGET', 4.0))
         }
 
 
@@ -211,7 +213,12 @@ def get_cache_settings() -> dict:
             'eviction_policy': getattr(config, 'response_cache_eviction_policy', 'lru'),
             'max_memory_mb': getattr(config, 'max_memory_usage_mb', 100),  # Default 100MB
             'auto_scale': getattr(config, 'auto_scale_enabled', True),
-            'cleanup_interval': getattr(config, 'cleanup_interval', 300)  # 5 minutes
+            'cleanup_interval': getattr(config, 'cleanup_interval', 300),  # 5 minutes
+            'soft_ttl': getattr(config, 'response_cache_soft_ttl', 0),  # 0 = no stale serving
+            'shards': getattr(config, 'cache_shards', 1),  # >1 = lock-striped ShardedResponseCache
+            'admission_policy': getattr(config, 'cache_admission_policy', 'none'),  # none | tinylfu
+            'miss_ratio_curve': getattr(config, 'cache_miss_ratio_curve', True),
+            'target_hit_rate': getattr(config, 'cache_target_hit_rate', 0.0)  # 0 = curve only, no resizing
         }
     else:  # Legacy config
         return {
@@ -220,5 +227,10 @@ def get_cache_settings() -> dict:
             'eviction_policy': getattr(config, 'RESPONSE_CACHE_EVICTION_POLICY', 'lru'),
             'max_memory_mb': getattr(config, 'MAX_MEMORY_USAGE_MB', 100),
             'auto_scale': getattr(config, 'AUTO_SCALE_ENABLED', True),
-            'cleanup_interval': getattr(config, 'CLEANUP_INTERVAL', 300)
+            'cleanup_interval': getattr(config, 'CLEANUP_INTERVAL', 300),
+            'soft_ttl': getattr(config, 'RESPONSE_CACHE_SOFT_TTL', 0),
+            'shards': getattr(config, 'CACHE_SHARDS', 1),
+            'admission_policy': getattr(config, 'CACHE_ADMISSION_POLICY', 'none'),
+            'miss_ratio_curve': getattr(config, 'CACHE_MISS_RATIO_CURVE', True),
+            'target_hit_rate': getattr(config, 'CACHE_TARGET_HIT_RATE', 0.0)
         }
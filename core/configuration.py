@@ -99,6 +99,12 @@ class AIConfig:
     language_detection: bool = True
     prefer_turkish_models: bool = True
     turkish_quality_threshold: float = 0.7  # Minimum quality for Turkish responses
+    generation_time_budget: float = 4.0  # Wall-clock budget (seconds) for one chat generation
+    
+    # Embedding inference backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime)
+    embedding_backend: str = "torch"
+    onnx_quantize: bool = True  # Dynamic int8 quantization for the ONNX export
+    onnx_num_threads: int = 0  # 0 = let ONNX Runtime decide
 
 @dataclass
 class QdrantConfig:
@@ -115,6 +121,9 @@ class ServerConfig:
     port: int = 8000
     debug: bool = False
     reload: bool = False
+    workers: int = 1
+    preload_models: bool = False  # Load models/content once in master before forking workers
+    reuse_port: bool = False  # Per-worker SO_REUSEPORT sockets instead of one shared socket
     allowed_origins: List[str] = field(default_factory=lambda: [
         "http://localhost:3000",
         "http://localhost:8000",
@@ -157,12 +166,15 @@ class CacheConfig:
     response_cache_max_size: int = 1000
     response_cache_ttl: int = 3600  # 1 hour
     response_cache_eviction_policy: str = "lru"  # lru, fifo, random
+    response_cache_soft_ttl: int = 0  # Serve stale + refresh after this age (0 = disabled)
     
     # Distributed cache settings
     distributed_cache_enabled: bool = True
     local_cache_max_size: int = 500
     local_cache_ttl: int = 1800  # 30 minutes
     redis_cache_ttl: int = 3600  # 1 hour
+    local_cache_soft_ttl: int = 0  # Stale-while-revalidate soft TTLs (0 = disabled)
+    redis_cache_soft_ttl: int = 0
     
     # Redis settings
     redis_host: str = "localhost"
@@ -175,6 +187,15 @@ class CacheConfig:
     cleanup_interval: int = 300  # 5 minutes
     max_memory_usage_mb: int = 100  # Maximum cache memory usage
     memory_check_interval: int = 60  # Memory check interval in seconds
+    cache_shards: int = 1  # >1 splits local caches into lock-striped segments
+    cache_admission_policy: str = "none"  # none, tinylfu
+    cache_key_fold_diacritics: bool = False  # "calisma" == "çalışma" in cache keys
+    cache_key_ignore_stopwords: bool = True  # Filler words (acaba, lütfen, mi) ignored
+    cache_key_sort_tokens: bool = True  # Word order ignored
+    near_cache_invalidation: bool = True  # Broadcast set/delete/clear to other workers' local caches
+    node_id: str = ""  # Prefix of this process's invalidation id (default: host name; pid is always appended)
+    cache_codec: str = "binary"  # Redis entry write format: binary, json (either is read back)
+    cache_compress_threshold: int = 512  # Compress binary entries from this size (bytes)
     
     # Auto-scaling settings
     auto_scale_enabled: bool = True
@@ -182,6 +203,38 @@ class CacheConfig:
     scale_up_threshold: float = 0.9    # Scale up when usage > 90%
     min_cache_size: int = 100
     max_cache_size: int = 10000
+    
+    # Single-flight coalescing of identical concurrent chat messages
+    single_flight_lock_ttl: float = 15.0  # Cross-worker lock lifetime (seconds)
+    single_flight_wait_timeout: float = 10.0  # Wait for another worker's answer (seconds)
+    
+    # Semantic cache: near-duplicate questions reuse an answer (embedding similarity)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.93  # Cosine threshold for sources without their own
+    semantic_cache_source_thresholds: str = ""  # e.g. "knowledge_base=0.90,openai=0.95"
+    semantic_cache_max_entries: int = 2048
+    semantic_cache_ttl: int = 3600
+    semantic_cache_verify_rate: float = 0.0  # Fraction of hits recomputed to measure false hits
+    
+    # Cache warming: recompute frequent historical questions after startup/clear/content reload
+    cache_warming_enabled: bool = True
+    cache_warming_top_n: int = 200  # Distinct (canonical) questions to warm
+    cache_warming_window_days: int = 7  # chat_messages history window
+    cache_warming_batch_size: int = 4  # Questions computed concurrently
+    cache_warming_rate: float = 2.0  # Max questions per second (0 = unlimited)
+    cache_warming_claim_ttl: float = 300.0  # Cross-worker lock: one worker warms per trigger
+    
+    # Negative cache: queries answered only by the default/fallback skip matching for a TTL
+    negative_cache_enabled: bool = True
+    negative_cache_max_entries: int = 5000
+    negative_cache_ttl: int = 600
+    
+    # Miss-ratio curves (SHARDS sampling): predicted hit rate as a function of cache size
+    cache_miss_ratio_curve: bool = True
+    cache_target_hit_rate: float = 0.0  # Size response caches for this hit rate (%); 0 = curve only
+    embedding_cache_size: int = 100
+    embedding_cache_target_hit_rate: float = 0.0  # Size the embedding cache for this hit rate (%); 0 = fixed
+    embedding_cache_max_memory_mb: int = 64
 
 @dataclass
 class ValidationConfig:
@@ -301,7 +354,11 @@ class UnifiedConfig:
             max_tokens=int(os.getenv("AI_MAX_TOKENS", "150")),
             temperature=float(os.getenv("AI_TEMPERATURE", "0.7")),
             language_detection=os.getenv("AI_LANGUAGE_DETECTION", "true").lower() == "true",
-            prefer_turkish_models=os.getenv("AI_PREFER_TURKISH_MODELS", "true").lower() == "true"
+            prefer_turkish_models=os.getenv("AI_PREFER_TURKISH_MODELS", "true").lower() == "true",
+            generation_time_budget=float(os.getenv("AI_GENERATION_TIME_BUDGET", "4.0")),
+            embedding_backend=os.getenv("AI_EMBEDDING_BACKEND", "torch").lower(),
+            onnx_quantize=os.getenv("AI_ONNX_QUANTIZE", "true").lower() == "true",
+            onnx_num_threads=int(os.getenv("AI_ONNX_NUM_THREADS", "0"))
         )
     
     def _init_qdrant_config(self) -> QdrantConfig:
@@ -328,6 +385,9 @@ class UnifiedConfig:
             port=int(os.getenv("PORT", "8000")),
             debug=os.getenv("DEBUG", "false").lower() == "true",
             reload=os.getenv("RELOAD", "false").lower() == "true",
+            workers=int(os.getenv("WORKERS", "1")),
+            preload_models=os.getenv("SERVER_PRELOAD", "false").lower() == "true",
+            reuse_port=os.getenv("SERVER_REUSE_PORT", "false").lower() == "true",
             allowed_origins=allowed_origins,
             allowed_hosts=allowed_hosts
         )
@@ -394,12 +454,15 @@ class UnifiedConfig:
             response_cache_max_size=int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "1000")),
             response_cache_ttl=int(os.getenv("RESPONSE_CACHE_TTL", "3600")),
             response_cache_eviction_policy=os.getenv("RESPONSE_CACHE_EVICTION_POLICY", "lru"),
+            response_cache_soft_ttl=int(os.getenv("RESPONSE_CACHE_SOFT_TTL", "0")),
             
             # Distributed cache settings
             distributed_cache_enabled=os.getenv("DISTRIBUTED_CACHE_ENABLED", "true").lower() == "true",
             local_cache_max_size=int(os.getenv("LOCAL_CACHE_MAX_SIZE", "500")),
             local_cache_ttl=int(os.getenv("LOCAL_CACHE_TTL", "1800")),
             redis_cache_ttl=int(os.getenv("REDIS_CACHE_TTL", "3600")),
+            local_cache_soft_ttl=int(os.getenv("LOCAL_CACHE_SOFT_TTL", "0")),
+            redis_cache_soft_ttl=int(os.getenv("REDIS_CACHE_SOFT_TTL", "0")),
             
             # Redis settings
             redis_host=os.getenv("REDIS_HOST", "localhost"),
@@ -412,13 +475,54 @@ class UnifiedConfig:
             cleanup_interval=int(os.getenv("CACHE_CLEANUP_INTERVAL", "300")),
             max_memory_usage_mb=int(os.getenv("CACHE_MAX_MEMORY_MB", "100")),
             memory_check_interval=int(os.getenv("CACHE_MEMORY_CHECK_INTERVAL", "60")),
+            cache_shards=int(os.getenv("CACHE_SHARDS", "1")),
+            cache_admission_policy=os.getenv("CACHE_ADMISSION_POLICY", "none"),
+            cache_key_fold_diacritics=os.getenv("CACHE_KEY_FOLD_DIACRITICS", "false").lower() == "true",
+            cache_key_ignore_stopwords=os.getenv("CACHE_KEY_IGNORE_STOPWORDS", "true").lower() == "true",
+            cache_key_sort_tokens=os.getenv("CACHE_KEY_SORT_TOKENS", "true").lower() == "true",
+            near_cache_invalidation=os.getenv("NEAR_CACHE_INVALIDATION", "true").lower() == "true",
+            node_id=os.getenv("NODE_ID", ""),
+            cache_codec=os.getenv("CACHE_CODEC", "binary"),
+            cache_compress_threshold=int(os.getenv("CACHE_COMPRESS_THRESHOLD", "512")),
             
             # Auto-scaling settings
             auto_scale_enabled=os.getenv("CACHE_AUTO_SCALE_ENABLED", "true").lower() == "true",
             scale_down_threshold=float(os.getenv("CACHE_SCALE_DOWN_THRESHOLD", "0.5")),
             scale_up_threshold=float(os.getenv("CACHE_SCALE_UP_THRESHOLD", "0.9")),
             min_cache_size=int(os.getenv("CACHE_MIN_SIZE", "100")),
-            max_cache_size=int(os.getenv("CACHE_MAX_SIZE", "10000"))
+            max_cache_size=int(os.getenv("CACHE_MAX_SIZE", "10000")),
+            
+            # Single-flight settings
+            single_flight_lock_ttl=float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "15")),
+            single_flight_wait_timeout=float(os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", "10")),
+            
+            # Semantic cache settings
+            semantic_cache_enabled=os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true",
+            semantic_cache_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.93")),
+            semantic_cache_source_thresholds=os.getenv("SEMANTIC_CACHE_SOURCE_THRESHOLDS", ""),
+            semantic_cache_max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2048")),
+            semantic_cache_ttl=int(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+            semantic_cache_verify_rate=float(os.getenv("SEMANTIC_CACHE_VERIFY_RATE", "0")),
+            
+            # Cache warming settings
+            cache_warming_enabled=os.getenv("CACHE_WARMING_ENABLED", "true").lower() == "true",
+            cache_warming_top_n=int(os.getenv("CACHE_WARMING_TOP_N", "200")),
+            cache_warming_window_days=int(os.getenv("CACHE_WARMING_WINDOW_DAYS", "7")),
+            cache_warming_batch_size=int(os.getenv("CACHE_WARMING_BATCH_SIZE", "4")),
+            cache_warming_rate=float(os.getenv("CACHE_WARMING_RATE", "2")),
+            cache_warming_claim_ttl=float(os.getenv("CACHE_WARMING_CLAIM_TTL", "300")),
+            
+            # Negative cache settings
+            negative_cache_enabled=os.getenv("NEGATIVE_CACHE_ENABLED", "true").lower() == "true",
+            negative_cache_max_entries=int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "5000")),
+            negative_cache_ttl=int(os.getenv("NEGATIVE_CACHE_TTL", "600")),
+            
+            # Miss-ratio curve settings
+            cache_miss_ratio_curve=os.getenv("CACHE_MISS_RATIO_CURVE", "true").lower() == "true",
+            cache_target_hit_rate=float(os.getenv("CACHE_TARGET_HIT_RATE", "0")),
+            embedding_cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "100")),
+            embedding_cache_target_hit_rate=float(os.getenv("EMBEDDING_CACHE_TARGET_HIT_RATE", "0")),
+            embedding_cache_max_memory_mb=int(os.getenv("EMBEDDING_CACHE_MAX_MEMORY_MB", "64"))
         )
     
     def _validate_config(self):
@@ -455,7 +559,10 @@ class UnifiedConfig:
         
         if self.server.port < 1 or self.server.port > 65535:
             errors.append(f"Invalid server port: {self.server.port}")
-        
+
+        if self.ai.embedding_backend not in ("torch", "onnx"):
+            warnings.append(f"Unknown embedding backend '{self.ai.embedding_backend}', torch will be used")
+
         # Log results
         if errors:
             error_msg = "❌ Configuration validation failed:\n" + "\n".join(f"  - {err}" for err in errors)
@@ -16,6 +16,7 @@ import threading
 from contextlib import contextmanager
 
 from core.logging_config import get_structured_logger
+from housekeeping import get_housekeeping_scheduler
 
 logger = get_structured_logger(__name__)
 
@@ -104,25 +105,22 @@ class MetricsCollector:
             return
         
         self._collection_active = True
-        
-        def collect_loop():
-            while self._collection_active:
-                try:
-                    self._collect_system_metrics()
-                    self._cleanup_old_metrics()
-                except Exception as e:
-                    logger.error("Error in metrics collection", error=str(e))
-                finally:
-                    # Always sleep to prevent busy loop
-                    time.sleep(interval_seconds)
-        
-        thread = threading.Thread(target=collect_loop, daemon=True)
-        thread.start()
+        get_housekeeping_scheduler().schedule_periodic(
+            "metrics_collection", self._collect_once, interval_seconds)
         logger.info("Metrics collection started", interval=interval_seconds)
     
+    def _collect_once(self):
+        """One collection pass (run by the housekeeping scheduler)"""
+        try:
+            self._collect_system_metrics()
+            self._cleanup_old_metrics()
+        except Exception as e:
+            logger.error("Error in metrics collection", error=str(e))
+    
     def stop_collection(self):
         """Stop metrics collection"""
         self._collection_active = False
+        get_housekeeping_scheduler().cancel("metrics_collection")
         logger.info("Metrics collection stopped")
     
     def increment_counter(self, name: str, value: int = 1, labels: Dict[str, str] = None):
@@ -0,0 +1,286 @@
+"""
+🧊 MEFAPEX Preload Serving Mode
+==============================
+Load models and content indexes ONCE in the master process before workers
+are forked, so model weights live in copy-on-write pages shared by all workers.
+
+- Models are loaded (not run) in the master: no inference before fork, so
+  no OpenMP / ONNX Runtime thread pools are inherited by children
+- Weights are frozen: eval(), requires_grad=False, share_memory()
+- gc.freeze() moves preloaded objects to the permanent generation so the
+  cyclic GC never touches (and un-shares) their pages
+- Per-worker memory report (USS/PSS) to see how much each worker really costs
+"""
+import gc
+import logging
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+# Preload state (inherited by forked workers)
+_preload_state: Dict[str, Any] = {
+    "preloaded": False,
+    "master_pid": None,
+    "preload_seconds": 0.0,
+    "models": [],
+    "content": [],
+    "frozen_objects": 0,
+}
+
+
+def is_preloaded() -> bool:
+    """True when this process (or its parent before fork) ran the preload"""
+    return _preload_state["preloaded"]
+
+
+def _freeze_torch_module(module: Any) -> bool:
+    """Put a torch module into shared, read-only inference state"""
+    try:
+        module.eval()
+        for parameter in module.parameters():
+            parameter.requires_grad_(False)
+        module.share_memory()
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Could not freeze module {type(module).__name__}: {e}")
+        return False
+
+
+def _default_models_to_preload() -> List[str]:
+    """Same model selection as ModelManager.warmup_models()"""
+    from core.configuration import get_config
+    ai_config = get_config().ai
+    models = ["turkish_sentence" if ai_config.prefer_turkish_models else "english_sentence"]
+    if ai_config.use_huggingface:
+        models.append("text_generator")
+    return models
+
+
+def _preload_models(models: List[str]) -> List[str]:
+    """Load (without running) the requested models and freeze their weights"""
+    from core.configuration import get_config
+    from model_manager import model_manager
+
+    if get_config().ai.embedding_backend == "onnx":
+        # ONNX Runtime sessions spawn thread pools on creation; they are created per worker
+        # (the exported model file is still shared through the OS page cache)
+        models = [m for m in models if m == "text_generator"]
+        logger.info("⚡ ONNX embedding backend: sessions will be created in each worker")
+
+    loaded = []
+    for model_type in models:
+        try:
+            attr_name = "text_generator" if model_type == "text_generator" else f"{model_type}_model"
+            model = getattr(model_manager, attr_name)  # Triggers lazy loading
+            if model is None:
+                continue
+            # Text generator is a pipeline; freeze its underlying module
+            _freeze_torch_module(getattr(model, "model", model))
+            loaded.append(model_type)
+        except Exception as e:
+            logger.warning(f"⚠️ Preload failed for {model_type}: {e}")
+
+    # Idle cleanup would drop shared weights and reload them privately in a worker
+    model_manager.set_auto_cleanup(False)
+    return loaded
+
+
+def _preload_content() -> List[str]:
+    """Build content indexes (static content, inverted index, Turkish content, intents)"""
+    loaded = []
+    try:
+        from content_manager import content_manager
+        if content_manager.static_responses:
+            loaded.append("content_manager")
+    except Exception as e:
+        logger.warning(f"⚠️ Content manager preload failed: {e}")
+
+    try:
+        from improved_turkish_content_manager import improved_turkish_content
+        if improved_turkish_content is not None:
+            loaded.append("turkish_content")
+    except Exception as e:
+        logger.warning(f"⚠️ Turkish content preload failed: {e}")
+
+    try:
+        from intent_classifier import intent_classifier
+        if intent_classifier.is_trained:
+            loaded.append("intent_classifier")
+    except Exception as e:
+        logger.warning(f"⚠️ Intent classifier preload failed: {e}")
+
+    return loaded
+
+
+def preload_for_workers(models: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    🧊 Preload models and content indexes in the master process
+
+    Must be called before workers are forked and before any request is served.
+
+    Args:
+        models: Model types to load (defaults to the configured warmup set)
+    """
+    if _preload_state["preloaded"]:
+        return get_preload_status()
+
+    start_time = time.time()
+    logger.info("🧊 Preload mode: loading models and content in master process...")
+
+    try:
+        import torch
+        torch.set_grad_enabled(False)
+    except ImportError:
+        pass
+
+    loaded_models = _preload_models(models or _default_models_to_preload())
+    loaded_content = _preload_content()
+
+    # Collect once, then freeze everything that survived into the permanent generation
+    gc.collect()
+    frozen = 0
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+        frozen = gc.get_freeze_count()
+
+    _preload_state.update({
+        "preloaded": True,
+        "master_pid": os.getpid(),
+        "preload_seconds": round(time.time() - start_time, 2),
+        "models": loaded_models,
+        "content": loaded_content,
+        "frozen_objects": frozen,
+    })
+
+    logger.info(f"✅ Preload completed in {_preload_state['preload_seconds']}s: "
+                f"models={loaded_models}, content={loaded_content}, frozen_objects={frozen}")
+    return get_preload_status()
+
+
+def release_before_fork():
+    """Close resources in the master that must not be inherited by forked workers"""
+    try:
+        from database.services.connection_service import connection_service
+        connection_service.close_pool()  # Workers open their own pools after fork
+    except Exception as e:
+        logger.debug(f"Connection pool release before fork skipped: {e}")
+
+    # Preloading registers housekeeping jobs (and starts the wheel thread); threads do
+    # not survive fork and a lock held by one would deadlock the child
+    try:
+        from housekeeping import get_housekeeping_scheduler
+        get_housekeeping_scheduler().pause()
+    except Exception as e:
+        logger.debug(f"Housekeeping pause before fork skipped: {e}")
+
+
+def after_fork_in_worker():
+    """
+    Re-initialize per-process state in a freshly forked worker
+    Preloaded objects stay frozen; only process-local state is reset.
+    """
+    random.seed()
+    try:
+        import torch
+        torch.set_grad_enabled(False)
+    except ImportError:
+        pass
+
+    # Fresh scheduler lock and threads; the jobs registered in the master keep running here
+    try:
+        from housekeeping import get_housekeeping_scheduler
+        get_housekeeping_scheduler().after_fork()
+    except Exception as e:
+        logger.warning(f"⚠️ Worker housekeeping restart failed: {e}")
+
+    # Database sockets must never be shared between processes
+    try:
+        from database.services.connection_service import connection_service
+        connection_service.reopen_pool()
+    except Exception as e:
+        logger.warning(f"⚠️ Worker connection pool re-open failed: {e}")
+
+    # Distributed WebSocket manager was created before fork; give each worker its own identity
+    try:
+        from websocket_manager import websocket_manager
+        if hasattr(websocket_manager, "worker_id"):
+            websocket_manager.worker_id = f"worker-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            websocket_manager.local_stats["worker_id"] = websocket_manager.worker_id
+    except Exception as e:
+        logger.debug(f"WebSocket worker identity reset skipped: {e}")
+
+    # A hybrid cache created before fork would carry the master's node id into every
+    # worker, and each would drop the others' invalidations as its own
+    try:
+        from cache_manager import cache_manager
+        from core.config_utils import load_cache_config
+        from distributed_cache import make_node_id
+        distributed_cache = cache_manager.distributed_cache
+        if hasattr(distributed_cache, "reset_node_id"):
+            distributed_cache.reset_node_id(make_node_id(getattr(load_cache_config(), "node_id", "") or None))
+    except Exception as e:
+        logger.debug(f"Distributed cache node id reset skipped: {e}")
+
+    logger.info(f"👶 Worker {os.getpid()} forked from master {os.getppid()} "
+                f"(preloaded: {_preload_state['preloaded']})")
+
+
+def _process_memory(process: Any) -> Dict[str, Any]:
+    """RSS / USS / PSS / shared memory of a process in MB"""
+    to_mb = lambda value: round(value / 1024 / 1024, 2)
+    try:
+        info = process.memory_full_info()
+        report = {
+            "pid": process.pid,
+            "rss_mb": to_mb(info.rss),
+            "uss_mb": to_mb(info.uss),  # memory unique to this process
+        }
+        if hasattr(info, "pss"):
+            report["pss_mb"] = to_mb(info.pss)  # proportional share of shared pages
+        if hasattr(info, "shared"):
+            report["shared_mb"] = to_mb(info.shared)
+        return report
+    except (psutil.AccessDenied, psutil.NoSuchProcess) as e:
+        return {"pid": process.pid, "error": str(e)}
+
+
+def get_process_memory_report(include_children: bool = True) -> Dict[str, Any]:
+    """
+    📊 Per-process memory report
+
+    In a worker this reports the worker itself; in the supervisor/master it
+    also reports every child worker. USS is the memory a worker adds on top
+    of the shared, preloaded pages.
+    """
+    if not PSUTIL_AVAILABLE:
+        return {"error": "psutil not available"}
+
+    current = psutil.Process()
+    report = {
+        "preload": get_preload_status(),
+        "process": _process_memory(current),
+    }
+
+    if include_children:
+        workers = [_process_memory(child) for child in current.children()]
+        if workers:
+            report["workers"] = workers
+            report["total_worker_uss_mb"] = round(sum(w.get("uss_mb", 0) for w in workers), 2)
+
+    return report
+
+
+def get_preload_status() -> Dict[str, Any]:
+    """Preload state for health endpoints"""
+    return dict(_preload_state, is_master=_preload_state["master_pid"] == os.getpid())
@@ -15,6 +15,7 @@ import redis.asyncio as redis
 from redis.exceptions import RedisError, ConnectionError, TimeoutError
 
 from core.configuration import RateLimitConfig
+from housekeeping import HousekeepingJob, get_housekeeping_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -274,7 +275,7 @@ class DistributedRateLimiter:
         self.config = config
         self.redis_backend: Optional[RedisRateLimiterBackend] = None
         self.memory_backend = MemoryRateLimiterBackend(config)
-        self._cleanup_task: Optional[asyncio.Task] = None
+        self._cleanup_job: Optional[HousekeepingJob] = None
         
         # Initialize Redis backend if enabled
         if config.use_redis:
@@ -284,25 +285,22 @@ class DistributedRateLimiter:
         self._start_cleanup_task()
     
     def _start_cleanup_task(self):
-        """Start background cleanup task"""
-        async def cleanup_worker():
-            while True:
-                try:
-                    await asyncio.sleep(self.config.cleanup_interval_seconds)
-                    
-                    # Cleanup Redis backend
-                    if self.redis_backend:
-                        await self.redis_backend.cleanup()
-                    
-                    # Always cleanup memory backend
-                    await self.memory_backend.cleanup()
-                    
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    logger.error(f"Error in cleanup task: {e}")
-        
-        self._cleanup_task = asyncio.create_task(cleanup_worker())
+        """Register backend cleanup with the housekeeping scheduler"""
+        self._cleanup_job = get_housekeeping_scheduler().schedule_periodic(
+            "rate_limiter.cleanup", self._cleanup_backends, self.config.cleanup_interval_seconds)
+    
+    async def _cleanup_backends(self):
+        """Drop expired rate-limit windows from both backends"""
+        try:
+            # Cleanup Redis backend
+            if self.redis_backend:
+                await self.redis_backend.cleanup()
+            
+            # Always cleanup memory backend
+            await self.memory_backend.cleanup()
+            
+        except Exception as e:
+            logger.error(f"Error in cleanup task: {e}")
     
     async def is_allowed(self, client_ip: str, endpoint_type: str = "general") -> bool:
         """
@@ -383,13 +381,10 @@ class DistributedRateLimiter:
     
     async def close(self):
         """Close and cleanup resources"""
-        # Cancel cleanup task
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel cleanup job
+        if self._cleanup_job:
+            self._cleanup_job.cancel()
+            self._cleanup_job = None
         
         # Close backends
         if self.redis_backend:
@@ -10,6 +10,8 @@ from typing import Optional
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from housekeeping import get_housekeeping_scheduler
+
 logger = logging.getLogger(__name__)
 
 class DistributedWebSocketMiddleware(BaseHTTPMiddleware):
@@ -19,23 +21,25 @@ class DistributedWebSocketMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.websocket_manager = websocket_manager
         self.cleanup_interval = cleanup_interval  # 5 minutes default
-        self.cleanup_task: Optional[asyncio.Task] = None
-        self.health_check_task: Optional[asyncio.Task] = None
+        self._job_suffix = f"{id(self):x}"
         
-        # Start background tasks
+        # Register background jobs
         self._start_background_tasks()
     
     def _start_background_tasks(self):
-        """Start background tasks for cleanup and health monitoring"""
+        """Register session cleanup and health monitoring with the housekeeping scheduler"""
         try:
-            # Session cleanup task
-            self.cleanup_task = asyncio.create_task(self._periodic_cleanup())
+            scheduler = get_housekeeping_scheduler()
+            # Session cleanup job
+            scheduler.schedule_periodic(f"websocket.session_cleanup.{self._job_suffix}",
+                                        self._periodic_cleanup, self.cleanup_interval)
             
-            # Health check task (if distributed manager supports it)
+            # Health check job (if distributed manager supports it)
             if hasattr(self.websocket_manager, 'health_check'):
-                self.health_check_task = asyncio.create_task(self._periodic_health_check())
+                scheduler.schedule_periodic(f"websocket.health_check.{self._job_suffix}",
+                                            self._periodic_health_check, 60)  # 1 minute
                 
-            logger.info("🔧 Distributed WebSocket middleware background tasks started")
+            logger.info("🔧 Distributed WebSocket middleware background jobs registered")
             
         except Exception as e:
             logger.error(f"Error starting background tasks: {e}")
@@ -66,63 +70,36 @@ class DistributedWebSocketMiddleware(BaseHTTPMiddleware):
         return response
     
     async def _periodic_cleanup(self):
-        """Periodic cleanup of expired sessions"""
-        while True:
-            try:
-                await asyncio.sleep(self.cleanup_interval)
-                
-                if hasattr(self.websocket_manager, 'cleanup_expired_sessions'):
-                    expired_count = await self.websocket_manager.cleanup_expired_sessions()
-                    if expired_count > 0:
-                        logger.info(f"🧹 Cleaned up {expired_count} expired WebSocket sessions")
-                
-            except asyncio.CancelledError:
-                logger.info("WebSocket cleanup task cancelled")
-                break
-            except Exception as e:
-                logger.error(f"Error in WebSocket cleanup task: {e}")
-                # Continue running even if cleanup fails
+        """Cleanup of expired sessions (run every cleanup_interval)"""
+        try:
+            if hasattr(self.websocket_manager, 'cleanup_expired_sessions'):
+                expired_count = await self.websocket_manager.cleanup_expired_sessions()
+                if expired_count > 0:
+                    logger.info(f"🧹 Cleaned up {expired_count} expired WebSocket sessions")
+        except Exception as e:
+            logger.error(f"Error in WebSocket cleanup task: {e}")
     
     async def _periodic_health_check(self):
-        """Periodic health check of distributed WebSocket system"""
-        health_check_interval = 60  # 1 minute
-        
-        while True:
-            try:
-                await asyncio.sleep(health_check_interval)
-                
-                health_status = await self.websocket_manager.health_check()
-                
-                # Log health status
-                if health_status.get('session_store_healthy') and health_status.get('message_broker_healthy'):
-                    logger.debug(f"💚 WebSocket system healthy - Worker: {health_status.get('worker_id')}")
-                else:
-                    logger.warning(f"⚠️ WebSocket system health issues: {health_status}")
-                
-            except asyncio.CancelledError:
-                logger.info("WebSocket health check task cancelled")
-                break
-            except Exception as e:
-                logger.error(f"Error in WebSocket health check: {e}")
+        """Health check of distributed WebSocket system (run every minute)"""
+        try:
+            health_status = await self.websocket_manager.health_check()
+            
+            # Log health status
+            if health_status.get('session_store_healthy') and health_status.get('message_broker_healthy'):
+                logger.debug(f"💚 WebSocket system healthy - Worker: {health_status.get('worker_id')}")
+            else:
+                logger.warning(f"⚠️ WebSocket system health issues: {health_status}")
+        except Exception as e:
+            logger.error(f"Error in WebSocket health check: {e}")
     
     async def shutdown(self):
         """Clean shutdown of middleware tasks"""
         logger.info("🔌 Shutting down WebSocket middleware")
         
-        # Cancel background tasks
-        if self.cleanup_task:
-            self.cleanup_task.cancel()
-            try:
-                await self.cleanup_task
-            except asyncio.CancelledError:
-                pass
-        
-        if self.health_check_task:
-            self.health_check_task.cancel()
-            try:
-                await self.health_check_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel background jobs
+        scheduler = get_housekeeping_scheduler()
+        scheduler.cancel(f"websocket.session_cleanup.{self._job_suffix}")
+        scheduler.cancel(f"websocket.health_check.{self._job_suffix}")
         
         # Shutdown WebSocket manager
         if hasattr(self.websocket_manager, 'close'):
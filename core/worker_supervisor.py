@@ -0,0 +1,392 @@
+"""
+👷 MEFAPEX Multi-Worker Supervisor
+=================================
+Pre-fork process supervisor for production serving:
+- N Uvicorn workers share one pre-bound listening socket (or SO_REUSEPORT sockets)
+- Crashed workers are restarted with exponential backoff (scheduled, the loop never sleeps on it)
+- SIGHUP triggers a rolling restart (one worker at a time, new worker ready first)
+- SIGTERM / SIGINT drain all workers gracefully
+- Each worker runs the FastAPI lifespan itself, so StartupManager /
+  ShutdownManager hooks execute once per worker, never in the supervisor
+- Redis-backed components (sessions, rate limiting, cache) are verified when N > 1
+"""
+import asyncio
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkerInfo:
+    """Bookkeeping for a single worker process"""
+    index: int
+    pid: int
+    started_at: float = field(default_factory=time.time)
+    ready_fd: Optional[int] = None
+    ready: bool = False
+    restarts: int = 0
+
+
+def check_multi_worker_requirements(config: Any, workers: int) -> List[str]:
+    """
+    Check that per-process state is externalized to Redis when running N > 1 workers
+
+    Returns:
+        List of problems (empty when the configuration is safe for multiple workers)
+    """
+    if workers <= 1:
+        return []
+
+    problems = []
+
+    if config.rate_limit.enabled and not config.rate_limit.use_redis:
+        problems.append("Rate limiting uses in-memory counters (RATE_LIMIT_USE_REDIS=false): "
+                        "limits would be enforced per worker")
+
+    if not config.cache.distributed_cache_enabled:
+        problems.append("Distributed cache disabled (DISTRIBUTED_CACHE_ENABLED=false): "
+                        "each worker would keep an inconsistent private cache")
+
+    try:
+        from websocket_manager import websocket_manager
+        if not hasattr(websocket_manager, "session_store"):
+            problems.append("WebSocket sessions are in-memory (no REDIS_URL for the distributed "
+                            "WebSocket manager): sessions would not be visible across workers")
+    except Exception as e:
+        problems.append(f"WebSocket manager could not be inspected: {e}")
+
+    # Redis must actually be reachable, otherwise components silently fall back to memory
+    try:
+        import redis
+        redis_url = config.cache.redis_url or f"redis://{config.cache.redis_host}:{config.cache.redis_port}/{config.cache.redis_db}"
+        client = redis.Redis.from_url(redis_url, password=config.cache.redis_password,
+                                      socket_connect_timeout=2, socket_timeout=2)
+        client.ping()
+        client.close()
+    except ImportError:
+        problems.append("redis package not installed")
+    except Exception as e:
+        problems.append(f"Redis not reachable ({e}): components would fall back to per-worker memory")
+
+    return problems
+
+
+def create_listening_socket(host: str, port: int, reuse_port: bool = False, backlog: int = 2048) -> socket.socket:
+    """Create a bound, listening, inheritable TCP socket"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerSupervisor:
+    """
+    Pre-fork supervisor for Uvicorn workers
+
+    Workers are forked (not spawned) so models preloaded in the supervisor
+    (see core.preload) stay shared copy-on-write. A rolling restart recycles
+    worker processes; code changes still require restarting the supervisor.
+    """
+
+    def __init__(self, app: Any, host: str, port: int, workers: int,
+                 reuse_port: bool = False, log_level: str = "warning",
+                 graceful_timeout: float = 30.0, ready_timeout: float = 120.0,
+                 max_restart_backoff: float = 30.0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.reuse_port = reuse_port and hasattr(socket, "SO_REUSEPORT")
+        self.log_level = log_level
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self.max_restart_backoff = max_restart_backoff
+
+        self.workers: Dict[int, WorkerInfo] = {}  # pid -> WorkerInfo
+        self._socket: Optional[socket.socket] = None
+        self._running = False
+        self._rolling_restart_requested = False
+        self._crash_counts: Dict[int, int] = {}  # worker index -> consecutive fast crashes
+        # worker index -> (monotonic due time, restarts); respawns wait here instead of
+        # sleeping so the loop keeps reaping, collecting readiness and handling signals
+        self._pending_respawns: Dict[int, Tuple[float, int]] = {}
+
+        self.stats = {
+            "workers_started": 0,
+            "workers_crashed": 0,
+            "rolling_restarts": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Supervisor (master) side
+    # ------------------------------------------------------------------
+
+    def run(self):
+        """Run the supervisor until SIGTERM/SIGINT"""
+        if not self.reuse_port:
+            self._socket = create_listening_socket(self.host, self.port)
+
+        self._prepare_for_fork()
+        self._install_signal_handlers()
+        self._running = True
+
+        logger.warning(f"👷 Supervisor {os.getpid()} starting {self.num_workers} workers on "
+                       f"{self.host}:{self.port} ({'SO_REUSEPORT' if self.reuse_port else 'shared socket'})")
+
+        for index in range(self.num_workers):
+            self._spawn_worker(index)
+
+        try:
+            while self._running:
+                self._reap_workers()
+                self._respawn_due_workers()
+                self._collect_ready_signals(timeout=0.5)
+                if self._rolling_restart_requested:
+                    self._rolling_restart_requested = False
+                    self._rolling_restart()
+        finally:
+            self._stop_all_workers()
+            if self._socket:
+                self._socket.close()
+            logger.warning("👷 Supervisor stopped")
+
+    def _prepare_for_fork(self):
+        """Release resources that must not be shared with forked workers"""
+        from core.preload import release_before_fork
+        release_before_fork()
+
+    def _install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_rolling_restart)
+
+    def _handle_stop(self, signum, frame):
+        logger.warning(f"🛑 Supervisor received signal {signum}, stopping workers...")
+        self._running = False
+
+    def _handle_rolling_restart(self, signum, frame):
+        logger.warning("🔄 Rolling restart requested (SIGHUP)")
+        self._rolling_restart_requested = True
+
+    def _spawn_worker(self, index: int, restarts: int = 0) -> WorkerInfo:
+        """Fork a new worker process"""
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            # Child process - never returns
+            os.close(ready_read)
+            for other in self.workers.values():
+                if other.ready_fd is not None:
+                    os.close(other.ready_fd)
+            self._run_worker(index, ready_write)
+
+        os.close(ready_write)
+        worker = WorkerInfo(index=index, pid=pid, ready_fd=ready_read, restarts=restarts)
+        self.workers[pid] = worker
+        self.stats["workers_started"] += 1
+        logger.info(f"👶 Worker {index} started (pid {pid})")
+        return worker
+
+    def _collect_ready_signals(self, timeout: float):
+        """Wait for readiness bytes from workers (also serves as the main loop sleep)"""
+        pending = {w.ready_fd: w for w in self.workers.values() if w.ready_fd is not None}
+        if not pending:
+            time.sleep(timeout)
+            return
+        try:
+            readable, _, _ = select.select(list(pending), [], [], timeout)
+        except InterruptedError:
+            return
+        for fd in readable:
+            worker = pending[fd]
+            os.read(fd, 1)
+            os.close(fd)
+            worker.ready_fd = None
+            worker.ready = True
+            self._crash_counts.pop(worker.index, None)
+            logger.info(f"✅ Worker {worker.index} (pid {worker.pid}) ready")
+
+    def _reap_workers(self):
+        """Collect exited workers and schedule restarts of crashed ones"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if worker.ready_fd is not None:
+                os.close(worker.ready_fd)
+
+            if not self._running:
+                continue
+
+            self.stats["workers_crashed"] += 1
+            crashes = self._crash_counts.get(worker.index, 0) + 1
+            self._crash_counts[worker.index] = crashes
+            backoff = min(self.max_restart_backoff, 0.5 * (2 ** (crashes - 1)))
+            logger.error(f"💥 Worker {worker.index} (pid {pid}) exited with status {status}, "
+                         f"restarting in {backoff:.1f}s")
+            self._pending_respawns[worker.index] = (time.monotonic() + backoff, worker.restarts + 1)
+
+    def _respawn_due_workers(self):
+        """Restart crashed workers whose backoff has elapsed"""
+        now = time.monotonic()
+        for index, (due, restarts) in list(self._pending_respawns.items()):
+            if due <= now and self._running:
+                del self._pending_respawns[index]
+                self._spawn_worker(index, restarts=restarts)
+
+    def _wait_ready(self, worker: WorkerInfo) -> bool:
+        """Block until a worker reports ready (or exits / times out)"""
+        deadline = time.time() + self.ready_timeout
+        while time.time() < deadline and worker.ready_fd is not None and worker.pid in self.workers:
+            self._collect_ready_signals(timeout=0.5)
+            self._reap_workers()
+        return worker.ready
+
+    def _rolling_restart(self):
+        """Replace workers one at a time; the replacement must be ready before the old one stops"""
+        self.stats["rolling_restarts"] += 1
+        for old in list(self.workers.values()):
+            if not self._running:
+                return
+            new = self._spawn_worker(old.index)
+            if not self._wait_ready(new):
+                logger.error(f"❌ Replacement for worker {old.index} not ready, aborting rolling restart")
+                # The old worker keeps serving the slot; do not leave a second process behind
+                self._terminate_worker(new)
+                self._pending_respawns.pop(old.index, None)  # Replacement crashed during startup
+                return
+            self._terminate_worker(old)
+        logger.warning("✅ Rolling restart completed")
+
+    def _terminate_worker(self, worker: WorkerInfo):
+        """Gracefully stop one worker (SIGTERM, then SIGKILL after the grace period)"""
+        self.workers.pop(worker.pid, None)
+        if worker.ready_fd is not None:
+            os.close(worker.ready_fd)
+            worker.ready_fd = None
+        try:
+            os.kill(worker.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        deadline = time.time() + self.graceful_timeout
+        while time.time() < deadline:
+            try:
+                pid, _ = os.waitpid(worker.pid, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid:
+                return
+            time.sleep(0.1)
+        logger.warning(f"⚠️ Worker {worker.index} (pid {worker.pid}) did not stop, killing")
+        os.kill(worker.pid, signal.SIGKILL)
+        os.waitpid(worker.pid, 0)
+
+    def _stop_all_workers(self):
+        """Graceful shutdown of all workers (lifespan shutdown runs in each)"""
+        self._pending_respawns.clear()
+        workers = list(self.workers.values())
+        for worker in workers:
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + self.graceful_timeout
+        remaining = {w.pid for w in workers}
+        while remaining and time.time() < deadline:
+            for pid in list(remaining):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+            time.sleep(0.1)
+        for pid in remaining:
+            logger.warning(f"⚠️ Killing worker pid {pid} after graceful timeout")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers.clear()
+
+    # ------------------------------------------------------------------
+    # Worker (child) side
+    # ------------------------------------------------------------------
+
+    def _run_worker(self, index: int, ready_fd: int):
+        """Worker process entry point; runs Uvicorn on the shared socket and exits"""
+        exit_code = 0
+        try:
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(sig, signal.SIG_DFL)
+            os.environ["WORKER_INDEX"] = str(index)
+
+            from core.preload import after_fork_in_worker
+            after_fork_in_worker()
+
+            import uvicorn
+
+            sock = self._socket or create_listening_socket(self.host, self.port, reuse_port=True)
+            server = uvicorn.Server(uvicorn.Config(
+                self.app,
+                log_level=self.log_level,
+                timeout_graceful_shutdown=self.graceful_timeout,
+            ))
+
+            async def _notify_ready():
+                # server.started flips after lifespan startup (StartupManager) completed
+                while not server.started and not server.should_exit:
+                    await asyncio.sleep(0.05)
+                if server.started:
+                    os.write(ready_fd, b"1")
+                os.close(ready_fd)
+
+            async def _serve():
+                notifier = asyncio.create_task(_notify_ready())
+                await server.serve(sockets=[sock])
+                notifier.cancel()
+
+            asyncio.run(_serve())
+        except Exception as e:
+            logger.error(f"❌ Worker {index} failed: {e}")
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # Skip atexit handlers inherited from the supervisor
+            os._exit(exit_code)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Supervisor statistics"""
+        return {
+            **self.stats,
+            "supervisor_pid": os.getpid(),
+            "workers": [
+                {"index": w.index, "pid": w.pid, "ready": w.ready, "restarts": w.restarts,
+                 "uptime_seconds": round(time.time() - w.started_at, 1)}
+                for w in self.workers.values()
+            ],
+            "pending_respawns": sorted(self._pending_respawns),
+        }
@@ -294,6 +294,10 @@ class DatabaseManager:
         """Get recent messages for a user"""
         return self.message_repo.get_user_messages(user_id, limit)
 
+    def get_frequent_messages(self, since_days: int = 7, limit: int = 1000) -> List[Dict]:
+        """Most frequent user messages over a window (used for cache warming)"""
+        return self.message_repo.get_frequent_user_messages(since_days, limit)
+
     def get_chat_history(self, user_id: str, limit: int = 20) -> List[Dict]:
         """Get chat history for a user (backward compatible)"""
         try:
@@ -116,6 +116,25 @@ class MessageRepository:
             logger.error(f"❌ Failed to get messages for user {user_id}: {e}")
             return []
 
+    def get_frequent_user_messages(self, since_days: int = 7, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Most frequent user messages of the last ``since_days`` days (message, hits)"""
+        query = """
+            SELECT user_message AS message, COUNT(*) AS hits
+            FROM chat_messages
+            WHERE timestamp >= NOW() - (%s * INTERVAL '1 day')
+            GROUP BY user_message
+            ORDER BY hits DESC
+            LIMIT %s
+        """
+        
+        try:
+            results = self.connection_service.execute_query(query, (since_days, limit))
+            return [dict(row) for row in results or []]
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to get frequent user messages: {e}")
+            return []
+
     def clear_user_messages(self, user_id: str) -> bool:
         """Clear all messages for a user"""
         query = "DELETE FROM chat_messages WHERE user_id = %s"
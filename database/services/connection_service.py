@@ -243,6 +243,11 @@ class ConnectionService:
             self.connection_pool = None
             logger.info("Connection pool closed")
 
+    def reopen_pool(self):
+        """Re-create the connection pool (e.g. in a freshly forked worker process)"""
+        self.close_pool()
+        self._init_connection_pool()
+
 
 # Create singleton instance
 connection_service = ConnectionService()
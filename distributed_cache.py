@@ -4,13 +4,17 @@ Redis-based distributed cache with fallback to local memory cache
 Enhanced with configurable TTL, size limits, and eviction policies
 """
 import json
+import os
+import socket
 import time
-import hashlib
 import logging
 import asyncio
 import gc
+import uuid
+import random
 import psutil
-from typing import Dict, Optional, Tuple, Any, Union
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Any, Union, Callable
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 
@@ -21,10 +25,107 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
-from response_cache import AdvancedResponseCache, CacheEntry, EvictionPolicy
+from response_cache import AdvancedResponseCache, ShardedResponseCache, CacheEntry, EvictionPolicy
+from cache_admission import create_admission_policy
+from cache_keys import make_cache_key
+from cache_codec import DEFAULT_COMPRESS_THRESHOLD, decode_entry, encode_entry
+from housekeeping import HousekeepingJob, get_housekeeping_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Release an in-flight lock only if this node still owns it
+_RELEASE_INFLIGHT_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Pop the lowest-scored members of the eviction index and delete their entries;
+# returns how many entries existed (members whose entry already expired count 0).
+# Victim keys are derived in Lua, not declared in KEYS: not Redis Cluster safe.
+_EVICT_SCRIPT = """
+local victims = redis.call('zpopmin', KEYS[1], ARGV[2])
+local removed = 0
+for i = 1, #victims, 2 do
+    removed = removed + redis.call('del', ARGV[1] .. victims[i])
+end
+return removed
+"""
+
+# Hot path: one round trip per get/set. Both scripts keep the eviction index in
+# step with the entry (ZADD XX on reads never re-adds an evicted key).
+_GET_SCRIPT = """
+local data = redis.call('get', KEYS[1])
+if not data then
+    redis.call('zrem', KEYS[2], ARGV[3])
+    return false
+end
+local count = false
+if ARGV[1] == 'lru' then
+    redis.call('zadd', KEYS[2], 'XX', ARGV[2], ARGV[3])
+elseif ARGV[1] == 'lfu' then
+    count = redis.call('zadd', KEYS[2], 'XX', 'INCR', 1, ARGV[3])
+end
+return {data, count}
+"""
+
+# Evicts one victim when a new key enters a full cache, optionally stamps the
+# entry from the version counter and publishes the near-cache invalidation.
+# Binary entries carry the version at a fixed header offset (cache_codec).
+# Like _EVICT_SCRIPT, the victim key is derived in Lua: not Redis Cluster safe.
+_SET_SCRIPT = """
+local function be64(n)
+    local b = {}
+    for i = 8, 1, -1 do
+        b[i] = n % 256
+        n = math.floor(n / 256)
+    end
+    return string.char(b[1], b[2], b[3], b[4], b[5], b[6], b[7], b[8])
+end
+local evicted = 0
+if redis.call('exists', KEYS[1]) == 0 and redis.call('zcard', KEYS[2]) >= tonumber(ARGV[6]) then
+    local victims = redis.call('zpopmin', KEYS[2], 1)
+    for i = 1, #victims, 2 do
+        evicted = evicted + redis.call('del', ARGV[7] .. victims[i])
+    end
+end
+local data = ARGV[1]
+local version = 0
+if ARGV[8] ~= '' then
+    version = redis.call('incr', KEYS[3])
+    if string.sub(data, 1, 2) == 'MC' then
+        data = string.sub(data, 1, 4) .. be64(version) .. string.sub(data, 13)
+    else
+        local entry = cjson.decode(data)
+        entry['version'] = version
+        data = cjson.encode(entry)
+    end
+end
+if tonumber(ARGV[2]) > 0 then
+    redis.call('set', KEYS[1], data, 'EX', ARGV[2])
+else
+    redis.call('set', KEYS[1], data)
+end
+if ARGV[5] == '1' then
+    redis.call('zadd', KEYS[2], 'NX', ARGV[4], ARGV[3])
+else
+    redis.call('zadd', KEYS[2], ARGV[4], ARGV[3])
+end
+if version > 0 then
+    redis.call('publish', ARGV[8], cjson.encode({op='set', key=ARGV[3], version=version, node=ARGV[9]}))
+end
+return {version, evicted, redis.call('zcard', KEYS[2])}
+"""
+
+def make_node_id(prefix: Optional[str] = None) -> str:
+    """
+    Unique id of this process in invalidation broadcasts; ``prefix`` (NODE_ID)
+    defaults to the host name, and the pid plus a random suffix keep workers
+    on one host (and a re-forked pid) apart
+    """
+    return f"{prefix or socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
 @dataclass
 class DistributedCacheEntry:
     """
@@ -36,6 +137,7 @@ class DistributedCacheEntry:
     last_accessed: float
     source: str
     node_id: str = "local"
+    version: int = 0  # Write stamp from the shared version counter (near-cache coherence)
     
     def is_expired(self, ttl: int) -> bool:
         """Check if entry is expired based on TTL"""
@@ -89,22 +191,53 @@ class BaseCacheInterface(ABC):
 class RedisDistributedCache(BaseCacheInterface):
     """
     Redis-based distributed cache implementation with size and memory limits
+    
+    Eviction state lives in one sorted set (``<prefix>index``) scored by the
+    policy: last access (lru), access count (lfu), insert time (fifo,
+    ttl_aware) or a random number (random). get and set are single Lua
+    script calls that also update the index; a write into a full cache evicts
+    one victim in the same script. Memory limits and any size overshoot are
+    enforced by a periodic housekeeping job, off the request path.
+    
+    Single-instance Redis (or a primary with replicas) only: the set and evict
+    scripts delete victim entries whose keys are built inside Lua from the
+    prefix (``ARGV[7] .. member``) rather than declared in ``KEYS``, which Redis
+    Cluster rejects or routes to the wrong slot. Running on a cluster would need
+    a hash-tagged prefix (e.g. ``"{mefapex:cache}:"``, pinning the whole cache
+    to one slot) and a cluster-aware client.
     """
     
     def __init__(self, 
                  redis_url: str = "redis://localhost:6379", 
                  key_prefix: str = "mefapex:cache:", 
-                 node_id: str = "node1",
+                 node_id: Optional[str] = None,
                  max_entries: int = 10000,
                  max_memory_mb: int = 100,
-                 eviction_policy: str = "lru"):
+                 eviction_policy: str = "lru",
+                 admission_policy: Optional[str] = None,
+                 limit_check_interval: int = 60,
+                 codec: str = "binary",
+                 compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD):
         self.redis_url = redis_url
         self.key_prefix = key_prefix
-        self.node_id = node_id
+        self.node_id = node_id or make_node_id()
         self.max_entries = max_entries
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
         self.eviction_policy = eviction_policy
+        self.limit_check_interval = limit_check_interval
+        # Write format: "binary" (cache_codec, compressed above the threshold) or "json".
+        # Values are read as bytes in both modes and dispatched on the MC magic prefix,
+        # so entries of either format (e.g. during a codec rollout) stay readable
+        self.codec = codec.lower()
+        self.compress_threshold = compress_threshold
         self.redis_client = None
+        self._binary_client = None  # decode_responses=False client for entry values
+        self._scripts: Dict[str, Any] = {}
+        self._limits_job: Optional[HousekeepingJob] = None  # Periodic limit enforcement, off the request path
+        self._last_size = 0  # Index size seen by the last write / limit check
+        # Per-node TinyLFU sketch; decides whether a new key may displace a victim
+        self.admission_policy = (admission_policy or "none").lower()
+        self.admission = create_admission_policy(self.admission_policy, max_entries)
         self._stats = {
             'hits': 0,
             'misses': 0,
@@ -112,7 +245,11 @@ class RedisDistributedCache(BaseCacheInterface):
             'deletes': 0,
             'evictions': 0,
             'errors': 0,
-            'memory_evictions': 0
+            'memory_evictions': 0,
+            'admission_rejects': 0,
+            'round_trips': 0,  # Request-path Redis round trips
+            'maintenance_round_trips': 0,
+            'bytes_written': 0
         }
         
     async def connect(self):
@@ -129,15 +266,30 @@ class RedisDistributedCache(BaseCacheInterface):
                 socket_timeout=5,
                 retry_on_timeout=True
             )
+            self._binary_client = redis.from_url(
+                self.redis_url,
+                decode_responses=False,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True
+            )
             # Test connection
             await self.redis_client.ping()
             logger.info(f"✅ Redis connected: {self.redis_url}")
+            if self.limit_check_interval > 0 and self._limits_job is None:
+                self._limits_job = get_housekeeping_scheduler().schedule_periodic(
+                    f"distributed_cache.limits.{id(self):x}", self.enforce_limits, self.limit_check_interval)
         except Exception as e:
             logger.error(f"❌ Redis connection failed: {e}")
             raise
     
     async def disconnect(self):
         """Close Redis connection"""
+        if self._limits_job:
+            self._limits_job.cancel()
+            self._limits_job = None
+        if self._binary_client:
+            await self._binary_client.close()
         if self.redis_client:
             await self.redis_client.close()
             logger.info("🔌 Redis disconnected")
@@ -146,33 +298,71 @@ class RedisDistributedCache(BaseCacheInterface):
         """Create prefixed cache key"""
         return f"{self.key_prefix}{key}"
     
-    def _make_meta_key(self, key: str) -> str:
-        """Create metadata key for tracking"""
-        return f"{self.key_prefix}meta:{key}"
+    def _make_index_key(self) -> str:
+        """Sorted set ordering entries for eviction (lowest score = first victim)"""
+        return f"{self.key_prefix}index"
+    
+    @property
+    def _entry_client(self):
+        """Binary-safe client that reads and writes entry values"""
+        return self._binary_client if self._binary_client is not None else self.redis_client
+    
+    def _script(self, source: str):
+        """Registered script (EVALSHA, loaded on first use) bound to the entry client"""
+        client = self._entry_client
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not client:
+            script = self._scripts[source] = client.register_script(source)
+        return script
+    
+    def _encode(self, entry: DistributedCacheEntry) -> Union[bytes, str]:
+        """Serialize an entry with the configured codec"""
+        if self.codec == "binary":
+            return encode_entry(entry, self.compress_threshold)
+        return json.dumps(entry.to_dict())
+    
+    def _index_score(self, entry: DistributedCacheEntry) -> float:
+        """Eviction index score of a newly written entry"""
+        policy = self.eviction_policy.lower()
+        if policy == "lru":
+            return entry.last_accessed
+        if policy == "lfu":
+            return entry.access_count
+        if policy in ("fifo", "ttl_aware"):
+            return entry.timestamp
+        return random.random()
     
     async def get(self, key: str) -> Optional[DistributedCacheEntry]:
         """Get entry from Redis"""
         if not self.redis_client:
             return None
         
+        if self.admission is not None:
+            self.admission.record(key)
+        
         try:
-            redis_key = self._make_key(key)
-            data = await self.redis_client.get(redis_key)
+            policy = self.eviction_policy.lower()
+            now = time.time()
+            
+            # Read and touch the eviction score in one script call; a miss also
+            # drops the index member of an entry that expired by TTL
+            self._stats['round_trips'] += 1
+            result = await self._script(_GET_SCRIPT)(
+                keys=[self._make_key(key), self._make_index_key()],
+                args=[policy, now, key]
+            )
             
-            if data is None:
+            if not result:
                 self._stats['misses'] += 1
                 return None
+            data, access_count = result[0], result[1] if len(result) > 1 else None
             
-            # Deserialize
-            entry_dict = json.loads(data)
-            entry = DistributedCacheEntry.from_dict(entry_dict)
+            # Deserialize (binary or legacy JSON)
+            entry = DistributedCacheEntry.from_dict(decode_entry(data))
             
             # Update access info
-            entry.access_count += 1
-            entry.last_accessed = time.time()
-            
-            # Update in Redis (fire and forget)
-            asyncio.create_task(self._update_entry_metadata(key, entry))
+            entry.access_count = int(float(access_count)) if access_count else entry.access_count + 1
+            entry.last_accessed = now
             
             self._stats['hits'] += 1
             return entry
@@ -182,59 +372,69 @@ class RedisDistributedCache(BaseCacheInterface):
             self._stats['errors'] += 1
             return None
     
-    async def set(self, key: str, entry: DistributedCacheEntry, ttl: int = None):
-        """Set entry in Redis with size limit enforcement"""
+    async def set(self, key: str, entry: DistributedCacheEntry, ttl: int = None,
+                  versioned: bool = False) -> Optional[int]:
+        """
+        Set entry in Redis; a new key in a full cache evicts one victim
+        
+        With ``versioned`` the entry is stamped from the shared version counter
+        and a near-cache invalidation is published in the same script call.
+        Returns the version (0 if unversioned), None if not stored.
+        """
         if not self.redis_client:
-            return
+            return None
         
         try:
-            # Check size limits before setting
-            await self.enforce_limits()
+            # A one-off key must not push out more popular entries of a full cache
+            if self.admission is not None and not await self._admit(key):
+                self._stats['admission_rejects'] += 1
+                logger.debug(f"🚪 Redis admission rejected: {key[:8]}...")
+                return None
             
-            redis_key = self._make_key(key)
             entry.node_id = self.node_id
-            data = json.dumps(entry.to_dict())
-            
-            if ttl:
-                await self.redis_client.setex(redis_key, ttl, data)
-            else:
-                await self.redis_client.set(redis_key, data)
-            
-            # Store metadata for eviction tracking
-            await self._store_entry_metadata(key, entry)
+            policy = self.eviction_policy.lower()
             
+            data = self._encode(entry)
+            self._stats['round_trips'] += 1
+            version, evicted, size = await self._script(_SET_SCRIPT)(
+                keys=[self._make_key(key), self._make_index_key(), self._make_version_key()],
+                args=[
+                    data,
+                    ttl or 0,
+                    key,
+                    self._index_score(entry),
+                    # LFU keeps the access count of an overwritten entry
+                    '1' if policy == "lfu" else '0',
+                    self.max_entries,
+                    self.key_prefix,
+                    self._make_invalidation_channel() if versioned else '',
+                    self.node_id
+                ]
+            )
+            entry.version = int(version)
+            self._last_size = int(size)
+            self._stats['evictions'] += int(evicted)
             self._stats['sets'] += 1
+            self._stats['bytes_written'] += len(data)
+            return entry.version
             
         except Exception as e:
             logger.error(f"Redis set error for key {key}: {e}")
             self._stats['errors'] += 1
+            return None
     
-    async def _store_entry_metadata(self, key: str, entry: DistributedCacheEntry):
-        """Store entry metadata for eviction policies"""
-        try:
-            meta_key = self._make_meta_key(key)
-            metadata = {
-                'timestamp': entry.timestamp,
-                'last_accessed': entry.last_accessed,
-                'access_count': entry.access_count,
-                'memory_size': entry.get_memory_size()
-            }
-            await self.redis_client.hset(f"{self.key_prefix}metadata", key, json.dumps(metadata))
-        except Exception as e:
-            logger.error(f"Error storing metadata for key {key}: {e}")
-    
-    async def _update_entry_metadata(self, key: str, entry: DistributedCacheEntry):
-        """Update entry metadata for access tracking"""
-        try:
-            metadata = {
-                'timestamp': entry.timestamp,
-                'last_accessed': entry.last_accessed,
-                'access_count': entry.access_count,
-                'memory_size': entry.get_memory_size()
-            }
-            await self.redis_client.hset(f"{self.key_prefix}metadata", key, json.dumps(metadata))
-        except Exception as e:
-            logger.error(f"Error updating metadata for key {key}: {e}")
+    async def _admit(self, key: str) -> bool:
+        """TinyLFU admission check against the next eviction victim"""
+        if self._last_size < self.max_entries:
+            return True
+        self._stats['round_trips'] += 1
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.exists(self._make_key(key))
+            pipe.zrange(self._make_index_key(), 0, 0)
+            exists, victim = await pipe.execute()
+        if exists:
+            return True  # Overwrite, nothing is evicted
+        return not victim or self.admission.admit(key, victim[0])
     
     async def delete(self, key: str):
         """Delete entry from Redis"""
@@ -242,10 +442,11 @@ class RedisDistributedCache(BaseCacheInterface):
             return
         
         try:
-            redis_key = self._make_key(key)
-            await self.redis_client.delete(redis_key)
-            # Remove metadata
-            await self.redis_client.hdel(f"{self.key_prefix}metadata", key)
+            self._stats['round_trips'] += 1
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(self._make_key(key))
+                pipe.zrem(self._make_index_key(), key)
+                await pipe.execute()
             self._stats['deletes'] += 1
             
         except Exception as e:
@@ -258,11 +459,19 @@ class RedisDistributedCache(BaseCacheInterface):
             return
         
         try:
-            pattern = f"{self.key_prefix}*"
-            keys = await self.redis_client.keys(pattern)
-            if keys:
-                await self.redis_client.delete(*keys)
-            logger.info(f"🗑️ Cleared {len(keys)} Redis cache entries")
+            # SCAN in batches instead of KEYS, which blocks Redis on large keyspaces;
+            # the version counter survives, so write stamps stay monotonic
+            version_key = self._make_version_key()
+            batch, cleared = [], 0
+            async for k in self.redis_client.scan_iter(match=f"{self.key_prefix}*", count=500):
+                if k != version_key:
+                    batch.append(k)
+                if len(batch) >= 500:
+                    cleared += await self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                cleared += await self.redis_client.delete(*batch)
+            logger.info(f"🗑️ Cleared {cleared} Redis cache keys")
             
         except Exception as e:
             logger.error(f"Redis clear error: {e}")
@@ -271,9 +480,8 @@ class RedisDistributedCache(BaseCacheInterface):
     async def get_size(self) -> int:
         """Get current cache size"""
         try:
-            pattern = f"{self.key_prefix}*"
-            keys = await self.redis_client.keys(pattern)
-            return len([k for k in keys if not k.endswith(':metadata')])
+            # Members whose entry expired by TTL are counted until evicted or missed
+            return await self.redis_client.zcard(self._make_index_key())
         except Exception:
             return 0
     
@@ -284,10 +492,12 @@ class RedisDistributedCache(BaseCacheInterface):
         
         try:
             current_size = await self.get_size()
+            self._last_size = current_size
+            self._stats['maintenance_round_trips'] += 2
             
-            # Check size limit
-            if current_size >= self.max_entries:
-                await self._evict_entries_by_policy()
+            # Writes evict inline; this only catches overshoot (e.g. max_entries lowered)
+            if current_size > self.max_entries:
+                await self._evict_entries_by_policy(current_size - self.max_entries)
             
             # Check memory limit (basic implementation)
             memory_info = await self.redis_client.info("memory")
@@ -299,45 +509,26 @@ class RedisDistributedCache(BaseCacheInterface):
         except Exception as e:
             logger.error(f"Error enforcing limits: {e}")
     
-    async def _evict_entries_by_policy(self):
-        """Evict entries based on configured policy"""
+    async def _evict(self, count: int) -> int:
+        """Pop ``count`` victims from the eviction index and delete them in one script call"""
+        self._stats['maintenance_round_trips'] += 1
+        return int(await self._script(_EVICT_SCRIPT)(keys=[self._make_index_key()],
+                                                     args=[self.key_prefix, count]))
+    
+    async def _evict_entries_by_policy(self, count: Optional[int] = None):
+        """Evict ``count`` entries (default 10%) based on configured policy"""
         try:
-            # Get all metadata
-            metadata_hash = f"{self.key_prefix}metadata"
-            all_metadata = await self.redis_client.hgetall(metadata_hash)
-            
-            if not all_metadata:
-                return
-            
-            # Parse metadata and sort by eviction policy
-            entries_with_meta = []
-            for key, meta_json in all_metadata.items():
-                try:
-                    meta = json.loads(meta_json)
-                    entries_with_meta.append((key, meta))
-                except json.JSONDecodeError:
-                    continue
-            
-            # Sort based on eviction policy
-            if self.eviction_policy.lower() == "lru":
-                entries_with_meta.sort(key=lambda x: x[1].get('last_accessed', 0))
-            elif self.eviction_policy.lower() == "lfu":
-                entries_with_meta.sort(key=lambda x: x[1].get('access_count', 0))
-            elif self.eviction_policy.lower() == "fifo":
-                entries_with_meta.sort(key=lambda x: x[1].get('timestamp', 0))
-            else:  # Random or default
-                import random
-                random.shuffle(entries_with_meta)
-            
-            # Evict 10% of entries or at least 1
-            evict_count = max(1, len(entries_with_meta) // 10)
+            if count is None:
+                self._stats['maintenance_round_trips'] += 1
+                size = await self.get_size()
+                if not size:
+                    return
+                # Evict 10% of entries or at least 1
+                count = max(1, size // 10)
+            removed = await self._evict(count)
+            self._stats['evictions'] += removed
             
-            for i in range(min(evict_count, len(entries_with_meta))):
-                key_to_evict = entries_with_meta[i][0]
-                await self.delete(key_to_evict)
-                self._stats['evictions'] += 1
-            
-            logger.info(f"🗑️ Evicted {evict_count} entries using {self.eviction_policy} policy")
+            logger.info(f"🗑️ Evicted {removed} entries using {self.eviction_policy} policy")
         
         except Exception as e:
             logger.error(f"Error in policy-based eviction: {e}")
@@ -345,22 +536,90 @@ class RedisDistributedCache(BaseCacheInterface):
     async def _evict_by_memory(self):
         """Evict entries to reduce memory usage"""
         try:
-            # Simple memory-based eviction - remove 20% of entries
-            all_keys = await self.redis_client.keys(f"{self.key_prefix}*")
-            cache_keys = [k for k in all_keys if not k.endswith(':metadata') and not k.endswith('metadata')]
-            
-            evict_count = max(1, len(cache_keys) // 5)  # Remove 20%
+            # Simple memory-based eviction - remove 20% of entries in policy order
+            self._stats['maintenance_round_trips'] += 1
+            evict_count = max(1, await self.get_size() // 5)
+            removed = await self._evict(evict_count)
+            self._stats['memory_evictions'] += removed
             
-            for i in range(min(evict_count, len(cache_keys))):
-                key_to_remove = cache_keys[i].replace(self.key_prefix, "")
-                await self.delete(key_to_remove)
-                self._stats['memory_evictions'] += 1
-            
-            logger.info(f"🧹 Memory eviction completed: removed {evict_count} entries")
+            logger.info(f"🧹 Memory eviction completed: removed {removed} entries")
         
         except Exception as e:
             logger.error(f"Error in memory eviction: {e}")
     
+    def _make_inflight_key(self, key: str) -> str:
+        """Lock key marking a response that is being computed"""
+        return f"{self.key_prefix}inflight:{key}"
+
+    def _make_done_channel(self, key: str) -> str:
+        """Pub/sub channel notified when an in-flight computation finishes"""
+        return f"{self.key_prefix}done:{key}"
+
+    async def acquire_inflight(self, key: str, token: str, ttl_ms: int) -> bool:
+        """Try to become the single node computing this key (SET NX PX)"""
+        return bool(await self.redis_client.set(self._make_inflight_key(key), token, nx=True, px=ttl_ms))
+
+    async def release_inflight(self, key: str, token: str):
+        """Release the in-flight lock (if still owned) and wake up waiting nodes"""
+        await self.redis_client.eval(_RELEASE_INFLIGHT_SCRIPT, 1, self._make_inflight_key(key), token)
+        await self.redis_client.publish(self._make_done_channel(key), token)
+
+    async def wait_for_inflight(self, key: str, timeout: float) -> bool:
+        """
+        Wait for another node's in-flight computation of this key
+
+        Returns True once the owner notified or its lock disappeared (finished
+        or expired), False on timeout.
+        """
+        lock_key = self._make_inflight_key(key)
+        channel = self._make_done_channel(key)
+        pubsub = self.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            # Subscribed before checking the lock, so a release in between is not missed
+            if not await self.redis_client.exists(lock_key):
+                return True
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                message = await pubsub.get_message(ignore_subscribe_messages=True,
+                                                   timeout=min(remaining, 1.0))
+                if message is not None:
+                    return True
+                # Owner may have died without notifying; its lock then expires
+                if not await self.redis_client.exists(lock_key):
+                    return True
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.close()
+            except Exception:
+                pass
+
+    def _make_version_key(self) -> str:
+        """Shared counter that stamps every write"""
+        return f"{self.key_prefix}version"
+
+    def _make_invalidation_channel(self) -> str:
+        """Pub/sub channel carrying near-cache invalidations"""
+        return f"{self.key_prefix}invalidate"
+
+    async def next_version(self) -> int:
+        """Next write stamp; one counter for all keys keeps stamps monotonic across clears"""
+        return int(await self.redis_client.incr(self._make_version_key()))
+
+    async def publish_invalidation(self, op: str, key: Optional[str] = None, version: int = 0):
+        """Tell other nodes that a key changed ("set" / "delete") or the cache was cleared"""
+        payload = json.dumps({'op': op, 'key': key, 'version': version, 'node': self.node_id})
+        await self.redis_client.publish(self._make_invalidation_channel(), payload)
+
+    def _round_trips_per_operation(self) -> float:
+        """Request-path Redis round trips per get/set/delete (1.0 = ideal)"""
+        operations = self._stats['hits'] + self._stats['misses'] + self._stats['sets'] + self._stats['deletes']
+        return round(self._stats['round_trips'] / operations, 3) if operations else 0.0
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get Redis cache statistics"""
         try:
@@ -377,6 +636,10 @@ class RedisDistributedCache(BaseCacheInterface):
                 'memory_peak_mb': round(info.get('used_memory_peak', 0) / (1024 * 1024), 2),
                 'memory_limit_mb': round(self.max_memory_bytes / (1024 * 1024), 2),
                 'eviction_policy': self.eviction_policy,
+                'admission_policy': self.admission_policy,
+                'round_trips_per_operation': self._round_trips_per_operation(),
+                'codec': self.codec,
+                'avg_bytes_per_write': round(self._stats['bytes_written'] / self._stats['sets'], 1) if self._stats['sets'] else 0,
                 **self._stats
             }
         except Exception as e:
@@ -392,6 +655,10 @@ class EnhancedHybridDistributedCache:
     - Memory usage monitoring
     - Auto-scaling capabilities
     - Comprehensive statistics
+    - Stale-while-revalidate with soft TTLs on both layers
+    - Coherent near cache: set/delete/clear are broadcast on a Redis pub/sub
+      channel and every write carries a version stamp, so reordered or
+      duplicate invalidations never leave an older local copy in place
     """
     
     def __init__(self, 
@@ -402,24 +669,82 @@ class EnhancedHybridDistributedCache:
                  redis_max_entries: int = 10000,
                  max_memory_mb: int = 100,
                  eviction_policy: str = "lru",
-                 node_id: str = "node1",
-                 auto_scale: bool = True):
+                 node_id: Optional[str] = None,
+                 auto_scale: bool = True,
+                 local_soft_ttl: int = 0,
+                 redis_soft_ttl: int = 0,
+                 local_shards: int = 1,
+                 admission_policy: Optional[str] = None,
+                 invalidation: bool = True,
+                 redis_limit_check_interval: int = 60,
+                 redis_codec: str = "binary",
+                 redis_compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+                 miss_ratio_curve: bool = False,
+                 target_hit_rate: float = 0.0):
         """
         Initialize enhanced hybrid cache
+        
+        ``local_soft_ttl`` / ``redis_soft_ttl`` enable stale-while-revalidate:
+        entries older than the soft TTL are served while a background refresh
+        recomputes them (0 = disabled). ``local_shards`` > 1 uses a lock-striped
+        ShardedResponseCache for the local layer. ``admission_policy`` ("tinylfu")
+        applies an admission filter to both layers. ``invalidation`` keeps the
+        local layers of all workers coherent through Redis pub/sub.
+        ``redis_limit_check_interval`` is the period of the background Redis
+        memory / size check (writes evict inline). ``redis_codec`` selects the
+        entry serialization ("binary" with compression above
+        ``redis_compress_threshold`` bytes, or "json"); both formats are read.
+        ``miss_ratio_curve`` estimates the local layer's hit rate at other sizes
+        (published as "local_cache"); with ``target_hit_rate`` the local layer
+        is sized for that hit rate within its memory budget.
         """
         self.redis_ttl = redis_ttl
         self.local_ttl = local_ttl
-        self.node_id = node_id
+        self.redis_soft_ttl = redis_soft_ttl if 0 < redis_soft_ttl < redis_ttl else 0
+        # Must differ between processes: a node ignores invalidations carrying its own id
+        self.node_id = node_id = node_id or make_node_id()
         self.auto_scale = auto_scale
+        self.invalidation = invalidation
         
         # Initialize local cache with advanced features
-        self.local_cache = AdvancedResponseCache(
+        local_cache_settings = dict(
             max_size=local_max_size, 
             ttl=local_ttl,
             eviction_policy=eviction_policy,
             max_memory_mb=max_memory_mb // 2,  # Reserve half memory for local cache
-            auto_scale=auto_scale
+            auto_scale=auto_scale,
+            soft_ttl=local_soft_ttl,
+            admission_policy=admission_policy,
+            miss_ratio_curve=miss_ratio_curve,
+            target_hit_rate=target_hit_rate,
+            curve_name="local_cache"
         )
+        if local_shards > 1:
+            self.local_cache = ShardedResponseCache(shards=local_shards, **local_cache_settings)
+        else:
+            self.local_cache = AdvancedResponseCache(**local_cache_settings)
+        
+        # Stale-while-revalidate state
+        self.refresher: Optional[Callable] = None
+        self._refreshing: set = set()
+        self._refresh_tasks: set = set()
+        self._stats = {
+            'redis_stale_hits': 0,
+            'redis_refreshes': 0,
+            'redis_refresh_failures': 0
+        }
+        
+        # Near-cache coherence: highest version seen per key (installed or announced)
+        self._versions: OrderedDict = OrderedDict()
+        self._max_tracked_versions = max(1000, local_max_size * 4)
+        self._listener_task: Optional[asyncio.Task] = None
+        self._invalidation_stats = {
+            'invalidations_sent': 0,
+            'invalidations_received': 0,
+            'invalidations_applied': 0,
+            'stale_installs_rejected': 0,
+            'listener_reconnects': 0
+        }
         
         # Initialize Redis cache
         self.redis_cache = None
@@ -431,7 +756,11 @@ class EnhancedHybridDistributedCache:
                 node_id=node_id,
                 max_entries=redis_max_entries,
                 max_memory_mb=max_memory_mb // 2,  # Reserve half memory for Redis cache
-                eviction_policy=eviction_policy
+                eviction_policy=eviction_policy,
+                admission_policy=admission_policy,
+                limit_check_interval=redis_limit_check_interval,
+                codec=redis_codec,
+                compress_threshold=redis_compress_threshold
             )
         
         logger.info(f"🔄 EnhancedHybridDistributedCache initialized: node_id={node_id}, "
@@ -444,6 +773,8 @@ class EnhancedHybridDistributedCache:
                 await self.redis_cache.connect()
                 self.redis_available = True
                 logger.info("✅ Distributed cache: Redis enabled")
+                if self.invalidation:
+                    self._listener_task = asyncio.create_task(self._invalidation_listener())
             except Exception as e:
                 logger.warning(f"⚠️ Redis unavailable, using local cache only: {e}")
                 self.redis_available = False
@@ -452,15 +783,19 @@ class EnhancedHybridDistributedCache:
     
     async def shutdown(self):
         """Cleanup resources"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
         if self.redis_cache:
             await self.redis_cache.disconnect()
     
     def _get_cache_key(self, message: str, context: str = "") -> str:
-        """Generate cache key from message and context"""
-        normalized_message = message.strip().lower()
-        normalized_context = context.strip().lower() if context else ""
-        combined = f"{normalized_message}:{normalized_context}"
-        return hashlib.md5(combined.encode('utf-8')).hexdigest()
+        """Generate canonical, versioned cache key from message and context"""
+        return make_cache_key(message, context)
     
     async def get(self, message: str, context: str = "") -> Optional[Tuple[str, str]]:
         """
@@ -479,8 +814,17 @@ class EnhancedHybridDistributedCache:
             try:
                 redis_entry = await self.redis_cache.get(cache_key)
                 if redis_entry and not redis_entry.is_expired(self.redis_ttl):
-                    # Warm local cache
-                    self.local_cache.set(message, redis_entry.response, context, redis_entry.source)
+                    # Warm local cache, keeping the entry's original age, unless a
+                    # newer write was announced while this read was in flight
+                    if redis_entry.version >= self._versions.get(cache_key, 0):
+                        self.local_cache.set(message, redis_entry.response, context, redis_entry.source,
+                                             timestamp=redis_entry.timestamp)
+                        self._note_version(cache_key, redis_entry.version)
+                    else:
+                        self._invalidation_stats['stale_installs_rejected'] += 1
+                    if self.redis_soft_ttl and redis_entry.is_expired(self.redis_soft_ttl):
+                        self._stats['redis_stale_hits'] += 1
+                        self._schedule_refresh(cache_key, message, context)
                     logger.debug(f"🌐 Redis cache hit, warmed local: {cache_key[:8]}...")
                     return (redis_entry.response, redis_entry.source)
                     
@@ -490,6 +834,61 @@ class EnhancedHybridDistributedCache:
         
         return None
     
+    def set_refresher(self, refresher: Optional[Callable]):
+        """
+        Register the async ``(message, context) -> (response, source)`` function
+        that recomputes stale entries
+        """
+        self.refresher = refresher
+        # Local stale hits refresh through both layers
+        self.local_cache.set_refresher(self._revalidate if refresher else None)
+    
+    async def _revalidate(self, message: str, context: str = "") -> Optional[Tuple[str, str]]:
+        """
+        Recompute a response and store it in Redis; the caller stores it locally
+        
+        The in-flight lock keeps other workers from refreshing the same key;
+        returns None if another worker is already on it.
+        """
+        cache_key = self._get_cache_key(message, context)
+        lock_key = f"refresh:{cache_key}"
+        token = uuid.uuid4().hex
+        owned = await self.acquire_inflight(lock_key, token, 60)
+        if owned is False:
+            return None
+        try:
+            result = self.refresher(message, context)
+            if asyncio.iscoroutine(result):
+                result = await result
+            if result:
+                await self._set_redis(cache_key, *result)
+            return result
+        finally:
+            if owned:
+                await self.release_inflight(lock_key, token)
+    
+    def _schedule_refresh(self, cache_key: str, message: str, context: str):
+        """Refresh a stale Redis entry in the background, at most once per key"""
+        if self.refresher is None or cache_key in self._refreshing:
+            return
+        self._refreshing.add(cache_key)
+        task = asyncio.create_task(self._refresh_stale(cache_key, message, context))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def _refresh_stale(self, cache_key: str, message: str, context: str):
+        """Background refresh of a stale Redis entry through both layers"""
+        try:
+            result = await self._revalidate(message, context)
+            if result:
+                self.local_cache.set(message, result[0], context, result[1])
+                self._stats['redis_refreshes'] += 1
+        except Exception as e:
+            self._stats['redis_refresh_failures'] += 1
+            logger.warning(f"Background refresh failed for key {cache_key[:8]}...: {e}")
+        finally:
+            self._refreshing.discard(cache_key)
+    
     async def set(self, message: str, response: str, context: str = "", source: str = "cached"):
         """
         Store response in both local and Redis cache
@@ -499,7 +898,10 @@ class EnhancedHybridDistributedCache:
         # Always store in local cache
         self.local_cache.set(message, response, context, source)
         
-        # Store in Redis if available
+        await self._set_redis(cache_key, response, source)
+    
+    async def _set_redis(self, cache_key: str, response: str, source: str):
+        """Store response in Redis if available and invalidate other nodes' copies"""
         if self.redis_available and self.redis_cache:
             try:
                 entry = DistributedCacheEntry(
@@ -510,13 +912,137 @@ class EnhancedHybridDistributedCache:
                     source=source,
                     node_id=self.node_id
                 )
-                await self.redis_cache.set(cache_key, entry, self.redis_ttl)
+                # Stamping and the invalidation broadcast happen in the same script call
+                version = await self.redis_cache.set(cache_key, entry, self.redis_ttl,
+                                                     versioned=self.invalidation)
+                if version:
+                    self._note_version(cache_key, version)
+                    self._invalidation_stats['invalidations_sent'] += 1
                 logger.debug(f"💾 Cached in both local and Redis: {cache_key[:8]}...")
                 
             except Exception as e:
                 logger.error(f"Redis set error: {e}")
                 self.redis_available = False
     
+    async def delete(self, message: str, context: str = ""):
+        """Remove a response from both layers and from other nodes' local caches"""
+        cache_key = self._get_cache_key(message, context)
+        self.local_cache._delete_by_key(cache_key)
+        
+        if self.redis_available and self.redis_cache:
+            try:
+                await self.redis_cache.delete(cache_key)
+                if self.invalidation:
+                    version = await self.redis_cache.next_version()
+                    self._note_version(cache_key, version)
+                    await self._publish_invalidation("delete", cache_key, version)
+            except Exception as e:
+                logger.error(f"Redis delete error: {e}")
+    
+    def reset_node_id(self, node_id: Optional[str] = None):
+        """Take a new node id (a worker forked from a master that created this cache)"""
+        self.node_id = node_id or make_node_id()
+        if self.redis_cache:
+            self.redis_cache.node_id = self.node_id
+    
+    def _note_version(self, cache_key: str, version: int):
+        """Remember the highest version seen for a key (bounded)"""
+        if version < self._versions.get(cache_key, 0):
+            return
+        self._versions[cache_key] = version
+        self._versions.move_to_end(cache_key)
+        if len(self._versions) > self._max_tracked_versions:
+            self._versions.popitem(last=False)
+    
+    async def _publish_invalidation(self, op: str, cache_key: Optional[str] = None, version: int = 0):
+        try:
+            await self.redis_cache.publish_invalidation(op, cache_key, version)
+            self._invalidation_stats['invalidations_sent'] += 1
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish failed: {e}")
+    
+    def _apply_invalidation(self, payload: Dict[str, Any]):
+        """Drop local copies older than an announced write"""
+        if payload.get('node') == self.node_id:
+            return
+        self._invalidation_stats['invalidations_received'] += 1
+        
+        if payload.get('op') == 'clear':
+            self.local_cache.clear()
+            self._invalidation_stats['invalidations_applied'] += 1
+            return
+        
+        cache_key = payload.get('key')
+        version = int(payload.get('version') or 0)
+        if not cache_key or version <= self._versions.get(cache_key, 0):
+            return  # Duplicate or reordered: the local copy is already as new
+        self.local_cache._delete_by_key(cache_key)
+        self._note_version(cache_key, version)
+        self._invalidation_stats['invalidations_applied'] += 1
+    
+    async def _invalidation_listener(self):
+        """Apply other nodes' invalidations; resubscribes after connection loss"""
+        channel = self.redis_cache._make_invalidation_channel()
+        subscribed_before = False
+        while True:
+            pubsub = self.redis_cache.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+                if subscribed_before:
+                    # Messages may have been missed while disconnected
+                    self.local_cache.clear()
+                    logger.info("🔄 Invalidation channel resubscribed, local cache cleared")
+                subscribed_before = True
+                async for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self._apply_invalidation(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._invalidation_stats['listener_reconnects'] += 1
+                logger.warning(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+    
+    async def acquire_inflight(self, cache_key: str, token: str, ttl: float) -> Optional[bool]:
+        """
+        Claim the cross-worker computation of a cache key
+
+        Returns:
+            True if this worker should compute, False if another worker already is,
+            None when Redis is unavailable (caller coalesces locally only)
+        """
+        if not (self.redis_available and self.redis_cache):
+            return None
+        try:
+            return await self.redis_cache.acquire_inflight(cache_key, token, int(ttl * 1000))
+        except Exception as e:
+            logger.warning(f"Redis in-flight lock error: {e}")
+            return None
+
+    async def release_inflight(self, cache_key: str, token: str):
+        """Release the cross-worker computation lock and notify waiters"""
+        if not (self.redis_available and self.redis_cache):
+            return
+        try:
+            await self.redis_cache.release_inflight(cache_key, token)
+        except Exception as e:
+            logger.warning(f"Redis in-flight release error: {e}")
+
+    async def wait_for_inflight(self, cache_key: str, timeout: float) -> bool:
+        """Wait until another worker finishes computing the key"""
+        if not (self.redis_available and self.redis_cache):
+            return False
+        try:
+            return await self.redis_cache.wait_for_inflight(cache_key, timeout)
+        except Exception as e:
+            logger.warning(f"Redis in-flight wait error: {e}")
+            return False
+
     async def clear(self):
         """Clear both local and Redis cache"""
         self.local_cache.clear()
@@ -524,6 +1050,8 @@ class EnhancedHybridDistributedCache:
         if self.redis_available and self.redis_cache:
             try:
                 await self.redis_cache.clear()
+                if self.invalidation:
+                    await self._publish_invalidation("clear")
             except Exception as e:
                 logger.error(f"Redis clear error: {e}")
     
@@ -536,7 +1064,21 @@ class EnhancedHybridDistributedCache:
             'node_id': self.node_id,
             'local': local_stats,
             'redis_available': self.redis_available,
-            'auto_scale_enabled': self.auto_scale
+            'auto_scale_enabled': self.auto_scale,
+            'stale_while_revalidate': {
+                'local_soft_ttl': self.local_cache.soft_ttl,
+                'redis_soft_ttl': self.redis_soft_ttl,
+                'local_stale_hits': local_stats.get('stale_hits', 0),
+                'local_refreshes': local_stats.get('refreshes', 0),
+                'refreshing': len(self._refreshing),
+                **self._stats
+            },
+            'near_cache': {
+                'invalidation': self.invalidation,
+                'listening': bool(self._listener_task and not self._listener_task.done()),
+                'tracked_versions': len(self._versions),
+                **self._invalidation_stats
+            }
         }
         
         if self.redis_available and self.redis_cache:
@@ -587,7 +1129,7 @@ class HybridDistributedCache(EnhancedHybridDistributedCache):
                  local_max_size: int = 500,
                  local_ttl: int = 1800,
                  redis_ttl: int = 3600,
-                 node_id: str = "node1"):
+                 node_id: Optional[str] = None):
         super().__init__(
             redis_url=redis_url,
             local_max_size=local_max_size,
@@ -628,10 +1170,20 @@ def create_distributed_cache(config=None) -> Union[EnhancedHybridDistributedCach
             redis_ttl=getattr(cache_config, 'redis_cache_ttl', 
                            getattr(cache_config, 'CACHE_REDIS_TTL', 3600)),
             redis_max_entries=getattr(cache_config, 'max_cache_size', 10000),
+            redis_limit_check_interval=getattr(cache_config, 'memory_check_interval', 60),
+            redis_codec=getattr(cache_config, 'cache_codec', 'binary'),
+            redis_compress_threshold=getattr(cache_config, 'cache_compress_threshold', DEFAULT_COMPRESS_THRESHOLD),
             max_memory_mb=getattr(cache_config, 'max_memory_usage_mb', 100),
             eviction_policy=getattr(cache_config, 'response_cache_eviction_policy', 'lru'),
-            node_id=getattr(cache_config, 'NODE_ID', 'node1'),
-            auto_scale=getattr(cache_config, 'auto_scale_enabled', True)
+            node_id=make_node_id(getattr(cache_config, 'node_id', '') or None),
+            auto_scale=getattr(cache_config, 'auto_scale_enabled', True),
+            local_soft_ttl=getattr(cache_config, 'local_cache_soft_ttl', 0),
+            redis_soft_ttl=getattr(cache_config, 'redis_cache_soft_ttl', 0),
+            local_shards=getattr(cache_config, 'cache_shards', 1),
+            admission_policy=getattr(cache_config, 'cache_admission_policy', 'none'),
+            invalidation=getattr(cache_config, 'near_cache_invalidation', True),
+            miss_ratio_curve=getattr(cache_config, 'cache_miss_ratio_curve', True),
+            target_hit_rate=getattr(cache_config, 'cache_target_hit_rate', 0.0)
         )
     else:
         logger.warning("Redis not configured or unavailable, using local cache only")
@@ -168,6 +168,8 @@ class TurkishTextNormalizer:
     # Class-level cache for loaded synonyms
     _synonyms = None
     _synonyms_file_path = None
+    # Incremented on every (re)load; caches of match results compare it
+    _synonyms_version = 0
     
     @classmethod
     def load_synonyms(cls) -> Dict[str, List[str]]:
@@ -202,6 +204,7 @@ class TurkishTextNormalizer:
             logger.error(f"❌ Synonyms yükleme hatası: {e}")
             cls._synonyms = cls.FALLBACK_SYNONYMS.copy()
         
+        cls._synonyms_version += 1
         return cls._synonyms
     
     @classmethod
@@ -0,0 +1,97 @@
+"""
+⏱️ Generation Time Budget and Sentence Streaming
+===============================================
+Torch-free pieces of text generation shared by model_manager:
+
+- remaining_generation_budget: budget of a request deadline, never above
+  the configured generation budget
+- GenerationBudget: wall-clock deadline, cancel flag and token counter
+  checked once per generated token
+- SentenceSplitter: turns streamed token pieces into complete sentences
+- truncate_to_sentence_boundary: drops a sentence cut off by the deadline
+"""
+import re
+import time
+from typing import List, Optional
+
+# Sentence boundary for streaming post-processing (punctuation followed by whitespace)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+')
+SENTENCE_END_CHARS = ('.', '!', '?', '…')
+GENERATION_DEADLINE_MARGIN = 0.1  # seconds reserved for post-processing after generation stops
+MIN_GENERATION_BUDGET = 0.2  # below this, skip generation and answer with the fallback
+
+
+def remaining_generation_budget(deadline: Optional[float], configured_budget: float) -> Optional[float]:
+    """
+    Generation time budget for a request deadline (time.monotonic() based)
+
+    Capped at the configured budget so a far-future deadline cannot disable it.
+    Returns None when too little time is left to generate anything useful.
+    """
+    if deadline is None:
+        return configured_budget
+    remaining = min(deadline - time.monotonic() - GENERATION_DEADLINE_MARGIN, configured_budget)
+    if remaining < MIN_GENERATION_BUDGET:
+        return None
+    return remaining
+
+
+def truncate_to_sentence_boundary(text: str) -> str:
+    """Cut text after its last complete sentence (empty if there is none)"""
+    last_end = max(text.rfind(ch) for ch in SENTENCE_END_CHARS)
+    return text[:last_end + 1].strip() if last_end >= 0 else ""
+
+
+class GenerationBudget:
+    """
+    Wall-clock budget of a single generation
+    tick() is called once per generated token and says whether to stop.
+    """
+
+    def __init__(self, time_budget: Optional[float] = None):
+        self.deadline = time.monotonic() + time_budget if time_budget else None
+        self.tokens_generated = 0
+        self.budget_exceeded = False
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop at the next token (e.g. streaming consumer went away)"""
+        self.cancelled = True
+
+    def tick(self) -> bool:
+        """Count a generated token; True when generation should stop"""
+        self.tokens_generated += 1
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.budget_exceeded = True
+        return self.budget_exceeded or self.cancelled
+
+
+class SentenceSplitter:
+    """Buffer streamed text pieces and release them sentence by sentence"""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, piece: str) -> List[str]:
+        """Add a streamed piece; return the sentences it completed"""
+        self._buffer += piece
+        parts = SENTENCE_BOUNDARY.split(self._buffer)
+        # Everything except the last part is a complete sentence
+        self._buffer = parts[-1]
+        return parts[:-1]
+
+    def tail(self, truncated: bool = False) -> str:
+        """
+        Trailing text once the stream ends, kept only if it looks like a real sentence
+
+        Args:
+            truncated: generation was stopped by the deadline, so drop the
+                sentence it was cut off in
+        """
+        tail = self._buffer.strip()
+        self._buffer = ""
+        if truncated:
+            tail = truncate_to_sentence_boundary(tail)
+        if tail and (tail.endswith(SENTENCE_END_CHARS) or len(tail) >= 5):
+            return tail
+        return ""
@@ -0,0 +1,30 @@
+"""
+🦄 Gunicorn configuration for MEFAPEX AI Chatbot (preload serving mode)
+Usage: gunicorn -c gunicorn.conf.py main:app
+
+Models and content indexes are loaded once in the master process and
+shared copy-on-write by all forked Uvicorn workers.
+"""
+import os
+
+bind = f"{os.getenv('SERVER_HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WORKERS", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("SERVER_PRELOAD", "true").lower() == "true"
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+
+
+def on_starting(server):
+    """Preload models in the master before any worker is forked"""
+    if preload_app:
+        from core.preload import preload_for_workers, release_before_fork
+        preload_for_workers()
+        release_before_fork()
+
+
+def post_fork(server, worker):
+    """Reset per-process state in each worker"""
+    if preload_app:
+        from core.preload import after_fork_in_worker
+        after_fork_in_worker()
@@ -0,0 +1,405 @@
+"""
+🧹 Unified Housekeeping Scheduler for MEFAPEX AI Assistant
+One timer wheel runs the periodic and delayed maintenance work of every
+component (cache expiry sweeps, auto-scaling, memory monitoring, metrics
+collection, idle model unloading, rate-limiter and WebSocket session cleanup)
+instead of each starting its own thread, timer or asyncio task.
+
+- Hashed timer wheel: jobs sit in the slot of their due tick, so each tick
+  only touches the jobs due then; deadlines longer than one revolution stay
+  in their slot until their tick comes round
+- One daemon thread drives the wheel and runs synchronous jobs, so they all
+  share it and must stay short; jobs registered with ``blocking=True`` (gc,
+  tracemalloc snapshots) run on a separate worker thread instead, and
+  coroutine jobs run on the application's asyncio loop (attached at startup,
+  or by the first coroutine job registered from inside a running loop)
+- Periodic jobs are jittered so components started together do not fire
+  together; a job still running when it comes due again is skipped
+- Jobs of bound methods hold their owner weakly, so a registered job never
+  keeps a cache or monitor alive
+- Per-job runs, failures, skips, lag and runtime (last/avg/max)
+- Fork safe: ``pause()`` stops the threads before a preloading master forks
+  (jobs stay registered) and ``after_fork()`` gives the child fresh locks and
+  threads
+"""
+import asyncio
+import inspect
+import logging
+import math
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Wheel resolution (seconds) and slots (one revolution = 512 ticks)
+DEFAULT_TICK = 1.0
+DEFAULT_WHEEL_SIZE = 512
+
+class HousekeepingJob:
+    """A periodic or one-shot job on the timer wheel"""
+
+    def __init__(self, name: str, func: Callable, interval: Optional[float], jitter: float,
+                 blocking: bool = False):
+        self.name = name
+        self.interval = interval
+        self.jitter = max(0.0, min(jitter, 0.5))
+        self.is_async = inspect.iscoroutinefunction(func)
+        self.blocking = blocking and not self.is_async
+        self._func = weakref.WeakMethod(func) if inspect.ismethod(func) else (lambda: func)
+        self.due_tick = 0
+        self.cancelled = False
+        self.running = False
+
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_runtime = 0.0
+        self.max_runtime = 0.0
+        self.total_runtime = 0.0
+        self.max_lag = 0.0
+        self.last_run: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def resolve(self) -> Optional[Callable]:
+        """The job's callable, or None once its owner has been collected"""
+        return self._func()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _record(self, runtime: float):
+        self.runs += 1
+        self.last_runtime = runtime
+        self.max_runtime = max(self.max_runtime, runtime)
+        self.total_runtime += runtime
+        self.last_run = time.time()
+
+    @property
+    def avg_runtime(self) -> float:
+        return self.total_runtime / self.runs if self.runs else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'interval': self.interval,
+            'async': self.is_async,
+            'blocking': self.blocking,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'last_runtime_ms': round(self.last_runtime * 1000, 3),
+            'avg_runtime_ms': round(self.avg_runtime * 1000, 3),
+            'max_runtime_ms': round(self.max_runtime * 1000, 3),
+            'max_lag_ms': round(self.max_lag * 1000, 3),
+            'last_run': self.last_run,
+            'last_error': self.last_error
+        }
+
+class HousekeepingScheduler:
+    """Timer-wheel scheduler for background maintenance jobs"""
+
+    def __init__(self,
+                 tick: float = DEFAULT_TICK,
+                 wheel_size: int = DEFAULT_WHEEL_SIZE,
+                 clock: Callable[[], float] = time.monotonic,
+                 autostart: bool = True):
+        """
+        Args:
+            tick: Wheel resolution in seconds (jobs fire on tick boundaries)
+            wheel_size: Number of wheel slots
+            clock: Monotonic time source
+            autostart: Start the wheel thread on the first registration
+                (without it, ``run_pending`` must be called to advance the wheel)
+        """
+        self.tick = tick
+        self.wheel_size = max(1, wheel_size)
+        self._clock = clock
+        self.autostart = autostart
+        self._origin = clock()
+        self._current_tick = 0
+        self._slots: List[Set[HousekeepingJob]] = [set() for _ in range(self.wheel_size)]
+        self._jobs: Dict[str, HousekeepingJob] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Set[Future] = set()
+        self._stats = {
+            'ticks': 0,
+            'dispatched': 0,
+            'owner_collected': 0,
+            'no_loop_skips': 0
+        }
+
+    # --- Registration -------------------------------------------------------
+
+    def attach_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Run coroutine jobs on ``loop`` (default: the running loop)"""
+        self._loop = loop or asyncio.get_running_loop()
+
+    def _attach_running_loop(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is None or self._loop.is_closed():
+            self._loop = loop
+
+    def schedule_periodic(self, name: str, func: Callable, interval: float,
+                          jitter: float = 0.1, initial_delay: Optional[float] = None,
+                          blocking: bool = False) -> HousekeepingJob:
+        """
+        Run ``func`` every ``interval`` seconds (± ``jitter`` x interval);
+        a job registered under an existing name replaces it. ``blocking`` sync
+        jobs run off the wheel thread so they cannot delay other jobs.
+        """
+        job = HousekeepingJob(name, func, max(interval, self.tick), jitter, blocking)
+        delay = self._jittered(job) if initial_delay is None else initial_delay
+        return self._register(job, delay)
+
+    def schedule_once(self, name: str, func: Callable, delay: float = 0.0,
+                      jitter: float = 0.0, blocking: bool = False) -> HousekeepingJob:
+        """Run ``func`` once after ``delay`` seconds (± ``jitter`` x delay)"""
+        job = HousekeepingJob(name, func, None, jitter, blocking)
+        return self._register(job, delay * (1 + self._random.uniform(-job.jitter, job.jitter)))
+
+    def cancel(self, name: str) -> bool:
+        """Cancel a job by name; False if there is none"""
+        with self._lock:
+            job = self._jobs.pop(name, None)
+            if job is None:
+                return False
+            job.cancel()
+            self._slots[job.due_tick % self.wheel_size].discard(job)
+        return True
+
+    def _jittered(self, job: HousekeepingJob) -> float:
+        return job.interval * (1 + self._random.uniform(-job.jitter, job.jitter))
+
+    def _register(self, job: HousekeepingJob, delay: float) -> HousekeepingJob:
+        if job.is_async:
+            self._attach_running_loop()
+        with self._lock:
+            previous = self._jobs.pop(job.name, None)
+            if previous is not None:
+                previous.cancel()
+                self._slots[previous.due_tick % self.wheel_size].discard(previous)
+            self._jobs[job.name] = job
+            self._insert_locked(job, delay)
+        if self.autostart:
+            self._ensure_started()
+        return job
+
+    def _insert_locked(self, job: HousekeepingJob, delay: float, base: Optional[float] = None):
+        """Put a job in the slot of the first tick at or after base (default now) + delay"""
+        base = self._clock() if base is None else base
+        due = (base + max(0.0, delay) - self._origin) / self.tick
+        job.due_tick = max(self._current_tick + 1, math.ceil(due))
+        self._slots[job.due_tick % self.wheel_size].add(job)
+
+    # --- Wheel --------------------------------------------------------------
+
+    def run_pending(self) -> int:
+        """Advance the wheel to now and run the jobs that came due; returns their count"""
+        now = self._clock()
+        target_tick = int((now - self._origin) / self.tick)
+        due: List[HousekeepingJob] = []
+        with self._lock:
+            if target_tick - self._current_tick >= self.wheel_size:
+                # Thread fell more than a revolution behind: every slot is due
+                for slot in self._slots:
+                    ready = {job for job in slot if job.due_tick <= target_tick}
+                    slot -= ready
+                    due.extend(ready)
+                self._stats['ticks'] += target_tick - self._current_tick
+                self._current_tick = target_tick
+            while self._current_tick < target_tick:
+                self._current_tick += 1
+                self._stats['ticks'] += 1
+                slot = self._slots[self._current_tick % self.wheel_size]
+                if slot:
+                    ready = {job for job in slot if job.due_tick <= self._current_tick}
+                    slot -= ready
+                    due.extend(ready)
+
+        for job in sorted(due, key=lambda job: job.due_tick):
+            job.max_lag = max(job.max_lag, now - (self._origin + job.due_tick * self.tick))
+            self._dispatch(job)
+        return len(due)
+
+    def _dispatch(self, job: HousekeepingJob):
+        func = None if job.cancelled else job.resolve()
+        if func is None:
+            if not job.cancelled:
+                self._stats['owner_collected'] += 1
+                job.cancel()
+        elif job.running:
+            job.skipped += 1
+        elif job.is_async:
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                job.skipped += 1
+                self._stats['no_loop_skips'] += 1
+            else:
+                job.running = True
+                future = asyncio.run_coroutine_threadsafe(self._run_async(job, func), loop)
+                self._inflight.add(future)
+                future.add_done_callback(self._inflight.discard)
+                self._stats['dispatched'] += 1
+        elif job.blocking:
+            job.running = True
+            future = self._get_executor().submit(self._run_sync, job, func)
+            self._inflight.add(future)
+            future.add_done_callback(self._inflight.discard)
+            future.add_done_callback(lambda f: f.cancelled() and setattr(job, 'running', False))
+            self._stats['dispatched'] += 1
+        else:
+            self._stats['dispatched'] += 1
+            self._run_sync(job, func)
+
+        with self._lock:
+            if job.interval is not None and not job.cancelled and self._jobs.get(job.name) is job:
+                # From the due time rather than now, so late ticks do not drift the period
+                self._insert_locked(job, self._jittered(job), base=self._origin + job.due_tick * self.tick)
+            elif self._jobs.get(job.name) is job:
+                del self._jobs[job.name]
+
+    def _run_sync(self, job: HousekeepingJob, func: Callable):
+        job.running = True
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"🧹 Housekeeping job {job.name} failed: {e}")
+        finally:
+            job._record(time.perf_counter() - started)
+            job.running = False
+
+    async def _run_async(self, job: HousekeepingJob, func: Callable):
+        started = time.perf_counter()
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"🧹 Housekeeping job {job.name} failed: {e}")
+        finally:
+            job._record(time.perf_counter() - started)
+            job.running = False
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # One worker: blocking jobs queue behind each other, never behind the wheel
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Housekeeping-blocking")
+        return self._executor
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run_wheel, daemon=True, name="Housekeeping")
+        self._thread.start()
+        logger.info(f"🧹 Housekeeping scheduler started (tick={self.tick}s, slots={self.wheel_size})")
+
+    def _run_wheel(self):
+        while not self._stopping.is_set():
+            next_tick = self._origin + (self._current_tick + 1) * self.tick
+            delay = next_tick - self._clock()
+            if delay > 0 and self._stopping.wait(delay):
+                break
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Housekeeping scheduler error: {e}")
+
+    # --- Lifecycle and stats ------------------------------------------------
+
+    def _stop_threads(self, timeout: float):
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+        for future in list(self._inflight):
+            future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def pause(self, timeout: float = 5.0):
+        """Stop the wheel and worker threads but keep the jobs (e.g. before fork)"""
+        self._stop_threads(timeout)
+        logger.info("🧹 Housekeeping scheduler paused")
+
+    def after_fork(self):
+        """
+        Reset process-local state in a forked child: locks, threads and the event
+        loop belong to the parent. Registered jobs carry over and the wheel restarts.
+        """
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._loop = None
+        self._inflight = set()
+        self._random = random.Random()
+        for job in self._jobs.values():
+            job.running = False
+        if self.autostart and self._jobs:
+            self._ensure_started()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the wheel, wait for a running sync job and cancel in-flight jobs"""
+        self._stop_threads(timeout)
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel()
+            self._jobs.clear()
+            for slot in self._slots:
+                slot.clear()
+        logger.info("🧹 Housekeeping scheduler stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = {name: job.to_dict() for name, job in sorted(self._jobs.items()) if not job.cancelled}
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'loop_attached': self._loop is not None and not self._loop.is_closed(),
+            'tick_seconds': self.tick,
+            'wheel_size': self.wheel_size,
+            'job_count': len(jobs),
+            'inflight': len(self._inflight),
+            'total_runs': sum(job['runs'] for job in jobs.values()),
+            'total_failures': sum(job['failures'] for job in jobs.values()),
+            **self._stats,
+            'jobs': jobs
+        }
+
+# Global scheduler instance
+_scheduler: Optional[HousekeepingScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_housekeeping_scheduler() -> HousekeepingScheduler:
+    """Get the process-wide housekeeping scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = HousekeepingScheduler()
+    return _scheduler
+
+def shutdown_housekeeping_scheduler(timeout: float = 5.0):
+    """Stop the housekeeping scheduler (jobs registered later restart it)"""
+    if _scheduler is not None:
+        _scheduler.shutdown(timeout)
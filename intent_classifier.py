@@ -115,6 +115,8 @@ class IntentClassifier:
         self.label_to_category = {}
         self.category_to_label = {}
         self.is_trained = False
+        # Incremented whenever a model is trained or loaded
+        self.model_version = 0
         
         # Configuration
         self.confidence_threshold = 0.3  # Minimum confidence for prediction
@@ -398,6 +400,7 @@ class IntentClassifier:
                     logger.info(f"📈 {category}: P={precision:.3f}, R={recall:.3f}, F1={f1:.3f}")
             
             self.is_trained = True
+            self.model_version += 1
             
             # Save model
             self.save_model()
@@ -493,6 +496,7 @@ class IntentClassifier:
             self.category_to_label = model_data['category_to_label']
             self.confidence_threshold = model_data.get('confidence_threshold', 0.3)
             self.is_trained = model_data.get('is_trained', True)
+            self.model_version += 1
             
             logger.info(f"✅ Model loaded from {self.model_path}")
             logger.info(f"📊 Categories: {len(self.label_to_category)}")
@@ -8,7 +8,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 # Import configuration
-from core.configuration import get_config
+from core.configuration import get_config, Environment
 
 # Import modular components
 from startup import StartupManager
@@ -100,16 +100,44 @@ app = create_app()
 # =============================================================================
 
 if __name__ == "__main__":
+    import os
     import uvicorn
     
     logger.info(f"🚀 Starting MEFAPEX Chatbot on {main_config.server.host}:{main_config.server.port}")
     logger.info(f"🔧 Debug mode: {main_config.server.debug}")
     logger.info(f"🗄️ Database: PostgreSQL ({main_config.database.host}:{main_config.database.port})")
     
-    uvicorn.run(
-        "main:app",
-        host=main_config.server.host,
-        port=main_config.server.port,
-        reload=False,  # Disable reload to fix connection issues
-        log_level="info" if main_config.server.debug else "warning"
-    )
+    workers = max(1, main_config.server.workers)
+    log_level = "info" if main_config.server.debug else "warning"
+    
+    if main_config.server.preload_models:
+        # Load models/content before serving; forked workers share these pages
+        from core.preload import preload_for_workers
+        preload_for_workers()
+    
+    if workers > 1 and hasattr(os, "fork"):
+        from core.worker_supervisor import WorkerSupervisor, check_multi_worker_requirements
+        
+        # Per-process state (sessions, rate limits, cache) must live in Redis with N > 1 workers
+        problems = check_multi_worker_requirements(main_config, workers)
+        for problem in problems:
+            logger.error(f"❌ Multi-worker check: {problem}")
+        if problems and main_config.environment == Environment.PRODUCTION:
+            raise SystemExit(f"Refusing to start {workers} workers in production: {'; '.join(problems)}")
+        
+        WorkerSupervisor(
+            app,
+            host=main_config.server.host,
+            port=main_config.server.port,
+            workers=workers,
+            reuse_port=main_config.server.reuse_port,
+            log_level=log_level
+        ).run()
+    else:
+        uvicorn.run(
+            "main:app",
+            host=main_config.server.host,
+            port=main_config.server.port,
+            reload=False,  # Disable reload to fix connection issues
+            log_level=log_level
+        )
@@ -6,7 +6,6 @@ Description: Comprehensive memory monitoring with leak detection and automatic c
 
 import gc
 import psutil
-import threading
 import time
 import logging
 import tracemalloc
@@ -17,6 +16,8 @@ from collections import defaultdict, deque
 import weakref
 import sys
 
+from housekeeping import get_housekeeping_scheduler
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
@@ -45,7 +46,7 @@ class MemoryMonitor:
         self.snapshots = deque(maxlen=leak_detection_window)
         self.process = psutil.Process()
         self.monitoring = False
-        self.monitor_thread = None
+        self.monitor_job = None
         
         # CRITICAL FIX: Enhanced object tracking
         self.tracked_objects = weakref.WeakSet()
@@ -59,7 +60,7 @@ class MemoryMonitor:
         self.emergency_cleanups = 0
         
     def start_monitoring(self):
-        """Start memory monitoring in background thread"""
+        """Start memory monitoring on the housekeeping scheduler"""
         if self.monitoring:
             logger.warning("Memory monitoring already started")
             return
@@ -67,41 +68,36 @@ class MemoryMonitor:
         self.monitoring = True
         tracemalloc.start()
         
-        self.monitor_thread = threading.Thread(
-            target=self._monitor_loop,
-            daemon=True,
-            name="MemoryMonitor"
-        )
-        self.monitor_thread.start()
+        self.monitor_job = get_housekeeping_scheduler().schedule_periodic(
+            "memory_monitor", self._monitor_once, self.check_interval, jitter=0.05,
+            blocking=True)  # gc + tracemalloc snapshots: keep them off the wheel thread
         logger.info(f"🧠 Memory monitoring started (interval: {self.check_interval}s, threshold: {self.memory_threshold_mb}MB)")
         
     def stop_monitoring(self):
         """Stop memory monitoring"""
         self.monitoring = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=5.0)
+        if self.monitor_job:
+            self.monitor_job.cancel()
+            self.monitor_job = None
         tracemalloc.stop()
         logger.info("🧠 Memory monitoring stopped")
         
-    def _monitor_loop(self):
-        """Main monitoring loop"""
-        while self.monitoring:
-            try:
-                snapshot = self._take_snapshot()
-                self.snapshots.append(snapshot)
-                
-                # Check for memory issues
-                self._check_memory_threshold(snapshot)
-                self._detect_memory_leaks()
-                
-                # Periodic cleanup
-                if len(self.snapshots) % 5 == 0:
-                    self._periodic_cleanup()
-                    
-            except Exception as e:
-                logger.error(f"Memory monitoring error: {e}")
+    def _monitor_once(self):
+        """One monitoring pass (run every check_interval by the housekeeping scheduler)"""
+        try:
+            snapshot = self._take_snapshot()
+            self.snapshots.append(snapshot)
+            
+            # Check for memory issues
+            self._check_memory_threshold(snapshot)
+            self._detect_memory_leaks()
+            
+            # Periodic cleanup
+            if len(self.snapshots) % 5 == 0:
+                self._periodic_cleanup()
                 
-            time.sleep(self.check_interval)
+        except Exception as e:
+            logger.error(f"Memory monitoring error: {e}")
             
     def _take_snapshot(self) -> MemorySnapshot:
         """Take a memory usage snapshot"""
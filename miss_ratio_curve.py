@@ -0,0 +1,303 @@
+"""
+📈 Online Miss-Ratio Curves for MEFAPEX AI Assistant
+Predicts the hit rate a cache would have at any size, from its live key stream,
+so caches can be sized for a target hit rate instead of from memory alone.
+
+- SHARDS spatial sampling: a key is tracked iff ``hash(key) mod P < T``, so
+  every reference of a sampled key is seen and reuse distances stay exact in
+  the sample; distances are scaled by ``1 / R`` (``R = T / P``)
+- Fixed-size variant: at most ``max_samples`` keys are tracked; when more
+  arrive the threshold drops to the largest tracked hash and those keys leave,
+  so small key spaces are measured exactly and large ones at a lower rate;
+  the histogram is rescaled by ``R_new / R_old`` to match the smaller sample
+- SHARDS_adj: the gap between expected (``R * N``) and sampled references
+  is credited to the smallest distance, correcting for hot keys that
+  happened to land in (or miss) the sample
+- LRU stack (reuse) distances come from a Fenwick tree over access times
+- The histogram decays periodically, so the curve follows current traffic
+
+While all keys are tracked (R = 1) the curve is exact for LRU; sampled
+curves do not resolve sizes below about ``1 / R``. For the other eviction
+policies it is the usual LRU approximation.
+"""
+import heapq
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache_admission import _hash_pair
+
+logger = logging.getLogger(__name__)
+
+# Hash space of the spatial sampling filter
+_HASH_SPACE = 1 << 24
+
+class MissRatioCurve:
+    """SHARDS-style LRU miss-ratio curve estimator over a key stream"""
+
+    def __init__(self,
+                 sample_rate: float = 1.0,
+                 max_samples: int = 2048,
+                 decay_every: int = 0,
+                 min_references: int = 500):
+        """
+        Args:
+            sample_rate: Initial spatial sampling rate (lowered automatically
+                once more than ``max_samples`` keys are tracked)
+            max_samples: Maximum number of tracked keys (bounds memory and CPU)
+            decay_every: Sampled references between halving the histogram
+                (0 = 10 x max_samples)
+            min_references: Estimated references needed before the curve is
+                used for resizing
+        """
+        self.max_samples = max(16, max_samples)
+        self._threshold = max(1, min(_HASH_SPACE, int(sample_rate * _HASH_SPACE)))
+        self.decay_every = decay_every or self.max_samples * 10
+        self.min_references = min_references
+
+        # Tracked keys: key -> last access time; max-heap of (-hash, key) for threshold drops
+        self._last_access: Dict[str, int] = {}
+        self._by_hash: List[Tuple[int, str]] = []
+        # Fenwick tree over access times marking each tracked key's last access
+        self._capacity = self.max_samples * 4
+        self._tree = [0] * (self._capacity + 1)
+        self._clock = 0
+
+        # Reuse-distance histogram (scaled distance -> weight) and cold misses
+        self._histogram: Dict[int, float] = {}
+        self._cold = 0.0
+        # All references (sampled or not), for the SHARDS_adj correction
+        self._total_references = 0.0
+        self._sampled_references = 0
+        self._since_decay = 0
+        self._lock = threading.Lock()
+
+    @property
+    def sample_rate(self) -> float:
+        return self._threshold / _HASH_SPACE
+
+    # --- Fenwick tree -------------------------------------------------------
+
+    def _tree_add(self, position: int, delta: int):
+        while position <= self._capacity:
+            self._tree[position] += delta
+            position += position & -position
+
+    def _tree_prefix(self, position: int) -> int:
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def _compact_clock(self):
+        """Renumber access times 1..n once the clock reaches the tree capacity"""
+        ordered = sorted(self._last_access.items(), key=lambda item: item[1])
+        self._tree = [0] * (self._capacity + 1)
+        for time_index, (key, _) in enumerate(ordered, start=1):
+            self._last_access[key] = time_index
+            self._tree_add(time_index, 1)
+        self._clock = len(ordered)
+
+    # --- Sampling -----------------------------------------------------------
+
+    def record(self, key: str):
+        """Record one reference to a cache key"""
+        key_hash = _hash_pair(key)[0] % _HASH_SPACE
+        self._total_references += 1
+        if key_hash >= self._threshold:
+            return
+
+        with self._lock:
+            if key_hash >= self._threshold:
+                return
+            rate = self.sample_rate
+            last = self._last_access.get(key)
+
+            if self._clock >= self._capacity:
+                self._compact_clock()
+                last = self._last_access.get(key)
+            self._clock += 1
+
+            if last is None:
+                self._cold += 1.0
+                heapq.heappush(self._by_hash, (-key_hash, key))
+            else:
+                # Distinct tracked keys referenced since this key's last access
+                distance = len(self._last_access) - self._tree_prefix(last)
+                bucket = int(distance / rate)
+                self._histogram[bucket] = self._histogram.get(bucket, 0.0) + 1.0
+                self._tree_add(last, -1)
+
+            self._last_access[key] = self._clock
+            self._tree_add(self._clock, 1)
+            self._sampled_references += 1
+
+            if len(self._last_access) > self.max_samples:
+                self._lower_threshold()
+
+            self._since_decay += 1
+            if self._since_decay >= self.decay_every:
+                self._decay()
+
+    def _lower_threshold(self):
+        """Fixed-size SHARDS: drop the keys with the largest hashes"""
+        old_threshold = self._threshold
+        self._threshold = -self._by_hash[0][0]
+        while self._by_hash and -self._by_hash[0][0] >= self._threshold:
+            _, key = heapq.heappop(self._by_hash)
+            self._tree_add(self._last_access.pop(key), -1)
+        # Counts so far came from a larger sample
+        scale = self._threshold / old_threshold
+        self._histogram = {bucket: weight * scale for bucket, weight in self._histogram.items()}
+        self._cold *= scale
+
+    def _decay(self):
+        """Halve the histogram so old traffic fades out"""
+        self._histogram = {bucket: weight / 2 for bucket, weight in self._histogram.items() if weight > 0.01}
+        self._cold /= 2
+        self._total_references /= 2
+        self._since_decay = 0
+
+    # --- Queries ------------------------------------------------------------
+
+    def _cumulative(self) -> Tuple[List[int], List[float], float]:
+        """Sorted distances, cumulative hit weights and total weight"""
+        with self._lock:
+            items = sorted(self._histogram.items())
+            cold = self._cold
+            expected = self._total_references * self.sample_rate
+        # SHARDS_adj: the sample holds more or fewer references than R * N when it
+        # caught more or fewer hot keys; the difference goes to the smallest
+        # distance (it may be negative)
+        adjustment = expected - cold - sum(weight for _, weight in items)
+        if items and items[0][0] == 0:
+            items[0] = (0, items[0][1] + adjustment)
+        else:
+            items.insert(0, (0, adjustment))
+        distances, cumulative, running = [], [], 0.0
+        for distance, weight in items:
+            running += weight
+            distances.append(distance)
+            cumulative.append(max(0.0, running))
+        return distances, cumulative, running + cold
+
+    @staticmethod
+    def _hits_below(distances: List[int], cumulative: List[float], size: int) -> float:
+        """Weight of references with reuse distance < size (hits in an LRU cache of that size)"""
+        low, high = 0, len(distances)
+        while low < high:
+            middle = (low + high) // 2
+            if distances[middle] < size:
+                low = middle + 1
+            else:
+                high = middle
+        return cumulative[low - 1] if low else 0.0
+
+    @property
+    def references(self) -> float:
+        """Estimated (decayed) number of references behind the curve"""
+        with self._lock:
+            return (self._cold + sum(self._histogram.values())) / self.sample_rate
+
+    @property
+    def ready(self) -> bool:
+        return self.references >= self.min_references
+
+    def hit_rate(self, size: int) -> float:
+        """Predicted hit rate (%) of an LRU cache with ``size`` entries"""
+        distances, cumulative, total = self._cumulative()
+        if not total:
+            return 0.0
+        return round(self._hits_below(distances, cumulative, size) / total * 100, 2)
+
+    def curve(self, max_size: int, points: int = 12) -> List[Dict[str, float]]:
+        """Predicted hit rate at geometrically spaced sizes up to ``max_size``"""
+        distances, cumulative, total = self._cumulative()
+        max_size = max(1, max_size)
+        sizes = sorted({max(1, round(max_size ** (i / (points - 1)))) for i in range(points)}) if points > 1 else [max_size]
+        return [
+            {'size': size,
+             'hit_rate': round(self._hits_below(distances, cumulative, size) / total * 100, 2) if total else 0.0}
+            for size in sizes
+        ]
+
+    def size_for_hit_rate(self, target: float, max_size: int, min_size: int = 1) -> int:
+        """
+        Smallest size reaching ``target`` hit rate (%); if ``max_size`` cannot
+        reach it, the smallest size with the hit rate ``max_size`` would have
+        """
+        distances, cumulative, total = self._cumulative()
+        if not total:
+            return max_size
+        needed = min(target / 100 * total, self._hits_below(distances, cumulative, max_size))
+        size = max_size
+        for distance, hits in zip(distances, cumulative):
+            if distance >= max_size:
+                break
+            if hits >= needed - 1e-9:
+                # References at this distance hit once the cache holds distance + 1 entries
+                size = distance + 1
+                break
+        return max(min_size, min(max_size, size))
+
+    def get_stats(self, max_size: Optional[int] = None, points: int = 12) -> Dict[str, Any]:
+        """Sampling state and the predicted hit-rate curve"""
+        with self._lock:
+            tracked = len(self._last_access)
+            sampled = self._sampled_references
+        stats = {
+            'sample_rate': round(self.sample_rate, 6),
+            'tracked_keys': tracked,
+            'sampled_references': sampled,
+            'estimated_references': round(self.references, 1),
+            'ready': self.ready
+        }
+        if max_size:
+            stats['curve'] = self.curve(max_size, points)
+        return stats
+
+    def reset(self):
+        """Forget all samples (the sampling rate is kept)"""
+        with self._lock:
+            self._last_access.clear()
+            self._by_hash.clear()
+            self._tree = [0] * (self._capacity + 1)
+            self._clock = 0
+            self._histogram.clear()
+            self._cold = 0.0
+            self._since_decay = 0
+
+def resize_target(curve: MissRatioCurve, target_hit_rate: float, current_size: int,
+                  min_size: int, max_size: int, tolerance: float = 0.1) -> Optional[int]:
+    """
+    New cache size for a target hit rate, or None to keep the current one
+    (curve not ready yet, or the change is within ``tolerance``)
+    """
+    if not target_hit_rate or not curve.ready:
+        return None
+    new_size = curve.size_for_hit_rate(target_hit_rate, max_size, min_size)
+    if abs(new_size - current_size) <= tolerance * current_size:
+        return None
+    return new_size
+
+# Curves of all caches by name, for the admin cache stats endpoint
+_curves: Dict[str, Tuple[MissRatioCurve, Any]] = {}
+
+def register_miss_ratio_curve(name: str, curve: MissRatioCurve, size_limit=None):
+    """
+    Publish a cache's curve; ``size_limit`` is a callable giving the largest
+    size worth plotting (e.g. the memory budget in entries)
+    """
+    _curves[name] = (curve, size_limit)
+
+def get_miss_ratio_curves(points: int = 12) -> Dict[str, Dict[str, Any]]:
+    """Stats and predicted hit-rate curves of all registered caches"""
+    result = {}
+    for name, (curve, size_limit) in list(_curves.items()):
+        try:
+            max_size = size_limit() if size_limit else None
+            result[name] = curve.get_stats(max_size=max_size or max(16, curve.max_samples), points=points)
+        except Exception as e:
+            result[name] = {'error': str(e)}
+    return result
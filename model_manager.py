@@ -16,17 +16,36 @@ import torch
 import time
 import weakref
 from sentence_transformers import SentenceTransformer
-from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
-from typing import Optional, Dict, Any, Union, Callable
+from transformers import (pipeline, AutoTokenizer, AutoModelForCausalLM, TextIteratorStreamer,
+                          StoppingCriteria, StoppingCriteriaList)
+from typing import Optional, Dict, Any, List, Union, Callable, Iterator, AsyncIterator
+import asyncio
 import os
-from functools import lru_cache, wraps
+from functools import wraps
+from collections import OrderedDict, namedtuple
 import atexit
+import sys
 from core.configuration import get_config
+from onnx_embedding_backend import ONNXEmbeddingBackend, is_onnx_backend_available
+from generation_budget import (GenerationBudget, SentenceSplitter, SENTENCE_END_CHARS,
+                               remaining_generation_budget, truncate_to_sentence_boundary)
+from housekeeping import get_housekeeping_scheduler
+from miss_ratio_curve import MissRatioCurve, register_miss_ratio_curve, resize_target
 import re
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+class TimeBudgetStoppingCriteria(GenerationBudget, StoppingCriteria):
+    """
+    ⏱️ Stop generation when the wall-clock budget is spent (or on cancel)
+    Called once per generated token, so it also counts produced tokens.
+    """
+    
+    def __call__(self, input_ids, scores, **kwargs):
+        stop = self.tick()
+        return torch.full((input_ids.shape[0],), stop, dtype=torch.bool, device=input_ids.device)
+
 class ModelType(Enum):
     """Model types for lazy loading management"""
     TURKISH_SENTENCE = "turkish_sentence"
@@ -108,31 +127,170 @@ def lazy_load_model(model_type: ModelType):
         return wrapper
     return decorator
 
-def memory_efficient_cache(maxsize: int = 100):  # AI MODEL FIX: Realistic cache size for AI models
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Calls between miss-ratio-curve driven resize checks
+_RESIZE_CHECK_CALLS = 1000
+
+def _estimate_result_size(value: Any) -> int:
+    """Approximate memory of a cached model output in bytes"""
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes) + 112
+    if isinstance(value, list):
+        # List of Python floats: pointer + float object per element
+        return sys.getsizeof(value) + 24 * len(value)
+    return sys.getsizeof(value)
+
+class ResizableLRUCache:
+    """
+    LRU cache of model outputs whose size can change at runtime
+    With a name, its key stream feeds a miss-ratio curve; with a target hit
+    rate it resizes itself for that rate within a memory budget.
+    """
+    
+    def __init__(self, maxsize: int, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.name = name
+        self.target_hit_rate = 0.0
+        self.max_memory_bytes = 0
+        self._initial_size = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._calls = 0
+        self.resizes = 0
+        self._configured = False
+        self._lock = threading.RLock()
+        self.curve = MissRatioCurve() if name else None
+        if self.curve is not None:
+            register_miss_ratio_curve(name, self.curve, self._size_budget)
+    
+    def _configure(self):
+        """Read size, target hit rate and memory budget from cache settings (first use)"""
+        self._configured = True
+        if not self.name:
+            return
+        try:
+            from core.config_utils import load_cache_config
+            cache_config = load_cache_config()
+        except Exception:
+            return
+        self.maxsize = self._initial_size = getattr(cache_config, 'embedding_cache_size', self.maxsize)
+        self.target_hit_rate = getattr(cache_config, 'embedding_cache_target_hit_rate', 0.0)
+        self.max_memory_bytes = getattr(cache_config, 'embedding_cache_max_memory_mb', 0) * 1024 * 1024
+    
+    def _size_budget(self) -> int:
+        """Largest size the memory budget allows at the current average entry size"""
+        with self._lock:
+            limit = self._initial_size * 10
+            if self.max_memory_bytes and self._entries and self._bytes:
+                limit = min(limit, int(self.max_memory_bytes * len(self._entries) / self._bytes))
+            return max(1, limit)
+    
+    def get(self, key, curve_key: Optional[str] = None):
+        """(True, value) on a hit, (False, None) on a miss"""
+        if not self._configured:
+            self._configure()
+        if self.curve is not None and curve_key is not None:
+            self.curve.record(curve_key)
+        with self._lock:
+            self._calls += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return True, self._entries[key][0]
+            self._misses += 1
+            return False, None
+    
+    def put(self, key, value):
+        size = _estimate_result_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._trim()
+            check_resize = self.target_hit_rate and self._calls >= _RESIZE_CHECK_CALLS
+            if check_resize:
+                self._calls = 0
+        if check_resize:
+            self.resize_for_target_hit_rate()
+    
+    def _trim(self):
+        while len(self._entries) > self.maxsize or (
+                self.max_memory_bytes and self._bytes > self.max_memory_bytes and len(self._entries) > 1):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+    
+    def resize(self, maxsize: int):
+        """Change the number of cached outputs (evicts least recently used ones)"""
+        with self._lock:
+            self.maxsize = max(1, maxsize)
+            self._trim()
+    
+    def resize_for_target_hit_rate(self) -> bool:
+        """Resize from the miss-ratio curve; True if the size changed"""
+        if self.curve is None:
+            return False
+        new_size = resize_target(self.curve, self.target_hit_rate, self.maxsize,
+                                 min_size=max(1, self._initial_size // 2), max_size=self._size_budget())
+        if new_size is None:
+            return False
+        self.resize(new_size)
+        self.resizes += 1
+        logger.info(f"📐 Resized {self.name} to {new_size} entries for a {self.target_hit_rate}% hit rate "
+                    f"(predicted {self.curve.hit_rate(new_size)}%)")
+        return True
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = 0
+    
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        info = self.info()
+        lookups = info.hits + info.misses
+        return {
+            'size': info.currsize,
+            'max_size': info.maxsize,
+            'memory_mb': round(self._bytes / (1024 * 1024), 2),
+            'hit_rate': round(info.hits / lookups * 100, 2) if lookups else 0.0,
+            'target_hit_rate': self.target_hit_rate,
+            'predicted_hit_rate': self.curve.hit_rate(info.maxsize) if self.curve else None,
+            'resizes': self.resizes
+        }
+
+def memory_efficient_cache(maxsize: int = 100, name: Optional[str] = None):
     """
-    AI MODEL FIX: Balanced memory-efficient LRU cache for AI models
-    Reasonable cache size to balance memory usage and performance
+    Memory-bounded LRU cache for model outputs
+    
+    Unlike ``lru_cache`` the size can change at runtime: with a ``name`` the
+    cache tracks a miss-ratio curve (published under that name) and, when
+    ``embedding_cache_target_hit_rate`` is configured, resizes itself for that
+    hit rate within ``embedding_cache_max_memory_mb``.
     """
     def decorator(func):
-        cached_func = lru_cache(maxsize=maxsize)(func)
+        cache = ResizableLRUCache(maxsize, name)
         
         @wraps(func)
         def wrapper(*args, **kwargs):
-            result = cached_func(*args, **kwargs)
-            
-            # AI MODEL FIX: Reasonable cache cleanup for AI models
-            cache_info = cached_func.cache_info()
-            if cache_info.currsize > maxsize * 0.85:  # AI MODEL FIX: Clean at 85% for better performance
-                logger.debug(f"Cache {func.__name__} at {cache_info.currsize}/{maxsize}, triggering cleanup")
-                # AI MODEL FIX: Clear cache only when very full
-                if cache_info.currsize >= maxsize * 0.95:  # 95% full
-                    cached_func.cache_clear()
-                    logger.debug(f"🧹 Cache {func.__name__} cleared due to memory pressure")
-                    
+            key = args + tuple(sorted(kwargs.items())) if kwargs else args
+            hit, result = cache.get(key, repr(key) if cache.curve is not None else None)
+            if hit:
+                return result
+            result = func(*args, **kwargs)
+            cache.put(key, result)
             return result
         
-        wrapper.cache_info = cached_func.cache_info
-        wrapper.cache_clear = cached_func.cache_clear
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
         return wrapper
     return decorator
 
@@ -202,6 +360,18 @@ class ModelManager:
                     self._english_sentence_model = None
                     self._turkish_sentence_model = None
                     self._text_generator_model = None
+                    self._onnx_backends = {}  # model_type -> ONNXEmbeddingBackend
+                    self._onnx_failed = set()  # model types whose ONNX init failed (torch fallback)
+                    
+                    # Deadline-aware generation statistics
+                    self._generation_stats = {
+                        'generations': 0,
+                        'truncated_by_deadline': 0,
+                        'tokens_generated': 0,
+                        'last_tokens_generated': 0,
+                        'last_truncated': False,
+                        'last_duration_ms': 0
+                    }
                     self._device = None
                     self._model_config = {}
                     
@@ -215,6 +385,7 @@ class ModelManager:
                     # AI MODEL FIX: Balanced lazy loading and performance tracking for AI models
                     self._lazy_tracker = LazyLoadTracker()
                     self._last_cleanup = time.time()
+                    self._cleanup_job = None
                     self._cleanup_interval = 300  # AI MODEL FIX: Balanced cleanup interval - 5 minutes
                     self._max_idle_time = 900  # AI MODEL FIX: Reasonable idle time - 15 minutes
                     
@@ -248,19 +419,17 @@ class ModelManager:
             return 0.0
     
     def _schedule_cleanup(self):
-        """Schedule periodic cleanup of unused models"""
-        if not self._auto_cleanup:
+        """Schedule periodic cleanup of unused models on the housekeeping scheduler"""
+        if not self._auto_cleanup or self._cleanup_job is not None:
             return
-            
-        current_time = time.time()
-        if current_time - self._last_cleanup > self._cleanup_interval:
-            threading.Thread(target=self._cleanup_idle_models, daemon=True).start()
-            self._last_cleanup = current_time
+        self._cleanup_job = get_housekeeping_scheduler().schedule_periodic(
+            "model_manager.idle_cleanup", self._cleanup_idle_models, self._cleanup_interval)
     
     def _cleanup_idle_models(self):
         """Clean up models that haven't been used recently"""
         try:
             current_time = time.time()
+            self._last_cleanup = current_time
             models_to_cleanup = []
             
             for model_type, last_access in self._lazy_tracker.last_access.items():
@@ -486,7 +655,7 @@ class ModelManager:
             logger.error(f"Failed to get sentence embedding: {e}")
             return None
 
-    @memory_efficient_cache(maxsize=100)  # AI MODEL FIX: Realistic cache size for AI models
+    @memory_efficient_cache(maxsize=100, name="embedding_cache")  # Size from EMBEDDING_CACHE_SIZE
     def generate_embedding(self, text: str, force_turkish: bool = None) -> list:
         """
         🧠 Generate embedding with AI MODEL optimizations for production use
@@ -509,6 +678,12 @@ class ModelManager:
             elif use_turkish_model is None:
                 use_turkish_model = config.prefer_turkish_models
             
+            # ONNX Runtime backend (int8 CPU inference) when configured
+            if config.embedding_backend == "onnx":
+                onnx_backend = self._get_onnx_backend(bool(use_turkish_model))
+                if onnx_backend is not None:
+                    return onnx_backend.encode([normalized_text])[0].tolist()
+            
             # Choose appropriate model (triggers lazy loading if needed)
             if use_turkish_model:
                 logger.debug(f"🇹🇷 Using Turkish model for: {normalized_text[:30]}...")
@@ -558,22 +733,130 @@ class ModelManager:
                     logger.error(f"Fallback also failed: {fallback_e}")
                     return []
             return []
-        finally:
-            # AI MODEL FIX: Balanced cache cleanup for AI model performance
+    
+    def generate_embeddings_batch(self, texts: List[str], force_turkish: bool = None,
+                                  as_numpy: bool = False) -> List[Any]:
+        """
+        🧠 Generate embeddings for many texts with one forward pass per model
+        Texts are grouped by detected language; order of the input is preserved.
+        Texts too short to embed get an empty list, like generate_embedding.
+        
+        Args:
+            as_numpy: Return numpy rows instead of lists (binary transport, no list round trip)
+        """
+        config = get_config().ai
+        results: List[list] = [[] for _ in texts]
+        groups: Dict[bool, List[int]] = {True: [], False: []}
+        normalized = []
+
+        for index, text in enumerate(texts):
+            normalized_text = (text or "").strip().lower()[:800]
+            normalized.append(normalized_text)
+            if len(normalized_text) < 2:
+                continue
+            use_turkish_model = force_turkish
+            if use_turkish_model is None and config.language_detection:
+                use_turkish_model = self._language_detector.is_turkish(normalized_text)
+            elif use_turkish_model is None:
+                use_turkish_model = config.prefer_turkish_models
+            groups[bool(use_turkish_model)].append(index)
+
+        for use_turkish_model, indices in groups.items():
+            if not indices:
+                continue
+            batch = [normalized[i] for i in indices]
+            try:
+                embeddings = None
+                if config.embedding_backend == "onnx":
+                    onnx_backend = self._get_onnx_backend(use_turkish_model)
+                    if onnx_backend is not None:
+                        embeddings = onnx_backend.encode(batch)
+
+                if embeddings is None:
+                    model = self.turkish_sentence_model if use_turkish_model else self.english_sentence_model
+                    with torch.inference_mode():
+                        embeddings = model.encode(
+                            batch,
+                            convert_to_tensor=False,
+                            show_progress_bar=False,
+                            batch_size=min(len(batch), 64),
+                            normalize_embeddings=True,
+                            device=self.device if self.device != "mps" else "cpu"
+                        )
+
+                for index, embedding in zip(indices, embeddings):
+                    results[index] = embedding if as_numpy else embedding.tolist()
+                del embeddings
+
+            except Exception as e:
+                logger.error(f"Batch embedding generation failed ({len(batch)} texts): {e}")
+                # Per-text path has its own model fallback chain
+                for index in indices:
+                    results[index] = self.generate_embedding(texts[index], force_turkish=force_turkish)
+
+        self._embedding_counter = getattr(self, '_embedding_counter', 0) + len(texts)
+        return results
+
+    def _get_onnx_backend(self, use_turkish: bool) -> Optional[ONNXEmbeddingBackend]:
+        """
+        ⚡ Get (and lazily export/load) the ONNX embedding backend
+        Returns None when ONNX Runtime is unavailable so callers fall back to torch
+        """
+        model_type = 'turkish_sentence' if use_turkish else 'english_sentence'
+        backend = self._onnx_backends.get(model_type)
+        if backend is not None or model_type in self._onnx_failed:
+            return backend
+        
+        if not is_onnx_backend_available():
+            logger.warning("⚠️ ONNX backend requested but onnxruntime is not installed, using torch")
+            self._onnx_failed.add(model_type)
+            return None
+        
+        with self._model_locks[model_type]:
+            backend = self._onnx_backends.get(model_type)
+            if backend is not None:
+                return backend
+            
+            config = get_config().ai
+            model_name = config.turkish_sentence_model if use_turkish else config.english_fallback_model
             try:
-                cache_info = self.generate_embedding.cache_info()
-                if cache_info.currsize > 80:  # AI MODEL FIX: Reasonable cache cleanup threshold
-                    if cache_info.currsize >= 95:  # AI MODEL FIX: Clear cache when nearly full
-                        self.generate_embedding.cache_clear()
-                        self._force_gc()
-                        logger.debug("🧹 Cache cleared due to memory pressure")
-            except Exception as cleanup_e:
-                logger.debug(f"Cache cleanup warning: {cleanup_e}")
+                start_time = time.time()
+                backend = ONNXEmbeddingBackend(
+                    model_name,
+                    cache_dir=self._cache_dir,
+                    quantize=config.onnx_quantize,
+                    num_threads=config.onnx_num_threads
+                )
+                
+                if not backend.is_exported():
+                    # Export needs the torch model once; it is released right after
+                    torch_model = SentenceTransformer(model_name, device="cpu", cache_folder=self._cache_dir)
+                    backend.export(torch_model)
+                    del torch_model
+                    self._force_gc()
+                
+                backend.load()
+                self._onnx_backends[model_type] = backend
+                self._model_config[f'{model_type}_onnx'] = model_name
+                logger.info(f"⚡ ONNX {model_type} backend loaded in {time.time() - start_time:.2f}s")
+                return backend
+                
+            except Exception as e:
+                logger.error(f"❌ ONNX backend initialization failed for {model_name}: {e}")
+                self._onnx_failed.add(model_type)
+                return None
     
-    def generate_text_response(self, prompt: str, max_length: int = 120, turkish_context: bool = True) -> str:
+    def generate_text_response(self, prompt: str, max_length: int = 120, turkish_context: bool = True,
+                               time_budget: Optional[float] = None) -> str:
         """
         AI MODEL FIX: Generate text response with balanced memory optimization for AI models
+        
+        Args:
+            time_budget: Optional wall-clock budget in seconds; when reached, generation
+                stops and the text is cut at the last sentence boundary
         """
+        start_time = time.time()
+        criteria = TimeBudgetStoppingCriteria(time_budget)
         try:
             if self.text_generator is None:
                 raise RuntimeError("Text generator not available")
@@ -605,7 +888,8 @@ class ModelManager:
                         repetition_penalty=1.3,  # Increased to discourage repetition
                         length_penalty=0.8,  # Encourage shorter, more focused responses
                         early_stopping=True,  # Stop when EOS token is reached
-                        clean_up_tokenization_spaces=True
+                        clean_up_tokenization_spaces=True,
+                        stopping_criteria=StoppingCriteriaList([criteria])  # Wall-clock budget
                     )
             
             generated_text = outputs[0]['generated_text'].strip()
@@ -617,6 +901,12 @@ class ModelManager:
                 if yanit_index != -1:
                     generated_text = generated_text[yanit_index + 6:].strip()
             
+            # Budget reached mid-sentence: keep only complete sentences
+            if criteria.budget_exceeded:
+                generated_text = truncate_to_sentence_boundary(generated_text)
+            
+            self._record_generation(criteria, start_time)
+            
             # Additional cleaning for better quality
             generated_text = self._post_process_generated_text(generated_text, prompt)
             
@@ -632,6 +922,185 @@ class ModelManager:
             self._force_gc()
             raise
     
+    def _record_generation(self, criteria: TimeBudgetStoppingCriteria, start_time: float):
+        """Update deadline-aware generation statistics"""
+        stats = self._generation_stats
+        stats['generations'] += 1
+        stats['tokens_generated'] += criteria.tokens_generated
+        stats['last_tokens_generated'] = criteria.tokens_generated
+        stats['last_truncated'] = criteria.budget_exceeded
+        stats['last_duration_ms'] = int((time.time() - start_time) * 1000)
+        if criteria.budget_exceeded:
+            stats['truncated_by_deadline'] += 1
+            logger.info(f"⏱️ Generation stopped by time budget after {criteria.tokens_generated} tokens "
+                        f"({stats['last_duration_ms']}ms)")
+        else:
+            logger.debug(f"Generation produced {criteria.tokens_generated} tokens in {stats['last_duration_ms']}ms")
+    
+    def get_generation_stats(self) -> Dict[str, Any]:
+        """⏱️ Deadline-aware generation statistics (truncation rate, tokens produced)"""
+        stats = dict(self._generation_stats)
+        generations = stats['generations']
+        stats['truncation_rate'] = stats['truncated_by_deadline'] / generations if generations else 0.0
+        stats['average_tokens_generated'] = stats['tokens_generated'] / generations if generations else 0.0
+        return stats
+    
+    def stream_text_response(self, prompt: str, max_length: int = 120, turkish_context: bool = True,
+                             time_budget: Optional[float] = None) -> Iterator[str]:
+        """
+        🌊 Streaming text generation
+        Tokens are produced by model.generate() in a background thread through a
+        TextIteratorStreamer; post-processed sentences are yielded as soon as a
+        sentence boundary is seen. Blocking iterator - drive it off the event loop.
+        Closing the iterator early stops the generation thread at the next token.
+        """
+        start_time = time.time()
+        if self.text_generator is None:
+            raise RuntimeError("Text generator not available")
+        
+        prompt = prompt[:300]
+        if turkish_context and self._language_detector.is_turkish(prompt):
+            enhanced_prompt = f"Soru: {prompt}\nYanıt:"
+        else:
+            enhanced_prompt = prompt
+        
+        tokenizer = self.text_generator.tokenizer
+        model = self.text_generator.model
+        inputs = tokenizer(enhanced_prompt, return_tensors="pt").to(model.device)
+        
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=60)
+        generation_kwargs = dict(
+            **inputs,
+            streamer=streamer,
+            max_length=min(max_length, 120),
+            num_return_sequences=1,
+            temperature=0.6,
+            do_sample=True,
+            top_p=0.85,
+            top_k=40,
+            pad_token_id=tokenizer.eos_token_id,
+            eos_token_id=tokenizer.eos_token_id,
+            no_repeat_ngram_size=3,
+            repetition_penalty=1.3,
+        )
+        criteria = TimeBudgetStoppingCriteria(time_budget)
+        generation_kwargs['stopping_criteria'] = StoppingCriteriaList([criteria])
+        
+        generation_error = []
+        
+        def _generate():
+            try:
+                with torch.inference_mode():  # Thread-local; must be entered in the generation thread
+                    model.generate(**generation_kwargs)
+            except Exception as e:
+                generation_error.append(e)
+                streamer.end()  # Unblock the consumer
+        
+        thread = threading.Thread(target=_generate, name="hf-stream-generate", daemon=True)
+        thread.start()
+        
+        splitter = SentenceSplitter()
+        emitted = []
+        try:
+            for piece in streamer:
+                for sentence in splitter.feed(piece):
+                    processed = self._post_process_sentence(sentence, prompt, emitted)
+                    if processed:
+                        emitted.append(processed)
+                        yield processed
+            
+            # Trailing text; a sentence cut off by the deadline is dropped
+            tail = splitter.tail(truncated=criteria.budget_exceeded)
+            if tail:
+                processed = self._post_process_sentence(tail, prompt, emitted)
+                if processed:
+                    if not processed.endswith(SENTENCE_END_CHARS):
+                        processed += '.'
+                    yield processed
+        finally:
+            criteria.cancel()  # Consumer stopped early (quality gate, disconnect)
+            thread.join(timeout=1.0)
+            self._record_generation(criteria, start_time)
+            self._force_gc()
+        
+        if generation_error:
+            raise generation_error[0]
+    
+    def _post_process_sentence(self, sentence: str, original_prompt: str, emitted: list) -> str:
+        """Sentence-level quality post-processing for streamed generation"""
+        text = re.sub(r'</s>|<s>|<pad>|<unk>', '', sentence)
+        text = re.sub(r'\s+', ' ', text).strip()
+        
+        # The first sentence may still carry the prompt scaffold
+        if not emitted:
+            if text.startswith("Yanıt:"):
+                text = text[len("Yanıt:"):].strip()
+            if original_prompt and text.lower().startswith(original_prompt.lower()):
+                text = text[len(original_prompt):].strip()
+        
+        text = self._fix_turkish_grammar(text)
+        
+        # Drop fragments and repeated sentences
+        if len(text) < 3 or text.lower() in (e.lower() for e in emitted):
+            return ""
+        return text
+    
+    async def stream_huggingface_response(self, message: str, user_id: str = None,
+                                          deadline: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        🌊 Streaming variant of generate_huggingface_response
+        Yields text deltas that concatenate to the full response. The first
+        sentence passes the Turkish quality gate before anything is sent.
+        """
+        try:
+            from improved_turkish_content_manager import improved_turkish_content
+            static_response = improved_turkish_content.get_response(message)
+            if static_response and not any(phrase in static_response.lower() for phrase in [
+                'elimde yeterli bilgi', 'bu konuda size', 'daha detaylandırır'
+            ]):
+                logger.info("🎯 Using improved Turkish static response")
+                yield static_response
+                return
+        except ImportError:
+            logger.debug("Improved Turkish content manager not available")
+        
+        time_budget = self._remaining_generation_budget(deadline)
+        if time_budget is None:
+            yield self._get_quality_fallback_response(message)
+            return
+        
+        loop = asyncio.get_running_loop()
+        sentinel = object()
+        emitted = 0
+        iterator = None
+        
+        try:
+            iterator = self.stream_text_response(prompt=message, max_length=80, turkish_context=True,
+                                                 time_budget=time_budget)
+            while True:
+                # Both model loading and streamer waits are blocking - run them in the executor
+                sentence = await loop.run_in_executor(None, next, iterator, sentinel)
+                if sentence is sentinel:
+                    break
+                
+                if emitted == 0:
+                    quality_score = self._assess_response_quality(sentence, message)
+                    if quality_score < get_config().ai.turkish_quality_threshold:
+                        logger.warning(f"Streamed response quality too low ({quality_score:.2f}), using fallback")
+                        break
+                
+                yield sentence if emitted == 0 else f" {sentence}"
+                emitted += 1
+                
+        except Exception as e:
+            logger.error(f"Hugging Face streaming failed: {e}")
+        finally:
+            if iterator is not None:
+                await loop.run_in_executor(None, iterator.close)
+        
+        if emitted == 0:
+            yield self._get_quality_fallback_response(message)
+    
     def _post_process_generated_text(self, text: str, original_prompt: str) -> str:
         """
         Post-process generated text for better quality
@@ -666,9 +1135,25 @@ class ModelManager:
             logger.warning(f"Post-processing failed: {e}")
             return text
     
-    async def generate_huggingface_response(self, message: str, user_id: str = None) -> str:
+    def _remaining_generation_budget(self, deadline: Optional[float]) -> Optional[float]:
+        """
+        ⏱️ Generation time budget for a request deadline (time.monotonic() based)
+        Never above the configured budget; None when too little time is left
+        to generate anything useful.
+        """
+        budget = remaining_generation_budget(deadline, get_config().ai.generation_time_budget)
+        if budget is None:
+            logger.info(f"⏱️ Deadline too close ({deadline - time.monotonic():.2f}s left), skipping generation")
+        return budget
+    
+    async def generate_huggingface_response(self, message: str, user_id: str = None,
+                                            deadline: Optional[float] = None) -> str:
         """
         ENHANCED: Generate improved Hugging Face response with Turkish quality optimization
+        
+        Args:
+            deadline: Optional time.monotonic() deadline of the request; generation stops
+                early at a sentence boundary so the answer arrives in time
         """
         try:
             # First try improved Turkish content manager
@@ -686,11 +1171,16 @@ class ModelManager:
             except ImportError:
                 logger.debug("Improved Turkish content manager not available")
             
+            time_budget = self._remaining_generation_budget(deadline)
+            if time_budget is None:
+                return self._get_quality_fallback_response(message)
+            
             # Generate AI response with quality control
             response = self.generate_text_response(
                 prompt=message,
                 max_length=80,  # Increased for better responses
-                turkish_context=True
+                turkish_context=True,
+                time_budget=time_budget
             )
             
             # ENHANCED: Quality check and improvement
@@ -928,6 +1418,10 @@ class ModelManager:
             "turkish_sentence_model_loaded": self._turkish_sentence_model is not None,
             "text_generator_loaded": self._text_generator_model is not None,
             
+            # Embedding backend
+            "embedding_backend": get_config().ai.embedding_backend,
+            "onnx_backends": {k: v.get_info() for k, v in self._onnx_backends.items()},
+            
             # System info
             "device": self.device,
             "model_config": self._model_config,
@@ -943,12 +1437,17 @@ class ModelManager:
                 "embedding_cache_hits": cache_info.hits,
                 "embedding_cache_misses": cache_info.misses,
                 "embedding_cache_maxsize": cache_info.maxsize,
-                "cache_hit_ratio": cache_info.hits / (cache_info.hits + cache_info.misses) if (cache_info.hits + cache_info.misses) > 0 else 0
+                "cache_hit_ratio": cache_info.hits / (cache_info.hits + cache_info.misses) if (cache_info.hits + cache_info.misses) > 0 else 0,
+                "embedding_cache": self.generate_embedding.cache.get_stats()
             },
             
             # Lazy loading statistics
             "lazy_loading_stats": lazy_stats,
             
+            # Deadline-aware generation
+            "generation_time_budget_seconds": get_config().ai.generation_time_budget,
+            "generation_stats": self.get_generation_stats(),
+            
             # Memory management
             "auto_cleanup_enabled": self._auto_cleanup,
             "cleanup_interval_seconds": self._cleanup_interval,
@@ -995,6 +1494,12 @@ class ModelManager:
                 self._text_generator_model = None
                 models_unloaded.append("Text generator model")
             
+            for model_type, backend in list(self._onnx_backends.items()):
+                backend.unload()
+                models_unloaded.append(f"ONNX {model_type} backend")
+            self._onnx_backends.clear()
+            self._onnx_failed.clear()
+            
             # Clear model config
             self._model_config.clear()
             
@@ -1037,6 +1542,12 @@ class ModelManager:
         self._cleanup_interval = cleanup_interval
         self._max_idle_time = max_idle_time
         
+        # Re-register the cleanup job with the new interval (or drop it)
+        if self._cleanup_job is not None:
+            self._cleanup_job.cancel()
+            self._cleanup_job = None
+        self._schedule_cleanup()
+        
         logger.info(f"🔧 Auto cleanup: {'enabled' if enabled else 'disabled'}, "
                    f"interval: {cleanup_interval}s, max idle: {max_idle_time}s")
     
@@ -0,0 +1,159 @@
+"""
+🚫 Negative-Result Cache for MEFAPEX AI Assistant
+Queries that fall through every matching stage of ``ContentManager.find_response``
+to the default or fallback answer would otherwise repeat the whole cascade
+(intent classifier, Turkish matcher, semantic search, ...) each time they are
+asked; spam and bot traffic does this heavily.
+
+- Canonical query keys of default/fallback answers are kept for a TTL in a
+  bounded LRU map
+- A Bloom filter in front answers "never seen" for the common (answerable)
+  query without touching the map; it is rebuilt once removed keys have
+  filled it with stale bits
+- Entries carry the knowledge version (content, synonyms, intent model) they
+  were computed under; any change clears the cache
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from cache_admission import BloomFilter, _hash_pair
+
+logger = logging.getLogger(__name__)
+
+class NegativeResultCache:
+    """Bounded TTL cache of unanswerable queries with a Bloom-filter front"""
+
+    def __init__(self, max_entries: int = 5000, ttl: int = 600):
+        """
+        Args:
+            max_entries: Maximum number of remembered queries (LRU beyond that)
+            ttl: Seconds a query is short-circuited before it is matched again
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        # key -> (expires_at, response, source)
+        self._entries: OrderedDict[str, Tuple[float, str, str]] = OrderedDict()
+        self._bloom = BloomFilter(self.max_entries)
+        self._stale_bits = 0
+        self._version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'bloom_rejects': 0,
+            'bloom_false_positives': 0,
+            'stores': 0,
+            'expirations': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'bloom_rebuilds': 0
+        }
+
+    def sync_version(self, version: Hashable) -> bool:
+        """Clear the cache if content, synonyms or intent model changed; True if cleared"""
+        with self._lock:
+            if version == self._version:
+                return False
+            had_entries = bool(self._entries)
+            self._version = version
+            self._clear_locked()
+            if had_entries:
+                self._stats['invalidations'] += 1
+        if had_entries:
+            logger.info("🚫 Negative cache invalidated (content, synonyms or intent model changed)")
+        return had_entries
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """(response, source) of a known-unanswerable query, else None"""
+        hashes = _hash_pair(key)
+        with self._lock:
+            if not self._bloom.contains(hashes):
+                self._stats['bloom_rejects'] += 1
+                return None
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['bloom_false_positives'] += 1
+                self._stats['misses'] += 1
+                return None
+            if entry[0] <= time.time():
+                self._remove_locked(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1], entry[2]
+
+    def add(self, key: str, response: str, source: str):
+        """Remember that a query only produced a default/fallback answer"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (time.time() + self.ttl, response, source)
+            self._bloom.add(_hash_pair(key))
+            self._stats['stores'] += 1
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self._stats['evictions'] += 1
+
+    def _remove_locked(self, key: str):
+        """Drop an entry; the Bloom filter cannot forget it, so count its stale bits"""
+        del self._entries[key]
+        self._stale_bits += 1
+        if self._stale_bits >= self.max_entries:
+            self._rebuild_bloom_locked()
+
+    def _rebuild_bloom_locked(self):
+        """Rebuild the Bloom filter from live keys (drops bits of removed keys)"""
+        self._bloom.clear()
+        now = time.time()
+        for key in [key for key, entry in self._entries.items() if entry[0] <= now]:
+            del self._entries[key]
+            self._stats['expirations'] += 1
+        for key in self._entries:
+            self._bloom.add(_hash_pair(key))
+        self._stale_bits = 0
+        self._stats['bloom_rebuilds'] += 1
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._bloom.clear()
+        self._stale_bits = 0
+
+    def clear(self):
+        """Forget all unanswerable queries"""
+        with self._lock:
+            self._clear_locked()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses'] + self._stats['bloom_rejects']
+            return {
+                'enabled': True,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hit_rate': round(self._stats['hits'] / lookups * 100, 2) if lookups else 0.0,
+                **self._stats
+            }
+
+def create_negative_cache() -> Optional[NegativeResultCache]:
+    """Negative cache configured from cache settings (None when disabled)"""
+    try:
+        from core.config_utils import load_cache_config
+        cache_config = load_cache_config()
+    except Exception:
+        cache_config = None
+    if not getattr(cache_config, 'negative_cache_enabled', True):
+        return None
+    return NegativeResultCache(
+        max_entries=getattr(cache_config, 'negative_cache_max_entries', 5000),
+        ttl=getattr(cache_config, 'negative_cache_ttl', 600)
+    )
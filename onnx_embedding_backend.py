@@ -0,0 +1,267 @@
+"""
+⚡ ONNX Runtime Embedding Backend for MEFAPEX AI Assistant
+========================================================
+CPU-optimized alternative to PyTorch SentenceTransformer inference
+- One-time export of the configured sentence models to ONNX
+- Dynamic int8 quantization (onnxruntime.quantization)
+- Exported artifacts cached under models_cache/onnx/
+- Pooling + normalization identical to SentenceTransformer.encode()
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional dependencies - backend is unavailable without them
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    ONNX_QUANTIZATION_AVAILABLE = True
+except ImportError:
+    quantize_dynamic = None
+    QuantType = None
+    ONNX_QUANTIZATION_AVAILABLE = False
+
+BACKEND_CONFIG_FILE = "backend_config.json"
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model-int8.onnx"
+
+
+def is_onnx_backend_available() -> bool:
+    """Check whether ONNX Runtime is installed"""
+    return ONNXRUNTIME_AVAILABLE
+
+
+def _safe_model_dir_name(model_name: str) -> str:
+    """Convert a HuggingFace model id into a filesystem-safe directory name"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+class ONNXEmbeddingBackend:
+    """
+    ONNX Runtime sentence embedding backend
+
+    The transformer body of a SentenceTransformer is exported once to ONNX
+    (optionally int8-quantized); pooling and L2 normalization are done in
+    NumPy so the output matches ``SentenceTransformer.encode(normalize_embeddings=True)``.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str, quantize: bool = True,
+                 num_threads: int = 0):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed")
+
+        self.model_name = model_name
+        self.quantize = quantize and ONNX_QUANTIZATION_AVAILABLE
+        self.num_threads = num_threads
+        self.export_dir = os.path.join(cache_dir, "onnx", _safe_model_dir_name(model_name))
+
+        self._session = None
+        self._tokenizer = None
+        self._input_names: List[str] = []
+        self._pooling_mode = "mean"
+        self._max_seq_length = 256
+        self._lock = threading.Lock()
+        # Fast (Rust) tokenizers are not safe to call from several threads at once
+        self._tokenizer_lock = threading.Lock()
+
+        if quantize and not ONNX_QUANTIZATION_AVAILABLE:
+            logger.warning("⚠️ onnxruntime.quantization not available, using fp32 ONNX model")
+
+    @property
+    def model_path(self) -> str:
+        """Path of the ONNX model actually served"""
+        return os.path.join(self.export_dir, INT8_MODEL_FILE if self.quantize else FP32_MODEL_FILE)
+
+    def is_exported(self) -> bool:
+        """Check whether cached export artifacts exist"""
+        return (os.path.exists(self.model_path) and
+                os.path.exists(os.path.join(self.export_dir, BACKEND_CONFIG_FILE)))
+
+    def export(self, sentence_model: Any = None):
+        """
+        Export the sentence model to ONNX and quantize it
+
+        Args:
+            sentence_model: Already-loaded SentenceTransformer (loaded on demand if None)
+        """
+        import torch
+
+        if sentence_model is None:
+            from sentence_transformers import SentenceTransformer
+            sentence_model = SentenceTransformer(
+                self.model_name, device="cpu",
+                cache_folder=os.path.dirname(os.path.dirname(self.export_dir))
+            )
+
+        start_time = time.time()
+        os.makedirs(self.export_dir, exist_ok=True)
+
+        transformer = sentence_model[0]
+        auto_model = transformer.auto_model.to("cpu").eval()
+        tokenizer = transformer.tokenizer
+
+        # Pooling configuration from the SentenceTransformer pipeline
+        pooling_mode = "mean"
+        if len(sentence_model) > 1 and hasattr(sentence_model[1], "get_pooling_mode_str"):
+            pooling_mode = sentence_model[1].get_pooling_mode_str()
+        max_seq_length = int(getattr(sentence_model, "max_seq_length", None) or 256)
+
+        dummy = tokenizer(["MEFAPEX örnek cümle"], return_tensors="pt", padding=True, truncation=True)
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+
+        class _HiddenStateWrapper(torch.nn.Module):
+            """Return only last_hidden_state so the graph has a single output"""
+
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names, inputs)))[0]
+
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        fp32_path = os.path.join(self.export_dir, FP32_MODEL_FILE)
+        with torch.no_grad():
+            torch.onnx.export(
+                _HiddenStateWrapper(auto_model),
+                tuple(dummy[name] for name in input_names),
+                fp32_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+                do_constant_folding=True,
+            )
+
+        if self.quantize:
+            quantize_dynamic(
+                fp32_path,
+                os.path.join(self.export_dir, INT8_MODEL_FILE),
+                weight_type=QuantType.QInt8,
+            )
+
+        tokenizer.save_pretrained(self.export_dir)
+        with open(os.path.join(self.export_dir, BACKEND_CONFIG_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "pooling_mode": pooling_mode,
+                "max_seq_length": max_seq_length,
+                "input_names": input_names,
+                "quantized": self.quantize,
+                "exported_at": time.time(),
+            }, f, indent=2)
+
+        logger.info(f"📦 ONNX export completed for {self.model_name} in {time.time() - start_time:.1f}s "
+                    f"({'int8' if self.quantize else 'fp32'})")
+
+    def load(self, sentence_model: Any = None):
+        """Load the ONNX session, exporting first if no cached artifact exists"""
+        with self._lock:
+            if self._session is not None:
+                return
+
+            if not self.is_exported():
+                logger.info(f"🔄 No cached ONNX export for {self.model_name}, exporting...")
+                self.export(sentence_model)
+
+            from transformers import AutoTokenizer
+
+            with open(os.path.join(self.export_dir, BACKEND_CONFIG_FILE), encoding="utf-8") as f:
+                backend_config = json.load(f)
+            self._pooling_mode = backend_config.get("pooling_mode", "mean")
+            self._max_seq_length = backend_config.get("max_seq_length", 256)
+
+            self._tokenizer = AutoTokenizer.from_pretrained(self.export_dir)
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.num_threads > 0:
+                options.intra_op_num_threads = self.num_threads
+            self._session = ort.InferenceSession(
+                self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = [i.name for i in self._session.get_inputs()]
+            logger.info(f"✅ ONNX embedding backend ready: {self.model_name} ({self.model_path})")
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True) -> np.ndarray:
+        """
+        Encode texts into sentence embeddings
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        session, tokenizer = self._session, self._tokenizer
+        if session is None:
+            self.load()
+            session, tokenizer = self._session, self._tokenizer
+
+        # Local references keep this call valid if unload() runs concurrently
+        with self._tokenizer_lock:
+            encoded = tokenizer(
+                texts, padding=True, truncation=True,
+                max_length=self._max_seq_length, return_tensors="np"
+            )
+        feeds = {name: encoded[name].astype(np.int64) for name in self._input_names if name in encoded}
+        # InferenceSession.run is thread-safe and releases the GIL: kept outside the lock
+        token_embeddings = session.run(None, feeds)[0]
+
+        embeddings = self._pool(token_embeddings, encoded["attention_mask"])
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Apply the SentenceTransformer pooling strategy"""
+        if self._pooling_mode == "cls":
+            return token_embeddings[:, 0]
+
+        mask = attention_mask[..., None].astype(token_embeddings.dtype)
+        if self._pooling_mode == "max":
+            masked = np.where(mask > 0, token_embeddings, -1e9)
+            return masked.max(axis=1)
+
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return summed / counts
+
+    def unload(self):
+        """Release the ONNX session"""
+        with self._lock:
+            self._session = None
+            self._tokenizer = None
+
+    def get_info(self) -> Dict[str, Any]:
+        """Backend information for model info endpoints"""
+        return {
+            "model_name": self.model_name,
+            "loaded": self._session is not None,
+            "quantized": self.quantize,
+            "pooling_mode": self._pooling_mode,
+            "model_path": self.model_path,
+        }
+
+
+def cosine_agreement(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two embedding matrices"""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    numerator = (a * b).sum(axis=1)
+    denominator = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    return numerator / np.clip(denominator, 1e-12, None)
@@ -1,20 +1,30 @@
 """
 Advanced Response Cache for MEFAPEX AI Assistant
 Implements TTL (Time To Live) and multiple eviction strategies with memory management
+Optional soft TTL: stale entries are served while a background refresh recomputes them
+Optional miss-ratio curve: predicts the hit rate at other sizes and can size
+the cache for a target hit rate within its memory budget
 """
+import asyncio
+import heapq
+import inspect
 import time
-import hashlib
 import threading
 import logging
 import random
 import psutil
 import gc
-from typing import Dict, Optional, Tuple, Any, Union
-from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple, Any, Union, Callable
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 import json
 
+from cache_admission import create_admission_policy
+from cache_keys import make_cache_key
+from housekeeping import get_housekeeping_scheduler
+from miss_ratio_curve import MissRatioCurve, register_miss_ratio_curve, resize_target
+
 logger = logging.getLogger(__name__)
 
 class EvictionPolicy(Enum):
@@ -57,12 +67,17 @@ class AdvancedResponseCache:
     """
     Thread-safe response cache with configurable TTL, size limits, and eviction policies
     Features:
-    - Multiple eviction policies (LRU, FIFO, LFU, Random, TTL-aware)
+    - Multiple eviction policies (LRU, FIFO, LFU, Random, TTL-aware), each
+      O(1) or O(log n) per eviction so inserts stay flat as the cache grows
+    - Expiry heap: expired-entry cleanup only touches expired entries
     - Memory usage monitoring and limits
     - Auto-scaling based on usage patterns
     - Thread-safe operations with performance optimization
     - Comprehensive statistics and monitoring
     - Context-aware caching
+    - Stale-while-revalidate between soft and hard TTL
+    - Optional TinyLFU admission: one-off keys do not displace popular entries
+    - Optional miss-ratio curve: resize for a target hit rate
     """
     
     def __init__(self, 
@@ -71,7 +86,13 @@ class AdvancedResponseCache:
                  eviction_policy: Union[str, EvictionPolicy] = EvictionPolicy.LRU,
                  max_memory_mb: int = 100,
                  auto_scale: bool = True,
-                 cleanup_interval: int = 300):
+                 cleanup_interval: int = 300,
+                 soft_ttl: int = 0,
+                 background_tasks: bool = True,
+                 admission_policy: Optional[str] = None,
+                 miss_ratio_curve: bool = False,
+                 target_hit_rate: float = 0.0,
+                 curve_name: Optional[str] = None):
         """
         Initialize advanced cache
         
@@ -82,6 +103,17 @@ class AdvancedResponseCache:
             max_memory_mb: Maximum memory usage in MB
             auto_scale: Enable auto-scaling based on usage
             cleanup_interval: Cleanup interval in seconds
+            soft_ttl: Age in seconds after which an entry is stale (0 = disabled).
+                Stale entries are still served until ``ttl`` (the hard TTL) while
+                the registered refresher recomputes them in the background
+            background_tasks: Start own cleanup / memory threads (segments of a
+                ShardedResponseCache are maintained by the sharded cache instead)
+            admission_policy: "tinylfu" to admit a new key into a full cache only
+                if it is accessed more often than the eviction victim
+            miss_ratio_curve: Estimate the hit rate as a function of size (SHARDS)
+            target_hit_rate: With a curve, auto-scaling sizes the cache for this
+                hit rate (%) within the memory budget instead of from usage alone
+            curve_name: Publish the curve under this name (admin cache stats)
         """
         self.max_size = max_size
         self.original_max_size = max_size  # Store original for auto-scaling
@@ -89,6 +121,12 @@ class AdvancedResponseCache:
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
         self.auto_scale = auto_scale
         self.cleanup_interval = cleanup_interval
+        self.soft_ttl = soft_ttl if 0 < soft_ttl < ttl else 0
+        
+        # Stale-while-revalidate: recomputes stale entries, at most once per key
+        self.refresher: Optional[Callable] = None
+        self._refreshing: set = set()
+        self._refresh_tasks: set = set()
         
         # Set eviction policy
         if isinstance(eviction_policy, str):
@@ -96,15 +134,30 @@ class AdvancedResponseCache:
         else:
             self.eviction_policy = eviction_policy
         
-        # Cache storage based on eviction policy
-        if self.eviction_policy in [EvictionPolicy.LRU, EvictionPolicy.TTL_AWARE]:
-            self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        else:
-            self._cache: Dict[str, CacheEntry] = {}
+        # Cache storage: insertion order gives FIFO, move_to_end() gives LRU
+        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        
+        # Expiry heap of (timestamp, key) for TTL-aware eviction and expiry cleanup.
+        # Overwritten/removed entries leave stale records that are skipped lazily.
+        self._expiry_heap: List[Tuple[float, str]] = []
         
-        # FIFO queue for FIFO policy
-        if self.eviction_policy == EvictionPolicy.FIFO:
-            self._fifo_queue: deque = deque()
+        # LFU: access_count -> keys in that frequency (oldest first)
+        self._freq_buckets: Dict[int, OrderedDict] = {}
+        self._min_freq = 0
+        
+        # Random: indexable key array with swap-remove
+        self._keys: List[str] = []
+        self._key_index: Dict[str, int] = {}
+        
+        # Admission filter (frequency sketch over all lookups)
+        self.admission_policy = (admission_policy or "none").lower()
+        self._admission = create_admission_policy(self.admission_policy, max_size)
+        
+        # Miss-ratio curve over the key stream
+        self.target_hit_rate = target_hit_rate
+        self._mrc = MissRatioCurve() if miss_ratio_curve else None
+        if self._mrc is not None and curve_name:
+            register_miss_ratio_curve(curve_name, self._mrc, self._size_budget)
         
         # Thread safety
         self._lock = threading.RLock()
@@ -117,42 +170,52 @@ class AdvancedResponseCache:
             'evictions': 0,
             'expirations': 0,
             'memory_evictions': 0,
-            'auto_scale_events': 0
+            'auto_scale_events': 0,
+            'stale_hits': 0,
+            'refreshes': 0,
+            'refresh_failures': 0,
+            'admission_rejects': 0,
+            'mrc_resizes': 0
         }
         
         # Memory tracking
         self._current_memory_usage = 0
         self._last_memory_check = time.time()
         
-        # Start background threads
-        self._start_background_tasks()
+        # Register background housekeeping jobs
+        if background_tasks:
+            self._start_background_tasks()
         
-        logger.info(f"🗄️ AdvancedResponseCache initialized: max_size={max_size}, ttl={ttl}s, "
+        (logger.info if background_tasks else logger.debug)(f"🗄️ AdvancedResponseCache initialized: max_size={max_size}, ttl={ttl}s, "
                    f"policy={self.eviction_policy.value}, max_memory={max_memory_mb}MB")
     
     def _start_background_tasks(self):
-        """Start background cleanup and monitoring threads"""
-        # Cleanup thread
-        self._cleanup_thread = threading.Thread(target=self._periodic_cleanup, daemon=True)
-        self._cleanup_thread.start()
-        
-        # Memory monitoring thread
+        """Register expiry cleanup and auto-scaling with the housekeeping scheduler"""
+        scheduler = get_housekeeping_scheduler()
+        scheduler.schedule_periodic(f"response_cache.cleanup.{id(self):x}",
+                                    self._cleanup_expired, self.cleanup_interval)
         if self.auto_scale:
-            self._memory_thread = threading.Thread(target=self._memory_monitor, daemon=True)
-            self._memory_thread.start()
+            scheduler.schedule_periodic(f"response_cache.auto_scale.{id(self):x}",
+                                        self._auto_scale, 60)
     
     def _get_cache_key(self, message: str, context: str = "") -> str:
-        """Generate cache key from message and context"""
-        normalized_message = message.strip().lower()
-        normalized_context = context.strip().lower() if context else ""
-        combined = f"{normalized_message}:{normalized_context}"
-        return hashlib.md5(combined.encode('utf-8')).hexdigest()
+        """Generate canonical, versioned cache key from message and context"""
+        return make_cache_key(message, context)
     
     def get(self, message: str, context: str = "") -> Optional[Tuple[str, str]]:
         """Retrieve cached response with policy-aware access tracking"""
-        cache_key = self._get_cache_key(message, context)
+        return self._get_by_key(self._get_cache_key(message, context), message, context)
+    
+    def _get_by_key(self, cache_key: str, message: str, context: str = "") -> Optional[Tuple[str, str]]:
+        """Lookup by precomputed cache key (message/context are kept for refreshes)"""
+        stale = False
+        if self._mrc is not None:
+            self._mrc.record(cache_key)
         
         with self._lock:
+            if self._admission is not None:
+                self._admission.record(cache_key)
+            
             if cache_key not in self._cache:
                 self._stats['misses'] += 1
                 return None
@@ -167,28 +230,104 @@ class AdvancedResponseCache:
                 return None
             
             # Update access info
-            entry.touch()
+            if self.eviction_policy == EvictionPolicy.LFU:
+                self._lfu_touch(cache_key, entry)
+            else:
+                entry.touch()
             
             # Handle LRU policy
-            if self.eviction_policy == EvictionPolicy.LRU and isinstance(self._cache, OrderedDict):
+            if self.eviction_policy == EvictionPolicy.LRU:
                 self._cache.move_to_end(cache_key)
             
             self._stats['hits'] += 1
+            if self.soft_ttl and entry.is_expired(self.soft_ttl):
+                stale = True
+                self._stats['stale_hits'] += 1
             logger.debug(f"✅ Cache hit for key: {cache_key[:8]}... (policy: {self.eviction_policy.value})")
             
-            return (entry.response, entry.source)
+            result = (entry.response, entry.source)
+        
+        if stale:
+            self._schedule_refresh(cache_key, message, context)
+        return result
     
-    def set(self, message: str, response: str, context: str = "", source: str = "cached"):
-        """Store response in cache with policy-aware eviction"""
-        cache_key = self._get_cache_key(message, context)
+    def set_refresher(self, refresher: Optional[Callable]):
+        """
+        Register the function that recomputes stale entries
         
+        Args:
+            refresher: ``(message, context) -> (response, source)``, preferably async;
+                returning None keeps the stale entry until its hard TTL
+        """
+        self.refresher = refresher
+    
+    def _schedule_refresh(self, cache_key: str, message: str, context: str):
+        """Start a background refresh for a stale entry unless one is running"""
+        if self.refresher is None:
+            return
         with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+        
+        coro = self._refresh(cache_key, message, context)
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        except RuntimeError:
+            # Called outside an event loop: refresh on a helper thread
+            threading.Thread(target=asyncio.run, args=(coro,), daemon=True).start()
+    
+    async def _refresh(self, cache_key: str, message: str, context: str):
+        """Recompute a stale entry and store the fresh response"""
+        try:
+            result = self.refresher(message, context)
+            if inspect.isawaitable(result):
+                result = await result
+            if result:
+                response, source = result
+                self.set(message, response, context, source)
+                with self._lock:
+                    self._stats['refreshes'] += 1
+                logger.debug(f"🔄 Refreshed stale entry: {cache_key[:8]}...")
+        except Exception as e:
+            with self._lock:
+                self._stats['refresh_failures'] += 1
+            logger.warning(f"Background refresh failed for key {cache_key[:8]}...: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(cache_key)
+    
+    def set(self, message: str, response: str, context: str = "", source: str = "cached",
+            timestamp: Optional[float] = None):
+        """
+        Store response in cache with policy-aware eviction
+        
+        ``timestamp`` keeps the original age of a response copied from another
+        cache layer, so it goes stale and expires on the original schedule.
+        """
+        self._set_by_key(self._get_cache_key(message, context), response, source, timestamp)
+    
+    def _set_by_key(self, cache_key: str, response: str, source: str = "cached",
+                    timestamp: Optional[float] = None):
+        """Store by precomputed cache key"""
+        with self._lock:
+            # Admission: a new key must be more popular than the entry it would evict
+            if (self._admission is not None and cache_key not in self._cache
+                    and len(self._cache) >= self.max_size):
+                victim_key = self._peek_victim()
+                if victim_key is not None and not self._admission.admit(cache_key, victim_key):
+                    self._stats['admission_rejects'] += 1
+                    logger.debug(f"🚪 Admission rejected: {cache_key[:8]}... (victim {victim_key[:8]}...)")
+                    return
+            
             current_time = time.time()
             
             # Create cache entry
             entry = CacheEntry(
                 response=response,
-                timestamp=current_time,
+                timestamp=timestamp if timestamp is not None else current_time,
                 access_count=1,
                 last_accessed=current_time,
                 source=source
@@ -198,20 +337,19 @@ class AdvancedResponseCache:
             entry_size = entry.get_memory_size()
             
             # Handle existing entry
-            if cache_key in self._cache:
-                old_entry = self._cache[cache_key]
+            old_entry = self._cache.get(cache_key)
+            if old_entry is not None:
                 self._current_memory_usage -= old_entry.get_memory_size()
+                if self.eviction_policy == EvictionPolicy.LFU:
+                    self._lfu_discard(cache_key, old_entry.access_count)
             
-            # Add new entry
+            # Add new entry (an overwritten key keeps its FIFO position)
             self._cache[cache_key] = entry
             self._current_memory_usage += entry_size
-            
-            # Handle FIFO queue
-            if self.eviction_policy == EvictionPolicy.FIFO and cache_key not in self._cache:
-                self._fifo_queue.append(cache_key)
+            self._index_entry(cache_key, entry, is_new=old_entry is None)
             
             # Handle LRU ordering
-            if self.eviction_policy == EvictionPolicy.LRU and isinstance(self._cache, OrderedDict):
+            if self.eviction_policy == EvictionPolicy.LRU:
                 self._cache.move_to_end(cache_key)
             
             self._stats['sets'] += 1
@@ -232,6 +370,75 @@ class AdvancedResponseCache:
         while len(self._cache) > self.max_size:
             self._evict_one()
     
+    def _index_entry(self, cache_key: str, entry: CacheEntry, is_new: bool):
+        """Register an entry in the eviction / expiry structures"""
+        heapq.heappush(self._expiry_heap, (entry.timestamp, cache_key))
+        if len(self._expiry_heap) > 2 * len(self._cache) + 1024:
+            self._compact_expiry_heap()
+        
+        if self.eviction_policy == EvictionPolicy.LFU:
+            self._lfu_add(cache_key, entry.access_count)
+        elif self.eviction_policy == EvictionPolicy.RANDOM and is_new:
+            self._key_index[cache_key] = len(self._keys)
+            self._keys.append(cache_key)
+    
+    def _compact_expiry_heap(self):
+        """Drop stale heap records left by overwritten or removed entries"""
+        self._expiry_heap = [(entry.timestamp, key) for key, entry in self._cache.items()]
+        heapq.heapify(self._expiry_heap)
+    
+    def _lfu_add(self, cache_key: str, freq: int):
+        """Put a key into its frequency bucket"""
+        bucket = self._freq_buckets.get(freq)
+        if bucket is None:
+            bucket = self._freq_buckets[freq] = OrderedDict()
+        bucket[cache_key] = None
+        if freq < self._min_freq or len(self._freq_buckets) == 1:
+            self._min_freq = freq
+    
+    def _lfu_touch(self, cache_key: str, entry: CacheEntry):
+        """Record an access: move the key to the next frequency bucket in O(1)"""
+        freq = entry.access_count
+        bucket = self._freq_buckets[freq]
+        del bucket[cache_key]
+        if not bucket:
+            del self._freq_buckets[freq]
+            if freq == self._min_freq:
+                self._min_freq = freq + 1
+        entry.touch()
+        self._lfu_add(cache_key, entry.access_count)
+    
+    def _lfu_discard(self, cache_key: str, freq: int):
+        """Take a key out of its frequency bucket"""
+        bucket = self._freq_buckets.get(freq)
+        if bucket is None:
+            return
+        bucket.pop(cache_key, None)
+        if not bucket:
+            del self._freq_buckets[freq]
+            if freq == self._min_freq and self._freq_buckets:
+                # Rare (removal of the last least-frequent key): rescan the few distinct frequencies
+                self._min_freq = min(self._freq_buckets)
+    
+    def _peek_victim(self) -> Optional[str]:
+        """Key the eviction policy would remove next, without removing it"""
+        if not self._cache:
+            return None
+        if self.eviction_policy in (EvictionPolicy.LRU, EvictionPolicy.FIFO):
+            return next(iter(self._cache))
+        if self.eviction_policy == EvictionPolicy.LFU:
+            return next(iter(self._freq_buckets[self._min_freq]))
+        if self.eviction_policy == EvictionPolicy.RANDOM:
+            return self._keys[random.randrange(len(self._keys))]
+        # TTL-aware: drop stale heap records until the top is a live entry
+        while self._expiry_heap:
+            timestamp, key = self._expiry_heap[0]
+            entry = self._cache.get(key)
+            if entry is not None and entry.timestamp == timestamp:
+                return key
+            heapq.heappop(self._expiry_heap)
+        return None
+    
     def _evict_one(self):
         """Evict one entry based on the configured policy"""
         if not self._cache:
@@ -249,58 +456,43 @@ class AdvancedResponseCache:
             self._evict_ttl_aware()
     
     def _evict_lru(self):
-        """Evict least recently used entry"""
-        if isinstance(self._cache, OrderedDict):
-            evicted_key, _ = self._cache.popitem(last=False)
-        else:
-            # Fallback for non-OrderedDict
-            evicted_key = min(self._cache.keys(), 
-                            key=lambda k: self._cache[k].last_accessed)
-            del self._cache[evicted_key]
-        
-        self._current_memory_usage -= self._cache.get(evicted_key, CacheEntry("", 0, 0, 0, "")).get_memory_size()
+        """Evict least recently used entry - O(1), recency order is kept by move_to_end()"""
+        evicted_key = next(iter(self._cache))
+        self._remove_entry(evicted_key)
         self._stats['evictions'] += 1
         logger.debug(f"🗑️ LRU evicted: {evicted_key[:8]}...")
     
     def _evict_fifo(self):
-        """Evict first in, first out entry"""
-        if hasattr(self, '_fifo_queue') and self._fifo_queue:
-            evicted_key = self._fifo_queue.popleft()
-            if evicted_key in self._cache:
-                entry = self._cache[evicted_key]
-                self._current_memory_usage -= entry.get_memory_size()
-                del self._cache[evicted_key]
-                self._stats['evictions'] += 1
-                logger.debug(f"�️ FIFO evicted: {evicted_key[:8]}...")
+        """Evict first in, first out entry - O(1), insertion order of the OrderedDict"""
+        evicted_key = next(iter(self._cache))
+        self._remove_entry(evicted_key)
+        self._stats['evictions'] += 1
+        logger.debug(f"🗑️ FIFO evicted: {evicted_key[:8]}...")
     
     def _evict_lfu(self):
-        """Evict least frequently used entry"""
-        evicted_key = min(self._cache.keys(), 
-                         key=lambda k: self._cache[k].access_count)
-        entry = self._cache[evicted_key]
-        self._current_memory_usage -= entry.get_memory_size()
-        del self._cache[evicted_key]
+        """Evict least frequently used entry - O(1), oldest key of the lowest frequency bucket"""
+        evicted_key = next(iter(self._freq_buckets[self._min_freq]))
+        self._remove_entry(evicted_key)
         self._stats['evictions'] += 1
         logger.debug(f"🗑️ LFU evicted: {evicted_key[:8]}...")
     
     def _evict_random(self):
-        """Evict random entry"""
-        evicted_key = random.choice(list(self._cache.keys()))
-        entry = self._cache[evicted_key]
-        self._current_memory_usage -= entry.get_memory_size()
-        del self._cache[evicted_key]
+        """Evict random entry - O(1) pick from the key array"""
+        evicted_key = self._keys[random.randrange(len(self._keys))]
+        self._remove_entry(evicted_key)
         self._stats['evictions'] += 1
         logger.debug(f"🗑️ Random evicted: {evicted_key[:8]}...")
     
     def _evict_ttl_aware(self):
-        """Evict entry closest to expiration"""
-        evicted_key = min(self._cache.keys(), 
-                         key=lambda k: self._cache[k].time_until_expiry(self.ttl))
-        entry = self._cache[evicted_key]
-        self._current_memory_usage -= entry.get_memory_size()
-        del self._cache[evicted_key]
-        self._stats['evictions'] += 1
-        logger.debug(f"🗑️ TTL-aware evicted: {evicted_key[:8]}...")
+        """Evict entry closest to expiration - O(log n) amortized via the expiry heap"""
+        while self._expiry_heap:
+            timestamp, evicted_key = heapq.heappop(self._expiry_heap)
+            entry = self._cache.get(evicted_key)
+            if entry is not None and entry.timestamp == timestamp:
+                self._remove_entry(evicted_key)
+                self._stats['evictions'] += 1
+                logger.debug(f"🗑️ TTL-aware evicted: {evicted_key[:8]}...")
+                return
     
     def _evict_by_memory(self):
         """Evict entries until memory usage is under limit"""
@@ -316,86 +508,115 @@ class AdvancedResponseCache:
         logger.info(f"🧹 Memory eviction completed. Usage: {self._current_memory_usage//1024}KB/{self.max_memory_bytes//1024}KB")
     
     def _remove_entry(self, cache_key: str):
-        """Remove entry and update memory tracking"""
-        if cache_key in self._cache:
-            entry = self._cache[cache_key]
-            self._current_memory_usage -= entry.get_memory_size()
-            del self._cache[cache_key]
-            
-            # Remove from FIFO queue if applicable
-            if self.eviction_policy == EvictionPolicy.FIFO and hasattr(self, '_fifo_queue'):
-                try:
-                    self._fifo_queue.remove(cache_key)
-                except ValueError:
-                    pass  # Key not in queue
-    
-    def _periodic_cleanup(self):
-        """Periodic cleanup of expired entries"""
-        while True:
-            try:
-                time.sleep(self.cleanup_interval)
-                self._cleanup_expired()
-            except Exception as e:
-                logger.error(f"Cache cleanup error: {e}")
+        """Remove entry and update memory tracking and eviction structures"""
+        entry = self._cache.pop(cache_key, None)
+        if entry is None:
+            return
+        self._current_memory_usage -= entry.get_memory_size()
+        
+        if self.eviction_policy == EvictionPolicy.LFU:
+            self._lfu_discard(cache_key, entry.access_count)
+        elif self.eviction_policy == EvictionPolicy.RANDOM:
+            # Swap-remove keeps the key array dense
+            index = self._key_index.pop(cache_key)
+            last_key = self._keys.pop()
+            if last_key != cache_key:
+                self._keys[index] = last_key
+                self._key_index[last_key] = index
+        # Expiry heap records are discarded lazily
     
     def _cleanup_expired(self):
-        """Remove expired entries from cache"""
+        """Remove expired entries from cache, oldest first from the expiry heap"""
         current_time = time.time()
-        expired_keys = []
+        expired_count = 0
         
         with self._lock:
-            for key, entry in self._cache.items():
-                if entry.is_expired(self.ttl):
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                self._remove_entry(key)
-                self._stats['expirations'] += 1
+            while self._expiry_heap and current_time - self._expiry_heap[0][0] > self.ttl:
+                timestamp, key = heapq.heappop(self._expiry_heap)
+                entry = self._cache.get(key)
+                if entry is not None and entry.timestamp == timestamp:
+                    self._remove_entry(key)
+                    self._stats['expirations'] += 1
+                    expired_count += 1
         
-        if expired_keys:
-            logger.info(f"🧹 Cleaned up {len(expired_keys)} expired cache entries")
+        if expired_count:
+            logger.info(f"🧹 Cleaned up {expired_count} expired cache entries")
     
-    def _memory_monitor(self):
-        """Monitor memory usage and auto-scale if needed"""
-        while True:
-            try:
-                time.sleep(60)  # Check every minute
-                
-                with self._lock:
-                    # Get system memory info
-                    memory_info = psutil.virtual_memory()
-                    system_memory_percent = memory_info.percent
-                    
-                    # Calculate cache usage ratio
-                    usage_ratio = len(self._cache) / self.max_size if self.max_size > 0 else 0
-                    memory_ratio = self._current_memory_usage / self.max_memory_bytes if self.max_memory_bytes > 0 else 0
-                    
-                    # Auto-scale based on usage patterns
-                    if usage_ratio > 0.9 and memory_ratio < 0.7 and system_memory_percent < 80:
-                        # Scale up
-                        new_size = min(self.max_size * 2, self.original_max_size * 10)
-                        if new_size != self.max_size:
-                            self.max_size = new_size
-                            self._stats['auto_scale_events'] += 1
-                            logger.info(f"📈 Auto-scaled cache up to {new_size} entries")
-                    
-                    elif usage_ratio < 0.5 and self.max_size > self.original_max_size:
-                        # Scale down
-                        new_size = max(self.max_size // 2, self.original_max_size)
-                        if new_size != self.max_size:
-                            self.max_size = new_size
-                            self._stats['auto_scale_events'] += 1
-                            logger.info(f"📉 Auto-scaled cache down to {new_size} entries")
-                
-            except Exception as e:
-                logger.error(f"Memory monitoring error: {e}")
+    def _auto_scale(self, system_memory_percent: Optional[float] = None):
+        """Grow or shrink max_size based on usage and system memory"""
+        if self._resize_for_target_hit_rate():
+            return
+        if system_memory_percent is None:
+            system_memory_percent = psutil.virtual_memory().percent
+        
+        with self._lock:
+            # Calculate cache usage ratio
+            usage_ratio = len(self._cache) / self.max_size if self.max_size > 0 else 0
+            memory_ratio = self._current_memory_usage / self.max_memory_bytes if self.max_memory_bytes > 0 else 0
+            
+            # Auto-scale based on usage patterns
+            if usage_ratio > 0.9 and memory_ratio < 0.7 and system_memory_percent < 80:
+                # Scale up
+                new_size = min(self.max_size * 2, self.original_max_size * 10)
+                if new_size != self.max_size:
+                    self.max_size = new_size
+                    self._stats['auto_scale_events'] += 1
+                    logger.info(f"📈 Auto-scaled cache up to {new_size} entries")
+            
+            elif usage_ratio < 0.5 and self.max_size > self.original_max_size:
+                # Scale down
+                new_size = max(self.max_size // 2, self.original_max_size)
+                if new_size != self.max_size:
+                    self.max_size = new_size
+                    self._stats['auto_scale_events'] += 1
+                    logger.info(f"📉 Auto-scaled cache down to {new_size} entries")
+    
+    def _size_budget(self) -> int:
+        """Largest size the memory limit allows at the current average entry size"""
+        with self._lock:
+            limit = self.original_max_size * 10
+            if self._cache and self._current_memory_usage:
+                limit = min(limit, int(self.max_memory_bytes * len(self._cache) / self._current_memory_usage))
+            return max(1, limit)
+    
+    def _resize_for_target_hit_rate(self) -> bool:
+        """Size the cache from its miss-ratio curve; False if there is no target or curve yet"""
+        if self._mrc is None or not self.target_hit_rate or not self._mrc.ready:
+            return False
+        new_size = resize_target(self._mrc, self.target_hit_rate, self.max_size,
+                                 min_size=max(1, self.original_max_size // 10),
+                                 max_size=self._size_budget())
+        if new_size is not None:
+            with self._lock:
+                self.max_size = new_size
+                self._enforce_limits()
+                self._stats['auto_scale_events'] += 1
+                self._stats['mrc_resizes'] += 1
+            logger.info(f"📐 Resized cache to {new_size} entries for a {self.target_hit_rate}% hit rate "
+                        f"(predicted {self._mrc.hit_rate(new_size)}%)")
+        return True
+    
+    def delete(self, message: str, context: str = "") -> bool:
+        """Remove a cached response; returns True if it was cached"""
+        return self._delete_by_key(self._get_cache_key(message, context))
+    
+    def _delete_by_key(self, cache_key: str) -> bool:
+        """Remove by precomputed cache key"""
+        with self._lock:
+            if cache_key not in self._cache:
+                return False
+            self._remove_entry(cache_key)
+            return True
     
     def clear(self):
         """Clear all cache entries"""
         with self._lock:
             self._cache.clear()
-            if hasattr(self, '_fifo_queue'):
-                self._fifo_queue.clear()
+            self._expiry_heap.clear()
+            self._freq_buckets.clear()
+            self._min_freq = 0
+            self._keys.clear()
+            self._key_index.clear()
             self._current_memory_usage = 0
             logger.info("🗑️ Cache cleared")
     
@@ -418,12 +639,17 @@ class AdvancedResponseCache:
                 'max_size': self.max_size,
                 'original_max_size': self.original_max_size,
                 'ttl': self.ttl,
+                'soft_ttl': self.soft_ttl,
+                'refreshing': len(self._refreshing),
                 'eviction_policy': self.eviction_policy.value,
+                'admission_policy': self.admission_policy,
                 'hit_rate': round(hit_rate * 100, 2),
                 'memory_usage_mb': round(memory_usage_mb, 2),
                 'memory_limit_mb': round(memory_limit_mb, 2),
                 'memory_usage_percent': round((memory_usage_mb / memory_limit_mb * 100), 2) if memory_limit_mb > 0 else 0,
                 'auto_scale_enabled': self.auto_scale,
+                'target_hit_rate': self.target_hit_rate,
+                'predicted_hit_rate': self._mrc.hit_rate(self.max_size) if self._mrc else None,
                 **self._stats
             }
     
@@ -459,12 +685,13 @@ class AdvancedResponseCache:
             gc.collect()
             
             # Rebuild cache structure for OrderedDict efficiency
-            if isinstance(self._cache, OrderedDict) and len(self._cache) > 100:
+            if len(self._cache) > 100:
                 # Rebuild to optimize internal structure
                 items = list(self._cache.items())
                 self._cache.clear()
                 for key, entry in items:
                     self._cache[key] = entry
+            self._compact_expiry_heap()
             
             logger.info(f"🔧 Cache optimized: {len(self._cache)} entries, {self._current_memory_usage//1024}KB memory")
 
@@ -482,8 +709,196 @@ class SimpleResponseCache(AdvancedResponseCache):
             cleanup_interval=300
         )
 
+class ShardedResponseCache:
+    """
+    Lock-striped response cache made of N independent AdvancedResponseCache segments
+    Features:
+    - Each segment has its own lock, eviction state and memory accounting
+    - Keys are hashed once, outside any lock, and routed to their segment
+    - Statistics are aggregated only when requested
+    - One housekeeping job sweeps a single segment per tick, so expiry
+      cleanup and auto-scaling never stop the whole cache
+    """
+    
+    # Counters that are summed across segments in get_stats()
+    _ADDITIVE_STATS = ('size', 'max_size', 'original_max_size', 'refreshing', 'hits', 'misses',
+                       'sets', 'evictions', 'expirations', 'memory_evictions', 'auto_scale_events',
+                       'stale_hits', 'refreshes', 'refresh_failures', 'admission_rejects', 'mrc_resizes')
+    
+    def __init__(self,
+                 shards: int = 16,
+                 max_size: int = 1000,
+                 ttl: int = 3600,
+                 eviction_policy: Union[str, EvictionPolicy] = EvictionPolicy.LRU,
+                 max_memory_mb: int = 100,
+                 auto_scale: bool = True,
+                 cleanup_interval: int = 300,
+                 soft_ttl: int = 0,
+                 admission_policy: Optional[str] = None,
+                 miss_ratio_curve: bool = False,
+                 target_hit_rate: float = 0.0,
+                 curve_name: Optional[str] = None):
+        """
+        Initialize sharded cache; size and memory limits are split evenly across shards
+        (each segment keeps its own admission sketch). The miss-ratio curve covers the
+        whole key stream and resizing splits the new size evenly across segments.
+        """
+        self.shards = max(1, shards)
+        self.ttl = ttl
+        self.auto_scale = auto_scale
+        self.cleanup_interval = cleanup_interval
+        self._segments = [
+            AdvancedResponseCache(
+                max_size=max(1, -(-max_size // self.shards)),
+                ttl=ttl,
+                eviction_policy=eviction_policy,
+                max_memory_mb=max_memory_mb / self.shards,
+                auto_scale=auto_scale,
+                cleanup_interval=cleanup_interval,
+                soft_ttl=soft_ttl,
+                background_tasks=False,
+                admission_policy=admission_policy
+            )
+            for _ in range(self.shards)
+        ]
+        self.eviction_policy = self._segments[0].eviction_policy
+        self.soft_ttl = self._segments[0].soft_ttl
+        self.admission_policy = self._segments[0].admission_policy
+        self.refresher: Optional[Callable] = None
+        
+        self.target_hit_rate = target_hit_rate
+        self._mrc = MissRatioCurve() if miss_ratio_curve else None
+        if self._mrc is not None and curve_name:
+            register_miss_ratio_curve(curve_name, self._mrc, self._size_budget)
+        
+        # One segment is swept per tick, so no sweep holds every lock at once
+        self._next_segment = 0
+        scheduler = get_housekeeping_scheduler()
+        scheduler.schedule_periodic(f"sharded_cache.sweep.{id(self):x}", self._sweep_next_segment,
+                                    max(scheduler.tick, self.cleanup_interval / self.shards), jitter=0)
+        if self.auto_scale:
+            scheduler.schedule_periodic(f"sharded_cache.auto_scale.{id(self):x}", self._auto_scale_segments, 60)
+        
+        logger.info(f"🗄️ ShardedResponseCache initialized: shards={self.shards}, max_size={max_size}, "
+                   f"ttl={ttl}s, policy={self.eviction_policy.value}, max_memory={max_memory_mb}MB")
+    
+    def _get_cache_key(self, message: str, context: str = "") -> str:
+        """Generate cache key from message and context"""
+        return self._segments[0]._get_cache_key(message, context)
+    
+    def _segment_for(self, cache_key: str) -> AdvancedResponseCache:
+        """Route a cache key to its segment"""
+        return self._segments[int(cache_key[-8:], 16) % self.shards]
+    
+    def get(self, message: str, context: str = "") -> Optional[Tuple[str, str]]:
+        """Retrieve cached response from the key's segment"""
+        cache_key = self._get_cache_key(message, context)
+        if self._mrc is not None:
+            self._mrc.record(cache_key)
+        return self._segment_for(cache_key)._get_by_key(cache_key, message, context)
+    
+    def set(self, message: str, response: str, context: str = "", source: str = "cached",
+            timestamp: Optional[float] = None):
+        """Store response in the key's segment"""
+        cache_key = self._get_cache_key(message, context)
+        self._segment_for(cache_key)._set_by_key(cache_key, response, source, timestamp)
+    
+    def delete(self, message: str, context: str = "") -> bool:
+        """Remove a cached response from its segment"""
+        return self._delete_by_key(self._get_cache_key(message, context))
+    
+    def _delete_by_key(self, cache_key: str) -> bool:
+        """Remove by precomputed cache key"""
+        return self._segment_for(cache_key)._delete_by_key(cache_key)
+    
+    def set_refresher(self, refresher: Optional[Callable]):
+        """Register the stale-entry refresher on every segment"""
+        self.refresher = refresher
+        for segment in self._segments:
+            segment.set_refresher(refresher)
+    
+    def _sweep_next_segment(self):
+        """Expire entries of the next segment in turn"""
+        index = self._next_segment
+        self._next_segment = (index + 1) % self.shards
+        self._segments[index]._cleanup_expired()
+    
+    def _auto_scale_segments(self):
+        """Size segments from the miss-ratio curve, else auto-scale each on memory"""
+        if not self._resize_for_target_hit_rate():
+            system_memory_percent = psutil.virtual_memory().percent
+            for segment in self._segments:
+                segment._auto_scale(system_memory_percent)
+    
+    def _size_budget(self) -> int:
+        """Largest total size the segments' memory limits allow"""
+        return sum(segment._size_budget() for segment in self._segments)
+    
+    def _resize_for_target_hit_rate(self) -> bool:
+        """Size all segments from the miss-ratio curve; False if there is no target or curve yet"""
+        if self._mrc is None or not self.target_hit_rate or not self._mrc.ready:
+            return False
+        current = sum(segment.max_size for segment in self._segments)
+        original = sum(segment.original_max_size for segment in self._segments)
+        new_size = resize_target(self._mrc, self.target_hit_rate, current,
+                                 min_size=max(self.shards, original // 10),
+                                 max_size=self._size_budget())
+        if new_size is not None:
+            for segment in self._segments:
+                with segment._lock:
+                    segment.max_size = max(1, -(-new_size // self.shards))
+                    segment._enforce_limits()
+                    segment._stats['auto_scale_events'] += 1
+                    segment._stats['mrc_resizes'] += 1
+            logger.info(f"📐 Resized sharded cache to {new_size} entries for a {self.target_hit_rate}% hit rate "
+                        f"(predicted {self._mrc.hit_rate(new_size)}%)")
+        return True
+    
+    def clear(self):
+        """Clear all segments"""
+        for segment in self._segments:
+            segment.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregate segment statistics"""
+        segment_stats = [segment.get_stats() for segment in self._segments]
+        stats = {key: sum(s[key] for s in segment_stats) for key in self._ADDITIVE_STATS}
+        
+        lookups = stats['hits'] + stats['misses']
+        memory_usage_mb = sum(segment._current_memory_usage for segment in self._segments) / (1024 * 1024)
+        memory_limit_mb = sum(segment.max_memory_bytes for segment in self._segments) / (1024 * 1024)
+        
+        return {
+            'type': 'sharded_response_cache',
+            'shards': self.shards,
+            'largest_shard_size': max(s['size'] for s in segment_stats),
+            'ttl': self.ttl,
+            'soft_ttl': self.soft_ttl,
+            'eviction_policy': self.eviction_policy.value,
+            'admission_policy': self.admission_policy,
+            'hit_rate': round(stats['hits'] / lookups * 100, 2) if lookups else 0,
+            'memory_usage_mb': round(memory_usage_mb, 2),
+            'memory_limit_mb': round(memory_limit_mb, 2),
+            'memory_usage_percent': round(memory_usage_mb / memory_limit_mb * 100, 2) if memory_limit_mb > 0 else 0,
+            'auto_scale_enabled': self.auto_scale,
+            'target_hit_rate': self.target_hit_rate,
+            'predicted_hit_rate': self._mrc.hit_rate(stats['max_size']) if self._mrc else None,
+            **stats
+        }
+    
+    def get_popular_entries(self, limit: int = 10) -> list:
+        """Get most frequently accessed cache entries across segments"""
+        entries = [entry for segment in self._segments for entry in segment.get_popular_entries(limit)]
+        entries.sort(key=lambda entry: entry['access_count'], reverse=True)
+        return entries[:limit]
+    
+    def optimize(self):
+        """Optimize segments one at a time"""
+        for segment in self._segments:
+            segment.optimize()
+
 # Factory function to create cache with configuration
-def create_response_cache(config=None) -> AdvancedResponseCache:
+def create_response_cache(config=None) -> Union[AdvancedResponseCache, ShardedResponseCache]:
     """Factory function to create response cache with configuration"""
     if not config:
         from core.config_utils import get_cache_settings
@@ -497,7 +912,12 @@ def create_response_cache(config=None) -> AdvancedResponseCache:
                 'eviction_policy': config.response_cache_eviction_policy,
                 'max_memory_mb': getattr(config, 'max_memory_usage_mb', 100),
                 'auto_scale': getattr(config, 'auto_scale_enabled', True),
-                'cleanup_interval': getattr(config, 'cleanup_interval', 300)
+                'cleanup_interval': getattr(config, 'cleanup_interval', 300),
+                'soft_ttl': getattr(config, 'response_cache_soft_ttl', 0),
+                'shards': getattr(config, 'cache_shards', 1),
+                'admission_policy': getattr(config, 'cache_admission_policy', 'none'),
+                'miss_ratio_curve': getattr(config, 'cache_miss_ratio_curve', True),
+                'target_hit_rate': getattr(config, 'cache_target_hit_rate', 0.0)
             }
         else:
             # Legacy config
@@ -510,13 +930,34 @@ def create_response_cache(config=None) -> AdvancedResponseCache:
                 'cleanup_interval': 300
             }
     
+    if cache_settings.get('shards', 1) > 1:
+        return ShardedResponseCache(
+            shards=cache_settings['shards'],
+            max_size=cache_settings['max_size'],
+            ttl=cache_settings['ttl'],
+            eviction_policy=EvictionPolicy(cache_settings['eviction_policy']),
+            max_memory_mb=cache_settings['max_memory_mb'],
+            auto_scale=cache_settings['auto_scale'],
+            cleanup_interval=cache_settings['cleanup_interval'],
+            soft_ttl=cache_settings.get('soft_ttl', 0),
+            admission_policy=cache_settings.get('admission_policy'),
+            miss_ratio_curve=cache_settings.get('miss_ratio_curve', False),
+            target_hit_rate=cache_settings.get('target_hit_rate', 0.0),
+            curve_name="response_cache"
+        )
+    
     return AdvancedResponseCache(
         max_size=cache_settings['max_size'],
         ttl=cache_settings['ttl'],
         eviction_policy=EvictionPolicy(cache_settings['eviction_policy']),
         max_memory_mb=cache_settings['max_memory_mb'],
         auto_scale=cache_settings['auto_scale'],
-        cleanup_interval=cache_settings['cleanup_interval']
+        cleanup_interval=cache_settings['cleanup_interval'],
+        soft_ttl=cache_settings.get('soft_ttl', 0),
+        admission_policy=cache_settings.get('admission_policy'),
+        miss_ratio_curve=cache_settings.get('miss_ratio_curve', False),
+        target_hit_rate=cache_settings.get('target_hit_rate', 0.0),
+        curve_name="response_cache"
     )
 
 # Global cache instance - will be replaced with factory-created instance
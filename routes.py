@@ -414,6 +414,10 @@ def setup_routes(app: FastAPI, services: Dict[str, Any]):
             except ImportError:
                 memory_info["memory_monitor"] = "not_available"
             
+            # Background job runtimes (cache sweeps, monitors, cleanups)
+            from housekeeping import get_housekeeping_scheduler
+            memory_info["housekeeping"] = get_housekeeping_scheduler().get_stats()
+            
             # Model manager info if available
             try:
                 if model_manager and hasattr(model_manager, 'get_model_info'):
@@ -562,7 +566,9 @@ def setup_routes(app: FastAPI, services: Dict[str, Any]):
                     stats = distributed_cache.get_stats()
                 else:
                     stats = {"error": "No stats method available"}
-                return {"status": "success", "cache_stats": stats}
+                # Predicted hit rate vs. size of every cache (SHARDS miss-ratio curves)
+                from miss_ratio_curve import get_miss_ratio_curves
+                return {"status": "success", "cache_stats": stats, "miss_ratio_curves": get_miss_ratio_curves()}
             else:
                 return {"status": "error", "message": "Cache not available"}
         except Exception as e:
@@ -741,16 +747,27 @@ def setup_routes(app: FastAPI, services: Dict[str, Any]):
                 await websocket.close(code=1008, reason=error_msg)
                 return
             
+            # Authenticate the handshake (access token cookie or Authorization header)
+            try:
+                user_info = verify_token_from_request(websocket)
+            except HTTPException as e:
+                await websocket.close(code=1008, reason=e.detail)
+                return
+            if str(user_info["user_id"]) != user_id:
+                await websocket.close(code=1008, reason="User mismatch")
+                return
+            websocket.user_info = user_info
+            
             # Connect user - handle both legacy and distributed managers
             if hasattr(websocket_manager, 'connect') and len(websocket_manager.connect.__code__.co_varnames) > 3:
                 # Distributed manager (returns session_id)
-                session_id = await websocket_manager.connect(websocket, user_id, f"user_{user_id}")
+                session_id = await websocket_manager.connect(websocket, user_id, user_info["username"])
                 if session_id is None:
                     await websocket.close(code=1011, reason="Session creation failed")
                     return
             else:
                 # Legacy manager
-                await websocket_manager.connect(websocket, user_id, f"user_{user_id}")
+                await websocket_manager.connect(websocket, user_id, user_info["username"])
             
             logger.info(f"🔌 WebSocket connected: {user_id} (session: {session_id or 'legacy'})")
             
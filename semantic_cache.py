@@ -0,0 +1,382 @@
+"""
+🧭 Semantic Response Cache for MEFAPEX AI Assistant
+Near-duplicate questions share an answer: "çalışma saatleri nedir" and
+"çalışma saatleriniz nedir?" hash to different exact-cache keys but have
+almost identical embeddings.
+
+- Recent query embeddings live in a small in-memory ANN index
+  (random-hyperplane LSH buckets + exact cosine re-ranking), one per
+  embedding dimension, since vectors of different models (768-d Turkish,
+  384-d English fallback) cannot be compared
+- A hit needs cosine similarity above the threshold of the cached answer's
+  source (generated answers need a closer match than FAQ answers)
+- Optional verification sample: a fraction of hits is recomputed in the
+  background and compared, giving a measured false-hit rate
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Answers from these sources are never reused for other phrasings
+UNCACHEABLE_SOURCES = frozenset({"fallback", "semantic_cache"})
+
+DEFAULT_SOURCE_THRESHOLDS = {
+    "static_content": 0.90,
+    "knowledge_base": 0.90,
+    "openai": 0.94,
+    "huggingface": 0.95,
+}
+
+@dataclass
+class SemanticEntry:
+    """Cached answer of one query"""
+    message: str
+    response: str
+    source: str
+    timestamp: float
+
+@dataclass
+class SemanticLookup:
+    """Result of a semantic lookup; the embedding is reused when storing"""
+    response: Optional[str]
+    source: Optional[str]
+    similarity: float
+    embedding: Optional[np.ndarray]
+    matched_message: Optional[str] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.response is not None
+
+class EmbeddingIndex:
+    """
+    Bounded ANN index over unit vectors
+
+    Vectors live in a ring buffer; LSH tables narrow the search to a few
+    candidate slots which are then scored exactly. Small indexes are scanned
+    fully, which is both exact and faster than hashing.
+    """
+
+    def __init__(self, capacity: int = 2048, tables: int = 4, bits: int = 10,
+                 brute_force_limit: int = 512, seed: int = 1923):
+        self.capacity = max(1, capacity)
+        self.tables = tables
+        self.bits = bits
+        self.brute_force_limit = brute_force_limit
+        self._rng = np.random.default_rng(seed)
+        self._vectors: Optional[np.ndarray] = None
+        self._planes: Optional[np.ndarray] = None
+        self._codes = np.zeros((self.capacity, tables), dtype=np.int64)
+        self._buckets: List[Dict[int, set]] = [dict() for _ in range(tables)]
+        self._size = 0
+        self._next_slot = 0
+        self._powers = 1 << np.arange(bits, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _hash(self, vector: np.ndarray) -> np.ndarray:
+        projections = (self._planes @ vector).reshape(self.tables, self.bits) > 0
+        return projections @ self._powers
+
+    def add(self, vector: np.ndarray) -> int:
+        """Insert a unit vector, overwriting the oldest slot when full; returns the slot"""
+        if self._vectors is None:
+            dim = vector.shape[0]
+            self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+            self._planes = self._rng.standard_normal((self.tables * self.bits, dim)).astype(np.float32)
+
+        slot = self._next_slot
+        if self._size == self.capacity:
+            for table, code in enumerate(self._codes[slot]):
+                bucket = self._buckets[table].get(int(code))
+                if bucket is not None:
+                    bucket.discard(slot)
+                    if not bucket:
+                        del self._buckets[table][int(code)]
+        else:
+            self._size += 1
+
+        self._vectors[slot] = vector
+        codes = self._hash(vector)
+        self._codes[slot] = codes
+        for table, code in enumerate(codes):
+            self._buckets[table].setdefault(int(code), set()).add(slot)
+
+        self._next_slot = (slot + 1) % self.capacity
+        return slot
+
+    def search(self, vector: np.ndarray, k: int = 3) -> List[Tuple[int, float]]:
+        """Top-k (slot, cosine similarity) pairs"""
+        if self._size == 0 or self._vectors is None or vector.shape[0] != self._vectors.shape[1]:
+            return []
+        if self._size <= self.brute_force_limit:
+            candidates = np.arange(self._size)
+        else:
+            slots = set()
+            for table, code in enumerate(self._hash(vector)):
+                slots.update(self._buckets[table].get(int(code), ()))
+            if not slots:
+                return []
+            candidates = np.fromiter(slots, dtype=np.int64)
+
+        scores = self._vectors[candidates] @ vector
+        top = np.argsort(scores)[::-1][:k]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def clear(self):
+        self._vectors = None
+        self._buckets = [dict() for _ in range(self.tables)]
+        self._size = 0
+        self._next_slot = 0
+
+class SemanticResponseCache:
+    """
+    Semantic near-duplicate cache in front of answer generation
+
+    ``embed`` is the (blocking) text -> vector function; it runs in the
+    default executor so lookups do not block the event loop.
+    """
+
+    def __init__(self,
+                 embed: Callable[[str], Any],
+                 max_entries: int = 2048,
+                 ttl: int = 3600,
+                 default_threshold: float = 0.93,
+                 source_thresholds: Optional[Dict[str, float]] = None,
+                 verify_sample_rate: float = 0.0,
+                 verifier: Optional[Callable[[str], Awaitable[Tuple[str, str]]]] = None,
+                 answer_match_threshold: float = 0.90):
+        """
+        Args:
+            embed: Text embedding function
+            max_entries: Query embeddings kept in the index (oldest are replaced)
+            ttl: Seconds a cached answer may be reused
+            default_threshold: Cosine threshold for sources without their own
+            source_thresholds: Per-source cosine thresholds
+            verify_sample_rate: Fraction of hits recomputed in the background
+            verifier: Recomputes the answer for verification (message -> (response, source))
+            answer_match_threshold: Answer-embedding similarity that counts as the same answer
+        """
+        self.embed = embed
+        self.ttl = ttl
+        self.default_threshold = default_threshold
+        self.source_thresholds = {**DEFAULT_SOURCE_THRESHOLDS, **(source_thresholds or {})}
+        self.verify_sample_rate = verify_sample_rate
+        self.verifier = verifier
+        self.answer_match_threshold = answer_match_threshold
+
+        self.max_entries = max_entries
+        # Embedding dimension -> index; entries are keyed by (dimension, slot)
+        self._indexes: Dict[int, EmbeddingIndex] = {}
+        self._entries: Dict[Tuple[int, int], SemanticEntry] = {}
+        self._lock = threading.Lock()
+        self._verify_tasks: set = set()
+        self._stats = {
+            'lookups': 0,
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'embedding_errors': 0,
+            'store_errors': 0,
+            'verified_hits': 0,
+            'false_hits': 0,
+            'verification_errors': 0
+        }
+        self._hits_by_source: Dict[str, int] = {}
+        self._false_hits_by_source: Dict[str, int] = {}
+
+        logger.info(f"🧭 SemanticResponseCache initialized: max_entries={max_entries}, ttl={ttl}s, "
+                   f"threshold={default_threshold}, verify_rate={verify_sample_rate}")
+
+    def threshold_for(self, source: str) -> float:
+        """Cosine threshold required to reuse an answer from this source"""
+        return self.source_thresholds.get(source, self.default_threshold)
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed and L2-normalize a text off the event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+            vector = await loop.run_in_executor(None, self.embed, text)
+            vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+            norm = float(np.linalg.norm(vector))
+            if vector.size == 0 or norm == 0.0:
+                return None
+            return vector / norm
+        except Exception as e:
+            self._stats['embedding_errors'] += 1
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+
+    async def lookup(self, message: str) -> SemanticLookup:
+        """Find a cached answer for a near-duplicate question"""
+        self._stats['lookups'] += 1
+        embedding = await self._embed(message)
+        if embedding is None:
+            self._stats['misses'] += 1
+            return SemanticLookup(None, None, 0.0, None)
+
+        now = time.time()
+        best_similarity = 0.0
+        dim = embedding.shape[0]
+        with self._lock:
+            index = self._indexes.get(dim)
+            for slot, similarity in (index.search(embedding) if index is not None else []):
+                entry = self._entries.get((dim, slot))
+                best_similarity = max(best_similarity, similarity)
+                if entry is None or now - entry.timestamp > self.ttl:
+                    continue
+                if similarity >= self.threshold_for(entry.source):
+                    self._stats['hits'] += 1
+                    self._hits_by_source[entry.source] = self._hits_by_source.get(entry.source, 0) + 1
+                    result = SemanticLookup(entry.response, entry.source, similarity, embedding, entry.message)
+                    break
+            else:
+                result = None
+
+        if result is None:
+            self._stats['misses'] += 1
+            return SemanticLookup(None, None, best_similarity, embedding)
+
+        logger.debug(f"🧭 Semantic cache hit ({result.similarity:.3f}, {result.source}): "
+                    f"'{message[:40]}' ~ '{result.matched_message[:40]}'")
+        if self.verifier and self.verify_sample_rate > 0 and random.random() < self.verify_sample_rate:
+            self._schedule_verification(message, result)
+        return result
+
+    async def store(self, message: str, response: str, source: str,
+                    embedding: Optional[np.ndarray] = None):
+        """Remember the answer of a freshly generated question"""
+        if not response or source in UNCACHEABLE_SOURCES:
+            return
+        if embedding is None:
+            embedding = await self._embed(message)
+            if embedding is None:
+                return
+        # The answer is already generated: a failed store must not fail the request
+        try:
+            dim = embedding.shape[0]
+            with self._lock:
+                index = self._indexes.get(dim)
+                if index is None:
+                    index = self._indexes[dim] = EmbeddingIndex(capacity=self.max_entries)
+                slot = index.add(embedding)
+                self._entries[(dim, slot)] = SemanticEntry(message, response, source, time.time())
+                self._stats['stores'] += 1
+        except Exception as e:
+            self._stats['store_errors'] += 1
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    def _schedule_verification(self, message: str, result: SemanticLookup):
+        """Recompute a sampled hit in the background"""
+        task = asyncio.get_running_loop().create_task(self._verify(message, result))
+        self._verify_tasks.add(task)
+        task.add_done_callback(self._verify_tasks.discard)
+
+    async def _verify(self, message: str, result: SemanticLookup):
+        """Compare the reused answer with a freshly generated one"""
+        try:
+            fresh_response, _ = await self.verifier(message)
+            same = fresh_response.strip() == result.response.strip()
+            if not same:
+                fresh_vector, cached_vector = await asyncio.gather(
+                    self._embed(fresh_response), self._embed(result.response))
+                same = (fresh_vector is not None and cached_vector is not None
+                        and float(fresh_vector @ cached_vector) >= self.answer_match_threshold)
+            if same:
+                self._stats['verified_hits'] += 1
+            else:
+                self._stats['false_hits'] += 1
+                self._false_hits_by_source[result.source] = self._false_hits_by_source.get(result.source, 0) + 1
+                logger.info(f"⚠️ Semantic cache false hit ({result.similarity:.3f}, {result.source}): "
+                           f"'{message[:40]}' ~ '{(result.matched_message or '')[:40]}'")
+        except Exception as e:
+            self._stats['verification_errors'] += 1
+            logger.warning(f"Semantic cache verification failed: {e}")
+
+    def clear(self):
+        """Forget every cached answer (content changed or caches were cleared)"""
+        with self._lock:
+            self._indexes.clear()
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit and measured false-hit statistics"""
+        verified = self._stats['verified_hits'] + self._stats['false_hits']
+        return {
+            'type': 'semantic_cache',
+            'size': sum(len(index) for index in self._indexes.values()),
+            'dimensions': sorted(self._indexes),
+            'ttl': self.ttl,
+            'default_threshold': self.default_threshold,
+            'source_thresholds': dict(self.source_thresholds),
+            'verify_sample_rate': self.verify_sample_rate,
+            'hit_rate': round(self._stats['hits'] / self._stats['lookups'] * 100, 2) if self._stats['lookups'] else 0,
+            'false_hit_rate': round(self._stats['false_hits'] / verified * 100, 2) if verified else None,
+            'hits_by_source': dict(self._hits_by_source),
+            'false_hits_by_source': dict(self._false_hits_by_source),
+            **self._stats
+        }
+
+def parse_source_thresholds(value: Optional[str]) -> Dict[str, float]:
+    """Parse "knowledge_base=0.9,openai=0.95" into a threshold mapping"""
+    thresholds = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        source, threshold = item.split("=", 1)
+        try:
+            thresholds[source.strip()] = float(threshold)
+        except ValueError:
+            logger.warning(f"Invalid semantic cache threshold: {item}")
+    return thresholds
+
+# Global semantic cache instance (None when disabled)
+_semantic_cache: Optional[SemanticResponseCache] = None
+_semantic_cache_initialized = False
+
+def get_semantic_cache(embed: Optional[Callable[[str], Any]] = None,
+                       verifier: Optional[Callable[[str], Awaitable[Tuple[str, str]]]] = None
+                       ) -> Optional[SemanticResponseCache]:
+    """
+    Get the global semantic cache; created on first call from cache configuration
+    (``embed`` / ``verifier`` are only used for that first creation)
+    """
+    global _semantic_cache, _semantic_cache_initialized
+    if _semantic_cache_initialized:
+        return _semantic_cache
+    _semantic_cache_initialized = True
+
+    try:
+        from core.config_utils import load_cache_config
+        cache_config = load_cache_config()
+    except Exception:
+        cache_config = None
+    if not getattr(cache_config, 'semantic_cache_enabled', False) or embed is None:
+        return None
+
+    _semantic_cache = SemanticResponseCache(
+        embed=embed,
+        max_entries=getattr(cache_config, 'semantic_cache_max_entries', 2048),
+        ttl=getattr(cache_config, 'semantic_cache_ttl', 3600),
+        default_threshold=getattr(cache_config, 'semantic_cache_threshold', 0.93),
+        source_thresholds=parse_source_thresholds(getattr(cache_config, 'semantic_cache_source_thresholds', None)),
+        verify_sample_rate=getattr(cache_config, 'semantic_cache_verify_rate', 0.0),
+        verifier=verifier
+    )
+    return _semantic_cache
+
+def clear_semantic_cache():
+    """Clear the global semantic cache, if one was created"""
+    if _semantic_cache is not None:
+        _semantic_cache.clear()
+        logger.info("🗑️ Semantic cache cleared")
@@ -29,6 +29,8 @@ import time
 
 logger = logging.getLogger(__name__)
 
+_NO_CLIENT = object()  # AI istemcisi kullanılamıyor işareti
+
 class AIServiceAdapter:
     """
     AI Mikroservis Adaptörü
@@ -46,6 +48,12 @@ class AIServiceAdapter:
         # Thread safety
         self._lock = threading.Lock()
         
+        # AI istemcisi tek bir kalıcı event loop'ta yaşar: sync ve async çağrılar
+        # aynı oturumu ve embedding birleştiricisini paylaşır
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client_thread: Optional[threading.Thread] = None
+        self._client_init_lock: Optional[asyncio.Lock] = None
+        
         # Performance tracking
         self._request_count = 0
         self._error_count = 0
@@ -58,20 +66,63 @@ class AIServiceAdapter:
         self._original_model_manager = model_manager
         logger.info("✅ Original model manager set for fallback")
     
+    def _get_client_loop(self) -> asyncio.AbstractEventLoop:
+        """AI istemcisinin çalıştığı arka plan event loop'unu al (gerekirse başlat)"""
+        with self._lock:
+            if self._client_loop is None or self._client_loop.is_closed():
+                self._client_loop = asyncio.new_event_loop()
+                self._client_thread = threading.Thread(
+                    target=self._client_loop.run_forever,
+                    name="ai-adapter-loop",
+                    daemon=True
+                )
+                self._client_thread.start()
+            return self._client_loop
+    
+    def _run_sync(self, coro):
+        """Sync wrapper'lar için: coroutine'i istemci loop'unda çalıştır ve sonucu bekle"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_client_loop()).result()
+    
+    async def _run_on_client_loop(self, coro):
+        """Coroutine'i istemci loop'unda çalıştır (zaten oradaysak doğrudan)"""
+        loop = self._get_client_loop()
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await coro
+        except RuntimeError:
+            pass
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+    
+    async def _call_client(self, method_name: str, *args, **kwargs):
+        """İstemci metodunu istemci loop'unda çağır; istemci yoksa _NO_CLIENT döner"""
+        async def _invoke():
+            client = await self._get_ai_client()
+            if client is None:
+                return _NO_CLIENT
+            return await getattr(client, method_name)(*args, **kwargs)
+        
+        return await self._run_on_client_loop(_invoke())
+    
     async def _get_ai_client(self):
-        """AI istemcisini al"""
+        """AI istemcisini al (istemci loop'unda çağrılmalı)"""
         if not self.enable_ai_service:
             return None
         
         if self._ai_client is None:
-            try:
-                from services.ai_service.client import get_ai_client
-                self._ai_client = await get_ai_client()
-                logger.info("✅ AI client connected")
-            except Exception as e:
-                logger.error(f"❌ AI client connection failed: {e}")
-                self._fallback_mode = True
-                return None
+            # Eşzamanlı ilk çağrılar tek istemci oluşturur
+            if self._client_init_lock is None:
+                self._client_init_lock = asyncio.Lock()
+            async with self._client_init_lock:
+                if self._ai_client is None and not self._fallback_mode:
+                    try:
+                        from services.ai_service.client import AIServiceClient
+                        client = AIServiceClient()
+                        await client.start()
+                        self._ai_client = client
+                        logger.info("✅ AI client connected")
+                    except Exception as e:
+                        logger.error(f"❌ AI client connection failed: {e}")
+                        self._fallback_mode = True
         
         return self._ai_client
     
@@ -84,11 +135,11 @@ class AIServiceAdapter:
             # Direkt fallback kullan
             with self._lock:
                 self._fallback_count += 1
-            return fallback_func(*args, **kwargs)
+            return await self._call_fallback(fallback_func, *args, **kwargs)
         
         try:
             # AI servis dene
-            result = await ai_func(*args, **kwargs)
+            result = await self._run_on_client_loop(ai_func(*args, **kwargs))
             return result
             
         except Exception as e:
@@ -99,23 +150,29 @@ class AIServiceAdapter:
                 self._fallback_count += 1
             
             # Fallback kullan
-            if self._original_model_manager and hasattr(self._original_model_manager, fallback_func.__name__):
-                return fallback_func(*args, **kwargs)
-            else:
-                return fallback_func(*args, **kwargs)
+            return await self._call_fallback(fallback_func, *args, **kwargs)
+    
+    @staticmethod
+    async def _call_fallback(fallback_func, *args, **kwargs):
+        """Fallback'i çağır; async model manager metotlarının coroutine'i çalışan loop'ta beklenir"""
+        result = fallback_func(*args, **kwargs)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
     
     # Model Manager API Uyumluluğu
     
     def generate_embedding(self, text: str, force_turkish: bool = None) -> List[float]:
         """Embedding oluştur - sync wrapper"""
-        return asyncio.run(self.generate_embedding_async(text, force_turkish))
+        return self._run_sync(self.generate_embedding_async(text, force_turkish))
     
     async def generate_embedding_async(self, text: str, force_turkish: bool = None) -> List[float]:
         """Embedding oluştur - async"""
         async def ai_func(text, force_turkish):
             client = await self._get_ai_client()
             if client:
-                return await client.generate_embedding(text, force_turkish)
+                # İstemci numpy döner; API sözleşmesi List[float]
+                return (await client.generate_embedding(text, force_turkish)).tolist()
             raise Exception("AI client not available")
         
         def fallback_func(text, force_turkish):
@@ -128,47 +185,52 @@ class AIServiceAdapter:
         
         return await self._execute_with_fallback(ai_func, fallback_func, text, force_turkish)
     
-    def generate_text_response(self, prompt: str, max_length: int = 80, turkish_context: bool = True) -> str:
+    def generate_text_response(self, prompt: str, max_length: int = 80, turkish_context: bool = True,
+                               time_budget: Optional[float] = None) -> str:
         """Metin yanıtı oluştur - sync wrapper"""
-        return asyncio.run(self.generate_text_response_async(prompt, max_length, turkish_context))
+        return self._run_sync(self.generate_text_response_async(prompt, max_length, turkish_context, time_budget))
     
-    async def generate_text_response_async(self, prompt: str, max_length: int = 80, turkish_context: bool = True) -> str:
-        """Metin yanıtı oluştur - async"""
-        async def ai_func(prompt, max_length, turkish_context):
+    async def generate_text_response_async(self, prompt: str, max_length: int = 80, turkish_context: bool = True,
+                                           time_budget: Optional[float] = None) -> str:
+        """Metin yanıtı oluştur - async (time_budget: saniye cinsinden üretim bütçesi)"""
+        async def ai_func(prompt, max_length, turkish_context, time_budget):
             client = await self._get_ai_client()
             if client:
-                return await client.generate_text(prompt, max_length, turkish_context)
+                return await client.generate_text(prompt, max_length, turkish_context, time_budget=time_budget)
             raise Exception("AI client not available")
         
-        def fallback_func(prompt, max_length, turkish_context):
+        def fallback_func(prompt, max_length, turkish_context, time_budget):
             if self._original_model_manager:
-                return self._original_model_manager.generate_text_response(prompt, max_length, turkish_context)
+                return self._original_model_manager.generate_text_response(prompt, max_length, turkish_context,
+                                                                          time_budget=time_budget)
             else:
                 from services.ai_service.client import FallbackAIManager
                 return FallbackAIManager.generate_text_fallback(prompt)
         
-        return await self._execute_with_fallback(ai_func, fallback_func, prompt, max_length, turkish_context)
+        return await self._execute_with_fallback(ai_func, fallback_func, prompt, max_length, turkish_context,
+                                                 time_budget)
     
-    async def generate_huggingface_response(self, message: str, user_id: str = None) -> str:
-        """Hugging Face yanıt oluştur"""
-        async def ai_func(message, user_id):
+    async def generate_huggingface_response(self, message: str, user_id: str = None,
+                                            deadline: Optional[float] = None) -> str:
+        """Hugging Face yanıt oluştur (deadline: isteğin time.monotonic() tabanlı son anı)"""
+        async def ai_func(message, user_id, deadline):
             client = await self._get_ai_client()
             if client:
-                return await client.generate_huggingface_response(message, user_id)
+                return await client.generate_huggingface_response(message, user_id, deadline=deadline)
             raise Exception("AI client not available")
         
-        def fallback_func(message, user_id):
+        def fallback_func(message, user_id, deadline):
             if self._original_model_manager:
-                return asyncio.run(self._original_model_manager.generate_huggingface_response(message, user_id))
+                return self._original_model_manager.generate_huggingface_response(message, user_id, deadline=deadline)
             else:
                 from services.ai_service.client import FallbackAIManager
                 return FallbackAIManager.generate_text_fallback(message)
         
-        return await self._execute_with_fallback(ai_func, fallback_func, message, user_id)
+        return await self._execute_with_fallback(ai_func, fallback_func, message, user_id, deadline)
     
     def detect_language(self, text: str) -> str:
         """Dil tanıma - sync wrapper"""
-        return asyncio.run(self.detect_language_async(text))
+        return self._run_sync(self.detect_language_async(text))
     
     async def detect_language_async(self, text: str) -> str:
         """Dil tanıma - async"""
@@ -189,15 +251,14 @@ class AIServiceAdapter:
     
     def get_model_info(self) -> Dict[str, Any]:
         """Model bilgilerini al"""
-        return asyncio.run(self.get_model_info_async())
+        return self._run_sync(self.get_model_info_async())
     
     async def get_model_info_async(self) -> Dict[str, Any]:
         """Model bilgilerini al - async"""
         try:
             if self.enable_ai_service and not self._fallback_mode:
-                client = await self._get_ai_client()
-                if client:
-                    ai_info = await client.get_model_info()
+                ai_info = await self._call_client("get_model_info")
+                if ai_info is not _NO_CLIENT:
                     
                     # Adapter istatistiklerini ekle
                     ai_info["adapter_stats"] = {
@@ -240,15 +301,13 @@ class AIServiceAdapter:
     
     def clear_caches(self):
         """Cache temizliği"""
-        return asyncio.run(self.clear_caches_async())
+        return self._run_sync(self.clear_caches_async())
     
     async def clear_caches_async(self):
         """Cache temizliği - async"""
         try:
             if self.enable_ai_service and not self._fallback_mode:
-                client = await self._get_ai_client()
-                if client:
-                    await client.cleanup_models()
+                if await self._call_client("cleanup_models") is not _NO_CLIENT:
                     logger.info("✅ AI service caches cleared")
                     return
             
@@ -262,16 +321,14 @@ class AIServiceAdapter:
     
     def unload_all_models(self):
         """Tüm modelleri kaldır"""
-        return asyncio.run(self.unload_all_models_async())
+        return self._run_sync(self.unload_all_models_async())
     
     async def unload_all_models_async(self):
         """Tüm modelleri kaldır - async"""
         try:
             if self.enable_ai_service and not self._fallback_mode:
-                client = await self._get_ai_client()
-                if client:
-                    # AI servis model'larını kaldıramayız, sadece cache temizleriz
-                    await client.cleanup_models()
+                # AI servis model'larını kaldıramayız, sadece cache temizleriz
+                if await self._call_client("cleanup_models") is not _NO_CLIENT:
                     logger.info("✅ AI service models cleaned")
                     return
             
@@ -285,16 +342,23 @@ class AIServiceAdapter:
     
     def cleanup_resources(self):
         """Kaynakları temizle"""
-        return asyncio.run(self.cleanup_resources_async())
+        result = self._run_sync(self.cleanup_resources_async())
+        
+        # İstemci loop'unu durdur
+        with self._lock:
+            loop, self._client_loop = self._client_loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        self._client_init_lock = None
+        return result
     
     async def cleanup_resources_async(self):
         """Kaynakları temizle - async"""
         try:
             # AI client'ı kapat
             if self._ai_client:
-                from services.ai_service.client import close_ai_client
-                await close_ai_client()
-                self._ai_client = None
+                client, self._ai_client = self._ai_client, None
+                await self._run_on_client_loop(client.close())
             
             # Original model manager'ı temizle
             if self._original_model_manager:
@@ -311,9 +375,9 @@ class AIServiceAdapter:
         """Modelleri ısıt"""
         try:
             if self.enable_ai_service and not self._fallback_mode:
-                client = await self._get_ai_client()
-                if client:
-                    return await client.warmup_models()
+                result = await self._call_client("warmup_models")
+                if result is not _NO_CLIENT:
+                    return result
             
             # Fallback
             if self._original_model_manager and hasattr(self._original_model_manager, 'warmup_models'):
@@ -330,9 +394,11 @@ class AIServiceAdapter:
         """Servis sağlığını kontrol et"""
         try:
             if self.enable_ai_service:
-                client = await self._get_ai_client()
-                if client:
-                    return await client.get_service_health()
+                health = await self._call_client("get_service_health")
+                if health is not _NO_CLIENT:
+                    if self._ai_client is not None:
+                        health["embedding_batching"] = self._ai_client.get_batching_stats()
+                    return health
             
             return {
                 "status": "healthy",
@@ -356,15 +422,15 @@ class AIServiceAdapter:
     
     def get_lazy_loading_statistics(self) -> Dict[str, Any]:
         """Lazy loading istatistikleri"""
-        return asyncio.run(self.get_lazy_loading_statistics_async())
+        return self._run_sync(self.get_lazy_loading_statistics_async())
     
     async def get_lazy_loading_statistics_async(self) -> Dict[str, Any]:
         """Lazy loading istatistikleri - async"""
         try:
             if self.enable_ai_service and not self._fallback_mode:
-                client = await self._get_ai_client()
-                if client:
-                    return await client.get_lazy_loading_stats()
+                stats = await self._call_client("get_lazy_loading_stats")
+                if stats is not _NO_CLIENT:
+                    return stats
             
             # Fallback
             if self._original_model_manager and hasattr(self._original_model_manager, 'get_lazy_loading_statistics'):
@@ -7,10 +7,14 @@ import logging
 import asyncio
 import aiohttp
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from dataclasses import dataclass
 import time
 
+import numpy as np
+
+from services.ai_service.embedding_codec import EMBEDDING_MEDIA_TYPE, decode_embeddings, unpack_embedding_rows
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -21,6 +25,26 @@ class AIServiceConfig:
     timeout: int = 30
     retry_attempts: int = 3
     retry_delay: float = 1.0
+    # Eşzamanlı embedding çağrılarını tek /embedding/batch isteğinde birleştir
+    coalesce_embeddings: bool = True
+    embedding_batch_window_ms: float = 5.0
+    embedding_max_batch_size: int = 64
+    # Embedding taşıma formatı: "float32" / "float16" (ikili) veya "json"
+    embedding_transport: str = "float32"
+    # Kalıcı bağlantı havuzu
+    connection_limit: int = 100
+    connection_limit_per_host: int = 32
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    # Pasif sağlık takibi: art arda bu kadar hata servisi sağlıksız işaretler
+    unhealthy_threshold: int = 3
+    health_probe_interval: float = 5.0  # Sağlıksızken arka plan /health yoklama aralığı
+
+def remaining_time_budget(deadline: Optional[float]) -> Optional[float]:
+    """time.monotonic() tabanlı son andan kalan süre (saniye); deadline yoksa None"""
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
 
 class AIServiceError(Exception):
     """AI servis hatası"""
@@ -30,6 +54,81 @@ class AIServiceUnavailableError(AIServiceError):
     """AI servis erişilemez"""
     pass
 
+class AIServiceOverloadedError(AIServiceUnavailableError):
+    """AI servis çıkarım kuyruğu dolu (503)"""
+    
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class EmbeddingBatcher:
+    """
+    Embedding İstek Birleştirici
+    ============================
+    Kısa bir pencere içinde gelen eşzamanlı embedding çağrılarını toplar ve
+    tek bir toplu istek olarak gönderir. Aynı metin tek kez gönderilir.
+    """
+    
+    def __init__(self, send_batch: Callable[[List[str], Optional[bool]], Awaitable[List[Any]]],
+                 window_ms: float = 5.0, max_batch_size: int = 64):
+        self._send_batch = send_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        # force_turkish değeri -> {metin: [future, ...]}
+        self._pending: Dict[Optional[bool], Dict[str, List[asyncio.Future]]] = {}
+        self._timers: Dict[Optional[bool], asyncio.TimerHandle] = {}
+        self._stats = {"requests": 0, "batches": 0, "texts_sent": 0}
+    
+    async def submit(self, text: str, force_turkish: Optional[bool] = None) -> Any:
+        """Metni bir sonraki batch'e ekle ve embedding'ini bekle"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._stats["requests"] += 1
+        
+        pending = self._pending.setdefault(force_turkish, {})
+        pending.setdefault(text, []).append(future)
+        
+        if len(pending) >= self.max_batch_size:
+            self._flush(force_turkish)
+        elif force_turkish not in self._timers:
+            self._timers[force_turkish] = loop.call_later(self.window, self._flush, force_turkish)
+        
+        return await future
+    
+    def _flush(self, force_turkish: Optional[bool]):
+        """Bekleyen metinleri toplu isteğe dönüştür"""
+        timer = self._timers.pop(force_turkish, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(force_turkish, None)
+        if pending:
+            asyncio.ensure_future(self._send(pending, force_turkish))
+    
+    async def _send(self, pending: Dict[str, List[asyncio.Future]], force_turkish: Optional[bool]):
+        texts = list(pending)
+        self._stats["batches"] += 1
+        self._stats["texts_sent"] += len(texts)
+        try:
+            embeddings = await self._send_batch(texts, force_turkish)
+            for text, embedding in zip(texts, embeddings):
+                for future in pending[text]:
+                    if not future.done():
+                        future.set_result(embedding)
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Birleştirme istatistikleri"""
+        batches = self._stats["batches"]
+        return dict(
+            self._stats,
+            average_batch_size=round(self._stats["texts_sent"] / batches, 2) if batches else 0,
+            http_requests_saved=self._stats["requests"] - batches
+        )
+
 class AIServiceClient:
     """
     AI Mikroservisi İstemcisi
@@ -41,9 +140,24 @@ class AIServiceClient:
         self.config = config or AIServiceConfig()
         self.base_url = f"http://{self.config.host}:{self.config.port}"
         self.session: Optional[aiohttp.ClientSession] = None
-        self._service_available = False
-        self._last_health_check = 0
-        self._health_check_interval = 60  # 1 dakika
+        self._embedding_batcher = EmbeddingBatcher(
+            self.generate_embeddings_batch,
+            window_ms=self.config.embedding_batch_window_ms,
+            max_batch_size=self.config.embedding_max_batch_size
+        )
+        
+        # Pasif sağlık durumu: istek sonuçlarından çıkarılır, istek yolu /health beklemez
+        self._service_available = True
+        self._consecutive_failures = 0
+        self._probe_task: Optional[asyncio.Task] = None
+        self._health_stats = {
+            "requests": 0,
+            "failures": 0,
+            "fast_failures": 0,  # Servis sağlıksızken beklemeden reddedilen istekler
+            "marked_unhealthy": 0,
+            "probes": 0,
+            "last_state_change": None
+        }
         
     async def __aenter__(self):
         """Async context manager giriş"""
@@ -54,99 +168,167 @@ class AIServiceClient:
         """Async context manager çıkış"""
         await self.close()
     
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Keep-alive ve DNS cache ayarlı kalıcı bağlantı havuzu ile oturum oluştur"""
+        connector = aiohttp.TCPConnector(
+            limit=self.config.connection_limit,
+            limit_per_host=self.config.connection_limit_per_host,
+            keepalive_timeout=self.config.keepalive_timeout,
+            ttl_dns_cache=self.config.dns_cache_ttl,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(total=self.config.timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+    
     async def start(self):
         """İstemciyi başlat"""
-        if self.session is None:
-            timeout = aiohttp.ClientTimeout(total=self.config.timeout)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
         
-        # Servis sağlık kontrolü
-        await self._check_service_health()
+        # İlk sağlık kontrolü (sadece başlangıçta; istek yolunda yapılmaz)
+        if not await self._check_service_health():
+            self._mark_unhealthy("başlangıç sağlık kontrolü başarısız")
     
     async def close(self):
         """İstemciyi kapat"""
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._probe_task = None
         if self.session:
             await self.session.close()
             self.session = None
     
+    async def _fetch_health(self) -> Dict[str, Any]:
+        """/health uç noktasını doğrudan çağır (pasif sağlık durumunu atlar)"""
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
+        async with self.session.get(f"{self.base_url}/health") as response:
+            if response.status != 200:
+                return {"status": "unhealthy", "http_status": response.status}
+            return await response.json()
+    
     async def _check_service_health(self) -> bool:
-        """AI servis sağlık kontrolü"""
+        """AI servis sağlık kontrolü (oturum açık kalır, havuzdaki bağlantılar korunur)"""
+        self._health_stats["probes"] += 1
         try:
-            current_time = time.time()
-            
-            # Cache'li sağlık kontrolü
-            if (current_time - self._last_health_check) < self._health_check_interval:
-                return self._service_available
-            
-            if not self.session:
-                await self.start()
-            
-            async with self.session.get(f"{self.base_url}/health") as response:
-                if response.status == 200:
-                    health_data = await response.json()
-                    self._service_available = health_data.get("status") == "healthy"
-                    self._last_health_check = current_time
-                    
-                    if self._service_available:
-                        logger.debug("✅ AI servis sağlıklı")
-                    else:
-                        logger.warning("⚠️ AI servis sağlıksız durumda")
-                    
-                    return self._service_available
-                else:
-                    self._service_available = False
-                    logger.warning(f"⚠️ AI servis sağlık kontrolü başarısız: {response.status}")
-                    return False
-                    
+            health_data = await self._fetch_health()
+            healthy = health_data.get("status") == "healthy"
+            if healthy:
+                logger.debug("✅ AI servis sağlıklı")
+            else:
+                logger.warning(f"⚠️ AI servis sağlıksız durumda: {health_data}")
+            return healthy
         except Exception as e:
-            self._service_available = False
-            logger.error(f"❌ AI servis sağlık kontrolü hatası: {e}")
-            logger.error(f"Sağlık kontrolü hatası: AI servis erişilemez durumda")
-            # Close session on persistent health check failures
-            if self.session and not self.session.closed:
-                await self.session.close()
-                self.session = None
+            logger.warning(f"⚠️ AI servis sağlık kontrolü hatası: {e}")
             return False
     
-    async def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
-        """HTTP isteği yap"""
-        if not await self._check_service_health():
+    def _record_success(self):
+        """Başarılı istek: servis sağlıklı"""
+        self._consecutive_failures = 0
+        if not self._service_available:
+            self._mark_healthy("istek başarılı")
+    
+    def _record_failure(self, error: Exception):
+        """Bağlantı/sunucu hatası: art arda eşik aşılırsa servisi sağlıksız işaretle"""
+        self._health_stats["failures"] += 1
+        self._consecutive_failures += 1
+        if self._service_available and self._consecutive_failures >= self.config.unhealthy_threshold:
+            self._mark_unhealthy(f"{self._consecutive_failures} ardışık hata: {error}")
+    
+    def _mark_healthy(self, reason: str):
+        self._service_available = True
+        self._consecutive_failures = 0
+        self._health_stats["last_state_change"] = time.time()
+        logger.info(f"✅ AI servis yeniden sağlıklı ({reason})")
+    
+    def _mark_unhealthy(self, reason: str):
+        if self._service_available:
+            self._health_stats["marked_unhealthy"] += 1
+            self._health_stats["last_state_change"] = time.time()
+            logger.warning(f"⚠️ AI servis sağlıksız işaretlendi ({reason})")
+        self._service_available = False
+        # Sağlıksızken arka planda /health yokla; istek yolu beklemez
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.ensure_future(self._probe_until_healthy())
+    
+    async def _probe_until_healthy(self):
+        """Servis tekrar sağlıklı olana kadar periyodik /health yoklaması"""
+        while not self._service_available:
+            await asyncio.sleep(self.config.health_probe_interval)
+            if await self._check_service_health():
+                self._mark_healthy("arka plan sağlık yoklaması")
+    
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Bağlantı havuzu ve pasif sağlık istatistikleri"""
+        return dict(
+            self._health_stats,
+            service_available=self._service_available,
+            consecutive_failures=self._consecutive_failures,
+            probing=self._probe_task is not None and not self._probe_task.done(),
+            connection_limit=self.config.connection_limit,
+            connection_limit_per_host=self.config.connection_limit_per_host,
+            keepalive_timeout=self.config.keepalive_timeout
+        )
+    
+    async def _make_request(self, method: str, endpoint: str, data: Dict = None,
+                            accept: Optional[str] = None) -> Dict:
+        """HTTP isteği yap (accept: istenen yanıt formatı, ör. ikili embedding)"""
+        self._health_stats["requests"] += 1
+        if not self._service_available:
+            # Arka plan yoklaması sürerken beklemeden fallback'e bırak
+            self._health_stats["fast_failures"] += 1
             raise AIServiceUnavailableError("AI servis erişilemez durumda")
         
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
+        
         url = f"{self.base_url}{endpoint}"
         
         for attempt in range(self.config.retry_attempts):
             try:
-                if not self.session:
-                    await self.start()
-                
                 if method.upper() == "GET":
                     async with self.session.get(url) as response:
-                        return await self._handle_response(response)
+                        result = await self._handle_response(response)
                 
                 elif method.upper() == "POST":
                     headers = {"Content-Type": "application/json"}
+                    if accept:
+                        headers["Accept"] = accept
                     json_data = json.dumps(data) if data else None
                     
                     async with self.session.post(url, data=json_data, headers=headers) as response:
-                        return await self._handle_response(response)
+                        result = await self._handle_response(response)
                 
                 else:
                     raise AIServiceError(f"Desteklenmeyen HTTP metod: {method}")
+                
+                self._record_success()
+                return result
                     
-            except aiohttp.ClientError as e:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 logger.warning(f"⚠️ AI servis istek hatası (deneme {attempt + 1}): {e}")
+                self._record_failure(e)
                 
-                if attempt == self.config.retry_attempts - 1:
-                    raise AIServiceUnavailableError(f"AI servis {self.config.retry_attempts} denemeden sonra erişilemez")
+                if attempt == self.config.retry_attempts - 1 or not self._service_available:
+                    raise AIServiceUnavailableError(f"AI servis {attempt + 1} denemeden sonra erişilemez")
                 
                 await asyncio.sleep(self.config.retry_delay * (attempt + 1))
+            
+            except AIServiceOverloadedError:
+                # Servis ayakta ama meşgul: sağlıksız sayılmaz
+                self._consecutive_failures = 0
+                raise
         
         raise AIServiceError("Beklenmeyen hata")
     
     async def _handle_response(self, response: aiohttp.ClientResponse) -> Dict:
         """HTTP yanıtını işle"""
         try:
+            if response.status == 200 and response.content_type == EMBEDDING_MEDIA_TYPE:
+                # İkili embedding: doğrudan numpy matrisine çöz
+                matrix, meta = decode_embeddings(await response.read())
+                return {"embeddings": matrix, "meta": meta}
+            
             response_data = await response.json()
             
             if response.status == 200:
@@ -160,37 +342,93 @@ class AIServiceClient:
                 error_detail = response_data.get("detail", "Sunucu hatası")
                 raise AIServiceError(f"AI servis hatası: {error_detail}")
             
+            elif response.status == 503:
+                error_detail = response_data.get("detail", "Servis meşgul")
+                try:
+                    retry_after = float(response.headers.get("Retry-After", 1))
+                except ValueError:
+                    retry_after = 1.0
+                raise AIServiceOverloadedError(f"AI servis meşgul: {error_detail}", retry_after)
+            
             else:
                 raise AIServiceError(f"Beklenmeyen yanıt kodu: {response.status}")
                 
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, aiohttp.ContentTypeError):
             raise AIServiceError("Geçersiz JSON yanıtı")
+        except ValueError as e:
+            raise AIServiceError(f"Geçersiz ikili embedding yanıtı: {e}")
     
     # AI İşlemleri
     
-    async def generate_embedding(self, text: str, force_turkish: bool = None) -> List[float]:
-        """Metin için embedding oluştur"""
+    def _embedding_accept_header(self) -> Optional[str]:
+        """Yapılandırılmış taşıma formatı için Accept başlığı (JSON için None)"""
+        transport = self.config.embedding_transport
+        if transport in ("float32", "float16"):
+            return f"{EMBEDDING_MEDIA_TYPE}; dtype={transport}, application/json;q=0.5"
+        return None
+    
+    @staticmethod
+    def _embedding_rows(response: Dict, key: str) -> List[np.ndarray]:
+        """Yanıttaki embedding'leri numpy satırlarına çevir (ikili veya JSON)"""
+        if "meta" in response:
+            return unpack_embedding_rows(response["embeddings"], response["meta"])
+        # JSON yanıtı (eski servis veya embedding_transport="json")
+        values = response[key] if key == "embeddings" else [response[key]]
+        return [np.asarray(row, dtype=np.float32) for row in values]
+    
+    async def generate_embedding(self, text: str, force_turkish: bool = None) -> np.ndarray:
+        """
+        Metin için embedding oluştur (float32 numpy vektörü)
+        Eşzamanlı çağrılar tek batch'te birleştirilir.
+        """
         try:
+            if self.config.coalesce_embeddings:
+                return await self._embedding_batcher.submit(text, force_turkish)
+            
             data = {
                 "text": text,
                 "force_turkish": force_turkish
             }
             
-            response = await self._make_request("POST", "/embedding", data)
-            return response["embedding"]
+            response = await self._make_request("POST", "/embedding", data,
+                                                accept=self._embedding_accept_header())
+            return self._embedding_rows(response, "embedding")[0]
             
         except Exception as e:
             logger.error(f"Embedding oluşturma hatası: {e}")
             raise AIServiceError(f"Embedding generation failed: {e}")
     
-    async def generate_text(self, prompt: str, max_length: int = 80, turkish_context: bool = True) -> str:
-        """Metin üret"""
+    async def generate_embeddings_batch(self, texts: List[str], force_turkish: bool = None) -> List[np.ndarray]:
+        """Birden çok metin için tek istekte embedding oluştur (float32 numpy vektörleri)"""
+        try:
+            data = {
+                "texts": texts,
+                "force_turkish": force_turkish
+            }
+            
+            response = await self._make_request("POST", "/embedding/batch", data,
+                                                accept=self._embedding_accept_header())
+            return self._embedding_rows(response, "embeddings")
+            
+        except Exception as e:
+            logger.error(f"Toplu embedding oluşturma hatası: {e}")
+            raise AIServiceError(f"Batch embedding generation failed: {e}")
+    
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Embedding birleştirme istatistikleri"""
+        return self._embedding_batcher.get_stats()
+    
+    async def generate_text(self, prompt: str, max_length: int = 80, turkish_context: bool = True,
+                            time_budget: Optional[float] = None) -> str:
+        """Metin üret (time_budget: servisteki üretim için saniye cinsinden zaman bütçesi)"""
         try:
             data = {
                 "prompt": prompt,
                 "max_length": max_length,
                 "turkish_context": turkish_context
             }
+            if time_budget is not None:
+                data["time_budget_seconds"] = time_budget
             
             response = await self._make_request("POST", "/generate", data)
             return response["generated_text"]
@@ -199,14 +437,24 @@ class AIServiceClient:
             logger.error(f"Metin üretme hatası: {e}")
             raise AIServiceError(f"Text generation failed: {e}")
     
-    async def generate_huggingface_response(self, message: str, user_id: str = None) -> str:
-        """Gelişmiş Hugging Face yanıt üret"""
+    async def generate_huggingface_response(self, message: str, user_id: str = None,
+                                            deadline: Optional[float] = None) -> str:
+        """
+        Gelişmiş Hugging Face yanıt üret
+        deadline: isteğin time.monotonic() tabanlı son anı; kalan süre zaman bütçesi
+        olarak servise gönderilir (monotonic saat süreçler arası taşınamaz)
+        """
         try:
             data = {
                 "prompt": message,
                 "max_length": 100,
                 "turkish_context": True
             }
+            time_budget = remaining_time_budget(deadline)
+            if time_budget is not None:
+                if time_budget <= 0:
+                    raise AIServiceError("Request deadline already passed")
+                data["time_budget_seconds"] = time_budget
             
             response = await self._make_request("POST", "/generate/huggingface", data)
             return response["response"]
@@ -256,13 +504,16 @@ class AIServiceClient:
             return False
     
     async def get_service_health(self) -> Dict[str, Any]:
-        """Servis sağlık bilgilerini al"""
+        """Servis sağlık bilgilerini al (doğrudan /health; istemci bağlantı istatistikleri eklenir)"""
         try:
-            return await self._make_request("GET", "/health")
-            
+            health_data = await self._fetch_health()
+            if health_data.get("status") == "healthy":
+                self._record_success()
         except Exception as e:
             logger.error(f"Sağlık kontrolü hatası: {e}")
-            return {"status": "unhealthy", "error": str(e)}
+            health_data = {"status": "unhealthy", "error": str(e)}
+        health_data["client"] = self.get_connection_stats()
+        return health_data
     
     async def get_lazy_loading_stats(self) -> Dict[str, Any]:
         """Lazy loading istatistiklerini al"""
@@ -348,25 +599,27 @@ async def safe_generate_embedding(text: str, force_turkish: bool = None) -> List
     """Güvenli embedding üretimi (fallback destekli)"""
     try:
         client = await get_ai_client()
-        return await client.generate_embedding(text, force_turkish)
+        return (await client.generate_embedding(text, force_turkish)).tolist()
     except (AIServiceUnavailableError, AIServiceError) as e:
         logger.warning(f"AI servis kullanılamıyor, fallback kullanılıyor: {e}")
         return FallbackAIManager.generate_embedding_fallback(text)
 
-async def safe_generate_text(prompt: str, max_length: int = 80, turkish_context: bool = True) -> str:
+async def safe_generate_text(prompt: str, max_length: int = 80, turkish_context: bool = True,
+                             time_budget: Optional[float] = None) -> str:
     """Güvenli metin üretimi (fallback destekli)"""
     try:
         client = await get_ai_client()
-        return await client.generate_text(prompt, max_length, turkish_context)
+        return await client.generate_text(prompt, max_length, turkish_context, time_budget=time_budget)
     except (AIServiceUnavailableError, AIServiceError) as e:
         logger.warning(f"AI servis kullanılamıyor, fallback kullanılıyor: {e}")
         return FallbackAIManager.generate_text_fallback(prompt)
 
-async def safe_generate_huggingface_response(message: str, user_id: str = None) -> str:
+async def safe_generate_huggingface_response(message: str, user_id: str = None,
+                                             deadline: Optional[float] = None) -> str:
     """Güvenli Hugging Face yanıt üretimi (fallback destekli)"""
     try:
         client = await get_ai_client()
-        return await client.generate_huggingface_response(message, user_id)
+        return await client.generate_huggingface_response(message, user_id, deadline=deadline)
     except (AIServiceUnavailableError, AIServiceError) as e:
         logger.warning(f"AI servis kullanılamıyor, fallback kullanılıyor: {e}")
         return FallbackAIManager.generate_text_fallback(message)
@@ -0,0 +1,143 @@
+"""
+📦 Embedding İkili Taşıma Formatı
+================================
+AI servisi ile uygulama arasında embedding'leri JSON float listeleri yerine
+kompakt ikili olarak taşır.
+
+Format (little-endian):
+    magic        4 bytes   b"MEMB"
+    version      uint8
+    dtype        uint8     1 = float32, 2 = float16
+    rows         uint32
+    dim          uint32
+    meta_length  uint16
+    meta         meta_length bytes, UTF-8 JSON (model, diller, boş satırlar)
+    payload      rows * dim * itemsize bytes
+
+İçerik müzakeresi Accept başlığı ile yapılır:
+    Accept: application/x-mefapex-embedding; dtype=float16
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_MEDIA_TYPE = "application/x-mefapex-embedding"
+CODEC_VERSION = 1
+
+_MAGIC = b"MEMB"
+_HEADER = struct.Struct("<4sBBIIH")
+_DTYPE_CODES = {"float32": 1, "float16": 2}
+_CODE_DTYPES = {code: np.dtype(name).newbyteorder("<") for name, code in _DTYPE_CODES.items()}
+
+
+class EmbeddingCodecError(ValueError):
+    """Geçersiz ikili embedding verisi"""
+    pass
+
+
+def negotiate_embedding_format(accept_header: Optional[str]) -> Optional[str]:
+    """
+    Accept başlığından ikili format dtype'ını çıkar
+
+    Returns:
+        "float32" / "float16" ikili yanıt istenmişse, aksi halde None (JSON)
+    """
+    if not accept_header:
+        return None
+    for media_range in accept_header.split(","):
+        parts = [part.strip() for part in media_range.split(";")]
+        if parts[0].lower() != EMBEDDING_MEDIA_TYPE:
+            continue
+        params = dict(part.split("=", 1) for part in parts[1:] if "=" in part)
+        if params.get("q", "1").strip() in ("0", "0.0"):
+            return None
+        dtype = params.get("dtype", "float32").strip().lower()
+        return dtype if dtype in _DTYPE_CODES else "float32"
+    return None
+
+
+def encode_embeddings(embeddings: Any, dtype: str = "float32",
+                      meta: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Embedding matrisini (rows x dim) ikili formata kodla
+
+    Args:
+        embeddings: 2 boyutlu dizi veya eşit uzunlukta vektör listesi
+        dtype: "float32" veya "float16"
+        meta: Başlığa eklenecek küçük metadata (model adı vb.)
+    """
+    if dtype not in _DTYPE_CODES:
+        raise EmbeddingCodecError(f"Unsupported dtype: {dtype}")
+    matrix = np.asarray(embeddings, dtype=_CODE_DTYPES[_DTYPE_CODES[dtype]])
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise EmbeddingCodecError(f"Embeddings must be 2-dimensional, got {matrix.ndim}")
+
+    meta_bytes = json.dumps(meta or {}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    header = _HEADER.pack(_MAGIC, CODEC_VERSION, _DTYPE_CODES[dtype],
+                          matrix.shape[0], matrix.shape[1], len(meta_bytes))
+    return header + meta_bytes + np.ascontiguousarray(matrix).tobytes()
+
+
+def pack_embedding_rows(rows: List[Any], meta: Dict[str, Any]) -> np.ndarray:
+    """
+    Farklı uzunluktaki embedding satırlarını tek matrise yerleştir
+
+    Boş satırlar (çok kısa metin) sıfır vektör olur ve meta["empty_rows"] ile
+    işaretlenir. force_turkish=None ile bir batch Türkçe (768) ve İngilizce
+    (384) metinleri karıştırabilir: kısa satırlar en geniş boyuta sıfırla
+    doldurulur ve gerçek boyutlar meta["row_dims"] ile gönderilir.
+    """
+    dims = [len(row) for row in rows]
+    empty_rows = [index for index, row_dim in enumerate(dims) if not row_dim]
+    if empty_rows:
+        meta["empty_rows"] = empty_rows
+    if len(set(dims) - {0}) > 1:
+        meta["row_dims"] = dims
+    matrix = np.zeros((len(rows), max(dims, default=0)), dtype=np.float32)
+    for index, row in enumerate(rows):
+        matrix[index, :dims[index]] = row
+    return matrix
+
+
+def unpack_embedding_rows(matrix: np.ndarray, meta: Dict[str, Any]) -> List[np.ndarray]:
+    """pack_embedding_rows tersi: satırları gerçek boyutlarına kes (boş satırlar boş vektör)"""
+    row_dims = meta.get("row_dims") or [matrix.shape[1]] * matrix.shape[0]
+    empty_rows = set(meta.get("empty_rows", ()))
+    return [matrix[i, :row_dims[i]] if i not in empty_rows else np.empty(0, dtype=np.float32)
+            for i in range(matrix.shape[0])]
+
+
+def decode_embeddings(payload: bytes) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    İkili embedding verisini çöz
+
+    Returns:
+        (float32 matris [rows x dim], metadata)
+    """
+    if len(payload) < _HEADER.size:
+        raise EmbeddingCodecError("Payload shorter than header")
+    magic, version, dtype_code, rows, dim, meta_length = _HEADER.unpack_from(payload)
+    if magic != _MAGIC:
+        raise EmbeddingCodecError("Invalid embedding payload magic")
+    if version != CODEC_VERSION:
+        raise EmbeddingCodecError(f"Unsupported embedding codec version: {version}")
+    if dtype_code not in _CODE_DTYPES:
+        raise EmbeddingCodecError(f"Unknown dtype code: {dtype_code}")
+
+    offset = _HEADER.size
+    meta = json.loads(payload[offset:offset + meta_length].decode("utf-8")) if meta_length else {}
+    offset += meta_length
+
+    dtype = _CODE_DTYPES[dtype_code]
+    expected = rows * dim * dtype.itemsize
+    if len(payload) - offset != expected:
+        raise EmbeddingCodecError(f"Payload size mismatch: expected {expected} bytes, "
+                                  f"got {len(payload) - offset}")
+
+    matrix = np.frombuffer(payload, dtype=dtype, count=rows * dim, offset=offset).reshape(rows, dim)
+    # float16 taşıma sadece kablo üzerinde; hesaplamalar float32 ile yapılır
+    return matrix.astype(np.float32, copy=dtype_code != _DTYPE_CODES["float32"]), meta
@@ -0,0 +1,155 @@
+"""
+⚙️ AI Mikroservisi Çıkarım Yürütücüsü
+===================================
+Bloklayan model çağrılarını event loop dışında, sınırlı kuyruklu
+thread havuzlarında çalıştırır.
+
+- Embedding ve metin üretimi ayrı havuzlarda: uzun bir üretim embedding
+  isteklerini ve /health kontrolünü bekletmez
+- Kuyruk doluysa istek hemen reddedilir (InferenceQueueFullError -> 503 + Retry-After)
+- Kuyruk derinliği ve bekleme süresi istatistikleri /health için raporlanır
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFullError(Exception):
+    """Çıkarım kuyruğu dolu"""
+
+    def __init__(self, pool_name: str, retry_after: int):
+        super().__init__(f"{pool_name} inference queue is full")
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+
+
+class BoundedInferenceExecutor:
+    """
+    Sınırlı kuyruklu çıkarım havuzu
+    max_workers iş aynı anda çalışır, en fazla max_queue iş bekler.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, retry_after: int = 1):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix=f"ai-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._wait_times_ms = deque(maxlen=500)
+        self._run_times_ms = deque(maxlen=500)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        func'ı havuzda çalıştır ve sonucunu bekle
+
+        Raises:
+            InferenceQueueFullError: çalışan + bekleyen iş sayısı sınırdaysa
+        """
+        with self._lock:
+            if self._queued + self._running >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceQueueFullError(self.name, self.retry_after)
+            self._queued += 1
+
+        submitted_at = time.perf_counter()
+
+        def _job():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_times_ms.append((started_at - submitted_at) * 1000)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_times_ms.append((time.perf_counter() - started_at) * 1000)
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor, _job)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Kuyruk derinliği ve bekleme süresi istatistikleri"""
+        with self._lock:
+            waits = sorted(self._wait_times_ms)
+            runs = list(self._run_times_ms)
+            stats = {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "failed": self._failed,
+            }
+        stats["wait_time_ms"] = {
+            "average": round(sum(waits) / len(waits), 2) if waits else 0,
+            "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0,
+            "max": round(waits[-1], 2) if waits else 0,
+        }
+        stats["average_run_time_ms"] = round(sum(runs) / len(runs), 2) if runs else 0
+        return stats
+
+    def shutdown(self, wait: bool = False):
+        """Havuzu kapat"""
+        self._executor.shutdown(wait=wait)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# Global havuzlar
+# Embedding: kısa ve paralel çalışabilen çağrılar (torch / ONNX Runtime GIL'i bırakır)
+embedding_executor = BoundedInferenceExecutor(
+    "embedding",
+    max_workers=_env_int("AI_SERVICE_EMBEDDING_WORKERS", 4),
+    max_queue=_env_int("AI_SERVICE_EMBEDDING_QUEUE", 64),
+)
+# Üretim: tek model örneği üzerinde seri çalışan uzun çağrılar
+generation_executor = BoundedInferenceExecutor(
+    "generation",
+    max_workers=_env_int("AI_SERVICE_GENERATION_WORKERS", 1),
+    max_queue=_env_int("AI_SERVICE_GENERATION_QUEUE", 8),
+    retry_after=_env_int("AI_SERVICE_GENERATION_RETRY_AFTER", 5),
+)
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Tüm çıkarım havuzlarının istatistikleri"""
+    return {
+        "embedding": embedding_executor.get_stats(),
+        "generation": generation_executor.get_stats(),
+    }
+
+
+def shutdown_executors():
+    """Uygulama kapanırken havuzları kapat"""
+    embedding_executor.shutdown()
+    generation_executor.shutdown()
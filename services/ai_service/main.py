@@ -11,12 +11,15 @@ import logging
 import asyncio
 import os
 import sys
+import time
 from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
+import numpy as np
 import uvicorn
 
 # Proje root'unu path'e ekle
@@ -25,6 +28,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 # AI model manager'ı import et
 from model_manager import model_manager
 from core.configuration import get_config
+from services.ai_service.embedding_codec import (
+    EMBEDDING_MEDIA_TYPE, encode_embeddings, negotiate_embedding_format, pack_embedding_rows
+)
+from services.ai_service.inference_executor import (
+    InferenceQueueFullError, embedding_executor, generation_executor,
+    get_executor_stats, shutdown_executors
+)
 
 # Logging ayarları
 logging.basicConfig(
@@ -43,10 +53,22 @@ class EmbeddingResponse(BaseModel):
     model_used: str
     language_detected: str
 
+class EmbeddingBatchRequest(BaseModel):
+    texts: List[str]
+    force_turkish: Optional[bool] = None
+
+class EmbeddingBatchResponse(BaseModel):
+    embeddings: List[List[float]]
+    models_used: List[str]
+    languages_detected: List[str]
+
+MAX_EMBEDDING_BATCH_SIZE = int(os.getenv("AI_SERVICE_MAX_EMBEDDING_BATCH", "256"))
+
 class TextGenerationRequest(BaseModel):
     prompt: str
     max_length: Optional[int] = 80
     turkish_context: Optional[bool] = True
+    time_budget_seconds: Optional[float] = None  # Zaman bütçesi; dolunca cümle sınırında kesilir
 
 class TextGenerationResponse(BaseModel):
     generated_text: str
@@ -73,6 +95,7 @@ class HealthResponse(BaseModel):
     models_available: Dict[str, bool]
     memory_usage_mb: float
     uptime_seconds: float
+    inference_queues: Dict[str, Any] = {}
 
 # Global değişkenler
 startup_time = None
@@ -106,7 +129,8 @@ async def lifespan(app: FastAPI):
     logger.info("🔄 AI Mikroservisi kapatılıyor...")
     
     try:
-        # Model kaynaklarını temizle
+        # Çıkarım havuzlarını ve model kaynaklarını temizle
+        shutdown_executors()
         model_manager.cleanup_resources()
         logger.info("✅ AI Mikroservisi temizlendi")
     except Exception as e:
@@ -150,15 +174,23 @@ async def health_check():
                 "text_generator": model_info["text_generator_loaded"]
             },
             memory_usage_mb=model_info["memory_info"].get("memory_mb", 0),
-            uptime_seconds=uptime
+            uptime_seconds=uptime,
+            inference_queues=get_executor_stats()
         )
     except Exception as e:
         logger.error(f"Sağlık kontrolü hatası: {e}")
         raise HTTPException(status_code=500, detail="Health check failed")
 
+def _binary_embedding_response(rows: List[Any], dtype: str, meta: Dict[str, Any]) -> Response:
+    """Embedding satırlarını ikili yanıta dönüştür (boş ve farklı boyutlu satırlar meta ile işaretlenir)"""
+    return Response(
+        content=encode_embeddings(pack_embedding_rows(rows, meta), dtype, meta),
+        media_type=EMBEDDING_MEDIA_TYPE
+    )
+
 @app.post("/embedding", response_model=EmbeddingResponse)
-async def generate_embedding(request: EmbeddingRequest):
-    """Metin için embedding oluştur"""
+async def generate_embedding(request: EmbeddingRequest, http_request: Request):
+    """Metin için embedding oluştur (Accept ile ikili yanıt istenebilir)"""
     try:
         if not request.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
@@ -166,9 +198,10 @@ async def generate_embedding(request: EmbeddingRequest):
         # Dil tanıma
         language = model_manager.detect_language(request.text)
         
-        # Embedding oluştur
-        embedding = model_manager.generate_embedding(
-            request.text, 
+        # Embedding oluştur (event loop dışında)
+        embedding = await embedding_executor.run(
+            model_manager.generate_embedding,
+            request.text,
             force_turkish=request.force_turkish
         )
         
@@ -182,18 +215,72 @@ async def generate_embedding(request: EmbeddingRequest):
         else:
             model_used = "english_sentence_transformer"
         
+        binary_dtype = negotiate_embedding_format(http_request.headers.get("accept"))
+        if binary_dtype:
+            return _binary_embedding_response(
+                [embedding], binary_dtype,
+                {"model": model_used, "language": language}
+            )
+        
         return EmbeddingResponse(
             embedding=embedding,
             model_used=model_used,
             language_detected=language
         )
         
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except Exception as e:
         logger.error(f"Embedding oluşturma hatası: {e}")
         raise HTTPException(status_code=500, detail=f"Embedding generation failed: {str(e)}")
 
+def _embedding_model_name(language: str, force_turkish: Optional[bool]) -> str:
+    """Embedding için kullanılan modeli belirle"""
+    config = get_config().ai
+    if force_turkish or (force_turkish is None and config.language_detection and language == 'turkish'):
+        return "turkish_sentence_transformer"
+    return "english_sentence_transformer"
+
+@app.post("/embedding/batch", response_model=EmbeddingBatchResponse)
+async def generate_embedding_batch(request: EmbeddingBatchRequest, http_request: Request):
+    """Birden çok metin için tek ileri geçişte embedding oluştur (Accept ile ikili yanıt istenebilir)"""
+    try:
+        if not request.texts:
+            raise HTTPException(status_code=400, detail="Texts cannot be empty")
+        if len(request.texts) > MAX_EMBEDDING_BATCH_SIZE:
+            raise HTTPException(status_code=400,
+                                detail=f"Batch too large (max {MAX_EMBEDDING_BATCH_SIZE} texts)")
+        
+        languages = [model_manager.detect_language(text) for text in request.texts]
+        models_used = [_embedding_model_name(language, request.force_turkish) for language in languages]
+        binary_dtype = negotiate_embedding_format(http_request.headers.get("accept"))
+        
+        # Tek havuz işi: model başına tek forward pass
+        embeddings = await embedding_executor.run(
+            model_manager.generate_embeddings_batch,
+            request.texts,
+            force_turkish=request.force_turkish,
+            as_numpy=bool(binary_dtype)
+        )
+        
+        if binary_dtype:
+            return _binary_embedding_response(
+                embeddings, binary_dtype,
+                {"models": models_used, "languages": languages}
+            )
+        
+        return EmbeddingBatchResponse(
+            embeddings=embeddings,
+            models_used=models_used,
+            languages_detected=languages
+        )
+        
+    except (HTTPException, InferenceQueueFullError):
+        raise
+    except Exception as e:
+        logger.error(f"Toplu embedding oluşturma hatası: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch embedding generation failed: {str(e)}")
+
 @app.post("/generate", response_model=TextGenerationResponse)
 async def generate_text(request: TextGenerationRequest):
     """Metin üretimi"""
@@ -201,11 +288,15 @@ async def generate_text(request: TextGenerationRequest):
         if not request.prompt.strip():
             raise HTTPException(status_code=400, detail="Prompt cannot be empty")
         
-        # Metin üret
-        generated_text = model_manager.generate_text_response(
+        # Metin üret (event loop dışında)
+        generated_text = await generation_executor.run(
+            model_manager.generate_text_response,
             prompt=request.prompt,
             max_length=request.max_length,
-            turkish_context=request.turkish_context
+            turkish_context=request.turkish_context,
+            # İstemcinin bütçesi yapılandırılmış üretim bütçesini aşamaz
+            time_budget=(min(request.time_budget_seconds, get_config().ai.generation_time_budget)
+                         if request.time_budget_seconds else None)
         )
         
         if not generated_text:
@@ -220,7 +311,7 @@ async def generate_text(request: TextGenerationRequest):
             quality_score=quality_score
         )
         
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except Exception as e:
         logger.error(f"Metin üretme hatası: {e}")
@@ -234,9 +325,16 @@ async def generate_huggingface_response(request: TextGenerationRequest):
             raise HTTPException(status_code=400, detail="Prompt cannot be empty")
         
         # Hugging Face modeli ile yanıt üret
-        response = await model_manager.generate_huggingface_response(
-            message=request.prompt,
-            user_id="ai_service"
+        deadline = None
+        if request.time_budget_seconds:
+            deadline = time.monotonic() + request.time_budget_seconds
+        # Yanıt üretimi bloklayıcı; üretim havuzundaki thread'de kendi loop'u ile çalışır
+        response = await generation_executor.run(
+            lambda: asyncio.run(model_manager.generate_huggingface_response(
+                message=request.prompt,
+                user_id="ai_service",
+                deadline=deadline
+            ))
         )
         
         if not response:
@@ -244,7 +342,7 @@ async def generate_huggingface_response(request: TextGenerationRequest):
         
         return {"response": response}
         
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except Exception as e:
         logger.error(f"Hugging Face yanıt hatası: {e}")
@@ -338,6 +436,16 @@ async def get_lazy_loading_stats():
         raise HTTPException(status_code=500, detail=f"Failed to get lazy loading stats: {str(e)}")
 
 # Hata yöneticileri
+@app.exception_handler(InferenceQueueFullError)
+async def queue_full_handler(request: Request, exc: InferenceQueueFullError):
+    """Çıkarım kuyruğu dolu: 503 + Retry-After"""
+    logger.warning(f"⚠️ {exc.pool_name} kuyruğu dolu, istek reddedildi: {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": f"AI service busy: {exc.pool_name} queue is full"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
     """404 hata yöneticisi"""
@@ -9,6 +9,7 @@ from typing import List, Any
 from database.manager import db_manager
 from websocket_manager import websocket_manager
 from core.rate_limiter import close_rate_limiter
+from housekeeping import shutdown_housekeeping_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,9 @@ class ShutdownManager:
             # Close database connections
             await self._cleanup_database()
             
+            # Stop background housekeeping jobs
+            self._cleanup_housekeeping()
+            
             logger.info("✅ Application shutdown completed")
             
         except Exception as e:
@@ -112,6 +116,13 @@ class ShutdownManager:
         except Exception as e:
             logger.warning(f"Cache manager shutdown warning: {e}")
     
+    def _cleanup_housekeeping(self):
+        """Stop the housekeeping scheduler"""
+        try:
+            shutdown_housekeeping_scheduler()
+        except Exception as e:
+            logger.warning(f"Housekeeping shutdown warning: {e}")
+    
     async def _cleanup_database(self):
         """Close database connections"""
         try:
@@ -0,0 +1,133 @@
+"""
+🔀 Single-Flight Request Coalescing for MEFAPEX AI Assistant
+Identical concurrent requests share a single computation:
+- Local: the first request computes, concurrent duplicates await the same task
+- Distributed: with Redis available, a short lock-and-notify lets other workers
+  wait for the owner and then read the answer from the shared cache
+"""
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent computations by key
+
+    ``do()`` returns ``(result, coalesced)`` where ``coalesced`` is ``None`` when
+    this request computed the result, ``"local"`` when it joined an in-flight
+    computation in this worker and ``"distributed"`` when another worker
+    computed it and the result was read back from the shared cache.
+    """
+
+    def __init__(self, lock_ttl: float = 15.0, wait_timeout: float = 10.0):
+        """
+        Args:
+            lock_ttl: Lifetime of the cross-worker lock; bounds how long a crashed
+                owner can block others
+            wait_timeout: How long a worker waits for another worker's result
+                before computing it itself
+        """
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {
+            'computed': 0,
+            'coalesced_local': 0,
+            'coalesced_distributed': 0,
+            'distributed_fallbacks': 0
+        }
+
+    async def do(self,
+                 key: str,
+                 compute: Callable[[], Awaitable[Any]],
+                 cache: Any = None,
+                 lookup: Optional[Callable[[], Awaitable[Any]]] = None) -> Tuple[Any, Optional[str]]:
+        """
+        Run ``compute`` once per key across concurrent callers
+
+        Args:
+            key: Normalized cache key of the request
+            compute: Produces the result; must also store it in the shared cache
+                so that other workers can read it
+            cache: Cache offering ``acquire_inflight`` / ``release_inflight`` /
+                ``wait_for_inflight`` for cross-worker coalescing (optional)
+            lookup: Reads the result from the shared cache after another worker
+                finished (optional)
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats['coalesced_local'] += 1
+            logger.debug(f"🔀 Coalesced with in-flight request: {key[:8]}...")
+            result, _ = await asyncio.shield(task)
+            return result, "local"
+
+        task = asyncio.ensure_future(self._lead(key, compute, cache, lookup))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done, k=key: self._finish(k, done))
+        # Shielded: a disconnecting first caller must not cancel the computation
+        # other callers are waiting for
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """Forget a completed computation"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight computation failed for {key[:8]}...: {task.exception()}")
+
+    async def _lead(self, key: str, compute, cache, lookup) -> Tuple[Any, Optional[str]]:
+        """Compute the result, or wait for the worker that already is"""
+        acquire = getattr(cache, 'acquire_inflight', None)
+        if acquire is None:
+            self._stats['computed'] += 1
+            return await compute(), None
+
+        token = uuid.uuid4().hex
+        owned = await acquire(key, token, self.lock_ttl)
+
+        if owned is False:
+            # Another worker is computing: wait for its notification, then read the cache
+            if await cache.wait_for_inflight(key, self.wait_timeout) and lookup:
+                result = await lookup()
+                if result is not None:
+                    self._stats['coalesced_distributed'] += 1
+                    logger.debug(f"🌐 Coalesced with another worker: {key[:8]}...")
+                    return result, "distributed"
+            self._stats['distributed_fallbacks'] += 1
+
+        try:
+            self._stats['computed'] += 1
+            return await compute(), None
+        finally:
+            if owned:
+                await cache.release_inflight(key, token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing statistics"""
+        return {
+            'in_flight': len(self._inflight),
+            'lock_ttl_seconds': self.lock_ttl,
+            'wait_timeout_seconds': self.wait_timeout,
+            **self._stats
+        }
+
+# Global single-flight instance for chat messages
+_chat_single_flight: Optional[SingleFlight] = None
+
+def get_chat_single_flight() -> SingleFlight:
+    """Get the global single-flight coordinator for chat messages"""
+    global _chat_single_flight
+    if _chat_single_flight is None:
+        try:
+            from core.config_utils import load_cache_config
+            cache_config = load_cache_config()
+        except Exception:
+            cache_config = None
+        _chat_single_flight = SingleFlight(
+            lock_ttl=getattr(cache_config, 'single_flight_lock_ttl', 15.0),
+            wait_timeout=getattr(cache_config, 'single_flight_wait_timeout', 10.0)
+        )
+    return _chat_single_flight
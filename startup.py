@@ -16,7 +16,7 @@ from core.rate_limiter import get_rate_limiter
 
 # Import API routes
 from api.auth import router as auth_router, set_rate_limiter as set_auth_rate_limiter
-from api.chat import router as chat_router, set_rate_limiter as set_chat_rate_limiter
+from api.chat import router as chat_router, set_rate_limiter as set_chat_rate_limiter, start_cache_warming
 from api.health import router as health_router
 
 # Import services
@@ -24,6 +24,7 @@ from database.manager import db_manager
 from websocket_manager import websocket_manager, message_handler
 from core.websocket_middleware import setup_websocket_middleware
 from auth_service import init_auth_service
+from housekeeping import get_housekeeping_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,9 @@ class StartupManager:
         logger.info("🚀 MEFAPEX Chatbot uygulaması başlatılıyor...")
         
         try:
+            # Coroutine housekeeping jobs run on this event loop
+            get_housekeeping_scheduler().attach_loop()
+            
             # Initialize unified microservice architecture
             await self._initialize_microservice_architecture()
             
@@ -57,6 +61,9 @@ class StartupManager:
             # Initialize WebSocket manager
             await self._initialize_websocket_manager()
             
+            # Warm response caches from chat history (background)
+            self._start_cache_warming()
+            
             logger.info("✅ Tüm servisler başarıyla başlatıldı")
             
             return {
@@ -153,6 +160,14 @@ class StartupManager:
             logger.error(f"❌ Cache manager initialization failed: {e}")
             # Don't raise here as cache is not critical for basic functionality
     
+    def _start_cache_warming(self):
+        """Start warming response caches with frequent questions from chat history"""
+        try:
+            start_cache_warming("startup")
+            self.initialized_services.append("cache_warming")
+        except Exception as e:
+            logger.warning(f"⚠️ Cache warming could not be started: {e}")
+    
     async def _initialize_websocket_manager(self, app=None):
         """Initialize WebSocket manager"""
         try:
@@ -182,6 +197,13 @@ class StartupManager:
     def _get_content_manager(self):
         """Get content manager if available"""
         try:
+            from core.preload import is_preloaded
+            if is_preloaded():
+                # Reuse the content indexes built in the master before fork (shared pages)
+                from content_manager import content_manager
+                logger.info("✅ Content manager loaded (preloaded)")
+                return content_manager
+            
             from content_manager import ContentManager
             content_manager = ContentManager()
             logger.info("✅ Content manager loaded")
@@ -16,6 +16,7 @@ class WebSocketChatClient {
         
         // Event listeners
         this.onMessageReceived = null;
+        this.onChunkReceived = null;
         this.onConnectionStatusChanged = null;
         this.onTypingStatusChanged = null;
         this.onError = null;
@@ -125,6 +126,18 @@ class WebSocketChatClient {
                 }
                 break;
                 
+            case 'chat_chunk':
+                // Streamed partial response (sentence-level deltas)
+                if (this.onChunkReceived) {
+                    this.onChunkReceived({
+                        streamId: data.stream_id,
+                        index: data.index,
+                        delta: data.delta,
+                        source: data.source
+                    });
+                }
+                break;
+                
             case 'bot_typing':
                 if (this.onTypingStatusChanged) {
                     this.onTypingStatusChanged(data.typing);
@@ -0,0 +1,80 @@
+"""
+Test latency-aware routing, hedging and fallback in the unified model manager
+"""
+import asyncio
+import time
+
+from unified_microservice_architecture import (
+    MicroserviceConfig, ServiceMode, ServiceRegistry, UnifiedModelManager
+)
+
+
+def _manager(**config):
+    manager = UnifiedModelManager(MicroserviceConfig(**config), ServiceRegistry())
+    manager.mode = ServiceMode.HYBRID
+    manager._ai_service_client = object()
+    manager._local_model_manager = object()
+    return manager
+
+
+def _seed_latency(manager, operation, path, elapsed_ms, samples):
+    tracker = manager._router.tracker(operation, path)
+    for _ in range(samples):
+        tracker.finish(tracker.start() - elapsed_ms / 1000, success=True)
+
+
+class TestAdaptiveRouting:
+    """Test path choice, hedging and fallback when a hedged request fails"""
+
+    def test_hedged_primary_failure_falls_back_to_local(self):
+        manager = _manager()
+
+        async def ai_func(text):
+            raise ConnectionError("ai service down")
+
+        # No latency samples yet: p95 is unknown so no hedge is ever launched
+        result = asyncio.run(manager._execute_with_fallback(
+            "generate_embedding", ai_func, lambda text: [len(text)], "merhaba", hedge=True))
+
+        assert result == [7]
+        assert manager._metrics["error_count"] == 1
+        assert manager._metrics["fallback_count"] == 1
+        stats = manager._router.get_stats()["paths"]["generate_embedding"]
+        assert stats["ai_service"]["failed"] == 1 and stats["local"]["completed"] == 1
+
+    def test_slow_primary_is_hedged_to_secondary(self):
+        manager = _manager(hedge_min_samples=5)
+        _seed_latency(manager, "generate_embedding", "ai_service", 5, 5)
+        _seed_latency(manager, "generate_embedding", "local", 50, 5)
+
+        async def ai_func(text):
+            await asyncio.sleep(1)
+            return "ai"
+
+        started = time.perf_counter()
+        result = asyncio.run(manager._execute_with_fallback(
+            "generate_embedding", ai_func, lambda text: "local", "merhaba", hedge=True))
+
+        assert result == "local" and time.perf_counter() - started < 0.5
+        hedging = manager._router.get_stats()["hedging"]
+        assert hedging["hedges_sent"] == 1 and hedging["hedge_wins"] == {"local": 1}
+        assert manager._router.tracker("generate_embedding", "ai_service").cancelled == 1
+
+    def test_router_prefers_path_with_lower_expected_completion(self):
+        manager = _manager()
+        _seed_latency(manager, "generate_text", "ai_service", 200, 3)
+        _seed_latency(manager, "generate_text", "local", 20, 3)
+        calls = []
+
+        async def ai_func(prompt):
+            calls.append("ai_service")
+            return "ai"
+
+        def local_func(prompt):
+            calls.append("local")
+            return "local"
+
+        result = asyncio.run(manager._execute_with_fallback("generate_text", ai_func, local_func, "soru"))
+
+        assert result == "local" and calls == ["local"]
+        assert manager._router.get_stats()["decisions"]["generate_text"] == {"local": 1}
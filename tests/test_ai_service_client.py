@@ -0,0 +1,102 @@
+"""
+Test embedding request coalescing and passive health tracking in the AI service client
+"""
+import asyncio
+
+import aiohttp
+import pytest
+
+from services.ai_service.client import (
+    AIServiceClient, AIServiceConfig, AIServiceUnavailableError, EmbeddingBatcher
+)
+
+
+class TestEmbeddingBatcher:
+    """Test that concurrent embedding calls share one batch request"""
+
+    def test_concurrent_calls_are_coalesced_and_deduplicated(self):
+        batches = []
+
+        async def send_batch(texts, force_turkish):
+            batches.append((list(texts), force_turkish))
+            return [f"emb:{text}" for text in texts]
+
+        async def run():
+            batcher = EmbeddingBatcher(send_batch, window_ms=10)
+            results = await asyncio.gather(
+                batcher.submit("merhaba"), batcher.submit("selam"), batcher.submit("merhaba"),
+                batcher.submit("hello", force_turkish=False),
+            )
+            return results, batcher.get_stats()
+
+        results, stats = asyncio.run(run())
+
+        assert results == ["emb:merhaba", "emb:selam", "emb:merhaba", "emb:hello"]
+        assert sorted(batches, key=str) == [(["hello"], False), (["merhaba", "selam"], None)]
+        assert stats["requests"] == 4 and stats["batches"] == 2 and stats["http_requests_saved"] == 2
+
+    def test_full_batch_is_sent_without_waiting_and_errors_reach_every_caller(self):
+        async def send_batch(texts, force_turkish):
+            raise ConnectionError("ai service down")
+
+        async def run():
+            batcher = EmbeddingBatcher(send_batch, window_ms=10_000, max_batch_size=2)
+            return await asyncio.wait_for(asyncio.gather(
+                batcher.submit("a"), batcher.submit("b"), return_exceptions=True), timeout=1)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, ConnectionError) for r in results)
+
+
+class FailingClient(AIServiceClient):
+    """Client whose session always fails and whose /health probe is scripted"""
+
+    def __init__(self, **config):
+        super().__init__(AIServiceConfig(retry_attempts=1, retry_delay=0, **config))
+        self.healthy = False
+        self.session = self
+
+    @property
+    def closed(self):
+        return False
+
+    def post(self, url, **kwargs):
+        raise aiohttp.ClientConnectionError("connection refused")
+
+    async def _check_service_health(self):
+        self._health_stats["probes"] += 1
+        return self.healthy
+
+
+class TestPassiveHealth:
+    """Test that failures mark the service down and requests then fail fast"""
+
+    def test_consecutive_failures_mark_unhealthy_then_fail_fast(self):
+        async def run():
+            client = FailingClient(unhealthy_threshold=2, health_probe_interval=60)
+            for _ in range(2):
+                with pytest.raises(AIServiceUnavailableError):
+                    await client._make_request("POST", "/generate", {"prompt": "soru"})
+            # Now rejected before any HTTP call is attempted
+            with pytest.raises(AIServiceUnavailableError):
+                await client._make_request("POST", "/generate", {"prompt": "soru"})
+            stats = client.get_connection_stats()
+            client._probe_task.cancel()
+            return stats
+
+        stats = asyncio.run(run())
+        assert stats["service_available"] is False and stats["probing"] is True
+        assert stats["failures"] == 2 and stats["fast_failures"] == 1 and stats["marked_unhealthy"] == 1
+
+    def test_background_probe_restores_the_service(self):
+        async def run():
+            client = FailingClient(unhealthy_threshold=1, health_probe_interval=0.01)
+            client._record_failure(ConnectionError("down"))
+            assert not client._service_available
+            client.healthy = True
+            await asyncio.sleep(0.1)
+            return client.get_connection_stats()
+
+        stats = asyncio.run(run())
+        assert stats["service_available"] is True and stats["probing"] is False
+        assert stats["consecutive_failures"] == 0 and stats["probes"] >= 1
@@ -0,0 +1,77 @@
+"""
+Test TinyLFU cache admission
+"""
+import pytest
+
+from cache_admission import TinyLFUAdmission, create_admission_policy
+from response_cache import AdvancedResponseCache
+
+
+class TestTinyLFUAdmission:
+    """Test the frequency sketch and doorkeeper"""
+
+    def test_estimates_follow_access_counts(self):
+        admission = TinyLFUAdmission(capacity=100)
+        for _ in range(5):
+            admission.record("popüler")
+        admission.record("tek seferlik")
+
+        assert admission.estimate("popüler") >= 5
+        assert admission.estimate("tek seferlik") == 1
+        assert admission.estimate("hiç görülmedi") == 0
+        assert admission.admit("popüler", "tek seferlik")
+        assert not admission.admit("tek seferlik", "popüler")
+
+    def test_counters_saturate(self):
+        admission = TinyLFUAdmission(capacity=1000)
+        for _ in range(100):
+            admission.record("sık")
+        assert admission.estimate("sık") <= 16
+
+    def test_aging_halves_counts(self):
+        admission = TinyLFUAdmission(capacity=16, sample_factor=1)
+        for _ in range(9):
+            admission.record("a")
+        before = admission.estimate("a")
+        for i in range(16):
+            admission.record(f"diğer {i}")
+        assert admission.resets >= 1
+        assert admission.estimate("a") < before
+
+    def test_policy_factory(self):
+        assert create_admission_policy("none", 10) is None
+        assert isinstance(create_admission_policy("TinyLFU", 10), TinyLFUAdmission)
+        with pytest.raises(ValueError):
+            create_admission_policy("arc", 10)
+
+
+class TestCacheAdmission:
+    """Test admission in AdvancedResponseCache"""
+
+    def test_one_off_queries_do_not_evict_popular_entries(self):
+        cache = AdvancedResponseCache(max_size=10, ttl=100, admission_policy="tinylfu", auto_scale=False)
+        popular = [f"popüler soru {i}" for i in range(10)]
+        for message in popular:
+            for _ in range(5):
+                cache.get(message)
+            cache.set(message, "yanıt")
+
+        for i in range(200):
+            message = f"tek seferlik soru {i}"
+            if cache.get(message) is None:
+                cache.set(message, "yanıt")
+
+        assert all(cache.get(message) for message in popular)
+        stats = cache.get_stats()
+        assert stats["admission_rejects"] == 200
+        assert stats["admission_policy"] == "tinylfu"
+
+    def test_repeated_query_is_admitted(self):
+        cache = AdvancedResponseCache(max_size=2, ttl=100, admission_policy="tinylfu", auto_scale=False)
+        for message in ("a", "b"):
+            cache.get(message)
+            cache.set(message, message)
+        for _ in range(3):
+            cache.get("c")
+        cache.set("c", "c")
+        assert cache.get("c") == ("c", "cached")
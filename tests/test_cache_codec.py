@@ -0,0 +1,51 @@
+"""
+Test the binary distributed cache entry codec
+"""
+import json
+import struct
+import time
+
+import pytest
+
+from cache_codec import (FLAG_COMPRESSED, VERSION_OFFSET, CodecError, decode_entry,
+                         encode_entry)
+from distributed_cache import DistributedCacheEntry
+
+
+def _entry(response, version=0):
+    now = time.time()
+    return DistributedCacheEntry(response, now, 3, now, "knowledge_base", "node1", version=version)
+
+
+class TestCacheCodec:
+    """Test round trips, compression and the legacy JSON path"""
+
+    def test_round_trip(self):
+        entry = _entry("İzin talepleri İK portalından yapılır. 😊", version=7)
+        decoded = DistributedCacheEntry.from_dict(decode_entry(encode_entry(entry)))
+        assert decoded == entry
+
+    def test_long_entries_are_compressed_and_smaller_than_json(self):
+        entry = _entry("Çalışma saatleri hafta içi 08:00-18:00 arasındadır. " * 30)
+        data = encode_entry(entry, compress_threshold=512)
+        assert data[3] & FLAG_COMPRESSED
+        assert len(data) < len(json.dumps(entry.to_dict())) // 4
+        assert decode_entry(data)["response"] == entry.response
+
+        short = encode_entry(_entry("Merhaba"), compress_threshold=512)
+        assert not short[3] & FLAG_COMPRESSED
+
+    def test_legacy_json_entries_are_readable(self):
+        entry = _entry("eski yanıt")
+        assert decode_entry(json.dumps(entry.to_dict())) == entry.to_dict()
+
+    def test_version_can_be_stamped_in_place(self):
+        data = bytearray(encode_entry(_entry("yanıt" * 200)))
+        data[VERSION_OFFSET:VERSION_OFFSET + 8] = struct.pack(">Q", 12345)
+        assert decode_entry(bytes(data))["version"] == 12345
+
+    def test_unknown_codec_version_is_rejected(self):
+        data = bytearray(encode_entry(_entry("yanıt")))
+        data[2] = 99
+        with pytest.raises(CodecError):
+            decode_entry(bytes(data))
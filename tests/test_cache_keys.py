@@ -0,0 +1,60 @@
+"""
+Test canonical Turkish cache keys
+"""
+from cache_keys import (CACHE_KEY_VERSION, QueryCanonicalizer, make_cache_key,
+                        turkish_casefold)
+from cache_admission import TinyLFUAdmission
+from response_cache import AdvancedResponseCache, ShardedResponseCache
+
+
+class TestQueryCanonicalizer:
+    """Test casefolding, folding rules and key versioning"""
+
+    def test_turkish_casefold(self):
+        assert turkish_casefold("İSTANBUL") == "istanbul"
+        assert turkish_casefold("IŞIK") == "ışık"
+        assert turkish_casefold("İzin") == "izin"
+
+    def test_punctuation_whitespace_and_apostrophes(self):
+        canonicalizer = QueryCanonicalizer(sort_tokens=False)
+        assert canonicalizer.canonicalize("  MEFAPEX'in   çalışma saatleri?!  ") == "mefapexin çalışma saatleri"
+        assert canonicalizer.canonicalize("MEFAPEX’in çalışma-saatleri") == "mefapexin çalışma saatleri"
+        # Separators inside numbers are kept, so ranges and dates keep their order
+        assert QueryCanonicalizer().canonicalize("vardiya 08:00-16:00") == "08:00-16:00 vardiya"
+
+    def test_stopwords_and_ordering(self):
+        canonicalizer = QueryCanonicalizer()
+        assert (canonicalizer.make_key("Acaba çalışma saatleri nedir?")
+                == canonicalizer.make_key("saatleri çalışma nedir lütfen"))
+        # Negations are not stopwords
+        assert canonicalizer.make_key("izin var mı") != canonicalizer.make_key("izin yok mu")
+        # A message of only filler words still has a key of its own
+        assert canonicalizer.canonicalize("merhaba") == "merhaba"
+
+    def test_optional_diacritic_folding(self):
+        plain, folded = QueryCanonicalizer(), QueryCanonicalizer(fold_diacritics=True)
+        assert plain.make_key("çalışma saatleri") != plain.make_key("calisma saatleri")
+        assert folded.make_key("ÇALIŞMA SAATLERİ") == folded.make_key("calisma saatleri")
+
+    def test_key_is_versioned(self):
+        key = make_cache_key("İzin nasıl alınır?")
+        version, digest = key.split(":")
+        assert version == CACHE_KEY_VERSION and len(digest) == 32
+        assert QueryCanonicalizer(version="v3").make_key("izin") != QueryCanonicalizer().make_key("izin")
+
+
+class TestCanonicalKeysInCaches:
+    """Equivalent phrasings share a cache entry"""
+
+    def test_local_caches_share_entries(self):
+        for cache in (AdvancedResponseCache(max_size=10, ttl=100, auto_scale=False),
+                      ShardedResponseCache(shards=4, max_size=40, ttl=100, auto_scale=False)):
+            cache.set("İzin nasıl alınır?", "İK portalından", source="knowledge_base")
+            assert cache.get("izin nasıl alınır") == ("İK portalından", "knowledge_base")
+
+    def test_admission_sketch_uses_digest_of_versioned_key(self):
+        admission = TinyLFUAdmission(capacity=100)
+        key = make_cache_key("izin")
+        for _ in range(3):
+            admission.record(key)
+        assert admission.estimate(key) >= 3
@@ -0,0 +1,160 @@
+"""
+Test response cache warming from chat history
+"""
+import asyncio
+
+import pytest
+
+from cache_warmer import CacheWarmer
+
+
+def _warmer(history, answers=None, cached=(), **kwargs):
+    store = {}
+    computed = []
+
+    async def compute(message):
+        computed.append(message)
+        return (answers or {}).get(message, (f"yanıt: {message}", "knowledge_base"))
+
+    async def save(message, response, source):
+        store[message] = (response, source)
+
+    async def lookup(message):
+        return ("önceki yanıt", "cached") if message in cached else None
+
+    kwargs.setdefault("rate_per_second", 0)
+    warmer = CacheWarmer(compute=compute, store=save, lookup=lookup,
+                         fetch_history=lambda days, limit: history[:limit], **kwargs)
+    return warmer, store, computed
+
+
+class TestCacheWarmer:
+    """Test candidate selection, coverage and triggers"""
+
+    def test_phrasings_grouped_by_canonical_key(self):
+        warmer, _, _ = _warmer([], top_n=2)
+        candidates, total = warmer.select_candidates([
+            {"message": "çalışma saatleri nedir", "hits": 5},
+            {"message": "Acaba ÇALIŞMA saatleri nedir?", "hits": 7},
+            {"message": "izin nasıl alınır", "hits": 10},
+            {"message": "yemekhane menüsü", "hits": 1},
+            {"message": "   ", "hits": 4},
+        ])
+        assert total == 23
+        assert [(c.message, c.hits) for c in candidates] == [
+            ("Acaba ÇALIŞMA saatleri nedir?", 12), ("izin nasıl alınır", 10)]
+
+    def test_warm_run_reports_coverage(self):
+        history = [
+            {"message": "izin nasıl alınır", "hits": 6},
+            {"message": "çalışma saatleri", "hits": 3},
+            {"message": "anlaşılmayan soru", "hits": 1},
+        ]
+        warmer, store, computed = _warmer(
+            history, answers={"anlaşılmayan soru": ("Üzgünüm", "fallback")},
+            cached={"çalışma saatleri"}, batch_size=2)
+
+        run = asyncio.run(warmer.warm("startup"))
+        assert store == {"izin nasıl alınır": ("yanıt: izin nasıl alınır", "knowledge_base")}
+        assert computed == ["izin nasıl alınır", "anlaşılmayan soru"]
+        assert (run.warmed, run.already_cached, run.skipped) == (1, 1, 1)
+        stats = warmer.get_stats()
+        assert stats["coverage"] == 66.67
+        assert stats["traffic_coverage"] == 90.0
+
+        # A refresh (content reload) recomputes cached questions too
+        asyncio.run(warmer.warm("content_reload", refresh=True))
+        assert "çalışma saatleri" in store
+
+    def test_requests_during_a_run_are_coalesced(self):
+        history = [{"message": f"soru {i}", "hits": 1} for i in range(4)]
+        warmer, _, computed = _warmer(history, batch_size=1)
+
+        async def run():
+            warmer.schedule("startup")
+            warmer.schedule("cache_clear")
+            warmer.schedule("content_reload", refresh=True)
+            await warmer._task
+
+        asyncio.run(run())
+        stats = warmer.get_stats()
+        assert stats["runs_by_reason"] == {"startup": 1, "content_reload": 1}
+        assert stats["coalesced_requests"] == 2
+        assert stats["last_run"]["refresh"] and len(computed) == 8
+
+    def test_rate_limit_spaces_batches(self):
+        history = [{"message": f"soru {i}", "hits": 1} for i in range(4)]
+        warmer, _, _ = _warmer(history, batch_size=2, rate_per_second=40)
+        run = asyncio.run(warmer.warm("startup"))
+        # Two batches of two at 40 questions/second take at least 0.1 s
+        assert run.warmed == 4 and run.duration >= 0.09
+
+    def test_only_the_worker_holding_the_lock_warms(self):
+        history = [{"message": "izin nasıl alınır", "hits": 3}]
+        locks, released = {}, []
+
+        async def claim(key, token, ttl):
+            return locks.setdefault(key, token) == token
+
+        async def release(key, token):
+            released.append(key)
+            if locks.get(key) == token:
+                del locks[key]
+
+        workers = [_warmer(history, claim=claim, release=release) for _ in range(3)]
+
+        async def run():
+            return await asyncio.gather(*(warmer.warm("startup") for warmer, _, _ in workers))
+
+        runs = asyncio.run(run())
+        assert sorted(run.claimed_elsewhere for run in runs) == [False, True, True]
+        assert sum(len(computed) for _, _, computed in workers) == 1
+        # The lock outlives a successful run: a worker starting later skips too
+        late, _, late_computed = _warmer(history, claim=claim, release=release)
+        assert asyncio.run(late.warm("startup")).claimed_elsewhere and not late_computed
+        assert released == [] and late.get_stats()["claimed_elsewhere"] == 1
+
+    def test_content_reload_lock_is_released_after_the_run(self):
+        history = [{"message": "izin nasıl alınır", "hits": 3}]
+        locks, released = {}, []
+
+        async def claim(key, token, ttl):
+            return locks.setdefault(key, token) == token
+
+        async def release(key, token):
+            released.append(key)
+            if locks.get(key) == token:
+                del locks[key]
+
+        warmer, _, computed = _warmer(history, claim=claim, release=release)
+        asyncio.run(warmer.warm("content_reload", refresh=True))
+        # A second edit shortly after is warmed again, not skipped as claimed elsewhere
+        second = asyncio.run(warmer.warm("content_reload", refresh=True))
+
+        assert not second.claimed_elsewhere and computed == ["izin nasıl alınır"] * 2
+        assert released == ["cache_warming:content_reload"] * 2 and locks == {}
+
+    def test_failed_run_releases_the_lock_and_no_redis_warms_locally(self):
+        released = []
+
+        async def claim(key, token, ttl):
+            return True
+
+        async def release(key, token):
+            released.append(key)
+
+        def broken_history(days, limit):
+            raise RuntimeError("database down")
+
+        warmer = CacheWarmer(compute=None, store=None, fetch_history=broken_history,
+                             claim=claim, release=release)
+        with pytest.raises(RuntimeError):
+            asyncio.run(warmer.warm("cache_clear"))
+        assert released == ["cache_warming:cache_clear"]
+
+        async def no_redis(key, token, ttl):
+            return None
+
+        history = [{"message": "izin nasıl alınır", "hits": 3}]
+        local, store, _ = _warmer(history, claim=no_redis)
+        assert asyncio.run(local.warm("startup")).warmed == 1 and store
@@ -0,0 +1,78 @@
+"""
+Test for the binary embedding transport codec
+"""
+import numpy as np
+import pytest
+from services.ai_service.embedding_codec import (
+    EMBEDDING_MEDIA_TYPE, EmbeddingCodecError, decode_embeddings,
+    encode_embeddings, negotiate_embedding_format, pack_embedding_rows
+)
+from services.ai_service.client import AIServiceClient
+
+
+class TestEmbeddingCodec:
+    """Test encode_embeddings / decode_embeddings round trips"""
+
+    def test_float32_round_trip(self):
+        """float32 payload decodes to the exact matrix and metadata"""
+        matrix = np.random.rand(3, 384).astype(np.float32)
+        payload = encode_embeddings(matrix, "float32", {"model": "turkish_sentence_transformer"})
+
+        decoded, meta = decode_embeddings(payload)
+        assert decoded.shape == (3, 384)
+        assert decoded.dtype == np.float32
+        assert np.array_equal(decoded, matrix)
+        assert meta == {"model": "turkish_sentence_transformer"}
+
+    def test_float16_round_trip(self):
+        """float16 payload is half the size and decodes to float32"""
+        matrix = np.random.rand(2, 768).astype(np.float32)
+        payload32 = encode_embeddings(matrix, "float32")
+        payload16 = encode_embeddings(matrix, "float16")
+
+        decoded, _ = decode_embeddings(payload16)
+        assert len(payload16) < len(payload32) * 0.6
+        assert decoded.dtype == np.float32
+        assert np.allclose(decoded, matrix, atol=1e-3)
+
+    def test_single_vector_is_one_row(self):
+        """A 1-D vector is encoded as a single row"""
+        decoded, _ = decode_embeddings(encode_embeddings([0.1, 0.2, 0.3]))
+        assert decoded.shape == (1, 3)
+
+    def test_corrupt_payload_rejected(self):
+        """Truncated or foreign payloads raise EmbeddingCodecError"""
+        payload = encode_embeddings(np.ones((2, 4), dtype=np.float32))
+        with pytest.raises(EmbeddingCodecError):
+            decode_embeddings(payload[:-4])
+        with pytest.raises(EmbeddingCodecError):
+            decode_embeddings(b"JSON" + payload[4:])
+
+
+    def test_mixed_language_batch_round_trip(self):
+        """Turkish (768-d), empty and English (384-d) rows in one batch keep their sizes"""
+        rows = [np.random.rand(768).astype(np.float32), [], np.random.rand(384).astype(np.float32)]
+        meta = {"languages": ["turkish", "turkish", "english"]}
+        payload = encode_embeddings(pack_embedding_rows(rows, meta), "float32", meta)
+
+        matrix, decoded_meta = decode_embeddings(payload)
+        decoded = AIServiceClient._embedding_rows({"embeddings": matrix, "meta": decoded_meta}, "embeddings")
+        assert [row.shape for row in decoded] == [(768,), (0,), (384,)]
+        assert np.array_equal(decoded[0], rows[0]) and np.array_equal(decoded[2], rows[2])
+
+
+class TestNegotiateEmbeddingFormat:
+    """Test Accept header content negotiation"""
+
+    def test_json_by_default(self):
+        assert negotiate_embedding_format(None) is None
+        assert negotiate_embedding_format("application/json") is None
+
+    def test_binary_dtype_parameter(self):
+        assert negotiate_embedding_format(EMBEDDING_MEDIA_TYPE) == "float32"
+        assert negotiate_embedding_format(
+            f"{EMBEDDING_MEDIA_TYPE}; dtype=float16, application/json;q=0.5"
+        ) == "float16"
+
+    def test_refused_binary(self):
+        assert negotiate_embedding_format(f"{EMBEDDING_MEDIA_TYPE};q=0") is None
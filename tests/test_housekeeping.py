@@ -0,0 +1,152 @@
+"""
+Test the timer-wheel housekeeping scheduler
+"""
+import asyncio
+import gc
+import threading
+import time
+
+from housekeeping import HousekeepingScheduler, get_housekeeping_scheduler
+from response_cache import AdvancedResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(**kwargs):
+    clock = FakeClock()
+    return HousekeepingScheduler(clock=clock, autostart=False, **kwargs), clock
+
+
+class TestHousekeepingScheduler:
+    """Test the wheel, jitter, metrics and lifecycle"""
+
+    def test_wheel_fires_due_jobs_across_revolutions(self):
+        scheduler, clock = _scheduler(tick=1.0, wheel_size=8)
+        fired = []
+        scheduler.schedule_periodic("sweep", lambda: fired.append(("sweep", clock.now)), 3, jitter=0)
+        scheduler.schedule_once("unload", lambda: fired.append(("unload", clock.now)), 20)
+
+        for _ in range(21):
+            clock.now += 1
+            scheduler.run_pending()
+
+        assert [t for name, t in fired if name == "sweep"] == [1003.0, 1006.0, 1009.0, 1012.0,
+                                                             1015.0, 1018.0, 1021.0]
+        # 20 ticks is more than two revolutions of an 8-slot wheel
+        assert ("unload", 1020.0) in fired
+        assert list(scheduler.get_stats()["jobs"]) == ["sweep"]
+
+    def test_jitter_and_per_job_metrics(self):
+        scheduler, clock = _scheduler(tick=0.1)
+        times = []
+
+        def flaky():
+            times.append(clock.now)
+            if len(times) % 2 == 0:
+                raise RuntimeError("redis down")
+
+        scheduler.schedule_periodic("flaky", flaky, 10, jitter=0.2)
+        for _ in range(1000):
+            clock.now += 0.1
+            scheduler.run_pending()
+
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        assert all(7.9 <= gap <= 12.1 for gap in gaps) and len(set(round(g, 1) for g in gaps)) > 1
+        job = scheduler.get_stats()["jobs"]["flaky"]
+        assert job["runs"] == len(times) and job["failures"] == len(times) // 2
+        assert job["last_error"] == "redis down"
+
+    def test_jobs_do_not_keep_owners_alive(self):
+        scheduler = get_housekeeping_scheduler()
+        cache = AdvancedResponseCache(max_size=10, ttl=60, cleanup_interval=30)
+        name = f"response_cache.cleanup.{id(cache):x}"
+        assert name in scheduler.get_stats()["jobs"]
+
+        cache = None
+        gc.collect()
+        job = scheduler._jobs[name]
+        scheduler._dispatch(job)
+        assert job.cancelled and name not in scheduler.get_stats()["jobs"]
+
+    def test_async_jobs_run_on_loop_skip_overlap_and_shutdown(self):
+        scheduler, clock = _scheduler(tick=1.0)
+        started, finished = [], []
+
+        async def cleanup():
+            started.append(clock.now)
+            await asyncio.sleep(0.05)
+            finished.append(clock.now)
+
+        async def run():
+            scheduler.schedule_periodic("rate_limiter.cleanup", cleanup, 1, jitter=0)
+            clock.now += 1
+            scheduler.run_pending()
+            await asyncio.sleep(0.01)
+            # Still running when due again: skipped rather than stacked
+            clock.now += 1
+            scheduler.run_pending()
+            await asyncio.sleep(0.1)
+            clock.now += 1
+            scheduler.run_pending()
+            await asyncio.sleep(0.01)
+            scheduler.shutdown()
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        assert started == [1001.0, 1003.0] and finished == [1002.0]
+        stats = scheduler.get_stats()
+        assert stats["jobs"] == {} and stats["inflight"] == 0 and stats["loop_attached"] is False
+
+    def test_blocking_jobs_run_off_the_wheel_thread(self):
+        scheduler, clock = _scheduler(tick=1.0)
+        heavy_started = threading.Event()
+        release = threading.Event()
+        heavy_threads = []
+        sweeps = []
+
+        def heavy():
+            heavy_threads.append(threading.current_thread().name)
+            heavy_started.set()
+            release.wait(5)
+
+        scheduler.schedule_periodic("memory_monitor", heavy, 1, jitter=0, blocking=True)
+        scheduler.schedule_periodic("sweep", lambda: sweeps.append(clock.now), 1, jitter=0)
+        clock.now += 1
+        scheduler.run_pending()
+        assert heavy_started.wait(5)
+        for _ in range(2):
+            clock.now += 1
+            scheduler.run_pending()
+
+        # The sweep kept its schedule while the heavy job was still running
+        assert sweeps == [1001.0, 1002.0, 1003.0]
+        job = scheduler.get_stats()["jobs"]["memory_monitor"]
+        assert job["blocking"] and job["running"] and job["skipped"] == 2
+        release.set()
+        scheduler.shutdown()
+        assert len(heavy_threads) == 1 and heavy_threads[0].startswith("Housekeeping-blocking")
+
+    def test_pause_before_fork_and_restart_in_child(self):
+        scheduler = HousekeepingScheduler(tick=0.05)
+        runs = []
+        scheduler.schedule_periodic("sweep", lambda: runs.append(1), 0.05, jitter=0)
+        assert scheduler.get_stats()["running"]
+
+        scheduler.pause()
+        assert not scheduler.get_stats()["running"]
+        assert list(scheduler.get_stats()["jobs"]) == ["sweep"]
+
+        # What a forked child does: new lock, threads restarted, jobs kept
+        parent_lock = scheduler._lock
+        scheduler.after_fork()
+        assert scheduler._lock is not parent_lock and scheduler.get_stats()["running"]
+        before = len(runs)
+        time.sleep(0.3)
+        assert len(runs) > before
+        scheduler.shutdown()
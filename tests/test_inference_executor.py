@@ -0,0 +1,57 @@
+"""
+Test the bounded inference pools of the AI service
+"""
+import asyncio
+import threading
+
+import pytest
+
+from services.ai_service.inference_executor import BoundedInferenceExecutor, InferenceQueueFullError
+
+
+class TestBoundedInferenceExecutor:
+    """Test queue limits, rejection and statistics"""
+
+    def test_full_queue_rejects_immediately(self):
+        executor = BoundedInferenceExecutor("generation", max_workers=1, max_queue=1, retry_after=5)
+        release = threading.Event()
+
+        async def run():
+            running = asyncio.ensure_future(executor.run(release.wait, 5))
+            queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+            await asyncio.sleep(0.05)
+
+            with pytest.raises(InferenceQueueFullError) as exc_info:
+                await executor.run(lambda: "rejected")
+            stats = executor.get_stats()
+
+            release.set()
+            return await running, await queued, exc_info.value, stats
+
+        try:
+            first, second, error, stats = asyncio.run(run())
+        finally:
+            executor.shutdown(wait=True)
+
+        assert first is True and second == "queued"
+        assert error.pool_name == "generation" and error.retry_after == 5
+        assert stats["running"] == 1 and stats["queue_depth"] == 1 and stats["rejected"] == 1
+        final = executor.get_stats()
+        assert final["completed"] == 2 and final["queue_depth"] == 0 and final["running"] == 0
+
+    def test_failures_are_counted_and_raised(self):
+        executor = BoundedInferenceExecutor("embedding", max_workers=2, max_queue=0)
+
+        def boom():
+            raise ValueError("bad input")
+
+        try:
+            with pytest.raises(ValueError):
+                asyncio.run(executor.run(boom))
+            assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+        finally:
+            executor.shutdown(wait=True)
+
+        stats = executor.get_stats()
+        assert stats["failed"] == 1 and stats["completed"] == 1
+        assert stats["wait_time_ms"]["max"] >= 0 and stats["average_run_time_ms"] >= 0
@@ -0,0 +1,73 @@
+"""
+Test SHARDS miss-ratio curves and hit-rate driven cache sizing
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from cache_keys import make_cache_key
+from miss_ratio_curve import MissRatioCurve, get_miss_ratio_curves
+from response_cache import AdvancedResponseCache
+
+
+def _lru_hit_rate(stream, size):
+    cache, hits = OrderedDict(), 0
+    for key in stream:
+        if key in cache:
+            hits += 1
+            cache.move_to_end(key)
+        else:
+            cache[key] = True
+            if len(cache) > size:
+                cache.popitem(last=False)
+    return round(hits / len(stream) * 100, 2)
+
+
+class TestMissRatioCurve:
+    """Test the curve against exact LRU simulation"""
+
+    def test_cyclic_stream(self):
+        curve = MissRatioCurve()
+        for _ in range(10):
+            for i in range(50):
+                curve.record(make_cache_key(f"soru {i}"))
+        assert curve.hit_rate(49) == 0.0
+        assert curve.hit_rate(50) == 90.0
+        assert curve.size_for_hit_rate(80, max_size=1000) == 50
+
+    def test_matches_exact_lru_when_unsampled(self):
+        rng = np.random.default_rng(0)
+        stream = [make_cache_key(f"soru {int(k)}") for k in rng.zipf(1.3, size=5000) % 500]
+        curve = MissRatioCurve()
+        for key in stream:
+            curve.record(key)
+        for size in (5, 50, 200):
+            assert curve.hit_rate(size) == _lru_hit_rate(stream, size)
+
+    def test_fixed_size_sampling_bounds_tracked_keys(self):
+        curve = MissRatioCurve(max_samples=64)
+        for i in range(5000):
+            curve.record(make_cache_key(f"soru {i}"))
+        stats = curve.get_stats(max_size=1000, points=4)
+        assert stats["tracked_keys"] <= 64 and stats["sample_rate"] < 0.05
+        assert [point["size"] for point in stats["curve"]] == [1, 10, 100, 1000]
+
+
+class TestHitRateDrivenSizing:
+    """Test resizing a response cache for a target hit rate"""
+
+    def test_cache_resized_for_target(self):
+        cache = AdvancedResponseCache(max_size=50, ttl=3600, auto_scale=False, background_tasks=False,
+                                      miss_ratio_curve=True, target_hit_rate=90, curve_name="test_cache")
+        for _ in range(10):
+            for i in range(200):
+                message = f"soru {i}"
+                if cache.get(message) is None:
+                    cache.set(message, "yanıt")
+
+        assert cache.get_stats()["hit_rate"] == 0.0
+        assert cache._resize_for_target_hit_rate()
+        stats = cache.get_stats()
+        assert stats["max_size"] == 200 and stats["mrc_resizes"] == 1
+        assert stats["predicted_hit_rate"] == 90.0
+        assert get_miss_ratio_curves()["test_cache"]["ready"]
@@ -0,0 +1,102 @@
+"""
+Test near-cache invalidation in EnhancedHybridDistributedCache
+"""
+import asyncio
+import json
+import time
+
+from distributed_cache import DistributedCacheEntry, EnhancedHybridDistributedCache
+
+
+class FakeRedisLayer:
+    """Redis layer returning a fixed entry"""
+
+    def __init__(self, entry):
+        self.entry = entry
+
+    async def get(self, key):
+        return self.entry
+
+
+def _hybrid(node_id="node1"):
+    return EnhancedHybridDistributedCache(local_max_size=100, node_id=node_id, auto_scale=False)
+
+
+class TestNearCacheInvalidation:
+    """Test version-stamped invalidations"""
+
+    def test_newer_write_from_other_node_drops_local_copy(self):
+        cache = _hybrid()
+        cache.local_cache.set("izin nasıl alınır", "eski yanıt")
+        key = cache._get_cache_key("izin nasıl alınır")
+        cache._note_version(key, 3)
+
+        # Own broadcasts and reordered older versions are ignored
+        cache._apply_invalidation({"op": "set", "key": key, "version": 4, "node": "node1"})
+        cache._apply_invalidation({"op": "set", "key": key, "version": 2, "node": "node2"})
+        assert cache.local_cache.get("izin nasıl alınır") == ("eski yanıt", "cached")
+
+        cache._apply_invalidation({"op": "set", "key": key, "version": 4, "node": "node2"})
+        assert cache.local_cache.get("izin nasıl alınır") is None
+        assert cache._versions[key] == 4
+
+    def test_clear_broadcast_clears_local_cache(self):
+        cache = _hybrid()
+        cache.local_cache.set("soru", "yanıt")
+        cache._apply_invalidation({"op": "clear", "key": None, "version": 0, "node": "node2"})
+        assert cache.local_cache.get("soru") is None
+
+    def test_read_older_than_announced_write_is_not_installed(self):
+        cache = _hybrid()
+        now = time.time()
+        cache.redis_cache = FakeRedisLayer(DistributedCacheEntry("eski yanıt", now, 1, now, "openai", version=3))
+        cache.redis_available = True
+        key = cache._get_cache_key("soru")
+        cache._apply_invalidation({"op": "set", "key": key, "version": 5, "node": "node2"})
+
+        assert asyncio.run(cache.get("soru")) == ("eski yanıt", "openai")
+        assert cache.local_cache.get("soru") is None
+        assert cache._invalidation_stats["stale_installs_rejected"] == 1
+
+        cache.redis_cache.entry.version = 5
+        asyncio.run(cache.get("soru"))
+        assert cache.local_cache.get("soru") == ("eski yanıt", "openai")
+
+
+class FakePublisher:
+    """Redis client recording published invalidations"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def publish(self, channel, payload):
+        self.messages.append(json.loads(payload))
+
+
+class TestNodeIdentity:
+    """Test that default-constructed caches (one per worker) invalidate each other"""
+
+    def test_default_caches_invalidate_each_other(self):
+        worker_a = EnhancedHybridDistributedCache(local_max_size=100, auto_scale=False)
+        worker_b = EnhancedHybridDistributedCache(local_max_size=100, auto_scale=False)
+        assert worker_a.node_id != worker_b.node_id
+
+        for writer, reader in ((worker_a, worker_b), (worker_b, worker_a)):
+            reader.local_cache.set("izin nasıl alınır", "eski yanıt")
+            writer.redis_cache.redis_client = publisher = FakePublisher()
+            key = writer._get_cache_key("izin nasıl alınır")
+            version = reader._versions.get(key, 0) + 1
+            asyncio.run(writer._publish_invalidation("set", key, version))
+
+            # The writer ignores its own broadcast, the other worker applies it
+            writer._apply_invalidation(publisher.messages[-1])
+            reader._apply_invalidation(publisher.messages[-1])
+            assert reader.local_cache.get("izin nasıl alınır") is None
+            assert reader._invalidation_stats["invalidations_applied"] == 1
+
+    def test_reset_node_id_after_fork(self):
+        cache = EnhancedHybridDistributedCache(local_max_size=100, auto_scale=False)
+        master_id = cache.node_id
+        cache.reset_node_id()
+        assert cache.node_id != master_id
+        assert cache.redis_cache.node_id == cache.node_id
@@ -0,0 +1,69 @@
+"""
+Test the negative-result cache for unanswerable queries
+"""
+import time
+
+from cache_keys import make_cache_key
+from negative_cache import NegativeResultCache
+
+
+class TestNegativeResultCache:
+    """Test Bloom front, TTL, bounds and version invalidation"""
+
+    def test_hit_and_bloom_reject(self):
+        cache = NegativeResultCache(max_entries=100, ttl=60)
+        cache.add(make_cache_key("xqzv blorf"), "Üzgünüm", "default")
+        assert cache.get(make_cache_key("XQZV blorf!")) == ("Üzgünüm", "default")
+        assert cache.get(make_cache_key("çalışma saatleri")) is None
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["bloom_rejects"] == 1
+
+    def test_entries_expire(self):
+        cache = NegativeResultCache(ttl=0)
+        key = make_cache_key("spam")
+        cache.add(key, "Üzgünüm", "default")
+        time.sleep(0.01)
+        assert cache.get(key) is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_bounded_lru_and_bloom_rebuild(self):
+        cache = NegativeResultCache(max_entries=4, ttl=60)
+        keys = [make_cache_key(f"spam {i}") for i in range(12)]
+        for key in keys:
+            cache.add(key, "Üzgünüm", "default")
+        stats = cache.get_stats()
+        assert stats["size"] == 4 and stats["evictions"] == 8
+        assert stats["bloom_rebuilds"] == 2
+        assert all(cache.get(key) for key in keys[-4:])
+        assert cache.get(keys[0]) is None
+
+    def test_version_change_clears(self):
+        cache = NegativeResultCache()
+        assert not cache.sync_version((1, 1, 1))
+        key = make_cache_key("spam")
+        cache.add(key, "Üzgünüm", "turkish_fallback")
+        assert not cache.sync_version((1, 1, 1))
+        assert cache.get(key)
+
+        # e.g. the intent model was retrained
+        assert cache.sync_version((1, 1, 2))
+        assert cache.get(key) is None
+        assert cache.get_stats()["invalidations"] == 1
+
+
+class TestContentManagerNegativeCache:
+    """Test that knowledge reloads invalidate remembered unanswerable queries"""
+
+    def test_synonym_reload_clears_negative_cache(self):
+        from content_manager import ContentManager
+        from enhanced_question_matcher import TurkishTextNormalizer
+
+        manager = ContentManager()
+        manager.find_response("xqzv blorf")
+        manager.find_response("xqzv blorf")
+        assert manager.stats["negative_cache_hits"] == 1
+
+        TurkishTextNormalizer.reload_synonyms()
+        manager.find_response("xqzv blorf")
+        assert manager.stats["negative_cache_hits"] == 1
+        assert manager._negative_cache.get_stats()["invalidations"] == 1
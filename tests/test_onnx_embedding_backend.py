@@ -0,0 +1,105 @@
+"""
+Test ONNX embedding pooling, normalization and concurrent encode without onnxruntime
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import onnx_embedding_backend
+from onnx_embedding_backend import ONNXEmbeddingBackend, cosine_agreement
+
+# Token embeddings for two texts: the second has one padding token
+TOKEN_EMBEDDINGS = np.array([
+    [[1.0, 0.0], [3.0, 4.0], [5.0, 2.0]],
+    [[0.0, 2.0], [2.0, 0.0], [9.0, 9.0]],
+], dtype=np.float32)
+ATTENTION_MASK = np.array([[1, 1, 1], [1, 1, 0]])
+
+
+class FakeTokenizer:
+    """Tokenizer stub that fails if two threads call it at the same time"""
+
+    def __init__(self):
+        self._active = 0
+        self.overlapped = False
+
+    def __call__(self, texts, **kwargs):
+        self._active += 1
+        if self._active > 1:
+            self.overlapped = True
+        time.sleep(0.01)
+        self._active -= 1
+        n = len(texts)
+        return {"input_ids": np.ones((n, 3), dtype=np.int32), "attention_mask": ATTENTION_MASK[:n]}
+
+
+class FakeSession:
+    """InferenceSession stub returning fixed token embeddings"""
+
+    def __init__(self):
+        self.feeds = []
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        return [TOKEN_EMBEDDINGS[:len(feeds["input_ids"])]]
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(onnx_embedding_backend, "ONNXRUNTIME_AVAILABLE", True)
+    backend = ONNXEmbeddingBackend("test/model", str(tmp_path), quantize=False)
+    backend._session = FakeSession()
+    backend._tokenizer = FakeTokenizer()
+    backend._input_names = ["input_ids", "attention_mask"]
+    return backend
+
+
+class TestONNXEmbeddingBackend:
+    """Test the NumPy pooling that has to match SentenceTransformer output"""
+
+    def test_mean_pooling_ignores_padding_and_normalizes(self, backend):
+        embeddings = backend.encode(["a", "b"])
+        expected = np.array([[3.0, 2.0], [1.0, 1.0]])
+        expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+
+        assert embeddings.dtype == np.float32
+        np.testing.assert_allclose(embeddings, expected, rtol=1e-6)
+        assert backend._session.feeds[0]["input_ids"].dtype == np.int64
+
+    def test_cls_and_max_pooling(self, backend):
+        backend._pooling_mode = "cls"
+        np.testing.assert_allclose(backend.encode(["a", "b"], normalize_embeddings=False),
+                                   [[1.0, 0.0], [0.0, 2.0]])
+        backend._pooling_mode = "max"
+        # The padded [9, 9] token must not win the max
+        np.testing.assert_allclose(backend.encode(["a", "b"], normalize_embeddings=False),
+                                   [[5.0, 4.0], [2.0, 2.0]])
+
+    def test_concurrent_encode_serializes_the_tokenizer(self, backend):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: backend.encode(["a", "b"]), range(16)))
+
+        assert not backend._tokenizer.overlapped
+        assert all(np.array_equal(r, results[0]) for r in results)
+        np.testing.assert_allclose(cosine_agreement(results[0], results[-1]), [1.0, 1.0], rtol=1e-6)
+
+    def test_unload_during_encode_does_not_break_the_call(self, backend):
+        tokenizer = backend._tokenizer
+        started = threading.Event()
+        original = tokenizer.__call__
+
+        def slow_tokenize(texts, **kwargs):
+            started.set()
+            time.sleep(0.05)
+            return original(texts, **kwargs)
+
+        backend._tokenizer = slow_tokenize
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(backend.encode, ["a"])
+            started.wait(1)
+            backend.unload()
+            assert future.result().shape == (1, 2)
+        assert backend.get_info()["loaded"] is False
@@ -0,0 +1,154 @@
+"""
+Test the one-round-trip Redis get/set/evict scripts of the distributed cache
+(needs fakeredis with Lua support: pip install "fakeredis[lua]")
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+import distributed_cache
+from distributed_cache import DistributedCacheEntry, RedisDistributedCache
+
+PREFIX = "test:cache:"
+
+
+def _cache(server, **kwargs):
+    """Cache wired to an in-process fake Redis server instead of connect()"""
+    kwargs.setdefault("limit_check_interval", 0)
+    cache = RedisDistributedCache(key_prefix=PREFIX, **kwargs)
+    cache.redis_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    cache._binary_client = fakeredis.aioredis.FakeRedis(server=server)
+    return cache
+
+
+def _entry(response, last_accessed=None):
+    now = time.time()
+    return DistributedCacheEntry(response=response, timestamp=now, access_count=1,
+                                 last_accessed=last_accessed or now, source="knowledge_base")
+
+
+class TestRedisScripts:
+    """Test set -> get, inline and background eviction, and versioned writes"""
+
+    def test_set_then_get_round_trips_each_codec(self):
+        server = fakeredis.FakeServer()
+
+        async def run():
+            results = {}
+            for codec in ("binary", "json"):
+                cache = _cache(server, codec=codec, eviction_policy="lfu")
+                await cache.set(f"{codec}-key", _entry(f"yanıt {codec}"), ttl=60)
+                first = await cache.get(f"{codec}-key")
+                second = await cache.get(f"{codec}-key")
+                missing = await cache.get("no-such-key")
+                ttl = await cache.redis_client.ttl(PREFIX + f"{codec}-key")
+                results[codec] = (first, second, missing, ttl)
+            return results
+
+        for codec, (first, second, missing, ttl) in asyncio.run(run()).items():
+            assert first.response == f"yanıt {codec}" and first.source == "knowledge_base"
+            # LFU: the script bumps the index score on every read
+            assert (first.access_count, second.access_count) == (2, 3)
+            assert missing is None and 0 < ttl <= 60
+
+    def test_new_key_in_a_full_cache_evicts_the_lru_victim(self):
+        server = fakeredis.FakeServer()
+        cache = _cache(server, max_entries=2, eviction_policy="lru")
+
+        async def run():
+            await cache.set("a", _entry("A", last_accessed=100.0))
+            await cache.set("b", _entry("B", last_accessed=200.0))
+            await cache.get("a")  # Touch: "b" is now least recently used
+            await cache.set("c", _entry("C"))
+            # Overwriting an existing key never evicts
+            await cache.set("c", _entry("C2"))
+            members = await cache.redis_client.zrange(PREFIX + "index", 0, -1)
+            return [await cache.get(key) for key in "abc"], members
+
+        (a, b, c), members = asyncio.run(run())
+        assert a.response == "A" and b is None and c.response == "C2"
+        assert sorted(members) == ["a", "c"]
+        assert cache._stats["evictions"] == 1 and cache._last_size == 2
+
+    def test_enforce_limits_trims_overshoot_with_the_evict_script(self):
+        server = fakeredis.FakeServer()
+        cache = _cache(server, max_entries=10, eviction_policy="fifo")
+
+        async def run():
+            for i in range(5):
+                await cache.set(f"k{i}", _entry(f"v{i}"))
+            cache.max_entries = 2
+            await cache.enforce_limits()
+            return sorted(await cache.redis_client.zrange(PREFIX + "index", 0, -1)), await cache.get_size()
+
+        members, size = asyncio.run(run())
+        assert members == ["k3", "k4"] and size == 2
+        assert cache._stats["evictions"] == 3
+
+    def test_versioned_set_stamps_the_entry_and_publishes_the_bump(self):
+        server = fakeredis.FakeServer()
+
+        async def run():
+            published = []
+            for codec in ("binary", "json"):
+                cache = _cache(server, codec=codec)
+                pubsub = cache.redis_client.pubsub()
+                await pubsub.subscribe(cache._make_invalidation_channel())
+                await pubsub.get_message(timeout=1)  # Subscribe confirmation
+
+                version = await cache.set(f"{codec}-key", _entry("yanıt"), versioned=True)
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+                stored = await cache.get(f"{codec}-key")
+                await pubsub.aclose()
+                published.append((version, stored.version, json.loads(message["data"]), cache.node_id))
+            return published
+
+        (binary_version, binary_stored, binary_msg, binary_node), (json_version, json_stored, json_msg, _) = \
+            asyncio.run(run())
+        # One shared counter across codecs; the stamp lands inside the stored value
+        assert (binary_version, json_version) == (1, 2)
+        assert binary_stored == 1 and json_stored == 2
+        assert binary_msg == {"op": "set", "key": "binary-key", "version": 1, "node": binary_node}
+        assert json_msg["key"] == "json-key" and json_msg["version"] == 2
+
+    def test_inflight_lock_is_released_only_by_its_owner(self):
+        server = fakeredis.FakeServer()
+        cache = _cache(server)
+
+        async def run():
+            owned = await cache.acquire_inflight("key", "token-a", 5000)
+            taken = await cache.acquire_inflight("key", "token-b", 5000)
+            await cache.release_inflight("key", "token-b")  # Not the owner: no-op
+            still_held = await cache.redis_client.get(PREFIX + "inflight:key")
+            await cache.release_inflight("key", "token-a")
+            return owned, taken, still_held, await cache.redis_client.get(PREFIX + "inflight:key")
+
+        assert asyncio.run(run()) == (True, False, "token-a", None)
+
+    def test_either_codec_reads_entries_written_by_the_other(self, monkeypatch):
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(distributed_cache.redis, "from_url", lambda url, **kwargs: fakeredis.aioredis.FakeRedis(
+            server=server, decode_responses=kwargs.get("decode_responses", False)))
+
+        async def run():
+            # A rollout back from the binary codec: both formats are in Redis at once
+            binary = RedisDistributedCache(key_prefix=PREFIX, codec="binary", limit_check_interval=0)
+            legacy = RedisDistributedCache(key_prefix=PREFIX, codec="json", limit_check_interval=0)
+            await binary.connect()
+            await legacy.connect()
+            await binary.set("from-binary", _entry("ikili yanıt"), versioned=True)
+            await legacy.set("from-json", _entry("json yanıt"), versioned=True)
+            raw = await binary._binary_client.get(PREFIX + "from-binary")
+            return (raw, await legacy.get("from-binary"), await binary.get("from-json"),
+                    legacy._stats["errors"] + binary._stats["errors"])
+
+        raw, binary_entry, json_entry, errors = asyncio.run(run())
+        assert raw.startswith(b"MC")
+        assert binary_entry.response == "ikili yanıt" and binary_entry.version == 1
+        assert json_entry.response == "json yanıt" and json_entry.version == 2
+        assert errors == 0
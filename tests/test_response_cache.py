@@ -0,0 +1,167 @@
+"""
+Test AdvancedResponseCache behaviour
+"""
+import asyncio
+import threading
+import time
+
+from response_cache import AdvancedResponseCache, ShardedResponseCache, create_response_cache
+
+
+class TestStaleWhileRevalidate:
+    """Test soft TTL / hard TTL serving"""
+
+    def test_stale_entry_served_and_refreshed_once(self):
+        """Between soft and hard TTL the stale answer is returned and refreshed once"""
+        cache = AdvancedResponseCache(max_size=10, ttl=100, soft_ttl=10, auto_scale=False)
+        cache.set("merhaba", "eski yanıt", source="openai", timestamp=time.time() - 30)
+        calls = []
+
+        async def refresher(message, context):
+            calls.append(message)
+            await asyncio.sleep(0.01)
+            return ("yeni yanıt", "openai")
+
+        cache.set_refresher(refresher)
+
+        async def run():
+            first = cache.get("merhaba")
+            second = cache.get("merhaba")
+            await asyncio.sleep(0.05)
+            return first, second, cache.get("merhaba")
+
+        first, second, refreshed = asyncio.run(run())
+        assert first == second == ("eski yanıt", "openai")
+        assert refreshed == ("yeni yanıt", "openai")
+        assert calls == ["merhaba"]
+        stats = cache.get_stats()
+        assert stats["stale_hits"] == 2
+        assert stats["refreshes"] == 1
+
+    def test_hard_ttl_still_misses(self):
+        """Entries older than the hard TTL are not served"""
+        cache = AdvancedResponseCache(max_size=10, ttl=100, soft_ttl=10, auto_scale=False)
+        cache.set("merhaba", "eski yanıt", timestamp=time.time() - 200)
+        assert cache.get("merhaba") is None
+
+    def test_failed_refresh_keeps_stale_entry(self):
+        """A failing refresher leaves the stale entry in place until the hard TTL"""
+        cache = AdvancedResponseCache(max_size=10, ttl=100, soft_ttl=10, auto_scale=False)
+        cache.set("merhaba", "eski yanıt", timestamp=time.time() - 30)
+
+        async def refresher(message, context):
+            raise RuntimeError("model error")
+
+        cache.set_refresher(refresher)
+
+        async def run():
+            cache.get("merhaba")
+            await asyncio.sleep(0.01)
+            return cache.get("merhaba")
+
+        assert asyncio.run(run()) == ("eski yanıt", "cached")
+        assert cache.get_stats()["refresh_failures"] >= 1
+
+
+class TestEvictionPolicies:
+    """Test the eviction structures behind each policy"""
+
+    def _cache(self, policy, max_size=3):
+        return AdvancedResponseCache(max_size=max_size, ttl=100, eviction_policy=policy,
+                                     max_memory_mb=10, auto_scale=False)
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = self._cache("lfu")
+        for message in ("a", "b", "c"):
+            cache.set(message, message)
+        cache.get("a")
+        cache.get("a")
+        cache.get("c")
+        cache.set("d", "d")
+        assert cache.get("b") is None
+        assert all(cache.get(message) for message in ("a", "c", "d"))
+
+    def test_ttl_aware_evicts_oldest_entry(self):
+        cache = self._cache("ttl_aware")
+        now = time.time()
+        cache.set("a", "a", timestamp=now - 10)
+        cache.set("b", "b", timestamp=now - 50)
+        cache.set("c", "c", timestamp=now - 20)
+        cache.set("d", "d")
+        assert cache.get("b") is None
+        assert cache.get_stats()["size"] == 3
+
+    def test_fifo_evicts_first_inserted(self):
+        cache = self._cache("fifo")
+        for message in ("a", "b", "c"):
+            cache.set(message, message)
+        cache.get("a")
+        cache.set("d", "d")
+        assert cache.get("a") is None
+
+    def test_random_keeps_size_and_memory_consistent(self):
+        cache = self._cache("random", max_size=50)
+        for i in range(500):
+            cache.set(f"message {i}", "x" * (i % 7))
+        assert cache.get_stats()["size"] == 50
+        assert cache._current_memory_usage == sum(entry.get_memory_size() for entry in cache._cache.values())
+
+    def test_cleanup_removes_only_expired_entries(self):
+        cache = self._cache("lru", max_size=10)
+        cache.set("old", "old", timestamp=time.time() - 200)
+        cache.set("new", "new")
+        cache.set("new", "newer")
+        cache._cleanup_expired()
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get("new") == ("newer", "cached")
+
+
+class TestShardedResponseCache:
+    """Test the lock-striped sharded cache"""
+
+    def test_get_set_and_aggregated_stats(self):
+        cache = ShardedResponseCache(shards=4, max_size=100, ttl=100, auto_scale=False)
+        for i in range(50):
+            cache.set(f"soru {i}", f"yanıt {i}", source="test")
+        assert cache.get("soru 7") == ("yanıt 7", "test")
+        assert cache.get("yok") is None
+
+        stats = cache.get_stats()
+        assert stats["shards"] == 4
+        assert stats["size"] == 50
+        assert stats["max_size"] == 100
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["largest_shard_size"] < 50
+
+    def test_limits_split_across_segments(self):
+        cache = ShardedResponseCache(shards=4, max_size=40, ttl=100, auto_scale=False)
+        for i in range(1000):
+            cache.set(f"soru {i}", "yanıt")
+        assert cache.get_stats()["size"] <= 40
+
+    def test_concurrent_threads(self):
+        cache = ShardedResponseCache(shards=8, max_size=10000, ttl=100, auto_scale=False)
+
+        def worker(offset):
+            for i in range(500):
+                cache.set(f"soru {offset}-{i}", "yanıt")
+                cache.get(f"soru {offset}-{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.get_stats()
+        assert stats["size"] == 4000
+        assert stats["hits"] == 4000
+
+    def test_factory_creates_sharded_cache(self):
+        class Config:
+            response_cache_max_size = 100
+            response_cache_ttl = 60
+            response_cache_eviction_policy = "lru"
+            cache_shards = 4
+
+        assert isinstance(create_response_cache(Config()), ShardedResponseCache)
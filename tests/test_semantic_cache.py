@@ -0,0 +1,163 @@
+"""
+Test the semantic near-duplicate response cache
+"""
+import asyncio
+
+import numpy as np
+
+import semantic_cache
+from semantic_cache import EmbeddingIndex, SemanticResponseCache, parse_source_thresholds
+
+
+def _vector(seed, dim=64):
+    return np.random.default_rng(seed).standard_normal(dim)
+
+
+def _near(base, noise, seed=0):
+    """A vector with roughly the given cosine distance from ``base``"""
+    return base + noise * np.linalg.norm(base) * _vector(seed + 1000, base.shape[0]) / np.sqrt(base.shape[0])
+
+
+class TestEmbeddingIndex:
+    """Test the ring-buffer ANN index"""
+
+    def _unit(self, vector):
+        return (vector / np.linalg.norm(vector)).astype(np.float32)
+
+    def test_lsh_search_finds_near_vector(self):
+        index = EmbeddingIndex(capacity=2000, brute_force_limit=0)
+        vectors = [self._unit(_vector(i)) for i in range(1500)]
+        for vector in vectors:
+            index.add(vector)
+        found = 0
+        for i in range(0, 1500, 50):
+            results = index.search(self._unit(_near(vectors[i], 0.1, seed=i)))
+            found += bool(results) and results[0][0] == i
+        assert found >= 28
+
+    def test_ring_buffer_replaces_oldest(self):
+        index = EmbeddingIndex(capacity=4)
+        vectors = [self._unit(_vector(i)) for i in range(6)]
+        for vector in vectors:
+            index.add(vector)
+        assert len(index) == 4
+        assert index.search(vectors[0])[0][1] < 0.99
+        assert index.search(vectors[5])[0][0] == 1
+
+
+class TestSemanticResponseCache:
+    """Test thresholds, storage rules and verification"""
+
+    def _cache(self, vectors, **kwargs):
+        return SemanticResponseCache(embed=lambda text: vectors[text], **kwargs)
+
+    def test_near_duplicate_hit_and_distinct_miss(self):
+        base = _vector(1)
+        vectors = {
+            "çalışma saatleri nedir": base,
+            "çalışma saatleriniz nedir?": _near(base, 0.05),
+            "izin nasıl alınır": _vector(2),
+        }
+        cache = self._cache(vectors)
+
+        async def run():
+            await cache.store("çalışma saatleri nedir", "08:00-18:00", "static_content")
+            return (await cache.lookup("çalışma saatleriniz nedir?"),
+                    await cache.lookup("izin nasıl alınır"))
+
+        hit, miss = asyncio.run(run())
+        assert hit.hit and hit.response == "08:00-18:00" and hit.source == "static_content"
+        assert not miss.hit and miss.embedding is not None
+        assert cache.get_stats()["hits_by_source"] == {"static_content": 1}
+
+    def test_per_source_thresholds(self):
+        base = _vector(3)
+        vectors = {"soru": base, "benzer soru": _near(base, 0.35)}
+        similarity = float(np.dot(base, vectors["benzer soru"]) /
+                           (np.linalg.norm(base) * np.linalg.norm(vectors["benzer soru"])))
+        thresholds = {"knowledge_base": similarity - 0.01, "openai": similarity + 0.01}
+
+        async def lookup(source):
+            cache = self._cache(vectors, source_thresholds=thresholds)
+            await cache.store("soru", "yanıt", source)
+            return await cache.lookup("benzer soru")
+
+        assert asyncio.run(lookup("knowledge_base")).hit
+        assert not asyncio.run(lookup("openai")).hit
+
+    def test_fallback_answers_are_not_stored(self):
+        cache = self._cache({"soru": _vector(4)})
+
+        async def run():
+            await cache.store("soru", "Üzgünüm, anlayamadım", "fallback")
+            return await cache.lookup("soru")
+
+        assert not asyncio.run(run()).hit
+        assert cache.get_stats()["stores"] == 0
+
+    def test_verification_sample_counts_false_hits(self):
+        base = _vector(5)
+        vectors = {
+            "soru": base,
+            "benzer soru": _near(base, 0.05),
+            "doğru yanıt": _vector(6),
+            "farklı yanıt": _vector(7),
+        }
+
+        async def verifier(message):
+            return "farklı yanıt", "openai"
+
+        cache = self._cache(vectors, verify_sample_rate=1.0, verifier=verifier)
+
+        async def run():
+            await cache.store("soru", "doğru yanıt", "knowledge_base")
+            await cache.lookup("benzer soru")
+            await asyncio.gather(*cache._verify_tasks)
+
+        asyncio.run(run())
+        stats = cache.get_stats()
+        assert stats["false_hits"] == 1
+        assert stats["false_hits_by_source"] == {"knowledge_base": 1}
+        assert stats["false_hit_rate"] == 100.0
+
+    def test_mixed_embedding_dimensions(self):
+        base = _vector(8, dim=768)
+        vectors = {
+            "çalışma saatleri nedir": base,
+            "working hours": _vector(9, dim=384),
+            "çalışma saatleriniz nedir?": _near(base, 0.05),
+            "what are the working hours": _near(_vector(9, dim=384), 0.05),
+        }
+        cache = self._cache(vectors)
+
+        async def run():
+            # A 384-d (English model) answer stored after a 768-d one must not fail the request
+            await cache.store("çalışma saatleri nedir", "08:00-18:00", "static_content")
+            await cache.store("working hours", "08:00-18:00", "static_content")
+            return (await cache.lookup("çalışma saatleriniz nedir?"),
+                    await cache.lookup("what are the working hours"))
+
+        turkish, english = asyncio.run(run())
+        assert turkish.hit and english.hit
+        stats = cache.get_stats()
+        assert stats["size"] == 2 and stats["dimensions"] == [384, 768] and stats["store_errors"] == 0
+
+    def test_content_reload_clears_cached_answers(self, monkeypatch):
+        from content_manager import ContentManager
+
+        base = _vector(10)
+        vectors = {"çalışma saatleri nedir": base, "çalışma saatleriniz nedir?": _near(base, 0.05)}
+        cache = self._cache(vectors)
+        monkeypatch.setattr(semantic_cache, "_semantic_cache", cache)
+
+        asyncio.run(cache.store("çalışma saatleri nedir", "08:00-18:00", "static_content"))
+        assert asyncio.run(cache.lookup("çalışma saatleriniz nedir?")).hit
+
+        # An admin content edit: the old answer must not be reused
+        ContentManager().reload_content()
+        assert not asyncio.run(cache.lookup("çalışma saatleriniz nedir?")).hit
+        assert cache.get_stats()["size"] == 0
+
+    def test_parse_source_thresholds(self):
+        assert parse_source_thresholds("knowledge_base=0.9, openai=0.95,bozuk") == {
+            "knowledge_base": 0.9, "openai": 0.95}
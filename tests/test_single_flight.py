@@ -0,0 +1,101 @@
+"""
+Test single-flight coalescing of identical concurrent requests
+"""
+import asyncio
+
+from single_flight import SingleFlight
+
+
+class FakeInflightCache:
+    """Cache stub exposing the cross-worker lock-and-notify interface"""
+
+    def __init__(self, owned):
+        self.owned = owned
+        self.released = []
+
+    async def acquire_inflight(self, key, token, ttl):
+        return self.owned
+
+    async def release_inflight(self, key, token):
+        self.released.append(key)
+
+    async def wait_for_inflight(self, key, timeout):
+        return True
+
+
+class TestSingleFlight:
+    """Test SingleFlight.do"""
+
+    def test_concurrent_duplicates_share_one_computation(self):
+        """Only the first caller computes; duplicates get the same result"""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return ("yanıt", "huggingface")
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(result == ("yanıt", "huggingface") for result, _ in results)
+        assert sorted(str(coalesced) for _, coalesced in results) == ["None"] + ["local"] * 4
+        assert flight.get_stats()["coalesced_local"] == 4
+        assert flight.get_stats()["in_flight"] == 0
+
+    def test_sequential_requests_are_not_coalesced(self):
+        """A finished computation is not reused by later requests"""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            return [await flight.do("key", compute) for _ in range(2)]
+
+        assert asyncio.run(run()) == [(1, None), (2, None)]
+
+    def test_error_propagates_to_all_waiters(self):
+        """Duplicates see the leader's failure instead of hanging"""
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("model error")
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", compute) for _ in range(3)),
+                                        return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+
+    def test_other_worker_result_read_from_cache(self):
+        """When another worker holds the lock, the answer comes from the shared cache"""
+        flight = SingleFlight()
+        cache = FakeInflightCache(owned=False)
+
+        async def compute():
+            raise AssertionError("should not compute")
+
+        async def lookup():
+            return ("önbellek", "openai")
+
+        result = asyncio.run(flight.do("key", compute, cache=cache, lookup=lookup))
+        assert result == (("önbellek", "openai"), "distributed")
+        assert flight.get_stats()["coalesced_distributed"] == 1
+
+    def test_owner_releases_lock(self):
+        """The lock owner computes and releases the lock afterwards"""
+        flight = SingleFlight()
+        cache = FakeInflightCache(owned=True)
+
+        async def compute():
+            return "yanıt"
+
+        assert asyncio.run(flight.do("key", compute, cache=cache)) == ("yanıt", None)
+        assert cache.released == ["key"]
@@ -0,0 +1,139 @@
+"""
+Test that a request's generation deadline reaches the AI service as a time budget,
+and that generation stops cleanly when it runs out
+"""
+import asyncio
+import time
+
+import pytest
+
+from generation_budget import (
+    GenerationBudget, SentenceSplitter, remaining_generation_budget, truncate_to_sentence_boundary
+)
+from services.ai_service.adapter import AIServiceAdapter
+from services.ai_service.client import AIServiceClient, AIServiceError
+from unified_microservice_architecture import (
+    MicroserviceConfig, ServiceMode, ServiceRegistry, UnifiedModelManager
+)
+
+
+class RecordingClient(AIServiceClient):
+    """Client whose HTTP layer records the request bodies"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    async def _make_request(self, method, endpoint, data=None, accept=None):
+        self.requests.append((endpoint, data))
+        return {"response": "yanıt", "generated_text": "yanıt"}
+
+
+class DeadlineRecorder:
+    """Model manager stub recording the deadline / budget it was called with"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    async def generate_huggingface_response(self, message, user_id=None, deadline=None):
+        self.calls.append(deadline)
+        if self.fail:
+            raise ConnectionError("ai service down")
+        return "yanıt"
+
+    def generate_text_response(self, prompt, max_length=80, turkish_context=True, time_budget=None):
+        self.calls.append(time_budget)
+        return "yanıt"
+
+
+class TestClientTimeBudget:
+    """Test the budget sent by AIServiceClient"""
+
+    def test_remaining_budget_is_sent(self):
+        client = RecordingClient()
+        asyncio.run(client.generate_huggingface_response("soru", deadline=time.monotonic() + 2.0))
+        asyncio.run(client.generate_huggingface_response("soru"))
+        asyncio.run(client.generate_text("soru", time_budget=1.5))
+
+        (_, with_deadline), (_, without_deadline), (endpoint, text) = client.requests
+        assert 1.5 < with_deadline["time_budget_seconds"] <= 2.0
+        assert "time_budget_seconds" not in without_deadline
+        assert endpoint == "/generate" and text["time_budget_seconds"] == 1.5
+
+    def test_expired_deadline_skips_the_request(self):
+        client = RecordingClient()
+        with pytest.raises(AIServiceError):
+            asyncio.run(client.generate_huggingface_response("soru", deadline=time.monotonic() - 0.1))
+        assert client.requests == []
+
+
+class TestDeadlinePropagation:
+    """Test that the adapter and the unified manager forward the deadline"""
+
+    def test_unified_manager_forwards_deadline_to_both_paths(self):
+        manager = UnifiedModelManager(MicroserviceConfig(), ServiceRegistry())
+        manager.mode = ServiceMode.HYBRID
+        manager._ai_service_client = DeadlineRecorder(fail=True)
+        manager._local_model_manager = DeadlineRecorder()
+        deadline = time.monotonic() + 3.0
+
+        result = asyncio.run(manager.generate_huggingface_response("soru", deadline=deadline))
+        asyncio.run(manager.generate_text_response_async("soru", time_budget=1.0))
+
+        assert result == "yanıt"
+        assert manager._ai_service_client.calls == [deadline]
+        assert manager._local_model_manager.calls == [deadline, 1.0]
+
+    def test_adapter_forwards_deadline_to_client_and_fallback(self):
+        adapter = AIServiceAdapter()
+        adapter._ai_client = DeadlineRecorder()
+        deadline = time.monotonic() + 3.0
+        asyncio.run(adapter.generate_huggingface_response("soru", deadline=deadline))
+        assert adapter._ai_client.calls == [deadline]
+
+        fallback = AIServiceAdapter(enable_ai_service=False)
+        fallback.set_original_model_manager(DeadlineRecorder())
+        asyncio.run(fallback.generate_huggingface_response("soru", deadline=deadline))
+        assert fallback._original_model_manager.calls == [deadline]
+
+
+class TestGenerationBudget:
+    """Test the torch-free stopping and sentence logic used by model_manager"""
+
+    def test_deadline_budget_is_capped_at_the_configured_budget(self):
+        # A far-future caller deadline must not disable the generation budget
+        assert remaining_generation_budget(time.monotonic() + 3600, 4.0) == 4.0
+        assert 1.5 < remaining_generation_budget(time.monotonic() + 2.0, 4.0) < 2.0
+        assert remaining_generation_budget(None, 4.0) == 4.0
+        # Too little time left: skip generation
+        assert remaining_generation_budget(time.monotonic() + 0.2, 4.0) is None
+
+    def test_budget_stops_after_deadline_and_on_cancel(self):
+        budget = GenerationBudget(0.05)
+        assert budget.tick() is False
+        time.sleep(0.06)
+        assert budget.tick() is True and budget.budget_exceeded
+
+        unlimited = GenerationBudget()
+        assert not any(unlimited.tick() for _ in range(100))
+        unlimited.cancel()
+        assert unlimited.tick() is True and not unlimited.budget_exceeded
+        assert unlimited.tokens_generated == 101
+
+    def test_streamed_pieces_are_released_per_sentence(self):
+        splitter = SentenceSplitter()
+        released = []
+        for piece in ["Merhaba", ". Nası", "lsınız? İyi", "yim", " teşekkürler"]:
+            released.extend(splitter.feed(piece))
+
+        assert released == ["Merhaba.", "Nasılsınız?"]
+        assert splitter.tail() == "İyiyim teşekkürler"
+
+    def test_deadline_drops_the_unfinished_sentence(self):
+        splitter = SentenceSplitter()
+        assert splitter.feed("Sipariş hazır. Kargo yar") == ["Sipariş hazır."]
+        assert splitter.tail(truncated=True) == ""
+
+        assert truncate_to_sentence_boundary("Tamam! Devam edi") == "Tamam!"
+        assert truncate_to_sentence_boundary("yarım cümle") == ""
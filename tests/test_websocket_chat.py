@@ -0,0 +1,60 @@
+"""
+Test that WebSocket chat messages require an authenticated, rate-limited connection
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from starlette.websockets import WebSocketState
+
+import core.rate_limiter as rate_limiter_module
+from core.configuration import RateLimitConfig
+from core.rate_limiter import DistributedRateLimiter
+from websocket_manager import ConnectionManager, WebSocketMessageHandler
+
+
+class FakeWebSocket:
+    """Connected WebSocket stub recording the frames sent to the client"""
+
+    def __init__(self, user_info=None):
+        self.client_state = WebSocketState.CONNECTED
+        self.headers = {}
+        self.client = SimpleNamespace(host="10.0.0.7")
+        self.sent = []
+        if user_info is not None:
+            self.user_info = user_info
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def _user(exp_offset=900):
+    return {"username": "ali", "user_id": "42", "payload": {"exp": int(time.time()) + exp_offset}}
+
+
+def _chat(websocket):
+    handler = WebSocketMessageHandler(ConnectionManager())
+    asyncio.run(handler.handle_chat_message(websocket, {"type": "chat_message", "message": "Merhaba"}))
+    return websocket.sent
+
+
+class TestWebSocketChatGuards:
+    """Test the checks run before any AI generation starts"""
+
+    def test_unauthenticated_connection_is_rejected(self):
+        sent = _chat(FakeWebSocket())
+        assert [frame["message"] for frame in sent] == ["User not authenticated"]
+
+    def test_expired_token_is_rejected(self):
+        sent = _chat(FakeWebSocket(_user(exp_offset=-5)))
+        assert [frame["message"] for frame in sent] == ["User not authenticated"]
+
+    def test_chat_rate_limit_applies(self, monkeypatch):
+        limiter = DistributedRateLimiter(RateLimitConfig(chat_requests_per_minute=1, use_redis=False))
+        monkeypatch.setattr(rate_limiter_module, "_global_rate_limiter", limiter)
+        # The client's only chat request this window is already used up
+        assert asyncio.run(limiter.is_allowed("10.0.0.7", "chat"))
+
+        sent = _chat(FakeWebSocket(_user()))
+        assert [frame["message"] for frame in sent] == ["Too many chat requests. Please slow down."]
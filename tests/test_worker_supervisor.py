@@ -0,0 +1,152 @@
+"""
+Test crash handling and readiness tracking in the multi-worker supervisor
+"""
+import os
+from types import SimpleNamespace
+
+import core.worker_supervisor as worker_supervisor
+from core.worker_supervisor import WorkerInfo, WorkerSupervisor, check_multi_worker_requirements
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _supervisor(monkeypatch, exits):
+    """Supervisor whose waitpid reports the given (pid, status) exits and whose forks are recorded"""
+    supervisor = WorkerSupervisor(app=None, host="127.0.0.1", port=0, workers=2, max_restart_backoff=4.0)
+    supervisor._running = True
+    spawned = []
+    clock = FakeClock()
+
+    def waitpid(pid, options):
+        return exits.pop(0) if exits else (0, 0)
+
+    def spawn(index, restarts=0):
+        spawned.append((index, restarts, clock.now))
+        worker = WorkerInfo(index=index, pid=500 + len(spawned), restarts=restarts)
+        supervisor.workers[worker.pid] = worker
+        return worker
+
+    def no_sleep(seconds):
+        raise AssertionError("the supervisor loop must not sleep on a crash")
+
+    monkeypatch.setattr(worker_supervisor.os, "waitpid", waitpid)
+    monkeypatch.setattr(worker_supervisor.time, "monotonic", clock)
+    monkeypatch.setattr(worker_supervisor.time, "sleep", no_sleep)
+    monkeypatch.setattr(supervisor, "_spawn_worker", spawn)
+    return supervisor, spawned, clock
+
+
+class TestWorkerSupervisor:
+    """Test scheduled crash restarts, backoff and readiness"""
+
+    def test_crash_schedules_respawn_instead_of_sleeping(self, monkeypatch):
+        exits = [(101, 256), (102, 256)]
+        supervisor, spawned, clock = _supervisor(monkeypatch, exits)
+        supervisor.workers = {101: WorkerInfo(index=0, pid=101), 102: WorkerInfo(index=1, pid=102)}
+
+        supervisor._reap_workers()
+        supervisor._respawn_due_workers()
+        assert spawned == [] and supervisor.get_stats()["pending_respawns"] == [0, 1]
+
+        clock.now += 0.5
+        supervisor._respawn_due_workers()
+        assert spawned == [(0, 1, 1000.5), (1, 1, 1000.5)]
+        assert supervisor.stats["workers_crashed"] == 2 and supervisor._pending_respawns == {}
+
+    def test_backoff_grows_with_repeated_crashes_and_is_capped(self, monkeypatch):
+        exits = []
+        supervisor, spawned, clock = _supervisor(monkeypatch, exits)
+        supervisor.workers = {101: WorkerInfo(index=0, pid=101)}
+
+        delays = []
+        for _ in range(5):
+            crashed = next(iter(supervisor.workers.values()))
+            exits.append((crashed.pid, 256))
+            supervisor._reap_workers()
+            due, _ = supervisor._pending_respawns[0]
+            delays.append(due - clock.now)
+            clock.now = due
+            supervisor._respawn_due_workers()
+
+        assert delays == [0.5, 1.0, 2.0, 4.0, 4.0]
+        assert [restarts for _, restarts, _ in spawned] == [1, 2, 3, 4, 5]
+
+    def test_no_respawn_while_stopping(self, monkeypatch):
+        supervisor, spawned, clock = _supervisor(monkeypatch, [(101, 0)])
+        supervisor.workers = {101: WorkerInfo(index=0, pid=101)}
+        supervisor._running = False
+
+        supervisor._reap_workers()
+        clock.now += 60
+        supervisor._respawn_due_workers()
+        assert spawned == [] and supervisor.workers == {}
+
+    def test_failed_rolling_restart_stops_the_replacement(self, monkeypatch):
+        supervisor, spawned, clock = _supervisor(monkeypatch, [])
+        old = WorkerInfo(index=0, pid=101, ready=True)
+        supervisor.workers = {101: old}
+        killed = []
+        ready_read, ready_write = os.pipe()
+        os.close(ready_write)
+
+        replacements = []
+
+        def spawn(index, restarts=0):
+            worker = WorkerInfo(index=index, pid=201, ready_fd=ready_read)
+            supervisor.workers[worker.pid] = worker
+            replacements.append(worker)
+            return worker
+
+        def wait_ready(worker):
+            # The replacement crashed during startup and the reaper scheduled a respawn
+            supervisor._pending_respawns[worker.index] = (clock.now + 0.5, 1)
+            return False
+
+        def kill(pid, sig):
+            killed.append(pid)
+            raise ProcessLookupError
+
+        monkeypatch.setattr(supervisor, "_spawn_worker", spawn)
+        monkeypatch.setattr(supervisor, "_wait_ready", wait_ready)
+        monkeypatch.setattr(worker_supervisor.os, "kill", kill)
+        supervisor._rolling_restart()
+
+        # Only the old worker is left serving the slot
+        assert killed == [201] and supervisor.workers == {101: old}
+        assert supervisor.get_stats()["pending_respawns"] == [] and replacements[0].ready_fd is None
+
+    def test_ready_signal_resets_crash_count(self):
+        supervisor = WorkerSupervisor(app=None, host="127.0.0.1", port=0, workers=1)
+        ready_read, ready_write = os.pipe()
+        worker = WorkerInfo(index=0, pid=101, ready_fd=ready_read)
+        supervisor.workers = {101: worker}
+        supervisor._crash_counts[0] = 3
+
+        os.write(ready_write, b"1")
+        os.close(ready_write)
+        supervisor._collect_ready_signals(timeout=1)
+
+        assert worker.ready and worker.ready_fd is None and 0 not in supervisor._crash_counts
+
+
+class TestMultiWorkerRequirements:
+    """Test the per-process state check done before starting N > 1 workers"""
+
+    def test_single_worker_needs_nothing_and_memory_rate_limits_are_reported(self):
+        config = SimpleNamespace(
+            rate_limit=SimpleNamespace(enabled=True, use_redis=False),
+            cache=SimpleNamespace(distributed_cache_enabled=False, redis_url="redis://127.0.0.1:1/0",
+                                  redis_password=None),
+        )
+        assert check_multi_worker_requirements(config, 1) == []
+
+        problems = check_multi_worker_requirements(config, 4)
+        assert any("RATE_LIMIT_USE_REDIS=false" in p for p in problems)
+        assert any("DISTRIBUTED_CACHE_ENABLED=false" in p for p in problems)
+        assert any("Redis not reachable" in p for p in problems)
@@ -28,9 +28,12 @@ from typing import Dict, Any, List, Optional, Union, Protocol
 from abc import ABC, abstractmethod
 from enum import Enum
 from dataclasses import dataclass
-from functools import wraps
+from collections import deque
+from functools import partial, wraps
 import weakref
 
+from housekeeping import get_housekeeping_scheduler
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -66,6 +69,9 @@ class MicroserviceConfig:
     circuit_breaker_timeout: int = 30
     max_retry_attempts: int = 3
     retry_delay: float = 1.0
+    routing_ewma_alpha: float = 0.2  # Gecikme EWMA ağırlığı (yeni örnek)
+    hedge_embeddings: bool = True  # p95 aşılınca embedding isteğini ikinci yola da gönder
+    hedge_min_samples: int = 20  # Hedge için gereken minimum gecikme örneği
 
     @classmethod
     def from_env(cls) -> 'MicroserviceConfig':
@@ -77,7 +83,10 @@ class MicroserviceConfig:
             fallback_strategy=os.getenv("FALLBACK_STRATEGY", "progressive"),
             health_check_interval=int(os.getenv("HEALTH_CHECK_INTERVAL", "60")),
             circuit_breaker_threshold=int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5")),
-            circuit_breaker_timeout=int(os.getenv("CIRCUIT_BREAKER_TIMEOUT", "30"))
+            circuit_breaker_timeout=int(os.getenv("CIRCUIT_BREAKER_TIMEOUT", "30")),
+            routing_ewma_alpha=float(os.getenv("ROUTING_EWMA_ALPHA", "0.2")),
+            hedge_embeddings=os.getenv("HEDGE_EMBEDDINGS", "true").lower() == "true",
+            hedge_min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
         )
 
 # =============================================================================
@@ -91,11 +100,13 @@ class IModelManager(Protocol):
         """Embedding oluştur"""
         ...
     
-    def generate_text_response(self, prompt: str, max_length: int = 80, turkish_context: bool = True) -> str:
+    def generate_text_response(self, prompt: str, max_length: int = 80, turkish_context: bool = True,
+                               time_budget: Optional[float] = None) -> str:
         """Metin yanıtı oluştur"""
         ...
     
-    async def generate_huggingface_response(self, message: str, user_id: str = None) -> str:
+    async def generate_huggingface_response(self, message: str, user_id: str = None,
+                                            deadline: Optional[float] = None) -> str:
         """Hugging Face yanıt oluştur"""
         ...
     
@@ -317,6 +328,131 @@ class AIServiceHealthMonitor(IHealthMonitor):
 # UNIFIED MODEL MANAGER
 # =============================================================================
 
+# =============================================================================
+# ADAPTIVE ROUTING
+# =============================================================================
+
+class PathLatencyTracker:
+    """Bir çıkarım yolunun (yerel / AI servis) EWMA gecikmesi ve anlık yükü"""
+    
+    STALE_AFTER_SECONDS = 10.0  # Bu süre ölçüm gelmezse yol yeniden denenir
+    
+    def __init__(self, alpha: float = 0.2, window: int = 200):
+        self.alpha = alpha
+        self.ewma_ms: Optional[float] = None
+        self._last_update = 0.0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def start(self) -> float:
+        with self._lock:
+            self.in_flight += 1
+        return time.perf_counter()
+    
+    def finish(self, started_at: float, success: bool, cancelled: bool = False) -> None:
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        with self._lock:
+            self.in_flight -= 1
+            if cancelled:
+                # Hedge kaybetti: geçen süre gerçek gecikmenin alt sınırı, EWMA'yı yine de besler
+                self.cancelled += 1
+            elif not success:
+                self.failed += 1
+                return
+            else:
+                self.completed += 1
+                self._samples.append(elapsed_ms)
+            self._last_update = time.monotonic()
+            if self.ewma_ms is None:
+                self.ewma_ms = elapsed_ms
+            else:
+                self.ewma_ms = self.alpha * elapsed_ms + (1 - self.alpha) * self.ewma_ms
+    
+    def expected_completion_ms(self) -> float:
+        """Yeni bir isteğin beklenen tamamlanma süresi: EWMA * (kuyruktaki + 1)"""
+        with self._lock:
+            if self.ewma_ms is None:
+                return 0.0  # Henüz ölçüm yok: yolu keşfet
+            if self.in_flight == 0 and time.monotonic() - self._last_update > self.STALE_AFTER_SECONDS:
+                return 0.0  # Eski ölçüm: yol toparlanmış olabilir, yeniden dene
+            return self.ewma_ms * (self.in_flight + 1)
+    
+    def p95_ms(self, min_samples: int) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        p95 = self.p95_ms(1)
+        return {
+            "ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "p95_ms": round(p95, 2) if p95 is not None else None,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled
+        }
+
+class AdaptiveRouter:
+    """
+    Gecikme duyarlı yönlendirici
+    Her işlem için yolların EWMA gecikmesini ve eşzamanlı istek sayısını izler,
+    beklenen tamamlanma süresi en düşük yolu seçer.
+    """
+    
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._trackers: Dict[str, Dict[str, PathLatencyTracker]] = {}
+        self._decisions: Dict[str, Dict[str, int]] = {}
+        self._hedge_stats = {"hedges_sent": 0, "hedge_wins": {}, "primary_wins_after_hedge": 0}
+        self._lock = threading.Lock()
+    
+    def tracker(self, operation: str, path: str) -> PathLatencyTracker:
+        with self._lock:
+            paths = self._trackers.setdefault(operation, {})
+            if path not in paths:
+                paths[path] = PathLatencyTracker(self.alpha)
+            return paths[path]
+    
+    def choose(self, operation: str, candidates: List[str]) -> List[str]:
+        """Adayları beklenen tamamlanma süresine göre sırala; ilk eleman seçilen yoldur"""
+        ordered = sorted(candidates, key=lambda path: self.tracker(operation, path).expected_completion_ms())
+        with self._lock:
+            decisions = self._decisions.setdefault(operation, {})
+            decisions[ordered[0]] = decisions.get(ordered[0], 0) + 1
+        return ordered
+    
+    def record_hedge(self, winner: Optional[str], hedged_path: str) -> None:
+        with self._lock:
+            self._hedge_stats["hedges_sent"] += 1
+            if winner == hedged_path:
+                wins = self._hedge_stats["hedge_wins"]
+                wins[hedged_path] = wins.get(hedged_path, 0) + 1
+            elif winner is not None:
+                self._hedge_stats["primary_wins_after_hedge"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            operations = {op: dict(paths) for op, paths in self._trackers.items()}
+            decisions = {op: dict(counts) for op, counts in self._decisions.items()}
+            hedging = {
+                "hedges_sent": self._hedge_stats["hedges_sent"],
+                "hedge_wins": dict(self._hedge_stats["hedge_wins"]),
+                "primary_wins_after_hedge": self._hedge_stats["primary_wins_after_hedge"]
+            }
+        return {
+            "decisions": decisions,
+            "paths": {op: {path: tracker.get_stats() for path, tracker in paths.items()}
+                      for op, paths in operations.items()},
+            "hedging": hedging
+        }
+
 class UnifiedModelManager(IModelManager):
     """
     Birleşik Model Manager
@@ -345,6 +481,9 @@ class UnifiedModelManager(IModelManager):
             "fallback_count": 0,
             "mode_switches": 0
         }
+        
+        # Latency-aware routing between local and AI service paths
+        self._router = AdaptiveRouter(alpha=config.routing_ewma_alpha)
     
     async def initialize(self) -> None:
         """Birleşik manager'ı başlat"""
@@ -442,30 +581,28 @@ class UnifiedModelManager(IModelManager):
     
     async def _setup_health_monitoring(self) -> None:
         """Sağlık izleme sistemini kur"""
-        # Periyodik health check başlat
-        asyncio.create_task(self._periodic_health_check())
+        # Periyodik health check, ortak housekeeping zamanlayıcısında
+        get_housekeeping_scheduler().schedule_periodic(
+            "microservices.health_check", self._periodic_health_check, self.config.health_check_interval)
     
     async def _periodic_health_check(self) -> None:
         """Periyodik sağlık kontrolü"""
-        while True:
-            try:
-                await asyncio.sleep(self.config.health_check_interval)
-                
-                # AI servis sağlık kontrolü
-                if self._ai_service_client:
-                    circuit_breaker = self.registry.get_circuit_breaker("ai_service")
-                    if circuit_breaker and not circuit_breaker.is_open():
-                        try:
-                            health_data = await self._ai_service_client.get_service_health()
-                            if health_data.get("status") == "healthy":
-                                circuit_breaker.record_success()
-                            else:
-                                circuit_breaker.record_failure()
-                        except Exception:
+        try:
+            # AI servis sağlık kontrolü
+            if self._ai_service_client:
+                circuit_breaker = self.registry.get_circuit_breaker("ai_service")
+                if circuit_breaker and not circuit_breaker.is_open():
+                    try:
+                        health_data = await self._ai_service_client.get_service_health()
+                        if health_data.get("status") == "healthy":
+                            circuit_breaker.record_success()
+                        else:
                             circuit_breaker.record_failure()
-                
-            except Exception as e:
-                logger.error(f"Health check error: {e}")
+                    except Exception:
+                        circuit_breaker.record_failure()
+            
+        except Exception as e:
+            logger.error(f"Health check error: {e}")
     
     async def _fallback_to_local(self) -> None:
         """Yerel moda geri dön"""
@@ -484,37 +621,122 @@ class UnifiedModelManager(IModelManager):
         
         return self.mode in [ServiceMode.MICROSERVICE, ServiceMode.HYBRID]
     
-    async def _execute_with_fallback(self, operation_name: str, ai_func, local_func, *args, **kwargs):
-        """Circuit breaker ve fallback ile işlem çalıştır"""
+    def _candidate_paths(self) -> List[str]:
+        """Bu istek için kullanılabilecek yollar (tercih sırasına göre, yerel fallback sonda)"""
+        paths = []
+        if self._should_use_ai_service():
+            paths.append("ai_service")
+        if self._local_model_manager:
+            paths.append("local")
+        return paths
+    
+    async def _run_path(self, operation_name: str, path: str, ai_func, local_func, *args, **kwargs):
+        """Tek bir yolda işlemi çalıştır; gecikme ve circuit breaker kaydı tutar"""
+        tracker = self._router.tracker(operation_name, path)
+        circuit_breaker = self.registry.get_circuit_breaker("ai_service") if path == "ai_service" else None
+        started_at = tracker.start()
+        try:
+            if path == "ai_service":
+                result = await ai_func(*args, **kwargs)
+            else:
+                # Yerel çıkarım bloklayıcı: event loop'u tutmamak için executor'da çalıştır
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(None, partial(local_func, *args, **kwargs))
+        except asyncio.CancelledError:
+            # Hedge kaybeden istek: hata sayılmaz
+            tracker.finish(started_at, success=False, cancelled=True)
+            raise
+        except Exception:
+            tracker.finish(started_at, success=False)
+            if circuit_breaker:
+                circuit_breaker.record_failure()
+            raise
+        
+        tracker.finish(started_at, success=True)
+        if circuit_breaker:
+            circuit_breaker.record_success()
+        return result
+    
+    async def _run_hedged(self, operation_name: str, paths: List[str], attempted: List[str],
+                          ai_func, local_func, *args, **kwargs):
+        """
+        Birincil yolu çalıştır; p95 süresinde yanıt gelmezse ikinci yolu da başlat,
+        ilk başarılı yanıtı döndür (başlatılan yollar ``attempted`` listesine eklenir)
+        """
+        primary, secondary = paths[0], paths[1]
+        attempted.append(primary)
+        primary_task = asyncio.ensure_future(
+            self._run_path(operation_name, primary, ai_func, local_func, *args, **kwargs))
+        p95_ms = self._router.tracker(operation_name, primary).p95_ms(self.config.hedge_min_samples)
+        
+        if p95_ms is not None:
+            done, _ = await asyncio.wait({primary_task}, timeout=p95_ms / 1000)
+            if not done:
+                attempted.append(secondary)
+                hedge_task = asyncio.ensure_future(
+                    self._run_path(operation_name, secondary, ai_func, local_func, *args, **kwargs))
+                task_paths = {primary_task: primary, hedge_task: secondary}
+                pending = set(task_paths)
+                last_error = None
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            for other in pending:
+                                other.cancel()
+                            self._router.record_hedge(task_paths[task], secondary)
+                            return task.result()
+                        last_error = task.exception()
+                self._router.record_hedge(None, secondary)
+                raise last_error
+        
+        return await primary_task
+    
+    async def _execute_with_fallback(self, operation_name: str, ai_func, local_func, *args,
+                                     hedge: bool = False, **kwargs):
+        """
+        Gecikme duyarlı yönlendirme, circuit breaker ve fallback ile işlem çalıştır
+        HYBRID modda beklenen tamamlanma süresi en düşük yol seçilir; hedge=True ise
+        birincil yol p95'ini aşınca istek ikinci yola da gönderilir.
+        """
         self._metrics["request_count"] += 1
         
-        # AI servis dene
-        if self._should_use_ai_service():
-            circuit_breaker = self.registry.get_circuit_breaker("ai_service")
+        paths = self._candidate_paths()
+        if not paths:
+            raise Exception(f"Hem AI servis hem yerel manager kullanılamıyor: {operation_name}")
+        routed = self.mode == ServiceMode.HYBRID and len(paths) > 1
+        if routed:
+            paths = self._router.choose(operation_name, paths)
+        
+        attempted: List[str] = []
+        last_error = None
+        if hedge and routed and self.config.hedge_embeddings:
             try:
-                result = await ai_func(*args, **kwargs)
-                if circuit_breaker:
-                    circuit_breaker.record_success()
-                return result
-                
+                return await self._run_hedged(operation_name, paths, attempted, ai_func, local_func,
+                                              *args, **kwargs)
             except Exception as e:
-                logger.warning(f"⚠️ AI servis hatası ({operation_name}): {e}")
-                if circuit_breaker:
-                    circuit_breaker.record_failure()
-                
+                # Birincil yol hedge başlamadan düştüyse kalan yollar sırayla denenir
+                logger.warning(f"⚠️ Hedge edilmiş istek başarısız ({operation_name}): {e}")
                 self._metrics["error_count"] += 1
+                last_error = e
         
-        # Fallback - yerel manager kullan
-        self._metrics["fallback_count"] += 1
-        
-        if self._local_model_manager:
+        for path in paths:
+            if path in attempted:
+                continue
+            if last_error is not None:
+                self._metrics["fallback_count"] += 1
+            attempted.append(path)
             try:
-                return local_func(*args, **kwargs)
+                return await self._run_path(operation_name, path, ai_func, local_func, *args, **kwargs)
             except Exception as e:
-                logger.error(f"❌ Yerel fallback hatası ({operation_name}): {e}")
-                raise
-        else:
-            raise Exception(f"Hem AI servis hem yerel manager kullanılamıyor: {operation_name}")
+                last_error = e
+                self._metrics["error_count"] += 1
+                if path == "ai_service":
+                    logger.warning(f"⚠️ AI servis hatası ({operation_name}): {e}")
+                else:
+                    logger.error(f"❌ Yerel model hatası ({operation_name}): {e}")
+        
+        raise last_error
     
     # IModelManager implementation
     
@@ -525,36 +747,47 @@ class UnifiedModelManager(IModelManager):
     async def generate_embedding_async(self, text: str, force_turkish: bool = None) -> List[float]:
         """Embedding oluştur - async"""
         async def ai_func(text, force_turkish):
-            return await self._ai_service_client.generate_embedding(text, force_turkish)
+            # İstemci numpy döner; yerel yol ve IModelManager sözleşmesi List[float]
+            return (await self._ai_service_client.generate_embedding(text, force_turkish)).tolist()
         
         def local_func(text, force_turkish):
             return self._local_model_manager.generate_embedding(text, force_turkish)
         
-        return await self._execute_with_fallback("generate_embedding", ai_func, local_func, text, force_turkish)
+        # Embedding gecikmeye duyarlı: yavaş yolda p95 aşılırsa hedge
+        return await self._execute_with_fallback("generate_embedding", ai_func, local_func, text, force_turkish,
+                                                 hedge=True)
     
-    def generate_text_response(self, prompt: str, max_length: int = 80, turkish_context: bool = True) -> str:
+    def generate_text_response(self, prompt: str, max_length: int = 80, turkish_context: bool = True,
+                               time_budget: Optional[float] = None) -> str:
         """Metin yanıtı oluştur"""
-        return asyncio.run(self.generate_text_response_async(prompt, max_length, turkish_context))
+        return asyncio.run(self.generate_text_response_async(prompt, max_length, turkish_context, time_budget))
     
-    async def generate_text_response_async(self, prompt: str, max_length: int = 80, turkish_context: bool = True) -> str:
-        """Metin yanıtı oluştur - async"""
-        async def ai_func(prompt, max_length, turkish_context):
-            return await self._ai_service_client.generate_text(prompt, max_length, turkish_context)
+    async def generate_text_response_async(self, prompt: str, max_length: int = 80, turkish_context: bool = True,
+                                           time_budget: Optional[float] = None) -> str:
+        """Metin yanıtı oluştur - async (time_budget: saniye cinsinden üretim bütçesi)"""
+        async def ai_func(prompt, max_length, turkish_context, time_budget):
+            return await self._ai_service_client.generate_text(prompt, max_length, turkish_context,
+                                                               time_budget=time_budget)
         
-        def local_func(prompt, max_length, turkish_context):
-            return self._local_model_manager.generate_text_response(prompt, max_length, turkish_context)
+        def local_func(prompt, max_length, turkish_context, time_budget):
+            return self._local_model_manager.generate_text_response(prompt, max_length, turkish_context,
+                                                                    time_budget=time_budget)
         
-        return await self._execute_with_fallback("generate_text", ai_func, local_func, prompt, max_length, turkish_context)
+        return await self._execute_with_fallback("generate_text", ai_func, local_func, prompt, max_length,
+                                                 turkish_context, time_budget)
     
-    async def generate_huggingface_response(self, message: str, user_id: str = None) -> str:
-        """Hugging Face yanıt oluştur"""
-        async def ai_func(message, user_id):
-            return await self._ai_service_client.generate_huggingface_response(message, user_id)
+    async def generate_huggingface_response(self, message: str, user_id: str = None,
+                                            deadline: Optional[float] = None) -> str:
+        """Hugging Face yanıt oluştur (deadline: isteğin time.monotonic() tabanlı son anı)"""
+        async def ai_func(message, user_id, deadline):
+            return await self._ai_service_client.generate_huggingface_response(message, user_id, deadline=deadline)
         
-        def local_func(message, user_id):
-            return asyncio.run(self._local_model_manager.generate_huggingface_response(message, user_id))
+        def local_func(message, user_id, deadline):
+            return asyncio.run(self._local_model_manager.generate_huggingface_response(
+                message, user_id, deadline=deadline))
         
-        return await self._execute_with_fallback("generate_huggingface", ai_func, local_func, message, user_id)
+        return await self._execute_with_fallback("generate_huggingface", ai_func, local_func, message, user_id,
+                                                 deadline)
     
     def detect_language(self, text: str) -> str:
         """Dil tanıma"""
@@ -649,6 +882,8 @@ class UnifiedModelManager(IModelManager):
                 await close_ai_client()
                 self._ai_service_client = None
             
+            get_housekeeping_scheduler().cancel("microservices.health_check")
+            
             # Yerel manager temizle
             if self._local_model_manager:
                 self._local_model_manager.cleanup_resources()
@@ -684,6 +919,7 @@ class UnifiedModelManager(IModelManager):
                 "metrics": self._metrics
             },
             "services": service_statuses,
+            "routing": self._router.get_stats(),
             "config": {
                 "ai_service_enabled": self.config.ai_service_enabled,
                 "fallback_strategy": self.config.fallback_strategy
@@ -7,6 +7,7 @@ import asyncio
 import json
 import logging
 import os
+import time
 import uuid
 from typing import Dict, Set, Optional, Any
 from datetime import datetime
@@ -248,6 +249,23 @@ def _get_connection_manager():
 # Global connection manager instance - will be distributed if Redis is configured
 websocket_manager = _get_connection_manager()
 
+def _token_expired(user_info: Dict[str, Any]) -> bool:
+    """Access token verified at handshake has expired since (long-lived connections)"""
+    exp = (user_info.get('payload') or {}).get('exp')
+    return exp is not None and exp < time.time()
+
+async def _chat_allowed(websocket: WebSocket) -> bool:
+    """Apply the distributed chat rate limit to a WebSocket chat message"""
+    from core.rate_limiter import get_rate_limiter
+    from core.utils import get_client_ip
+    
+    try:
+        rate_limiter = await get_rate_limiter()
+        return await rate_limiter.is_allowed(get_client_ip(websocket), "chat")
+    except Exception as e:
+        logger.warning(f"WebSocket rate limit check failed: {e}")
+        return True
+
 class WebSocketMessageHandler:
     """
     Handle different types of WebSocket messages
@@ -276,12 +294,79 @@ class WebSocketMessageHandler:
     
     async def handle_chat_message(self, websocket: WebSocket, message_data: dict):
         """
-        Handle chat message from client
-        This will be implemented in the main FastAPI app
+        Handle chat message from client with streamed response
+        Sends ``bot_typing``, incremental ``chat_chunk`` frames and a final
+        ``chat_response`` frame with the full text (legacy clients use only the last one)
         """
-        # This is a placeholder - actual implementation will be in main.py
-        # where we have access to the AI models and database
-        pass
+        # Only connections authenticated at handshake may trigger AI generation
+        user_info = getattr(websocket, 'user_info', None)
+        if not user_info or _token_expired(user_info):
+            await self.connection_manager.send_personal_message({
+                'type': 'error',
+                'message': 'User not authenticated',
+                'timestamp': datetime.utcnow().isoformat()
+            }, websocket)
+            return
+        
+        # Same per-client chat limit as the HTTP chat endpoints
+        if not await _chat_allowed(websocket):
+            logger.warning(f"WebSocket chat rate limit exceeded for user {user_info.get('user_id')}")
+            await self.connection_manager.send_personal_message({
+                'type': 'error',
+                'message': 'Too many chat requests. Please slow down.',
+                'timestamp': datetime.utcnow().isoformat()
+            }, websocket)
+            return
+        
+        # Imported lazily: the chat API pulls in models, database and caches
+        from fastapi import HTTPException
+        from api.chat import stream_chat_events, _validate_chat_input
+        
+        try:
+            message = _validate_chat_input(message_data.get('message') or '')
+        except HTTPException as e:
+            await self.connection_manager.send_personal_message({
+                'type': 'error',
+                'message': e.detail,
+                'timestamp': datetime.utcnow().isoformat()
+            }, websocket)
+            return
+        
+        await self.connection_manager.send_personal_message({
+            'type': 'bot_typing',
+            'typing': True
+        }, websocket)
+        
+        try:
+            final_event = None
+            async for event in stream_chat_events(message):
+                event['timestamp'] = datetime.utcnow().isoformat()
+                await self.connection_manager.send_personal_message(event, websocket)
+                if event['type'] == 'chat_response':
+                    final_event = event
+            
+            if final_event:
+                from database.manager import db_manager
+                from database.utils import get_database_helper
+                get_database_helper(db_manager).save_chat_interaction(
+                    user_id=user_info.get('user_id'),
+                    message=message,
+                    response=final_event['response'],
+                    source=final_event['source']
+                )
+                
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {e}")
+            await self.connection_manager.send_personal_message({
+                'type': 'error',
+                'message': 'Failed to process chat message',
+                'timestamp': datetime.utcnow().isoformat()
+            }, websocket)
+        finally:
+            await self.connection_manager.send_personal_message({
+                'type': 'bot_typing',
+                'typing': False
+            }, websocket)
     
     async def handle_typing_start(self, websocket: WebSocket, message_data: dict):
         """